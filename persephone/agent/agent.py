@@ -5,11 +5,16 @@ import argparse
 import json
 import logging
 import os
+import time
 from pathlib import Path
 from threading import Event, Thread
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
-from .gpu_metrics import collect_gpu_metrics
+from .checkpoints import CheckpointWriter, load_checkpoints, summarize_checkpoints
+from .gpu_metrics import collect_gpu_metrics, make_backend
 from .runner import run_probe
+from .windows import RunWindows
+from .workers import run_workers
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,6 +23,13 @@ logger = logging.getLogger(__name__)
 WORKSPACE = Path("/workspace")
 RESULT_JSON = WORKSPACE / "result.json"
 GPU_CSV = WORKSPACE / "gpu_timeseries.csv"
+GPU_COLUMNAR = WORKSPACE / "gpu_timeseries.ptel"
+# One line per finished configuration of a batch run, appended as they complete.
+RESULTS_JSONL = WORKSPACE / "results.jsonl"
+# One line per time window: latency percentiles next to the GPU state in that window.
+WINDOWS_JSONL = WORKSPACE / "windows.jsonl"
+# Append-only progress of a soak run, one line per checkpoint interval.
+CHECKPOINTS_JSONL = WORKSPACE / "checkpoints.jsonl"
 
 
 def main() -> None:
@@ -26,42 +38,369 @@ def main() -> None:
     run_parser = subparsers.add_parser("run", help="Execute benchmark run")
     run_parser.add_argument("--model", dest="model_ref", default=os.getenv("MODEL_REF", "mock-v0"))
     run_parser.add_argument("--samples", dest="samples", type=int, default=int(os.getenv("SAMPLES", "1")))
+    run_parser.add_argument(
+        "--concurrency", type=int, default=int(os.getenv("CONCURRENCY", "1")), help="Requests in flight"
+    )
+    run_parser.add_argument(
+        "--rate",
+        dest="rate_rps",
+        type=float,
+        default=_optional_float(os.getenv("RATE_RPS")),
+        help="Target arrival rate in requests/s; enables open-loop mode",
+    )
+    run_parser.add_argument(
+        "--arrival", choices=["constant", "poisson"], default=os.getenv("ARRIVAL", "constant")
+    )
+    run_parser.add_argument("--warmup-s", dest="warmup_s", type=float, default=float(os.getenv("WARMUP_S", "0")))
+    run_parser.add_argument(
+        "--duration-s",
+        dest="duration_s",
+        type=float,
+        default=_optional_float(os.getenv("DURATION_S")),
+        help="Measurement phase length; overrides --samples",
+    )
+    run_parser.add_argument(
+        "--telemetry-format",
+        dest="telemetry_format",
+        choices=["csv", "columnar"],
+        default=os.getenv("TELEMETRY_FORMAT", "csv"),
+        help="GPU time series format: CSV text or compressed columnar blocks",
+    )
+    run_parser.add_argument(
+        "--backend",
+        choices=["mock", "reference", "openai"],
+        default=os.getenv("INFERENCE_BACKEND", "mock"),
+        help="Inference backend: 20 ms mock, numpy reference model on CPU, or an OpenAI-compatible server",
+    )
+    run_parser.add_argument(
+        "--backend-url",
+        dest="backend_url",
+        default=os.getenv("INFERENCE_URL", "http://localhost:8000"),
+        help="Base URL of the OpenAI-compatible server, e.g. vLLM",
+    )
+    run_parser.add_argument(
+        "--dataset-profile",
+        dest="dataset_profile",
+        default=os.getenv("DATASET_PROFILE"),
+        help="Built-in prompt profile (chat, summarize, code, long-context) or a JSON lines file of prompts",
+    )
+    run_parser.add_argument(
+        "--batch-sizes",
+        dest="batch_sizes",
+        default=os.getenv("BATCH_SIZES", "1"),
+        help="Comma-separated prompts per request; more than one size runs a sweep",
+    )
+    run_parser.add_argument(
+        "--max-tokens",
+        dest="max_tokens",
+        type=int,
+        default=_optional_int(os.getenv("MAX_TOKENS")),
+        help="Tokens to generate per prompt; defaults to the dataset profile's",
+    )
+    run_parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WORKERS", "1")),
+        help="Probe processes, each pinned to its own CPU cores; samples and rate are split between them",
+    )
+    run_parser.add_argument(
+        "--gpus",
+        default=os.getenv("GPUS"),
+        help="Comma-separated GPU indexes assigned to workers round-robin via CUDA_VISIBLE_DEVICES",
+    )
+    run_parser.add_argument(
+        "--window-s",
+        dest="window_s",
+        type=float,
+        default=float(os.getenv("WINDOW_S", "2")),
+        help="Window length for joining request latencies with GPU telemetry",
+    )
+    run_parser.add_argument(
+        "--soak-s",
+        dest="soak_s",
+        type=float,
+        default=_optional_float(os.getenv("SOAK_S")),
+        help="Soak mode: run for this many seconds, checkpointing progress to checkpoints.jsonl",
+    )
+    run_parser.add_argument(
+        "--checkpoint-s",
+        dest="checkpoint_s",
+        type=float,
+        default=float(os.getenv("CHECKPOINT_S", "30")),
+        help="Seconds between soak checkpoints",
+    )
+    run_parser.add_argument(
+        "--checkpoint-max-mb",
+        dest="checkpoint_max_mb",
+        type=float,
+        default=float(os.getenv("CHECKPOINT_MAX_MB", "64")),
+        help="Size of checkpoints.jsonl after which per-window records are no longer checkpointed",
+    )
+    run_parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=os.getenv("RESUME", "") in ("1", "true"),
+        help="Continue the soak recorded in checkpoints.jsonl instead of starting over",
+    )
+    run_parser.add_argument(
+        "--batch-config",
+        dest="batch_config",
+        default=os.getenv("BATCH_CONFIG"),
+        help="JSON list of {id, model_ref, samples} configurations to run one after another",
+    )
+    run_parser.add_argument(
+        "--run-token",
+        dest="run_token",
+        default=os.getenv("RUN_TOKEN"),
+        help="Echoed in result.json so the controller can tell this run's result from an earlier one",
+    )
 
     args = parser.parse_args()
 
     if args.command == "run":
-        execute_run(args.model_ref, args.samples)
+        execute_run(
+            args.model_ref,
+            args.samples,
+            concurrency=args.concurrency,
+            rate_rps=args.rate_rps,
+            arrival=args.arrival,
+            warmup_s=args.warmup_s,
+            duration_s=args.duration_s,
+            telemetry_format=args.telemetry_format,
+            backend=args.backend,
+            backend_url=args.backend_url,
+            dataset_profile=args.dataset_profile,
+            batch_sizes=[int(size) for size in args.batch_sizes.split(",") if size.strip()],
+            max_tokens=args.max_tokens,
+            window_s=args.window_s,
+            workers=args.workers,
+            gpus=[gpu.strip() for gpu in args.gpus.split(",") if gpu.strip()] if args.gpus else None,
+            soak_s=args.soak_s,
+            checkpoint_s=args.checkpoint_s,
+            checkpoint_max_bytes=int(args.checkpoint_max_mb * (1 << 20)),
+            resume=args.resume,
+            batch=json.loads(args.batch_config) if args.batch_config else None,
+            run_token=args.run_token,
+        )
     else:
         parser.print_help()
 
 
-def execute_run(model_ref: str, samples: int) -> None:
-    logger.info("Starting agent run model=%s samples=%s", model_ref, samples)
+def execute_run(
+    model_ref: str,
+    samples: int,
+    concurrency: int = 1,
+    rate_rps: Optional[float] = None,
+    arrival: str = "constant",
+    warmup_s: float = 0.0,
+    duration_s: Optional[float] = None,
+    telemetry_format: str = "csv",
+    backend: str = "mock",
+    backend_url: Optional[str] = None,
+    dataset_profile: Optional[str] = None,
+    batch_sizes: Sequence[int] = (1,),
+    max_tokens: Optional[int] = None,
+    window_s: float = 2.0,
+    workers: int = 1,
+    gpus: Optional[Sequence[str]] = None,
+    soak_s: Optional[float] = None,
+    checkpoint_s: float = 30.0,
+    checkpoint_max_bytes: int = 64 << 20,
+    resume: bool = False,
+    batch: Optional[List[Dict[str, Any]]] = None,
+    run_token: Optional[str] = None,
+) -> None:
+    """Run one probe, or every configuration of ``batch`` in turn, under GPU telemetry.
+
+    Batch results are appended to ``results.jsonl`` as each configuration
+    finishes, with its time window relative to the start of the telemetry; a
+    configuration's own ``dataset_profile`` overrides the run's.
+    Seconds spent in each phase of the run are reported under ``phases``.
+
+    GPU samples and request timings share the ``perf_counter`` clock, with
+    zero at the start of the telemetry; per ``window_s`` window they are
+    joined into ``windows.jsonl``. With more than one of ``workers`` each
+    probe runs in that many processes, see ``workers.run_workers``.
+
+    ``soak_s`` makes the run time-bound with that budget and appends
+    progress to ``checkpoints.jsonl`` every ``checkpoint_s``. With
+    ``resume`` a soak continues from its last checkpoint: only the rest of
+    the budget is run, the time axis carries on where it stopped, and the
+    headline metrics of ``result.json`` cover the whole soak.
+
+    Files left in the workspace by an earlier run on the same pod are
+    removed first, and ``run_token`` is written into ``result.json``.
+    """
+
+    logger.info(
+        "Starting agent run model=%s samples=%s concurrency=%s rate=%s backend=%s dataset=%s",
+        model_ref,
+        samples,
+        concurrency,
+        rate_rps,
+        backend,
+        dataset_profile,
+    )
+    phases: Dict[str, float] = {}
+    phase_started = time.monotonic()
+
+    def mark(phase: str) -> None:
+        nonlocal phase_started
+        now = time.monotonic()
+        phases[phase] = round(now - phase_started, 3)
+        phase_started = now
+
     WORKSPACE.mkdir(parents=True, exist_ok=True)
+    previous = load_checkpoints(CHECKPOINTS_JSONL) if soak_s is not None and resume else []
+    resumed_at_s = float(previous[-1]["t_s"]) if previous else 0.0  # type: ignore[arg-type]
+    if soak_s is not None:
+        # Each batch size would get the whole budget, running for soak_s times their number.
+        if batch is not None or workers > 1 or len(batch_sizes) > 1:
+            raise ValueError("soak mode runs a single probe of one batch size in one process")
+        if previous:
+            logger.info("Resuming soak after %s checkpoints at t=%ss", len(previous), resumed_at_s)
+        duration_s = soak_s - resumed_at_s
+    for stale in (RESULT_JSON, RESULTS_JSONL, WINDOWS_JSONL, GPU_CSV, GPU_COLUMNAR):
+        stale.unlink(missing_ok=True)
+    if not previous:
+        CHECKPOINTS_JSONL.unlink(missing_ok=True)
+    # A resumed soak keeps the time axis of the checkpoints it continues.
+    telemetry_start = time.perf_counter() - resumed_at_s
+    windows = RunWindows(window_s, origin=telemetry_start)
+    load_options: Dict[str, Any] = {
+        "concurrency": concurrency,
+        "rate_rps": rate_rps,
+        "arrival": arrival,
+        "warmup_s": warmup_s,
+        "duration_s": duration_s,
+        "backend": backend,
+        "backend_url": backend_url,
+        "dataset_profile": dataset_profile,
+        "batch_sizes": batch_sizes,
+        "max_tokens": max_tokens,
+        "windows": windows,
+    }
+    if workers > 1:
+        load_options["workers"] = workers
+        load_options["gpus"] = gpus
 
     stop_event = Event()
     metrics_thread = Thread(
         target=collect_gpu_metrics,
         kwargs={
-            "output_path": GPU_CSV,
+            "output_path": GPU_COLUMNAR if telemetry_format == "columnar" else GPU_CSV,
             "interval_s": 0.5,
             "duration_s": None,
             "stop_event": stop_event,
+            "backend": make_backend(os.getenv("GPU_METRICS_BACKEND", "nvml")),
+            "fmt": telemetry_format,
+            "clock": time.perf_counter,
+            "origin": telemetry_start,
+            "windows": windows,
         },
         daemon=True,
     )
     metrics_thread.start()
+    checkpoints = (
+        CheckpointWriter(CHECKPOINTS_JSONL, windows, checkpoint_s, checkpoint_max_bytes, previous)
+        if soak_s is not None
+        else None
+    )
+    if checkpoints is not None:
+        checkpoints.start()
+    mark("setup")
 
     try:
-        result = run_probe(model_ref, samples)
+        if batch is not None:
+            result = _run_batch(batch, load_options, telemetry_start)
+        elif duration_s is not None and duration_s <= 0:
+            result = {}  # The soak had used up its budget before it was interrupted.
+        else:
+            result = _probe(model_ref, samples, load_options)
+        mark("probe")
     finally:
         stop_event.set()
         metrics_thread.join(timeout=5)
+        if checkpoints is not None:
+            checkpoints.stop()
+    mark("telemetry_flush")
+    records: Iterable[Dict[str, object]] = windows.records()
+    if soak_s is not None:
+        saved = load_checkpoints(CHECKPOINTS_JSONL)
+        result = _soak_result(result, saved, soak_s, resumed=bool(previous))
+        # Checkpointed windows, also those from before a resume, are no longer in memory.
+        records = [record for entry in saved for record in entry.get("windows", [])]  # type: ignore[attr-defined]
+    result["phases"] = phases
+    if run_token is not None:
+        result["run_token"] = run_token
+
+    with open(WINDOWS_JSONL, "w", encoding="utf-8") as windows_file:
+        for record in records:
+            windows_file.write(json.dumps(record) + "\n")
 
     with open(RESULT_JSON, "w", encoding="utf-8") as result_file:
         json.dump(result, result_file, indent=2)
     logger.info("Run complete; results stored at %s", RESULT_JSON)
 
 
+def _run_batch(batch: List[Dict[str, Any]], load_options: Dict[str, Any], telemetry_start: float) -> Dict[str, Any]:
+    RESULTS_JSONL.unlink(missing_ok=True)
+    completed: List[str] = []
+    for config in batch:
+        started = time.perf_counter() - telemetry_start
+        options = {**load_options, "dataset_profile": config.get("dataset_profile") or load_options["dataset_profile"]}
+        try:
+            entry: Dict[str, Any] = {
+                "id": config["id"],
+                "result": _probe(config["model_ref"], int(config["samples"]), options),
+            }
+            completed.append(config["id"])
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Batch configuration %s failed", config.get("id"))
+            entry = {"id": config.get("id"), "error": str(exc)}
+        entry["window_s"] = [round(started, 3), round(time.perf_counter() - telemetry_start, 3)]
+        with open(RESULTS_JSONL, "a", encoding="utf-8") as results_file:
+            results_file.write(json.dumps(entry) + "\n")
+            results_file.flush()
+            os.fsync(results_file.fileno())
+    return {"batch": [config.get("id") for config in batch], "completed": completed}
+
+
+def _soak_result(
+    result: Dict[str, Any], checkpoints: List[Dict[str, Any]], budget_s: float, resumed: bool
+) -> Dict[str, Any]:
+    """Attach the soak totals; a resumed soak reports them as its headline metrics.
+
+    The probe result of a resumed soak covers only the part after the
+    restart, so it moves under ``segment``. Its headline percentiles come
+    from the checkpointed window histograms, which are coarser (5 %
+    relative error) than the 1 % histogram of an uninterrupted probe.
+    """
+
+    soak = {"budget_s": budget_s, "resumed": resumed, **summarize_checkpoints(checkpoints)}
+    if not resumed:
+        return {**result, "soak": soak}
+    headline = {
+        key: soak[key]
+        for key in ("errors", "throughput_rps", "latency_p50_ms", "latency_p95_ms", "latency_p99_ms")
+        if key in soak
+    }
+    return {"samples": soak["requests"], "mode": result.get("mode"), **headline, "soak": soak, "segment": result or None}
+
+
+def _probe(model_ref: str, samples: int, load_options: Dict[str, Any]) -> Dict[str, Any]:
+    if "workers" in load_options:
+        return run_workers(model_ref, samples, **load_options)
+    return run_probe(model_ref, samples, **load_options)
+
+
+def _optional_float(value: Optional[str]) -> Optional[float]:
+    return float(value) if value else None
+
+
+def _optional_int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value else None
+
+
 if __name__ == "__main__":
     main()
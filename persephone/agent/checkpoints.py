@@ -0,0 +1,172 @@
+"""Crash-safe progress checkpoints of long-running soak probes."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from threading import Event, Thread
+from typing import Dict, List, Optional, Sequence
+
+from .histogram import LatencyHistogram
+from .windows import RunWindows
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointWriter:
+    """Appends the rolling-window progress of a run to a JSON lines file.
+
+    Every ``interval_s`` (at least one window) the windows that closed since
+    the previous checkpoint are appended as one line: their records, the
+    merged latency histogram and request and error counts. Each line holds
+    only new data, so checkpointing costs the same at hour ten as at minute
+    one, and it is flushed and fsynced so that a crash loses at most one
+    interval. Checkpointed windows are then evicted from ``windows``, so
+    memory does not grow with the length of the run either; requests that
+    complete in a window after it was checkpointed are counted in the next
+    checkpoint. Once the file
+    reaches ``max_bytes`` the per-window records are left out and only the
+    histogram and counters are kept.
+
+    With ``previous`` checkpoints the file is continued instead of replaced;
+    a last line torn by a crash is dropped first.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        windows: RunWindows,
+        interval_s: float = 30.0,
+        max_bytes: int = 64 << 20,
+        previous: Sequence[Dict[str, object]] = (),
+    ) -> None:
+        self.path = path
+        self.windows = windows
+        self.interval_s = max(interval_s, windows.window_s)
+        self.max_bytes = max_bytes
+        self._seq = int(previous[-1]["seq"]) + 1 if previous else 0  # type: ignore[call-overload]
+        self._next_index = windows.index_at(windows.clock())
+        self._late: Optional[LatencyHistogram] = None
+        self._late_errors = 0
+        if previous:
+            _drop_torn_line(path)
+        self._file = open(path, "a" if previous else "w", encoding="utf-8")  # pylint: disable=consider-using-with
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name="checkpoints", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the periodic checkpoints and write a final one covering every window."""
+
+        self._stop.set()
+        self._thread.join()
+        try:
+            self._checkpoint(final=True)
+        finally:
+            self._file.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self._checkpoint(final=False)
+            except OSError as exc:
+                # A lost checkpoint must not end a soak; the next one covers the same windows.
+                logger.warning("Writing checkpoint to %s failed: %s", self.path, exc)
+
+    def _checkpoint(self, final: bool) -> None:
+        last = None if final else self.windows.index_at(self.windows.clock())
+        if last is not None and last <= self._next_index:
+            return
+        records = self.windows.records(self._next_index, last)
+        histogram = self.windows.merged_latency(self._next_index, last)
+        # Late arrivals stay pending until a checkpoint holding them is written.
+        late, late_errors = self.windows.take_late()
+        if late is not None:
+            if self._late is None:
+                self._late = late
+            else:
+                self._late.merge(late)
+        self._late_errors += late_errors
+        if self._late is not None:
+            histogram = histogram or LatencyHistogram(**self._late.layout)
+            histogram.merge(self._late)
+        errors = self._late_errors + sum(int(record["errors"]) for record in records)  # type: ignore[call-overload]
+        entry: Dict[str, object] = {
+            "seq": self._seq,
+            "t_s": round(
+                self.windows.elapsed(self.windows.clock()) if last is None else last * self.windows.window_s, 3
+            ),
+            "final": final,
+            "requests": histogram.count if histogram is not None else 0,
+            "errors": errors,
+            "latency_histogram": histogram.to_dict() if histogram is not None and histogram.count else None,
+        }
+        if self._file.tell() < self.max_bytes:
+            entry["windows"] = records
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._seq += 1
+        self._late, self._late_errors = None, 0
+        if last is not None:
+            self._next_index = last
+            self.windows.evict(last)
+
+
+def load_checkpoints(path: Path) -> List[Dict[str, object]]:
+    """Read the checkpoints in ``path``, ignoring a torn last line; empty if there is no file."""
+
+    if not path.exists():
+        return []
+    checkpoints = []
+    with open(path, encoding="utf-8") as stream:
+        for line in stream:
+            try:
+                checkpoints.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return checkpoints
+
+
+def summarize_checkpoints(checkpoints: Sequence[Dict[str, object]]) -> Dict[str, object]:
+    """Totals and latency percentiles of everything the checkpoints cover."""
+
+    requests = sum(int(checkpoint.get("requests") or 0) for checkpoint in checkpoints)  # type: ignore[call-overload]
+    elapsed_s = float(checkpoints[-1]["t_s"]) if checkpoints else 0.0  # type: ignore[arg-type]
+    summary: Dict[str, object] = {
+        "checkpoints": len(checkpoints),
+        "elapsed_s": elapsed_s,
+        "requests": requests,
+        "errors": sum(int(checkpoint.get("errors") or 0) for checkpoint in checkpoints),  # type: ignore[call-overload]
+        "throughput_rps": round(requests / elapsed_s, 3) if elapsed_s else 0.0,
+    }
+    merged: Optional[LatencyHistogram] = None
+    for checkpoint in checkpoints:
+        payload = checkpoint.get("latency_histogram")
+        if not payload:
+            continue
+        histogram = LatencyHistogram.from_dict(payload)  # type: ignore[arg-type]
+        if merged is None:
+            merged = histogram
+        else:
+            merged.merge(histogram)
+    if merged is not None:
+        latency = merged.percentiles((0.50, 0.95, 0.99))
+        summary.update(
+            latency_p50_ms=round(latency[0.50], 3),
+            latency_p95_ms=round(latency[0.95], 3),
+            latency_p99_ms=round(latency[0.99], 3),
+            latency_max_ms=round(merged.max_ms, 3),
+        )
+    return summary
+
+
+def _drop_torn_line(path: Path) -> None:
+    if not path.exists():
+        return
+    with open(path, "rb+") as stream:
+        data = stream.read()
+        stream.truncate(data.rfind(b"\n") + 1)
@@ -0,0 +1,86 @@
+"""Prompt sets selected by a run's ``dataset_profile``."""
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Prompt:
+    text: str
+    max_tokens: int
+
+
+@dataclass(frozen=True)
+class DatasetProfile:
+    """Synthetic prompt distribution: prompt length in words and tokens to generate."""
+
+    prompt_words: Tuple[int, int]
+    max_tokens: int
+    instruction: str
+
+
+DEFAULT_PROFILE = "chat"
+PROFILES: Dict[str, DatasetProfile] = {
+    "chat": DatasetProfile((16, 64), 128, "Answer the question briefly."),
+    "summarize": DatasetProfile((256, 768), 96, "Summarize the following text."),
+    "code": DatasetProfile((32, 128), 256, "Write a function that does the following."),
+    "long-context": DatasetProfile((1024, 2048), 32, "Answer using only the document below."),
+}
+
+_WORDS = (
+    "the model request batch token latency cache memory kernel device queue stream "
+    "server client window sample value result error retry budget signal metric power "
+    "thermal clock vector matrix layer weight shard replica region price market"
+).split()
+
+
+def load_prompts(
+    profile: Optional[str], count: int = 256, max_tokens: Optional[int] = None, seed: int = 0
+) -> List[Prompt]:
+    """Return ``count`` prompts for ``profile``.
+
+    ``profile`` names a built-in synthetic profile or points to a JSON lines
+    file with one ``{"prompt": ..., "max_tokens": ...}`` object per line.
+    Built-in prompts are generated deterministically, so every run of a
+    profile sends the same requests. ``max_tokens`` overrides the per-prompt
+    generation length.
+    """
+
+    name = profile or DEFAULT_PROFILE
+    if name in PROFILES:
+        prompts = _synthetic_prompts(PROFILES[name], count, random.Random(f"{name}:{seed}"))
+    elif Path(name).is_file():
+        prompts = _file_prompts(Path(name))
+    else:
+        raise ValueError(f"unknown dataset profile: {name}")
+    if not prompts:
+        raise ValueError(f"dataset profile {name} has no prompts")
+    if max_tokens is not None:
+        prompts = [Prompt(prompt.text, max_tokens) for prompt in prompts]
+    return prompts
+
+
+def _synthetic_prompts(profile: DatasetProfile, count: int, rng: random.Random) -> List[Prompt]:
+    low, high = profile.prompt_words
+    return [
+        Prompt(
+            f"{profile.instruction}\n" + " ".join(rng.choice(_WORDS) for _ in range(rng.randint(low, high))),
+            profile.max_tokens,
+        )
+        for _ in range(count)
+    ]
+
+
+def _file_prompts(path: Path) -> List[Prompt]:
+    prompts = []
+    with open(path, encoding="utf-8") as prompts_file:
+        for line in prompts_file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            prompts.append(Prompt(str(entry["prompt"]), int(entry.get("max_tokens", 128))))
+    return prompts
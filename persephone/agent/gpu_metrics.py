@@ -1,78 +1,326 @@
 """GPU metrics collection using NVML."""
 from __future__ import annotations
 
-import csv
 import logging
+import math
 import time
 from pathlib import Path
-from threading import Event
-from typing import Optional
+from threading import Event, Lock
+from typing import IO, TYPE_CHECKING, Callable, List, Literal, Optional, Protocol, TextIO, Tuple
+
+import numpy as np
+
+from .telemetry_format import ColumnarWriter
+
+if TYPE_CHECKING:
+    from .windows import RunWindows
 
 logger = logging.getLogger(__name__)
 
 
+FIELDS = (
+    "gpu_util",
+    "mem_util",
+    "vram_mb",
+    "power_w",
+    "temp_c",
+    "sm_clock_mhz",
+    "pcie_tx_kbps",
+    "pcie_rx_kbps",
+    "throttle_reasons",
+)
+CSV_HEADER = ["t", "gpu", *FIELDS]
+# ``throttle_reasons`` is NVML's clock throttle bitmask. Only these bits slow a busy GPU down:
+# SW power cap, HW slowdown, SW thermal, HW thermal and HW power brake. GpuIdle (0x1) and
+# ApplicationsClocksSetting (0x2) are set on healthy GPUs.
+SLOWDOWN_THROTTLE_REASONS = 0x04 | 0x08 | 0x20 | 0x40 | 0x80
+TelemetryFormat = Literal["csv", "columnar"]
+_CSV_FORMAT = ["%.3f", "%d", "%d", "%d", "%.2f", "%.2f", "%d", "%d", "%d", "%d", "%d"]
+
+
+class GpuBackend(Protocol):
+    """Source of per-device telemetry readings."""
+
+    def init(self) -> int:
+        """Initialise the backend and return the number of devices."""
+
+    def read(self, index: int, out: np.ndarray) -> None:
+        """Fill ``out`` (one slot per entry in ``FIELDS``) for device ``index``.
+
+        Fields that cannot be read are left as NaN.
+        """
+
+    def shutdown(self) -> None:
+        """Release backend resources."""
+
+
+class PynvmlBackend:
+    """NVML backend built on ``pynvml``; reads every visible device."""
+
+    def __init__(self) -> None:
+        import pynvml  # type: ignore
+
+        self._nvml = pynvml
+        self._handles: List[object] = []
+
+    def init(self) -> int:
+        nvml = self._nvml
+        nvml.nvmlInit()
+        self._handles = [nvml.nvmlDeviceGetHandleByIndex(i) for i in range(nvml.nvmlDeviceGetCount())]
+        return len(self._handles)
+
+    def read(self, index: int, out: np.ndarray) -> None:
+        nvml = self._nvml
+        handle = self._handles[index]
+        util = _safe_nvml_call(nvml.nvmlDeviceGetUtilizationRates, handle)
+        mem_info = _safe_nvml_call(nvml.nvmlDeviceGetMemoryInfo, handle)
+        power = _safe_nvml_call(nvml.nvmlDeviceGetPowerUsage, handle)
+        out[0] = getattr(util, "gpu", math.nan)
+        out[1] = getattr(util, "memory", math.nan)
+        out[2] = mem_info.used / (1024 * 1024) if mem_info is not None else math.nan
+        out[3] = power / 1000 if power is not None else math.nan
+        out[4] = _nan_if_none(_safe_nvml_call(nvml.nvmlDeviceGetTemperature, handle, nvml.NVML_TEMPERATURE_GPU))
+        out[5] = _nan_if_none(_safe_nvml_call(nvml.nvmlDeviceGetClockInfo, handle, nvml.NVML_CLOCK_SM))
+        out[6] = _nan_if_none(
+            _safe_nvml_call(nvml.nvmlDeviceGetPcieThroughput, handle, nvml.NVML_PCIE_UTIL_TX_BYTES)
+        )
+        out[7] = _nan_if_none(
+            _safe_nvml_call(nvml.nvmlDeviceGetPcieThroughput, handle, nvml.NVML_PCIE_UTIL_RX_BYTES)
+        )
+        out[8] = _nan_if_none(_safe_nvml_call(nvml.nvmlDeviceGetCurrentClocksThrottleReasons, handle))
+
+    def shutdown(self) -> None:
+        self._nvml.nvmlShutdown()
+
+
+class FakeBackend:
+    """Deterministic synthetic backend for GPU-less machines."""
+
+    def __init__(self, device_count: int = 1) -> None:
+        self.device_count = device_count
+        self._ticks = 0
+
+    def init(self) -> int:
+        return self.device_count
+
+    def read(self, index: int, out: np.ndarray) -> None:
+        self._ticks += 1
+        phase = self._ticks / 10 + index
+        out[:] = (
+            50 + 40 * math.sin(phase),
+            30 + 20 * math.cos(phase),
+            1800 + 100 * index,
+            120 + 60 * math.sin(phase),
+            60 + 5 * math.sin(phase / 3),
+            1500,
+            1024 * (index + 1),
+            2048 * (index + 1),
+            0,
+        )
+
+    def shutdown(self) -> None:
+        return None
+
+
+def make_backend(name: str = "nvml") -> Optional[GpuBackend]:
+    """Return the named backend, or ``None`` if it cannot be loaded."""
+
+    if name == "fake":
+        return FakeBackend()
+    if name != "nvml":
+        raise ValueError(f"unknown GPU metrics backend: {name}")
+    try:
+        return PynvmlBackend()
+    except ImportError:
+        logger.warning("pynvml not available")
+        return None
+
+
+class GpuSampler:
+    """Samples all devices into a preallocated ring buffer and flushes in chunks.
+
+    The buffer holds ``capacity`` samples of shape ``(devices, len(FIELDS))``.
+    Rows are written to CSV in bulk once ``flush_every`` samples are pending,
+    which keeps per-sample work down to the NVML reads themselves.
+    """
+
+    def __init__(self, backend: GpuBackend, capacity: int = 4096, flush_every: int = 256) -> None:
+        if not 0 < flush_every <= capacity:
+            raise ValueError("expected 0 < flush_every <= capacity")
+        self.backend = backend
+        self.capacity = capacity
+        self.flush_every = flush_every
+        self.devices = 0
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._values = np.zeros((capacity, 0, len(FIELDS)), dtype=np.float64)
+        self._written = 0
+        self._flushed = 0
+        self._lock = Lock()
+
+    def open(self) -> None:
+        self.devices = self.backend.init()
+        self._values = np.full((self.capacity, self.devices, len(FIELDS)), np.nan, dtype=np.float64)
+
+    def close(self) -> None:
+        self.backend.shutdown()
+
+    def sample(self, t: float) -> None:
+        slot = self._written % self.capacity
+        row = self._values[slot]
+        for index in range(self.devices):
+            self.backend.read(index, row[index])
+        self._times[slot] = t
+        with self._lock:
+            self._written += 1
+            if self._written - self._flushed > self.capacity:
+                # The writer fell behind; the oldest unflushed samples were overwritten.
+                logger.warning("GPU sample buffer overrun; dropping old samples")
+                self._flushed = self._written - self.capacity
+
+    @property
+    def pending(self) -> int:
+        return self._written - self._flushed
+
+    def drain(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return and consume unflushed samples as ``(times, values)`` in order."""
+
+        with self._lock:
+            start, end = self._flushed, self._written
+            self._flushed = end
+        slots = np.arange(start, end) % self.capacity
+        return self._times[slots], self._values[slots]
+
+    def latest(self) -> Optional[Tuple[float, np.ndarray]]:
+        """Return a copy of the most recent sample, if any."""
+
+        with self._lock:
+            if self._written == 0:
+                return None
+            slot = (self._written - 1) % self.capacity
+            return float(self._times[slot]), self._values[slot].copy()
+
+    def flush(self, writer: "TelemetryWriter") -> int:
+        """Hand pending samples to ``writer`` in long format (one row per device)."""
+
+        times, values = self.drain()
+        if not len(times):
+            return 0
+        samples, devices = values.shape[0], values.shape[1]
+        table = np.empty((samples * devices, len(CSV_HEADER)), dtype=np.float64)
+        table[:, 0] = np.repeat(times, devices)
+        table[:, 1] = np.tile(np.arange(devices), samples)
+        table[:, 2:] = np.nan_to_num(values.reshape(samples * devices, len(FIELDS)))
+        writer.write(table)
+        return samples
+
+
+class TelemetryWriter(Protocol):
+    def write(self, table: np.ndarray) -> None:
+        """Persist rows laid out as ``CSV_HEADER``."""
+
+
+class CsvWriter:
+    """Writes telemetry rows as CSV text."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+        self._stream.write(",".join(CSV_HEADER) + "\n")
+
+    def write(self, table: np.ndarray) -> None:
+        np.savetxt(self._stream, table, fmt=_CSV_FORMAT, delimiter=",")
+        self._stream.flush()
+
+
 def collect_gpu_metrics(
     output_path: str | Path,
     interval_s: float = 1.0,
     duration_s: Optional[float] = 20.0,
     stop_event: Optional[Event] = None,
+    backend: Optional[GpuBackend] = None,
+    fmt: TelemetryFormat = "csv",
+    clock: Callable[[], float] = time.perf_counter,
+    origin: Optional[float] = None,
+    windows: Optional["RunWindows"] = None,
 ) -> None:
-    """Capture GPU telemetry via NVML and write it to CSV."""
+    """Capture GPU telemetry for every device and write it to ``output_path``.
 
-    try:
-        import pynvml  # type: ignore
-    except ImportError:
-        logger.warning("pynvml not available; writing empty metrics file")
-        _write_header_only(output_path)
+    ``fmt`` selects CSV text or the compressed columnar format from
+    ``telemetry_format``. Sample times are seconds of ``clock`` since
+    ``origin`` (default: now); pass the load generator's clock and start so
+    that GPU samples and request timings share one time axis. Samples are
+    also added to ``windows`` if given.
+    """
+
+    if backend is None:
+        backend = make_backend("nvml")
+    if backend is None:
+        logger.warning("No GPU metrics backend; writing empty metrics file")
+        _write_header_only(output_path, fmt)
         return
 
+    sampler = GpuSampler(backend, flush_every=max(1, min(256, int(30 / max(interval_s, 1e-3)))))
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["t", "gpu_util", "mem_util", "vram_mb", "power_w", "temp_c"])
-
-        pynvml.nvmlInit()
+    with _open_output(output_path, fmt) as stream:
+        writer = _make_writer(stream, fmt)
+        sampler.open()
         try:
-            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-            start = time.time()
+            start = clock() if origin is None else origin
+            next_tick = time.monotonic()
             while True:
-                now = time.time()
+                now = clock()
                 if stop_event and stop_event.is_set():
                     break
                 if duration_s is not None and now - start > duration_s:
                     break
 
-                util = pynvml.nvmlDeviceGetUtilizationRates(handle)
-                mem_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
-                power = _safe_nvml_call(pynvml.nvmlDeviceGetPowerUsage, handle)
-                temp = _safe_nvml_call(pynvml.nvmlDeviceGetTemperature, handle, pynvml.NVML_TEMPERATURE_GPU)
-
-                writer.writerow(
-                    [
-                        round(now - start, 2),
-                        getattr(util, "gpu", 0),
-                        getattr(util, "memory", 0),
-                        round(mem_info.used / (1024 * 1024), 2),
-                        round(power / 1000 if power is not None else 0, 2),
-                        temp if temp is not None else 0,
-                    ]
-                )
-                csvfile.flush()
-                time.sleep(interval_s)
+                sampler.sample(round(now - start, 3))
+                if windows is not None:
+                    latest = sampler.latest()
+                    if latest is not None:
+                        windows.record_gpu(now, latest[1])
+                if sampler.pending >= sampler.flush_every:
+                    sampler.flush(writer)
+
+                # Sleep to a fixed cadence so that sampling cost does not accumulate as drift.
+                next_tick += interval_s
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    if stop_event:
+                        stop_event.wait(delay)
+                    else:
+                        time.sleep(delay)
+                else:
+                    next_tick = time.monotonic()
         finally:
-            pynvml.nvmlShutdown()
+            sampler.flush(writer)
+            sampler.close()
+
+
+def _open_output(output_path: str | Path, fmt: TelemetryFormat) -> IO:  # type: ignore[type-arg]
+    if fmt == "columnar":
+        return open(output_path, "wb")
+    return open(output_path, "w", newline="", encoding="utf-8")
 
 
-def _write_header_only(output_path: str | Path) -> None:
+def _make_writer(stream: IO, fmt: TelemetryFormat) -> TelemetryWriter:  # type: ignore[type-arg]
+    if fmt == "columnar":
+        return ColumnarWriter(stream, CSV_HEADER)  # type: ignore[arg-type]
+    return CsvWriter(stream)  # type: ignore[arg-type]
+
+
+def _write_header_only(output_path: str | Path, fmt: TelemetryFormat = "csv") -> None:
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["t", "gpu_util", "mem_util", "vram_mb", "power_w", "temp_c"])
+    with _open_output(output_path, fmt) as stream:
+        _make_writer(stream, fmt)
+
+
+def _nan_if_none(value: Optional[float]) -> float:
+    return math.nan if value is None else value
 
 
 def _safe_nvml_call(func, *args):  # type: ignore[no-untyped-def]
     try:
         return func(*args)
     except Exception:  # pylint: disable=broad-except
-        logger.debug("NVML call %s failed", func.__name__)
+        logger.debug("NVML call %s failed", getattr(func, "__name__", func))
         return None
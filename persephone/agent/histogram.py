@@ -0,0 +1,137 @@
+"""Fixed-memory latency histogram for the Persephone agent."""
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+DEFAULT_PERCENTILES = (0.50, 0.90, 0.95, 0.99, 0.999)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with a fixed memory footprint.
+
+    Bucket boundaries grow geometrically by ``1 + precision`` starting at
+    ``lowest_ms``, so every recorded value is reported with a relative error of
+    at most ``precision / 2``. Values outside ``[lowest_ms, highest_ms]`` are
+    clamped into the first or last bucket; exact minimum and maximum are kept
+    separately. Two histograms with the same layout merge exactly by adding
+    their bucket counts.
+    """
+
+    def __init__(self, lowest_ms: float = 1e-3, highest_ms: float = 3.6e6, precision: float = 0.01) -> None:
+        if lowest_ms <= 0 or highest_ms <= lowest_ms:
+            raise ValueError("expected 0 < lowest_ms < highest_ms")
+        if not 0 < precision < 1:
+            raise ValueError("precision must be between 0 and 1")
+        self.lowest_ms = lowest_ms
+        self.highest_ms = highest_ms
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self._log_lowest = math.log(lowest_ms)
+        size = int(math.ceil((math.log(highest_ms) - self._log_lowest) / self._log_base)) + 2
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    @property
+    def layout(self) -> Dict[str, float]:
+        return {"lowest_ms": self.lowest_ms, "highest_ms": self.highest_ms, "precision": self.precision}
+
+    def _index(self, value_ms: float) -> int:
+        if value_ms <= self.lowest_ms:
+            return 0
+        index = int((math.log(value_ms) - self._log_lowest) / self._log_base) + 1
+        return min(index, len(self.counts) - 1)
+
+    def record(self, value_ms: float) -> None:
+        self.counts[self._index(value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        if value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def record_many(self, values_ms: Iterable[float]) -> None:
+        values = np.asarray(list(values_ms), dtype=np.float64)
+        if values.size == 0:
+            return
+        clipped = np.maximum(values, self.lowest_ms)
+        indexes = ((np.log(clipped) - self._log_lowest) / self._log_base).astype(np.int64) + 1
+        indexes[values <= self.lowest_ms] = 0
+        np.minimum(indexes, len(self.counts) - 1, out=indexes)
+        self.counts += np.bincount(indexes, minlength=len(self.counts))
+        self.count += int(values.size)
+        self.sum_ms += float(values.sum())
+        self.min_ms = min(self.min_ms, float(values.min()))
+        self.max_ms = max(self.max_ms, float(values.max()))
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.layout != self.layout:
+            raise ValueError("cannot merge histograms with different layouts")
+        self.counts += other.counts
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def bucket_value(self, index: int) -> float:
+        """Return the representative (geometric middle) value of a bucket."""
+
+        if index == 0:
+            return self.lowest_ms
+        return math.exp(self._log_lowest + (index - 0.5) * self._log_base)
+
+    def percentiles(self, quantiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[float, float]:
+        """Return nearest-rank values for all ``quantiles`` from one cumulative pass."""
+
+        if self.count == 0:
+            raise ValueError("histogram is empty")
+        cumulative = np.cumsum(self.counts)
+        ranks = np.maximum(np.ceil(np.asarray(quantiles, dtype=np.float64) * self.count), 1)
+        indexes = np.searchsorted(cumulative, ranks)
+        values: Dict[float, float] = {}
+        for quantile, index in zip(quantiles, indexes):
+            value = self.max_ms if quantile >= 1 else self.bucket_value(int(index))
+            values[quantile] = min(max(value, self.min_ms), self.max_ms)
+        return values
+
+    def mean(self) -> float:
+        if self.count == 0:
+            raise ValueError("histogram is empty")
+        return self.sum_ms / self.count
+
+    def to_dict(self) -> Dict[str, object]:
+        """Serialize into a compact sparse form suitable for result.json.
+
+        Non-empty bucket indexes are delta-encoded to keep the payload small.
+        """
+
+        nonzero = np.flatnonzero(self.counts)
+        deltas: List[int] = np.diff(nonzero, prepend=0).tolist()
+        return {
+            "layout": self.layout,
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 6),
+            "min_ms": self.min_ms if self.count else None,
+            "max_ms": self.max_ms if self.count else None,
+            "index_deltas": deltas,
+            "counts": self.counts[nonzero].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, object]) -> "LatencyHistogram":
+        layout = payload["layout"]
+        histogram = cls(**layout)  # type: ignore[arg-type]
+        indexes = np.cumsum(np.asarray(payload["index_deltas"], dtype=np.int64))
+        histogram.counts[indexes] = np.asarray(payload["counts"], dtype=np.int64)
+        histogram.count = int(payload["count"])  # type: ignore[arg-type]
+        histogram.sum_ms = float(payload["sum_ms"])  # type: ignore[arg-type]
+        if histogram.count:
+            histogram.min_ms = float(payload["min_ms"])  # type: ignore[arg-type]
+            histogram.max_ms = float(payload["max_ms"])  # type: ignore[arg-type]
+        return histogram
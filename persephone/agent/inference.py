@@ -0,0 +1,262 @@
+"""Inference backends driven by the agent's probes."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Protocol, Sequence
+
+import numpy as np
+
+from .datasets import Prompt
+
+
+@dataclass
+class Generation:
+    """Token timings of one generated completion, in seconds."""
+
+    prompt_tokens: int
+    output_tokens: int
+    ttft_s: float
+    inter_token_s: List[float] = field(default_factory=list)
+
+
+class InferenceBackend(Protocol):
+    """Serves completions for a batch of prompts."""
+
+    name: str
+
+    def load(self) -> None:
+        """Prepare the model; not counted in the measured latency."""
+
+    def generate(self, prompts: Sequence[Prompt]) -> List[Generation]:
+        """Complete every prompt and return their token timings in order."""
+
+    def close(self) -> None:
+        """Release backend resources."""
+
+
+class MockBackend:
+    """Sleeps 20 ms per call and returns one token per prompt."""
+
+    name = "mock"
+
+    def load(self) -> None:
+        return None
+
+    def generate(self, prompts: Sequence[Prompt]) -> List[Generation]:
+        started = time.perf_counter()
+        time.sleep(0.02)
+        elapsed = time.perf_counter() - started
+        return [Generation(len(prompt.text.split()), 1, elapsed) for prompt in prompts]
+
+    def close(self) -> None:
+        return None
+
+
+class ReferenceBackend:
+    """Tiny decoder-only transformer in numpy, runnable on any CPU.
+
+    Weights are random, seeded from ``model_ref``, so completions are
+    meaningless; what matters is that the work has the shape of real
+    inference: a batched prefill over byte-level tokens followed by greedy
+    decode steps against a KV cache. A static batch runs until its longest
+    completion is done.
+    """
+
+    name = "reference"
+    vocab_size = 256
+
+    def __init__(
+        self, model_ref: str, d_model: int = 128, layers: int = 2, heads: int = 4, max_context: int = 1024
+    ) -> None:
+        if d_model % heads:
+            raise ValueError("d_model must be divisible by heads")
+        self.model_ref = model_ref
+        self.d_model = d_model
+        self.layers = layers
+        self.heads = heads
+        self.max_context = max_context
+        self._weights: Optional[dict] = None
+
+    def load(self) -> None:
+        seed = int.from_bytes(hashlib.sha256(self.model_ref.encode("utf-8")).digest()[:4], "little")
+        rng = np.random.default_rng(seed)
+        d = self.d_model
+        scale = 1.0 / np.sqrt(d)
+        self._weights = {
+            "embed": rng.standard_normal((self.vocab_size, d), dtype=np.float32) * scale,
+            "position": rng.standard_normal((self.max_context, d), dtype=np.float32) * 0.1,
+            "qkv": [rng.standard_normal((d, 3 * d), dtype=np.float32) * scale for _ in range(self.layers)],
+            "out": [rng.standard_normal((d, d), dtype=np.float32) * scale for _ in range(self.layers)],
+            "up": [rng.standard_normal((d, 4 * d), dtype=np.float32) * scale for _ in range(self.layers)],
+            "down": [rng.standard_normal((4 * d, d), dtype=np.float32) * scale / 2 for _ in range(self.layers)],
+        }
+
+    def generate(self, prompts: Sequence[Prompt]) -> List[Generation]:
+        if self._weights is None:
+            self.load()
+        weights = self._weights
+        assert weights is not None
+        # Prompt and completion share the context: completions are capped so at
+        # least one prompt token fits, and prompts keep their last tokens.
+        max_new = min(max(prompt.max_tokens for prompt in prompts), self.max_context - 1)
+        encoded = [list(prompt.text.encode("utf-8"))[-(self.max_context - max_new) :] or [0] for prompt in prompts]
+        batch, length = len(encoded), max(len(tokens) for tokens in encoded)
+        # Prompts are left-padded so every sequence's next token lands in the same slot.
+        tokens = np.zeros((batch, length), dtype=np.int64)
+        valid = np.ones((batch, length + max_new), dtype=bool)
+        for row, sequence in enumerate(encoded):
+            tokens[row, length - len(sequence) :] = sequence
+            valid[row, : length - len(sequence)] = False
+        cache = [
+            (
+                np.zeros((batch, self.heads, length + max_new, self.d_model // self.heads), dtype=np.float32),
+                np.zeros((batch, self.heads, length + max_new, self.d_model // self.heads), dtype=np.float32),
+            )
+            for _ in range(self.layers)
+        ]
+
+        started = time.perf_counter()
+        next_tokens = self._forward(tokens, 0, valid, cache).argmax(axis=-1)
+        ttft = time.perf_counter() - started
+        generations = [Generation(len(sequence), 1, ttft) for sequence in encoded]
+
+        for step in range(1, max_new):
+            active = [row for row, prompt in enumerate(prompts) if prompt.max_tokens > step]
+            step_started = time.perf_counter()
+            next_tokens = self._forward(next_tokens[:, None], length + step - 1, valid, cache).argmax(axis=-1)
+            step_s = time.perf_counter() - step_started
+            for row in active:
+                generations[row].output_tokens += 1
+                generations[row].inter_token_s.append(step_s)
+        return generations
+
+    def close(self) -> None:
+        self._weights = None
+
+    def _forward(self, tokens: np.ndarray, offset: int, valid: np.ndarray, cache: list) -> np.ndarray:
+        """Run ``tokens`` at positions ``offset...`` through the model, appending to ``cache``.
+
+        Returns the next-token logits of each sequence.
+        """
+
+        weights = self._weights
+        assert weights is not None
+        batch, count = tokens.shape
+        end = offset + count
+        head_dim = self.d_model // self.heads
+        hidden = weights["embed"][tokens] + weights["position"][offset:end]
+        causal = np.tril(np.ones((count, end), dtype=bool), k=offset)
+        mask = causal[None, None] & valid[:, None, None, :end]
+        for layer, (keys, values) in enumerate(cache):
+            normed = _rms_norm(hidden)
+            qkv = (normed @ weights["qkv"][layer]).reshape(batch, count, 3, self.heads, head_dim)
+            query, key, value = (qkv[:, :, part].transpose(0, 2, 1, 3) for part in range(3))
+            keys[:, :, offset:end] = key
+            values[:, :, offset:end] = value
+            scores = query @ keys[:, :, :end].transpose(0, 1, 3, 2) / np.sqrt(head_dim)
+            scores = np.where(mask, scores, -1e9)
+            scores = np.exp(scores - scores.max(axis=-1, keepdims=True))
+            scores /= scores.sum(axis=-1, keepdims=True)
+            attended = (scores @ values[:, :, :end]).transpose(0, 2, 1, 3).reshape(batch, count, self.d_model)
+            hidden = hidden + attended @ weights["out"][layer]
+            hidden = hidden + np.maximum(_rms_norm(hidden) @ weights["up"][layer], 0) @ weights["down"][layer]
+        return _rms_norm(hidden[:, -1]) @ weights["embed"].T
+
+
+class OpenAICompatibleBackend:
+    """Streams completions from an OpenAI-compatible server such as vLLM.
+
+    Every prompt of a batch is sent as its own concurrent streaming request,
+    so batching happens inside the server (continuous batching in vLLM).
+    Each non-empty streamed chunk counts as one token.
+    """
+
+    name = "openai"
+
+    def __init__(self, model: str, base_url: str, timeout_s: float = 300.0, max_parallel: int = 256) -> None:
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.timeout_s = timeout_s
+        self._api_key = os.getenv("OPENAI_API_KEY")
+        self._executor = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="openai-stream")
+
+    def load(self) -> None:
+        """Fail fast if the server is not reachable, and warm it up with one request."""
+
+        with urllib.request.urlopen(self._request("/v1/models"), timeout=self.timeout_s) as response:
+            response.read()
+        self._stream(Prompt("warmup", 1))
+
+    def generate(self, prompts: Sequence[Prompt]) -> List[Generation]:
+        if len(prompts) == 1:
+            return [self._stream(prompts[0])]
+        return list(self._executor.map(self._stream, prompts))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _request(self, path: str, body: Optional[dict] = None) -> urllib.request.Request:
+        headers = {"Content-Type": "application/json"}
+        if self._api_key:
+            headers["Authorization"] = f"Bearer {self._api_key}"
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        return urllib.request.Request(f"{self.base_url}{path}", data=data, headers=headers)
+
+    def _stream(self, prompt: Prompt) -> Generation:
+        body = {
+            "model": self.model,
+            "prompt": prompt.text,
+            "max_tokens": prompt.max_tokens,
+            "temperature": 0,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            # vLLM extension: always generate max_tokens so runs are comparable.
+            "ignore_eos": True,
+        }
+        started = time.perf_counter()
+        token_times: List[float] = []
+        prompt_tokens = len(prompt.text.split())
+        with urllib.request.urlopen(self._request("/v1/completions", body), timeout=self.timeout_s) as response:
+            for raw_line in response:
+                line = raw_line.strip()
+                if not line.startswith(b"data:"):
+                    continue
+                payload = line[len(b"data:") :].strip()
+                if payload == b"[DONE]":
+                    break
+                chunk = json.loads(payload)
+                if chunk.get("usage"):
+                    prompt_tokens = int(chunk["usage"].get("prompt_tokens", prompt_tokens))
+                choices = chunk.get("choices") or []
+                if choices and choices[0].get("text"):
+                    token_times.append(time.perf_counter())
+        if not token_times:
+            raise RuntimeError("server returned no tokens")
+        return Generation(
+            prompt_tokens=prompt_tokens,
+            output_tokens=len(token_times),
+            ttft_s=token_times[0] - started,
+            inter_token_s=np.diff(token_times).tolist(),
+        )
+
+
+def make_inference_backend(name: str, model_ref: str, url: Optional[str] = None) -> InferenceBackend:
+    """Return the named backend for ``model_ref``; ``url`` is the server of the ``openai`` backend."""
+
+    if name == "mock":
+        return MockBackend()
+    if name == "reference":
+        return ReferenceBackend(model_ref)
+    if name == "openai":
+        return OpenAICompatibleBackend(model_ref, url or "http://localhost:8000")
+    raise ValueError(f"unknown inference backend: {name}")
+
+
+def _rms_norm(values: np.ndarray) -> np.ndarray:
+    return values / np.sqrt(np.mean(values * values, axis=-1, keepdims=True) + 1e-6)
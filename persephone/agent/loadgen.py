@@ -0,0 +1,211 @@
+"""Load generation engine for the Persephone agent."""
+from __future__ import annotations
+
+import itertools
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING, Callable, Iterator, Literal, Optional
+
+from .histogram import LatencyHistogram
+
+if TYPE_CHECKING:
+    from .windows import RunWindows
+
+logger = logging.getLogger(__name__)
+
+
+ArrivalProcess = Literal["constant", "poisson"]
+RequestFn = Callable[[], None]
+
+
+@dataclass
+class LoadConfig:
+    """Parameters of a load generation run.
+
+    Without ``rate_rps`` the engine runs a closed loop: ``concurrency`` workers
+    issue requests back to back. With ``rate_rps`` it runs an open loop where
+    requests are scheduled on an arrival process independently of completions
+    and ``concurrency`` bounds the number of requests in service.
+    """
+
+    concurrency: int = 1
+    rate_rps: Optional[float] = None
+    arrival: ArrivalProcess = "constant"
+    warmup_s: float = 0.0
+    duration_s: Optional[float] = None
+    samples: Optional[int] = None
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        if self.rate_rps is not None and self.rate_rps <= 0:
+            raise ValueError("rate_rps must be positive")
+        if self.arrival not in ("constant", "poisson"):
+            raise ValueError(f"unknown arrival process: {self.arrival}")
+        if self.warmup_s < 0:
+            raise ValueError("warmup_s must not be negative")
+        if self.duration_s is None and self.samples is None:
+            raise ValueError("either duration_s or samples must be set")
+        if self.duration_s is not None and self.duration_s <= 0:
+            raise ValueError("duration_s must be positive")
+        if self.samples is not None and self.samples <= 0:
+            raise ValueError("samples must be positive")
+
+    @property
+    def mode(self) -> str:
+        return "closed" if self.rate_rps is None else "open"
+
+
+@dataclass
+class LoadResult:
+    """Timings collected during the measurement phase.
+
+    ``latency`` is measured from the intended start of each request, so
+    queueing behind a saturated system is included (coordinated omission
+    correction). ``service`` only covers the time spent inside the request.
+    """
+
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    service: LatencyHistogram = field(default_factory=LatencyHistogram)
+    errors: int = 0
+    measured_s: float = 0.0
+
+    @property
+    def completed(self) -> int:
+        return self.latency.count
+
+
+class _Recorder:
+    """Collects timings of requests that started after the warmup phase."""
+
+    def __init__(self, measure_start: float, windows: Optional["RunWindows"] = None) -> None:
+        self.measure_start = measure_start
+        self.windows = windows
+        self.result = LoadResult()
+        self._first_start: Optional[float] = None
+        self._last_end: Optional[float] = None
+        self._lock = Lock()
+
+    def record(self, intended: float, started: float, ended: float, ok: bool) -> None:
+        if intended < self.measure_start:
+            return
+        if self.windows is not None:
+            if ok:
+                self.windows.record_latency(ended, (ended - intended) * 1000)
+            else:
+                self.windows.record_error(ended)
+        with self._lock:
+            if self._first_start is None or intended < self._first_start:
+                self._first_start = intended
+            if self._last_end is None or ended > self._last_end:
+                self._last_end = ended
+            if not ok:
+                self.result.errors += 1
+                return
+            self.result.latency.record((ended - intended) * 1000)
+            self.result.service.record((ended - started) * 1000)
+
+    def finish(self) -> LoadResult:
+        if self._first_start is not None and self._last_end is not None:
+            self.result.measured_s = max(self._last_end - self._first_start, 1e-6)
+        return self.result
+
+
+def run_load(request_fn: RequestFn, config: LoadConfig, windows: Optional["RunWindows"] = None) -> LoadResult:
+    """Drive ``request_fn`` according to ``config`` and return measured timings.
+
+    Measured requests are also added to ``windows`` by completion time.
+    """
+
+    logger.info(
+        "Starting %s-loop load concurrency=%s rate=%s arrival=%s warmup=%ss",
+        config.mode,
+        config.concurrency,
+        config.rate_rps,
+        config.arrival,
+        config.warmup_s,
+    )
+    if config.rate_rps is None:
+        return _run_closed_loop(request_fn, config, windows)
+    return _run_open_loop(request_fn, config, windows)
+
+
+def _timed_call(request_fn: RequestFn, intended: float, recorder: _Recorder) -> None:
+    started = time.perf_counter()
+    ok = True
+    try:
+        request_fn()
+    except Exception:  # pylint: disable=broad-except
+        logger.debug("Request failed", exc_info=True)
+        ok = False
+    recorder.record(intended, started, time.perf_counter(), ok)
+
+
+def _run_closed_loop(request_fn: RequestFn, config: LoadConfig, windows: Optional["RunWindows"]) -> LoadResult:
+    start = time.perf_counter()
+    measure_start = start + config.warmup_s
+    deadline = measure_start + config.duration_s if config.duration_s is not None else None
+    recorder = _Recorder(measure_start, windows)
+    tickets = itertools.count()
+    stop_event = Event()
+
+    def worker() -> None:
+        while not stop_event.is_set():
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                break
+            if now >= measure_start and config.samples is not None:
+                if next(tickets) >= config.samples:
+                    break
+            _timed_call(request_fn, now, recorder)
+
+    threads = [Thread(target=worker, daemon=True) for _ in range(config.concurrency)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    finally:
+        stop_event.set()
+    return recorder.finish()
+
+
+def _run_open_loop(request_fn: RequestFn, config: LoadConfig, windows: Optional["RunWindows"]) -> LoadResult:
+    start = time.perf_counter()
+    recorder = _Recorder(start + config.warmup_s, windows)
+
+    with ThreadPoolExecutor(max_workers=config.concurrency) as executor:
+        for offset in _arrival_offsets(config):
+            intended = start + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(_timed_call, request_fn, intended, recorder)
+    return recorder.finish()
+
+
+def _arrival_offsets(config: LoadConfig) -> Iterator[float]:
+    """Yield intended start offsets (seconds from start) for an open loop."""
+
+    assert config.rate_rps is not None
+    rng = random.Random(config.seed)
+    end = config.warmup_s + config.duration_s if config.duration_s is not None else None
+    measured = 0
+    offset = 0.0
+    while True:
+        if end is not None and offset >= end:
+            return
+        if offset >= config.warmup_s:
+            if config.samples is not None and measured >= config.samples:
+                return
+            measured += 1
+        yield offset
+        if config.arrival == "poisson":
+            offset += rng.expovariate(config.rate_rps)
+        else:
+            offset += 1.0 / config.rate_rps
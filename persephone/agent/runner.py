@@ -1,50 +1,178 @@
-"""Mock inference runner for the Persephone agent."""
+"""Inference probes for the Persephone agent."""
 from __future__ import annotations
 
+import itertools
 import math
 import time
-from typing import Dict, List
+from threading import Lock
+from typing import Dict, List, Optional, Sequence
 
+from .datasets import Prompt, load_prompts
+from .histogram import LatencyHistogram
+from .inference import Generation, InferenceBackend, make_inference_backend
+from .loadgen import ArrivalProcess, LoadConfig, run_load
+from .windows import RunWindows
 
-def run_probe(model_ref: str, samples: int) -> Dict[str, float | int | str]:
-    """Execute a mock inference workload and collect latency metrics."""
+PROMPT_POOL_SIZE = 256
+
+
+class TokenStats:
+    """Token-level timings of the completions measured by a probe."""
+
+    def __init__(self) -> None:
+        self.ttft = LatencyHistogram()
+        self.inter_token = LatencyHistogram()
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self._lock = Lock()
+
+    def record(self, generations: Sequence[Generation]) -> None:
+        with self._lock:
+            for generation in generations:
+                self.prompt_tokens += generation.prompt_tokens
+                self.output_tokens += generation.output_tokens
+                self.ttft.record(generation.ttft_s * 1000)
+                self.inter_token.record_many(seconds * 1000 for seconds in generation.inter_token_s)
+
+    def summary(self, measured_s: float) -> Dict[str, object]:
+        summary: Dict[str, object] = {
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "tokens_per_s": round(self.output_tokens / measured_s, 3) if measured_s else 0.0,
+        }
+        if self.ttft.count:
+            ttft = self.ttft.percentiles((0.50, 0.95, 0.99))
+            summary.update(
+                ttft_p50_ms=round(ttft[0.50], 3),
+                ttft_p95_ms=round(ttft[0.95], 3),
+                ttft_p99_ms=round(ttft[0.99], 3),
+                # Histograms let results of parallel workers be combined exactly.
+                ttft_histogram=self.ttft.to_dict(),
+            )
+        if self.inter_token.count:
+            inter_token = self.inter_token.percentiles((0.50, 0.95, 0.99))
+            summary.update(
+                itl_p50_ms=round(inter_token[0.50], 3),
+                itl_p95_ms=round(inter_token[0.95], 3),
+                itl_p99_ms=round(inter_token[0.99], 3),
+                itl_histogram=self.inter_token.to_dict(),
+            )
+        return summary
+
+
+def run_probe(
+    model_ref: str,
+    samples: int,
+    concurrency: int = 1,
+    rate_rps: Optional[float] = None,
+    arrival: ArrivalProcess = "constant",
+    warmup_s: float = 0.0,
+    duration_s: Optional[float] = None,
+    backend: str = "mock",
+    backend_url: Optional[str] = None,
+    dataset_profile: Optional[str] = None,
+    batch_sizes: Sequence[int] = (1,),
+    max_tokens: Optional[int] = None,
+    windows: Optional[RunWindows] = None,
+) -> Dict[str, object]:
+    """Execute an inference workload and collect latency and token metrics.
+
+    By default requests are issued one at a time. ``concurrency`` adds parallel
+    closed-loop workers, and ``rate_rps`` switches to an open loop driven by a
+    constant or Poisson arrival process. When ``duration_s`` is set the
+    measurement phase is time-bound and ``samples`` is ignored.
+
+    Prompts come from ``dataset_profile``. Each request sends a batch of
+    prompts to ``backend``; with several ``batch_sizes`` the probe is
+    repeated per size, the results are listed under ``batch_sweep`` and the
+    top-level metrics are those of the size with the highest token throughput.
+    Measured requests are also added to ``windows`` if given.
+    """
 
     if samples <= 0:
         raise ValueError("samples must be positive")
+    if not batch_sizes or any(batch_size <= 0 for batch_size in batch_sizes):
+        raise ValueError("batch sizes must be positive")
 
-    latencies_ms: List[float] = []
-    start_time = time.perf_counter()
+    prompts = load_prompts(dataset_profile, PROMPT_POOL_SIZE, max_tokens)
+    engine = make_inference_backend(backend, model_ref, backend_url)
+    engine.load()
+    try:
+        sweep = [
+            _probe(
+                engine,
+                prompts,
+                batch_size,
+                LoadConfig(
+                    concurrency=concurrency,
+                    rate_rps=rate_rps,
+                    arrival=arrival,
+                    warmup_s=warmup_s,
+                    duration_s=duration_s,
+                    samples=None if duration_s is not None else math.ceil(samples / batch_size),
+                ),
+                windows,
+            )
+            for batch_size in batch_sizes
+        ]
+    finally:
+        engine.close()
 
-    for _ in range(samples):
-        iter_start = time.perf_counter()
-        time.sleep(0.02)
-        latency_ms = (time.perf_counter() - iter_start) * 1000
-        latencies_ms.append(latency_ms)
+    result = dict(max(sweep, key=lambda entry: (entry["tokens_per_s"], entry["throughput_rps"])))
+    if len(sweep) > 1:
+        result["batch_sweep"] = sweep
+    result["backend"] = engine.name
+    result["dataset_profile"] = dataset_profile
+    result["note"] = f"{engine.name} backend, model {model_ref}"
+    if rate_rps is not None:
+        result["offered_rps"] = rate_rps
+        result["arrival"] = arrival
+    return result
 
-    duration_s = max(time.perf_counter() - start_time, 1e-6)
 
-    p50 = _percentile(latencies_ms, 0.50)
-    p95 = _percentile(latencies_ms, 0.95)
-    throughput = samples / duration_s
+def _probe(
+    engine: InferenceBackend,
+    prompts: List[Prompt],
+    batch_size: int,
+    config: LoadConfig,
+    windows: Optional[RunWindows] = None,
+) -> Dict[str, object]:
+    """Measure one batch size. Latency is per request, i.e. per batch of prompts."""
 
-    return {
-        "samples": samples,
-        "latency_p50_ms": round(p50, 3),
-        "latency_p95_ms": round(p95, 3),
-        "throughput_rps": round(throughput, 3),
-        "note": f"mock model {model_ref}; replace with vLLM later",
-    }
+    tokens = TokenStats()
+    tickets = itertools.count()
+    measure_start = time.perf_counter() + config.warmup_s
 
+    def request() -> None:
+        offset = next(tickets) * batch_size
+        batch = [prompts[(offset + index) % len(prompts)] for index in range(batch_size)]
+        started = time.perf_counter()
+        generations = engine.generate(batch)
+        if started >= measure_start:
+            tokens.record(generations)
 
-def _percentile(values: List[float], percentile: float) -> float:
-    if not values:
-        raise ValueError("values must not be empty")
-    sorted_values = sorted(values)
-    k = (len(sorted_values) - 1) * percentile
-    f = math.floor(k)
-    c = math.ceil(k)
-    if f == c:
-        return sorted_values[int(k)]
-    d0 = sorted_values[f] * (c - k)
-    d1 = sorted_values[c] * (k - f)
-    return d0 + d1
+    load = run_load(request, config, windows)
+    if not load.completed:
+        raise RuntimeError("no successful requests were measured")
+
+    latency = load.latency.percentiles()
+    service = load.service.percentiles((0.50, 0.95))
+    return {
+        "batch_size": batch_size,
+        "samples": load.completed * batch_size,
+        "mode": config.mode,
+        "concurrency": config.concurrency,
+        "latency_p50_ms": round(latency[0.50], 3),
+        "latency_p90_ms": round(latency[0.90], 3),
+        "latency_p95_ms": round(latency[0.95], 3),
+        "latency_p99_ms": round(latency[0.99], 3),
+        "latency_p999_ms": round(latency[0.999], 3),
+        "latency_max_ms": round(load.latency.max_ms, 3),
+        "service_p50_ms": round(service[0.50], 3),
+        "service_p95_ms": round(service[0.95], 3),
+        "throughput_rps": round(load.completed * batch_size / load.measured_s, 3),
+        "errors": load.errors,
+        "duration_s": round(load.measured_s, 3),
+        "latency_histogram": load.latency.to_dict(),
+        **tokens.summary(load.measured_s),
+    }
@@ -0,0 +1,77 @@
+"""Columnar, compressed on-disk format for GPU telemetry.
+
+A file starts with ``MAGIC`` and is followed by self-contained blocks, one per
+sampler flush. Every block is a little-endian ``uint32`` header length, a JSON
+header and the column payloads it describes::
+
+    {"rows": 512, "columns": [{"name": "t", "dtype": "<i4", "scale": 1000,
+      "encoding": "delta", "codec": "zlib", "length": 731}, ...]}
+
+Values are quantized to integers with ``scale`` (``value = stored / scale``),
+optionally delta-encoded along the rows of the block and zlib-compressed.
+Columns with ``codec == "none"`` can be read without copying.
+"""
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from typing import BinaryIO, Dict, Sequence
+
+import numpy as np
+
+MAGIC = b"PTEL1\n"
+
+# Quantization scale per column; everything not listed is stored as an integer.
+_SCALES: Dict[str, int] = {"t": 1000, "vram_mb": 100, "power_w": 100}
+# Columns that change slowly between consecutive rows compress best as deltas.
+_DELTA_COLUMNS = {"t", "vram_mb", "temp_c", "sm_clock_mhz"}
+
+
+def encode_block(names: Sequence[str], table: np.ndarray, level: int = 6) -> bytes:
+    """Encode the rows of ``table`` (one column per entry in ``names``) as a block."""
+
+    columns = []
+    payloads = []
+    for position, name in enumerate(names):
+        scale = _SCALES.get(name, 1)
+        values = np.rint(np.nan_to_num(table[:, position]) * scale).astype(np.int64)
+        encoding = "raw"
+        if name in _DELTA_COLUMNS:
+            values = np.diff(values, prepend=0)
+            encoding = "delta"
+        dtype = "<i4" if values.size == 0 or np.abs(values).max() < 2**31 else "<i8"
+        raw = values.astype(dtype).tobytes()
+        payload = zlib.compress(raw, level)
+        codec = "zlib"
+        if len(payload) >= len(raw):
+            payload, codec = raw, "none"
+        columns.append(
+            {
+                "name": name,
+                "dtype": dtype,
+                "scale": scale,
+                "encoding": encoding,
+                "codec": codec,
+                "length": len(payload),
+            }
+        )
+        payloads.append(payload)
+
+    header = json.dumps({"rows": int(table.shape[0]), "columns": columns}, separators=(",", ":")).encode()
+    return struct.pack("<I", len(header)) + header + b"".join(payloads)
+
+
+class ColumnarWriter:
+    """Appends telemetry blocks to a binary stream."""
+
+    def __init__(self, stream: BinaryIO, names: Sequence[str]) -> None:
+        self._stream = stream
+        self._names = list(names)
+        self._stream.write(MAGIC)
+
+    def write(self, table: np.ndarray) -> None:
+        if not len(table):
+            return
+        self._stream.write(encode_block(self._names, table))
+        self._stream.flush()
@@ -0,0 +1,242 @@
+"""Per-window join of request latency and GPU telemetry on one clock."""
+from __future__ import annotations
+
+import math
+import time
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .gpu_metrics import FIELDS, SLOWDOWN_THROTTLE_REASONS
+from .histogram import LatencyHistogram
+
+# Coarser than the run's headline histogram: one of these is kept per window.
+_WINDOW_PRECISION = 0.05
+# How GPU fields are reduced over a window's samples and devices.
+_MEAN_FIELDS = ("gpu_util", "mem_util", "power_w", "sm_clock_mhz")
+_MAX_FIELDS = ("vram_mb", "power_w", "temp_c")
+_MIN_FIELDS = ("sm_clock_mhz",)
+
+
+class _GpuWindow:
+    def __init__(self) -> None:
+        self.samples = 0
+        self.sums = np.zeros(len(FIELDS))
+        self.counts = np.zeros(len(FIELDS))
+        self.maxima = np.full(len(FIELDS), -math.inf)
+        self.minima = np.full(len(FIELDS), math.inf)
+        self.throttled = 0
+
+    def add(self, values: np.ndarray) -> None:
+        present = ~np.isnan(values)
+        self.samples += 1
+        self.sums += np.where(present, values, 0.0).sum(axis=0)
+        self.counts += present.sum(axis=0)
+        self.maxima = np.fmax(self.maxima, np.where(present, values, -math.inf).max(axis=0))
+        self.minima = np.fmin(self.minima, np.where(present, values, math.inf).min(axis=0))
+        reasons = values[:, FIELDS.index("throttle_reasons")]
+        self.throttled += int(np.any(np.nan_to_num(reasons).astype(np.int64) & SLOWDOWN_THROTTLE_REASONS))
+
+
+class RunWindows:
+    """Latencies and GPU samples bucketed into fixed windows of the same clock.
+
+    Both series are timestamped with ``clock`` (``time.perf_counter``, the
+    load generator's clock) relative to ``origin``, the start of the GPU
+    telemetry, so window ``i`` covers ``[i * window_s, (i + 1) * window_s)``
+    seconds of the telemetry time axis. Requests are assigned to the window
+    in which they completed.
+
+    A long run ``evict``s windows once they are persisted elsewhere (soak
+    checkpoints), so memory stays bounded by the windows not yet saved.
+    Their latencies are kept merged into one running histogram, so
+    ``merged_latency`` over the whole run stays exact. Latencies and errors
+    that arrive for a window after it was evicted are also set aside until
+    ``take_late`` hands them to the next checkpoint.
+    """
+
+    def __init__(
+        self, window_s: float = 2.0, origin: float | None = None, clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        if window_s <= 0:
+            raise ValueError("window_s must be positive")
+        self.window_s = window_s
+        self.clock = clock
+        self.origin = clock() if origin is None else origin
+        self._latency: Dict[int, LatencyHistogram] = {}
+        self._errors: Dict[int, int] = {}
+        self._gpu: Dict[int, _GpuWindow] = {}
+        # Windows below ``_evicted_before`` were dropped; ``_end`` is one past the last window seen.
+        self._evicted_before = 0
+        self._end = 0
+        self._retired: Optional[LatencyHistogram] = None
+        # Recorded for already evicted windows and not yet taken by ``take_late``.
+        self._late: Optional[LatencyHistogram] = None
+        self._late_errors = 0
+        self._lock = Lock()
+
+    def elapsed(self, timestamp: float) -> float:
+        return timestamp - self.origin
+
+    def index_at(self, timestamp: float) -> int:
+        """Return the index of the window containing ``timestamp``."""
+
+        return max(int(self.elapsed(timestamp) // self.window_s), 0)
+
+    def record_latency(self, ended: float, latency_ms: float) -> None:
+        index = self.index_at(ended)
+        with self._lock:
+            self._histogram(index).record(latency_ms)
+
+    def record_error(self, ended: float) -> None:
+        index = self.index_at(ended)
+        with self._lock:
+            self._end = max(self._end, index + 1)
+            if index < self._evicted_before:
+                self._late_errors += 1
+            else:
+                self._errors[index] = self._errors.get(index, 0) + 1
+
+    def record_gpu(self, timestamp: float, values: np.ndarray) -> None:
+        """Add one sample of shape ``(devices, len(FIELDS))``; samples of evicted windows are dropped."""
+
+        index = self.index_at(timestamp)
+        with self._lock:
+            if index < self._evicted_before:
+                return
+            self._end = max(self._end, index + 1)
+            self._gpu.setdefault(index, _GpuWindow()).add(values)
+
+    def latency_state(self) -> Dict[str, Dict[int, object]]:
+        """Return the per-window latency data in a picklable form for ``merge_latency``."""
+
+        with self._lock:
+            return {
+                "latency": {index: histogram.to_dict() for index, histogram in self._latency.items()},
+                "errors": dict(self._errors),
+            }
+
+    def merge_latency(self, state: Dict[str, Dict[int, object]]) -> None:
+        """Add the latencies recorded by another process against the same origin."""
+
+        with self._lock:
+            for index, payload in state["latency"].items():
+                self._histogram(index).merge(LatencyHistogram.from_dict(payload))  # type: ignore[arg-type]
+            for index, errors in state["errors"].items():
+                self._end = max(self._end, index + 1)
+                if index < self._evicted_before:
+                    self._late_errors += int(errors)  # type: ignore[call-overload]
+                else:
+                    self._errors[index] = self._errors.get(index, 0) + int(errors)  # type: ignore[call-overload]
+
+    def evict(self, before: int) -> None:
+        """Drop the windows with ``index < before``, folding their latencies into the running histogram."""
+
+        with self._lock:
+            for index in range(self._evicted_before, before):
+                histogram = self._latency.pop(index, None)
+                if histogram is not None:
+                    self._retire(histogram)
+                self._errors.pop(index, None)
+                self._gpu.pop(index, None)
+            self._evicted_before = max(self._evicted_before, before)
+
+    def records(self, first: int = 0, last: Optional[int] = None) -> List[Dict[str, object]]:
+        """Return one joined record per window that saw requests or GPU samples.
+
+        Only windows with ``first <= index < last`` are included when given;
+        evicted windows are not.
+        """
+
+        with self._lock:
+            return [
+                self._record(index)
+                for index in self._indexes(first, last)
+                if index in self._latency or index in self._errors or index in self._gpu
+            ]
+
+    def merged_latency(self, first: int = 0, last: Optional[int] = None) -> Optional[LatencyHistogram]:
+        """Merge the latency histograms of windows ``first <= index < last``; ``None`` if there are none.
+
+        Evicted windows only exist merged, so they are all included when the
+        range starts before the first window still kept.
+        """
+
+        merged: Optional[LatencyHistogram] = None
+        with self._lock:
+            parts = [self._latency.get(index) for index in self._indexes(first, last)]
+            if first < self._evicted_before:
+                parts += [self._retired, self._late]
+            for histogram in parts:
+                if histogram is None:
+                    continue
+                if merged is None:
+                    merged = LatencyHistogram(**histogram.layout)
+                merged.merge(histogram)
+        return merged
+
+    def take_late(self) -> Tuple[Optional[LatencyHistogram], int]:
+        """Return the latencies and errors recorded for evicted windows since the last call."""
+
+        with self._lock:
+            late, errors = self._late, self._late_errors
+            if late is not None:
+                self._retire(late)
+            self._late, self._late_errors = None, 0
+        return late, errors
+
+    def _indexes(self, first: int, last: Optional[int]) -> range:
+        return range(max(first, self._evicted_before), self._end if last is None else min(last, self._end))
+
+    def _histogram(self, index: int) -> LatencyHistogram:
+        """Return the histogram that latencies of window ``index`` go to; the caller holds the lock."""
+
+        self._end = max(self._end, index + 1)
+        if index < self._evicted_before:
+            if self._late is None:
+                self._late = LatencyHistogram(precision=_WINDOW_PRECISION)
+            return self._late
+        histogram = self._latency.get(index)
+        if histogram is None:
+            histogram = self._latency[index] = LatencyHistogram(precision=_WINDOW_PRECISION)
+        return histogram
+
+    def _retire(self, histogram: LatencyHistogram) -> None:
+        if self._retired is None:
+            self._retired = LatencyHistogram(precision=_WINDOW_PRECISION)
+        self._retired.merge(histogram)
+
+    def _record(self, index: int) -> Dict[str, object]:
+        record: Dict[str, object] = {
+            "t_start_s": round(index * self.window_s, 3),
+            "t_end_s": round((index + 1) * self.window_s, 3),
+            "requests": 0,
+            "errors": self._errors.get(index, 0),
+        }
+        histogram = self._latency.get(index)
+        if histogram is not None:
+            latency = histogram.percentiles((0.50, 0.95, 0.99))
+            record.update(
+                requests=histogram.count,
+                latency_p50_ms=round(latency[0.50], 3),
+                latency_p95_ms=round(latency[0.95], 3),
+                latency_p99_ms=round(latency[0.99], 3),
+                latency_max_ms=round(histogram.max_ms, 3),
+            )
+        gpu = self._gpu.get(index)
+        if gpu is not None and gpu.samples:
+            record["gpu_samples"] = gpu.samples
+            for name in _MEAN_FIELDS:
+                column = FIELDS.index(name)
+                record[f"{name}_mean"] = _rounded(gpu.sums[column] / gpu.counts[column]) if gpu.counts[column] else None
+            for name in _MAX_FIELDS:
+                record[f"{name}_max"] = _rounded(gpu.maxima[FIELDS.index(name)])
+            for name in _MIN_FIELDS:
+                record[f"{name}_min"] = _rounded(gpu.minima[FIELDS.index(name)])
+            record["throttled_fraction"] = round(gpu.throttled / gpu.samples, 3)
+        return record
+
+
+def _rounded(value: float) -> float | None:
+    return round(float(value), 2) if math.isfinite(value) else None
@@ -0,0 +1,253 @@
+"""Multi-process load generation for the Persephone agent.
+
+One probe loop in one process is capped by the GIL long before a fast GPU
+saturates. ``run_workers`` runs the probe in ``workers`` processes, each
+pinned to its own share of the CPU cores and, optionally, to one GPU, and
+combines their results exactly by merging histograms.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from multiprocessing.connection import Connection, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .histogram import LatencyHistogram
+from .runner import run_probe
+from .windows import RunWindows
+
+logger = logging.getLogger(__name__)
+
+# Workers wait for each other after loading the model so their measurements overlap.
+START_TIMEOUT_S = 600.0
+
+
+def run_workers(
+    model_ref: str,
+    samples: int,
+    workers: int,
+    gpus: Optional[Sequence[str]] = None,
+    windows: Optional[RunWindows] = None,
+    **options: Any,
+) -> Dict[str, Any]:
+    """Run ``run_probe`` in ``workers`` processes and combine their results.
+
+    ``samples`` and ``rate_rps`` are split evenly between workers; every
+    worker uses the full ``concurrency``. CPU cores are split into contiguous
+    ranges, one per worker, and GPUs from ``gpus`` are assigned round-robin
+    through ``CUDA_VISIBLE_DEVICES``. Per-worker results are reported under
+    ``workers``; the top-level metrics, including ``latency_histogram``, are
+    for all workers together at the chosen batch size, so readers never need
+    to merge the per-worker histograms (which may be for different sizes).
+
+    A worker that dies without reporting aborts the start barrier, so the
+    others fail at once instead of waiting ``START_TIMEOUT_S`` for it.
+    """
+
+    if workers <= 0:
+        raise ValueError("workers must be positive")
+    if samples < workers:
+        raise ValueError("samples must be at least the number of workers")
+
+    cpu_sets = _split_cpus(workers)
+    rate_rps = options.get("rate_rps")
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    processes = []
+    for index in range(workers):
+        worker_options = dict(options)
+        if rate_rps is not None:
+            worker_options["rate_rps"] = rate_rps / workers
+        receiver, sender = context.Pipe(duplex=False)
+        gpu = gpus[index % len(gpus)] if gpus else None
+        process = context.Process(
+            target=_worker_main,
+            name=f"probe-worker-{index}",
+            args=(
+                index,
+                cpu_sets[index],
+                gpu,
+                model_ref,
+                samples // workers + (1 if index < samples % workers else 0),
+                worker_options,
+                windows.window_s if windows is not None else None,
+                windows.origin if windows is not None else None,
+                barrier,
+                sender,
+            ),
+        )
+        process.start()
+        sender.close()
+        processes.append((process, receiver, gpu))
+
+    messages = _collect(processes, barrier)
+    reports: List[Dict[str, Any]] = []
+    for index, (_, _, gpu) in enumerate(processes):
+        message = messages[index]
+        report: Dict[str, Any] = {"worker": index, "cpus": cpu_sets[index], "gpu": gpu}
+        if "error" in message:
+            logger.error("Probe worker %s failed: %s", index, message["error"])
+            report["error"] = message["error"]
+        else:
+            report.update(message["result"])
+            if windows is not None:
+                windows.merge_latency(message["windows"])
+        reports.append(report)
+
+    succeeded = [report for report in reports if "error" not in report]
+    if not succeeded:
+        raise RuntimeError(f"all {workers} probe workers failed: {reports[0]['error']}")
+    result = _combine_sweeps(succeeded)
+    for key in ("backend", "dataset_profile", "note", "arrival"):
+        if key in succeeded[0]:
+            result[key] = succeeded[0][key]
+    if rate_rps is not None:
+        result["offered_rps"] = rate_rps
+    result["worker_count"] = workers
+    result["failed_workers"] = len(reports) - len(succeeded)
+    result["workers"] = reports
+    return result
+
+
+def _collect(
+    processes: List[Tuple[Any, Connection, Optional[str]]], barrier: threading.Barrier
+) -> List[Dict[str, Any]]:
+    """Receive every worker's message as it arrives; a worker that exits without one gets an error."""
+
+    messages: Dict[int, Dict[str, Any]] = {}
+    waiting = dict(enumerate(processes))
+    while waiting:
+        handles = [receiver for _, receiver, _ in waiting.values()]
+        handles += [process.sentinel for process, _, _ in waiting.values()]
+        ready = set(wait(handles))
+        for index, (process, receiver, _) in list(waiting.items()):
+            if receiver not in ready and process.sentinel not in ready:
+                continue
+            try:
+                message = receiver.recv() if receiver.poll() else None
+            except EOFError:
+                message = None
+            process.join()
+            if message is None:
+                # Killed before reporting, e.g. out of memory: release the others from the start barrier.
+                barrier.abort()
+                message = {"error": f"worker exited with code {process.exitcode} without a result"}
+            messages[index] = message
+            del waiting[index]
+    return [messages[index] for index in range(len(processes))]
+
+
+def _worker_main(
+    index: int,
+    cpus: List[int],
+    gpu: Optional[str],
+    model_ref: str,
+    samples: int,
+    options: Dict[str, Any],
+    window_s: Optional[float],
+    origin: Optional[float],
+    barrier: threading.Barrier,
+    connection: Connection,
+) -> None:
+    logging.basicConfig(level=logging.INFO)
+    try:
+        if gpu is not None:
+            os.environ["CUDA_VISIBLE_DEVICES"] = gpu
+        if cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+        # perf_counter is system-wide on Linux, so the parent's origin is valid here.
+        windows = RunWindows(window_s, origin=origin) if window_s is not None else None
+        barrier.wait(START_TIMEOUT_S)
+        logger.info("Probe worker %s starting on cpus=%s gpu=%s", index, cpus, gpu)
+        result = run_probe(model_ref, samples, windows=windows, **options)
+        connection.send({"result": result, "windows": windows.latency_state() if windows is not None else None})
+    except BaseException as exc:  # pylint: disable=broad-except
+        barrier.abort()
+        connection.send({"error": f"{type(exc).__name__}: {exc}"})
+    finally:
+        connection.close()
+
+
+def _split_cpus(workers: int) -> List[List[int]]:
+    """Split the cores this process may use into one contiguous range per worker."""
+
+    if not hasattr(os, "sched_getaffinity"):
+        return [[] for _ in range(workers)]
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) < workers:
+        # Fewer cores than workers: share them round-robin.
+        return [[cpus[index % len(cpus)]] for index in range(workers)]
+    size, extra = divmod(len(cpus), workers)
+    sets, start = [], 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        sets.append(cpus[start:end])
+        start = end
+    return sets
+
+
+def _combine_sweeps(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine worker results per batch size; pick the best size like ``run_probe`` does."""
+
+    if not any("batch_sweep" in result for result in results):
+        return _combine(results)
+    by_size: Dict[int, List[Dict[str, Any]]] = {}
+    for result in results:
+        for entry in result.get("batch_sweep", [result]):
+            by_size.setdefault(int(entry["batch_size"]), []).append(entry)
+    sweep = [_combine(entries) for _, entries in sorted(by_size.items())]
+    combined = dict(max(sweep, key=lambda entry: (entry["tokens_per_s"], entry["throughput_rps"])))
+    combined["batch_sweep"] = sweep
+    return combined
+
+
+def _combine(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add up counts and rates of concurrent probes and merge their histograms."""
+
+    latency = _merged(entry.get("latency_histogram") for entry in entries)
+    combined: Dict[str, Any] = {
+        "batch_size": entries[0].get("batch_size", 1),
+        "samples": sum(entry["samples"] for entry in entries),
+        "mode": entries[0]["mode"],
+        "concurrency": sum(entry["concurrency"] for entry in entries),
+        "throughput_rps": round(sum(entry["throughput_rps"] for entry in entries), 3),
+        "errors": sum(entry["errors"] for entry in entries),
+        "duration_s": max(entry["duration_s"] for entry in entries),
+        "prompt_tokens": sum(entry.get("prompt_tokens", 0) for entry in entries),
+        "output_tokens": sum(entry.get("output_tokens", 0) for entry in entries),
+        "tokens_per_s": round(sum(entry.get("tokens_per_s", 0.0) for entry in entries), 3),
+    }
+    if latency is not None:
+        percentiles = latency.percentiles()
+        combined["latency_histogram"] = latency.to_dict()
+        combined.update(
+            latency_p50_ms=round(percentiles[0.50], 3),
+            latency_p90_ms=round(percentiles[0.90], 3),
+            latency_p95_ms=round(percentiles[0.95], 3),
+            latency_p99_ms=round(percentiles[0.99], 3),
+            latency_p999_ms=round(percentiles[0.999], 3),
+            latency_max_ms=round(latency.max_ms, 3),
+        )
+    for prefix in ("ttft", "itl"):
+        histogram = _merged(entry.get(f"{prefix}_histogram") for entry in entries)
+        if histogram is not None:
+            percentiles = histogram.percentiles((0.50, 0.95, 0.99))
+            combined[f"{prefix}_p50_ms"] = round(percentiles[0.50], 3)
+            combined[f"{prefix}_p95_ms"] = round(percentiles[0.95], 3)
+            combined[f"{prefix}_p99_ms"] = round(percentiles[0.99], 3)
+    return combined
+
+
+def _merged(payloads: Any) -> Optional[LatencyHistogram]:
+    merged: Optional[LatencyHistogram] = None
+    for payload in payloads:
+        if not payload:
+            continue
+        histogram = LatencyHistogram.from_dict(payload)
+        if merged is None:
+            merged = histogram
+        else:
+            merged.merge(histogram)
+    return merged if merged is not None and merged.count else None
@@ -0,0 +1,7 @@
+"""Benchmarks for controller hot paths.
+
+Run from the ``persephone`` directory: ``python -m benchmarks`` runs the
+whole suite, ``python -m benchmarks.bench_api`` (``bench_store``,
+``bench_serialization``, ``bench_metrics``) a single one. Results are
+printed as one JSON document, or written to ``--output``.
+"""
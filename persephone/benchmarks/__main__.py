@@ -0,0 +1,49 @@
+"""Run every benchmark and emit one JSON document.
+
+``python -m benchmarks --quick --output results.json`` gives a fast smoke
+run; the defaults are sized for comparing builds on the same machine.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict
+
+from . import bench_api, bench_metrics, bench_serialization, bench_store
+from .common import emit
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the controller benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="Small sizes for a fast smoke run")
+    parser.add_argument("--only", nargs="+", choices=["api", "store", "serialization", "metrics"])
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    selected = set(args.only or ["api", "store", "serialization", "metrics"])
+    results: Dict[str, Any] = {}
+    started = time.perf_counter()
+    if "api" in selected:
+        results["api"] = asyncio.run(
+            bench_api.run(
+                concurrency_levels=[1, 8] if args.quick else [1, 8, 32, 128],
+                requests_per_level=50 if args.quick else 500,
+                catalog_size=2000,
+                run_duration_s=0.5 if args.quick else 2.0,
+            )
+        )
+    if "store" in selected:
+        results["store"] = bench_store.run([1, 8] if args.quick else [1, 4, 16, 64], 100 if args.quick else 500, True)
+    if "serialization" in selected:
+        results["serialization"] = bench_serialization.run(
+            [1_000, 10_000] if args.quick else [1_000, 10_000, 100_000], 5 if args.quick else 50
+        )
+    if "metrics" in selected:
+        results["metrics"] = bench_metrics.run(20_000 if args.quick else 200_000)
+    elapsed_s = round(time.perf_counter() - started, 2)
+    emit({"suite": "controller", "quick": args.quick, "elapsed_s": elapsed_s, **results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Controller API load test against an in-process fake RunPod backend.
+
+The controller and the fake RunPod server (``providers.fake_runpod``) both
+run in this process and are connected through ASGI transports, so results
+measure the controller itself rather than the network. Runs started during
+the benchmark really execute against the fake backend and compete with the
+API for the event loop, as they would in production.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+from typing import Any, Dict, List, Sequence
+
+import httpx
+
+from controller.app.core.config import get_settings
+from controller.app.dependencies import get_catalog_cache, get_orchestrator, get_run_service
+from controller.app.main import create_app
+from controller.app.providers.catalog_cache import CatalogCache
+from controller.app.providers.fake_runpod import FakeRunpodConfig, create_fake_runpod_app
+from controller.app.providers.runpod_orch import RunpodOrchestrator
+from controller.app.providers.warm_pool import WarmPodPool
+from controller.app.services.run_cache import RunResultCache
+from controller.app.services.run_service import RunService
+from controller.app.services.scheduler import RunScheduler
+from controller.app.storage.store import InMemoryRunStore
+
+from .common import emit, run_concurrently
+
+REGIONS = ("EU", "US", "APAC")
+AVAILABILITY = ("low", "medium", "high")
+
+
+def synthetic_catalog(size: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"gpu-{index}",
+            "name": f"Synthetic GPU {index}",
+            "vram_gb": rng.choice((16, 24, 40, 48, 80, 141)),
+            "hourly_usd": round(rng.uniform(0.2, 6.0), 3),
+            "regions": rng.sample(REGIONS, rng.randint(1, len(REGIONS))),
+            "availability": rng.choice(AVAILABILITY),
+        }
+        for index in range(size)
+    ]
+
+
+async def run(
+    concurrency_levels: Sequence[int],
+    requests_per_level: int,
+    catalog_size: int,
+    run_duration_s: float,
+) -> Dict[str, Any]:
+    runpod_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=create_fake_runpod_app(FakeRunpodConfig(run_duration_s=run_duration_s))),
+        base_url="http://fake-runpod",
+    )
+    orchestrator = RunpodOrchestrator(
+        "bench",
+        "persephone-agent:bench",
+        300,
+        runpod_client,
+        base_url="http://fake-runpod/v2",
+        poll_initial_s=0.1,
+        poll_max_s=1.0,
+    )
+    scheduler = RunScheduler(max_concurrency=64, max_queue=len(concurrency_levels) * requests_per_level + 1)
+    store = InMemoryRunStore()
+    offers = synthetic_catalog(catalog_size)
+
+    async def fetch_catalog() -> List[dict]:
+        return offers
+
+    catalog = CatalogCache(fetch_catalog, ttl_s=3600)
+    service = RunService(
+        store,
+        orchestrator,
+        300,
+        scheduler=scheduler,
+        pool=WarmPodPool(orchestrator),
+        cache=RunResultCache(),
+    )
+
+    app = create_app()
+    app.dependency_overrides[get_run_service] = lambda: service
+    app.dependency_overrides[get_orchestrator] = lambda: orchestrator
+    app.dependency_overrides[get_catalog_cache] = lambda: catalog
+
+    results: Dict[str, Any] = {"runs_start": [], "runs_get": [], "catalog": {}}
+    await scheduler.start()
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://controller",
+        headers={"X-API-Key": get_settings().api_key},
+    )
+    try:
+        run_ids: List[str] = []
+        for concurrency in concurrency_levels:
+
+            async def start(index: int, concurrency: int = concurrency) -> None:
+                response = await client.post(
+                    "/runs/start",
+                    json={"gpu_type": "l4-24gb", "model_ref": f"bench-c{concurrency}-{index}", "samples": 8},
+                )
+                response.raise_for_status()
+                run_ids.append(response.json()["run_id"])
+
+            results["runs_start"].append(await run_concurrently(start, requests_per_level, concurrency))
+
+        for concurrency in concurrency_levels:
+
+            async def get(index: int) -> None:
+                response = await client.get(f"/runs/{run_ids[index % len(run_ids)]}")
+                response.raise_for_status()
+
+            results["runs_get"].append(await run_concurrently(get, requests_per_level, concurrency))
+
+        first = await client.get("/compute/gpus")
+        etag = first.headers["ETag"]
+        variants = {
+            "full": ({}, {}),
+            "not_modified": ({}, {"If-None-Match": etag}),
+            "filtered": ({"min_vram_gb": 40, "region": "EU", "sort": "price_per_vram_gb", "limit": 20}, {}),
+        }
+        for name, (params, headers) in variants.items():
+            levels = []
+            for concurrency in concurrency_levels:
+
+                async def get_catalog(index: int, params: dict = params, headers: dict = headers) -> None:
+                    response = await client.get("/compute/gpus", params=params, headers=headers)
+                    if response.status_code not in (200, 304):
+                        response.raise_for_status()
+
+                levels.append(await run_concurrently(get_catalog, requests_per_level, concurrency))
+            results["catalog"][name] = levels
+
+        statuses: Dict[str, int] = {}
+        for run_id in run_ids:
+            status = store.get(run_id).status  # type: ignore[union-attr]
+            statuses[status] = statuses.get(status, 0) + 1
+        results["run_statuses_at_end"] = statuses
+    finally:
+        await client.aclose()
+        await scheduler.shutdown(timeout_s=run_duration_s + 5)
+        await orchestrator.watcher.close()
+        await runpod_client.aclose()
+
+    return {
+        "benchmark": "api",
+        "params": {
+            "concurrency_levels": list(concurrency_levels),
+            "requests_per_level": requests_per_level,
+            "catalog_size": catalog_size,
+            "fake_run_duration_s": run_duration_s,
+        },
+        **results,
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=500, help="Requests per concurrency level")
+    parser.add_argument("--catalog-size", type=int, default=2000)
+    parser.add_argument("--run-duration-s", type=float, default=2.0, help="Fake RunPod run length")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the controller API against a fake RunPod")
+    add_arguments(parser)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+    emit(asyncio.run(run(args.concurrency, args.requests, args.catalog_size, args.run_duration_s)), args.output)
+
+
+if __name__ == "__main__":
+    main()
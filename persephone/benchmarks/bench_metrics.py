@@ -0,0 +1,85 @@
+"""Overhead of the Prometheus instrumentation on controller hot paths."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any, Callable, Dict
+
+from controller.app.core.metrics import Counter, Histogram, RequestMetricsMiddleware, Registry
+
+from .common import emit
+
+
+def _ns_per_op(func: Callable[[], None], iterations: int) -> float:
+    started = time.perf_counter_ns()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter_ns() - started) / iterations
+
+
+async def _asgi_ns_per_request(app: Any, iterations: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/health"}
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        return None
+
+    started = time.perf_counter_ns()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter_ns() - started) / iterations
+
+
+async def _endpoint(scope: Dict[str, Any], receive: Any, send: Any) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def run(iterations: int) -> Dict[str, Any]:
+    registry = Registry()
+    counter = registry.register(Counter("bench_total", "Benchmark counter.", ("operation",)))
+    histogram = registry.register(Histogram("bench_seconds", "Benchmark histogram.", ("method", "route", "code")))
+    counter_child = counter.labels("exec")
+    histogram_child = histogram.labels("GET", "/runs/{run_id}", "2xx")
+
+    middleware = RequestMetricsMiddleware(_endpoint, histogram)
+    bare_ns = asyncio.run(_asgi_ns_per_request(_endpoint, iterations))
+    instrumented_ns = asyncio.run(_asgi_ns_per_request(middleware, iterations))
+
+    for route in range(50):
+        histogram.labels("GET", f"/route/{route}", "2xx").observe(0.01)
+    started = time.perf_counter()
+    rendered = registry.render()
+    render_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "benchmark": "metrics",
+        "params": {"iterations": iterations},
+        "counter_inc_ns": round(_ns_per_op(counter_child.inc, iterations), 1),
+        "histogram_observe_ns": round(_ns_per_op(lambda: histogram_child.observe(0.042), iterations), 1),
+        "labels_lookup_ns": round(_ns_per_op(lambda: histogram.labels("GET", "/runs/{run_id}", "2xx"), iterations), 1),
+        "asgi_request_bare_ns": round(bare_ns, 1),
+        "asgi_request_instrumented_ns": round(instrumented_ns, 1),
+        "middleware_overhead_ns": round(instrumented_ns - bare_ns, 1),
+        "render_ms": round(render_ms, 3),
+        "render_bytes": len(rendered),
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--iterations", type=int, default=200_000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure metrics instrumentation overhead")
+    add_arguments(parser)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+    emit(run(args.iterations), args.output)
+
+
+if __name__ == "__main__":
+    main()
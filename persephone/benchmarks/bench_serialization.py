@@ -0,0 +1,76 @@
+"""Cost of serializing ``RunResponse`` for runs with large GPU telemetry."""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, Sequence
+
+from fastapi.encoders import jsonable_encoder
+
+from controller.app.api.api_runs import RunResponse
+from controller.app.storage.models import Run
+
+from .common import emit, latency_summary
+
+CSV_HEADER = "t,gpu,gpu_util,mem_util,vram_mb,power_w,temp_c,sm_clock_mhz,pcie_tx_kbps,pcie_rx_kbps,throttle_reasons\n"
+
+
+def make_run(rows: int) -> Run:
+    csv = CSV_HEADER + "".join(
+        f"{index * 0.5:.1f},{index % 8},{index % 100},{index % 90},{18000 + index % 512},"
+        f"{250 + index % 50}.0,{60 + index % 20},1500,1024,2048,0\n"
+        for index in range(rows)
+    )
+    run = Run(id="bench", gpu_type="l4-24gb", model_ref="bench", samples=1000, status="pending")
+    run.mark_succeeded(25.0, 35.0, 40.0, {"result_json": json.dumps({"samples": 1000}), "gpu_csv": csv}, run.started_at)
+    return run
+
+
+def _time(func: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - started)
+    return latency_summary(latencies)
+
+
+def run(row_counts: Sequence[int], iterations: int) -> Dict[str, Any]:
+    results = []
+    for rows in row_counts:
+        sample_run = make_run(rows)
+        csv_bytes = len(sample_run.artifacts["gpu_csv"])  # type: ignore[arg-type]
+        results.append(
+            {
+                "gpu_csv_rows": rows,
+                "gpu_csv_bytes": csv_bytes,
+                # The path FastAPI takes for a ``response_model`` endpoint.
+                "from_run_encode_json": _time(
+                    lambda: json.dumps(jsonable_encoder(RunResponse.from_run(sample_run))), iterations
+                ),
+                "from_run_model_json": _time(lambda: RunResponse.from_run(sample_run).json(), iterations),
+                "without_artifacts": _time(
+                    lambda: RunResponse.from_run(sample_run, include_artifacts=False).json(exclude={"artifacts"}),
+                    iterations,
+                ),
+            }
+        )
+    return {"benchmark": "serialization", "params": {"iterations": iterations}, "results": results}
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--iterations", type=int, default=50)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure RunResponse serialization with large telemetry")
+    add_arguments(parser)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+    emit(run(args.rows, args.iterations), args.output)
+
+
+if __name__ == "__main__":
+    main()
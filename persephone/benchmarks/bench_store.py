@@ -0,0 +1,104 @@
+"""Run store contention under many concurrent writers.
+
+Each writer thread creates runs and updates them through the running and
+succeeded states, the write pattern of the scheduler's workers. One reader
+thread keeps paging ``query_runs`` meanwhile, as the list endpoint does.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+from controller.app.storage.models import Run
+from controller.app.storage.sqlite_store import SqliteRunStore
+from controller.app.storage.store import InMemoryRunStore, RunQuery, RunStore
+
+from .common import emit, latency_summary
+
+
+def _writer(store: RunStore, writer: int, runs: int, latencies: List[float], barrier: threading.Barrier) -> None:
+    barrier.wait()
+    for index in range(runs):
+        run = Run(id=f"w{writer}-{index}", gpu_type="l4-24gb", model_ref="bench", samples=8, status="pending")
+        for step in (store.save, store.update, store.update):
+            started = time.perf_counter()
+            step(run)
+            latencies.append(time.perf_counter() - started)
+            if run.status == "pending":
+                run.mark_running()
+            else:
+                run.mark_succeeded(25.0, 35.0, 40.0, {"result_json": "{}"}, run.started_at)
+
+
+def _reader(store: RunStore, stop: threading.Event, latencies: List[float]) -> None:
+    query = RunQuery(status="succeeded", limit=50)
+    while not stop.is_set():
+        started = time.perf_counter()
+        store.query_runs(query)
+        latencies.append(time.perf_counter() - started)
+
+
+def measure(make_store: Callable[[], RunStore], writers: int, runs_per_writer: int) -> Dict[str, Any]:
+    store = make_store()
+    write_latencies: List[List[float]] = [[] for _ in range(writers)]
+    read_latencies: List[float] = []
+    barrier = threading.Barrier(writers + 1)
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=_writer, args=(store, writer, runs_per_writer, write_latencies[writer], barrier))
+        for writer in range(writers)
+    ]
+    reader = threading.Thread(target=_reader, args=(store, stop, read_latencies))
+    for thread in threads:
+        thread.start()
+    reader.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall_s = time.perf_counter() - started
+    stop.set()
+    reader.join()
+    return {
+        "writers": writers,
+        "writes": latency_summary([value for values in write_latencies for value in values], wall_s),
+        "reads_during_writes": latency_summary(read_latencies, wall_s),
+    }
+
+
+def run(writer_counts: Sequence[int], runs_per_writer: int, sqlite: bool) -> Dict[str, Any]:
+    backends: Dict[str, Callable[[], RunStore]] = {"memory": InMemoryRunStore}
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        if sqlite:
+            counter = iter(range(len(writer_counts)))
+            backends["sqlite"] = lambda: SqliteRunStore(Path(directory) / f"runs-{next(counter)}.db")
+        for name, make_store in backends.items():
+            results[name] = [measure(make_store, writers, runs_per_writer) for writers in writer_counts]
+    return {
+        "benchmark": "store",
+        "params": {"writer_counts": list(writer_counts), "runs_per_writer": runs_per_writer},
+        **results,
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--runs-per-writer", type=int, default=500)
+    parser.add_argument("--sqlite", action="store_true", help="Also measure the SQLite store")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure run store contention under concurrent writers")
+    add_arguments(parser)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+    emit(run(args.writers, args.runs_per_writer, args.sqlite), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Shared helpers for the benchmark scripts."""
+from __future__ import annotations
+
+import asyncio
+import json
+import platform
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def environment() -> Dict[str, str]:
+    return {"python": sys.version.split()[0], "platform": platform.platform(), "machine": platform.machine()}
+
+
+def latency_summary(samples_s: Sequence[float], wall_s: Optional[float] = None) -> Dict[str, float]:
+    """Summarise latencies in seconds as milliseconds, plus throughput if ``wall_s`` is given."""
+
+    array = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    if array.size == 0:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(array, [50, 95, 99])
+    summary = {
+        "count": int(array.size),
+        "mean_ms": round(float(array.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(array.max()), 4),
+    }
+    if wall_s:
+        summary["throughput_per_s"] = round(array.size / wall_s, 2)
+    return summary
+
+
+async def run_concurrently(
+    operation: Callable[[int], Awaitable[Any]], total: int, concurrency: int
+) -> Dict[str, float]:
+    """Call ``operation(i)`` for ``i`` in ``range(total)`` with ``concurrency`` calls in flight.
+
+    Returns the latency summary; calls that raise are counted as errors.
+    """
+
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index, errors
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                await operation(index)
+            except Exception:  # pylint: disable=broad-except
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = latency_summary(latencies, time.perf_counter() - started)
+    summary["concurrency"] = concurrency
+    summary["errors"] = errors
+    return summary
+
+
+def emit(results: Dict[str, Any], output: Optional[str]) -> None:
+    """Print ``results`` as JSON, or write them to ``output``."""
+
+    document = {"environment": environment(), **results}
+    if output:
+        with open(output, "w", encoding="utf-8") as output_file:
+            json.dump(document, output_file, indent=2)
+    else:
+        print(json.dumps(document, indent=2))
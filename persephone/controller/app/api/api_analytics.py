@@ -0,0 +1,42 @@
+"""Cross-run analytics API routes."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from ..dependencies import get_run_service
+from ..services.analytics import CompareSort
+from ..services.run_service import RunService
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/compare", response_model=Dict[str, Any])
+def compare_gpus(
+    model_ref: str,
+    dataset_profile: Optional[str] = None,
+    gpu_type: Optional[List[str]] = Query(None, description="Restrict to these gpu_types; repeat to pass several"),
+    sort: CompareSort = Query("throughput", description="Rank by mean throughput or by cost per 1k requests"),
+    inference_backend: Optional[str] = Query(
+        None, description="Inference backend the runs were served by; defaults to the configured one"
+    ),
+    soak: bool = Query(False, description="Compare soak runs instead of sample-count runs"),
+    run_service: RunService = Depends(get_run_service),
+) -> Dict[str, Any]:
+    """Compare gpu_types on the successful runs of one model.
+
+    Each entry has throughput and latency distributions with 95% confidence
+    intervals across repeated runs, cost per 1k requests at the catalog's
+    hourly price, and the mean GPU telemetry summary of its runs. Runs of
+    other inference backends, and soak runs unless ``soak``, are left out.
+    """
+
+    entries = run_service.compare_gpus(model_ref, dataset_profile, gpu_type, sort, inference_backend, soak)
+    return {
+        "model_ref": model_ref,
+        "dataset_profile": dataset_profile,
+        "inference_backend": inference_backend or run_service.inference_backend,
+        "soak": soak,
+        "gpu_types": entries,
+    }
@@ -1,25 +1,91 @@
 """Compute related API routes."""
 from __future__ import annotations
 
-from typing import List
+import json
+from typing import Any, Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
 
-from ..core.config import Settings, get_settings
-from ..providers.runpod_catalog import MOCK_GPUS, RunpodCatalog
+from ..dependencies import get_catalog_cache, get_run_service, get_warm_pool
+from ..providers.catalog_cache import CatalogCache, CatalogUnavailable
+from ..providers.offer_index import OfferSort
+from ..providers.warm_pool import WarmPodPool
+from ..services.run_service import RunService
 
 router = APIRouter(prefix="/compute", tags=["compute"])
 
 
 @router.get("/gpus", response_model=List[dict])
-def list_gpus(settings: Settings = Depends(get_settings)) -> List[dict]:
-    """Return available GPU offerings."""
+async def list_gpus(
+    min_vram_gb: Optional[float] = Query(None, ge=0),
+    max_hourly_usd: Optional[float] = Query(None, ge=0),
+    region: Optional[str] = None,
+    availability: Optional[Literal["low", "medium", "high"]] = Query(
+        None, description="Minimum availability level"
+    ),
+    sort: Optional[OfferSort] = Query(None, description="Rank offers, best first"),
+    model_ref: Optional[str] = Query(None, description="Model whose past runs rank sort=throughput_per_usd"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    if_none_match: Optional[str] = Header(None),
+    cache: CatalogCache = Depends(get_catalog_cache),
+    run_service: RunService = Depends(get_run_service),
+) -> Response:
+    """Return available GPU offerings, optionally filtered and ranked.
 
-    if settings.catalog_mode == "mock":
-        return MOCK_GPUS
+    Served from the in-memory catalog cache. The unfiltered list carries an
+    ``ETag``; clients may send it in ``If-None-Match`` to get ``304 Not
+    Modified``. ``sort=throughput_per_usd`` ranks by requests per dollar
+    measured in past successful runs of ``model_ref``, which it requires.
+    ``availability`` is rejected when the catalog has no availability data,
+    as is the case for the live RunPod catalog, instead of matching nothing.
+    """
 
-    if not settings.runpod_api_key:
-        return []
+    if sort == "throughput_per_usd" and not model_ref:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="sort=throughput_per_usd needs model_ref",
+        )
+    try:
+        snapshot = await cache.get()
+    except CatalogUnavailable as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
 
-    catalog = RunpodCatalog(api_key=settings.runpod_api_key)
-    return catalog.list_gpus()
+    if availability is not None and not snapshot.index.has_availability:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="the GPU catalog reports no availability levels; drop the availability filter",
+        )
+
+    headers = {
+        "Cache-Control": f"private, max-age={max(0, int(cache.ttl_s - snapshot.age_s))}",
+        "Age": str(int(snapshot.age_s)),
+    }
+    filters = (min_vram_gb, max_hourly_usd, region, availability, sort, limit)
+    if any(value is not None for value in filters):
+        throughput_rps = None
+        if sort == "throughput_per_usd":
+            # A store query; keep it off the event loop.
+            throughput_rps = await run_in_threadpool(run_service.throughput_by_gpu_type, model_ref)
+        offers = snapshot.index.query(
+            min_vram_gb=min_vram_gb,
+            max_hourly_usd=max_hourly_usd,
+            region=region,
+            availability=availability,
+            sort=sort,
+            limit=limit,
+            throughput_rps=throughput_rps,
+        )
+        return Response(content=json.dumps(offers), media_type="application/json", headers=headers)
+
+    headers["ETag"] = snapshot.etag
+    if if_none_match and snapshot.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+@router.get("/pool", response_model=Dict[str, Any])
+def warm_pool_stats(pool: WarmPodPool = Depends(get_warm_pool)) -> Dict[str, Any]:
+    """Return warm pod pool occupancy, hit rate and cold-start time saved."""
+
+    return pool.stats()
@@ -1,18 +1,47 @@
 """Run management API routes."""
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Dict, Optional
+import base64
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, Security, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, conint, validator
 
-from ..dependencies import get_run_service
+from ..core.auth import api_key_header
+from ..core.config import Settings, get_settings
+from ..dependencies import get_event_broadcaster, get_orchestrator, get_run_cache, get_run_service, get_scheduler
+from ..providers.runpod_orch import RunpodOrchestrator
+from ..services.correlation import OutlierMetric
+from ..services.events import RunEventBroadcaster
+from ..services.run_cache import RunResultCache
 from ..services.run_service import RunService
+from ..services.scheduler import RunScheduler, SchedulerError
 from ..storage.models import Run
+from ..storage.store import RunQuery
 
 router = APIRouter(prefix="/runs", tags=["runs"])
 
+# Built-in prompt sets of the agent; must match ``agent.datasets.PROFILES``.
+DATASET_PROFILES = ("chat", "summarize", "code", "long-context")
+
+ARTIFACT_MEDIA_TYPES = {
+    ".json": "application/json",
+    ".jsonl": "application/x-ndjson",
+    ".csv": "text/csv",
+}
+
+
+def _check_dataset_profile(profile: Optional[str]) -> Optional[str]:
+    """Reject unknown profiles before a pod is started; a ``.jsonl`` path names a prompt file in the agent image."""
+
+    if profile is not None and profile not in DATASET_PROFILES and not profile.endswith(".jsonl"):
+        raise ValueError(f"unknown dataset profile {profile!r}; use {', '.join(DATASET_PROFILES)} or a .jsonl path")
+    return profile
+
 
 class RunStartRequest(BaseModel):
     """Request payload for starting a run."""
@@ -21,11 +50,36 @@ class RunStartRequest(BaseModel):
     model_ref: str = Field(..., description="Model reference or tag")
     samples: int = Field(..., gt=0, description="Number of inference samples")
     dataset_profile: Optional[str] = Field(None, description="Dataset profile identifier")
+    soak_s: Optional[float] = Field(
+        None, gt=0, description="Soak run: measure for this many seconds instead of `samples`, with checkpoints"
+    )
+    priority: int = Field(0, ge=-10, le=10, description="Higher runs are dispatched first")
+    force: bool = Field(False, description="Always start a new run instead of reusing an identical one")
+    max_age_s: Optional[float] = Field(
+        None, ge=0, description="Accept a cached identical result up to this age; defaults to the server setting"
+    )
+
+    _dataset_profile = validator("dataset_profile", allow_reuse=True)(_check_dataset_profile)
+
+
+class SweepRequest(BaseModel):
+    """A grid of configurations; every combination becomes one run."""
+
+    gpu_types: List[str] = Field(..., min_items=1)
+    model_refs: List[str] = Field(..., min_items=1)
+    samples: List[conint(gt=0)] = Field(..., min_items=1)  # type: ignore[valid-type]
+    dataset_profiles: List[Optional[str]] = Field(default_factory=lambda: [None], min_items=1)
+    priority: int = Field(0, ge=-10, le=10)
+
+    _dataset_profiles = validator("dataset_profiles", each_item=True, allow_reuse=True)(_check_dataset_profile)
 
 
 class RunArtifacts(BaseModel):
     result_json: Optional[str] = None
     gpu_csv: Optional[str] = None
+    gpu_columnar_bytes: Optional[int] = Field(
+        None, description="Size of the columnar telemetry artifact, if the run produced one"
+    )
 
 
 class RunResponse(BaseModel):
@@ -34,57 +88,466 @@ class RunResponse(BaseModel):
     gpu_type: str
     model_ref: str
     samples: int
+    dataset_profile: Optional[str] = None
+    sweep_id: Optional[str] = None
+    soak_s: Optional[float] = None
+    inference_backend: Optional[str] = None
     latency_p50_ms: Optional[float] = None
     latency_p95_ms: Optional[float] = None
+    latency_p99_ms: Optional[float] = None
     throughput_rps: Optional[float] = None
+    cost_usd: Optional[float] = None
+    phases: Dict[str, float] = Field(default_factory=dict, description="Seconds spent in each execution phase")
+    telemetry_summary: Dict[str, float] = Field(default_factory=dict, description="Headline GPU telemetry statistics")
+    progress: Dict[str, Any] = Field(default_factory=dict, description="Soak totals as of the last checkpoint")
     artifacts: RunArtifacts
+    artifact_refs: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict, description="Stored pod files, downloadable from /runs/{id}/artifacts/{name}"
+    )
     started_at: datetime
     finished_at: Optional[datetime] = None
     error_message: Optional[str] = None
 
     @classmethod
-    def from_run(cls, run: Run) -> "RunResponse":
+    def from_run(cls, run: Run, include_artifacts: bool = True) -> "RunResponse":
+        artifacts = RunArtifacts()
+        if include_artifacts:
+            artifacts = RunArtifacts(
+                result_json=run.artifacts.get("result_json"),
+                gpu_csv=run.artifacts.get("gpu_csv"),
+                gpu_columnar_bytes=_columnar_size(run),
+            )
         return cls(
             id=run.id,
             status=run.status,
             gpu_type=run.gpu_type,
             model_ref=run.model_ref,
             samples=run.samples,
+            dataset_profile=run.dataset_profile,
+            sweep_id=run.sweep_id,
+            soak_s=run.soak_s,
+            inference_backend=run.inference_backend,
             latency_p50_ms=run.latency_p50_ms,
             latency_p95_ms=run.latency_p95_ms,
+            latency_p99_ms=run.latency_p99_ms,
             throughput_rps=run.throughput_rps,
-            artifacts=RunArtifacts(
-                result_json=run.artifacts.get("result_json"),
-                gpu_csv=run.artifacts.get("gpu_csv"),
-            ),
+            cost_usd=run.cost_usd,
+            phases=run.phases,
+            telemetry_summary=run.telemetry_summary,
+            progress=run.progress,
+            artifacts=artifacts,
+            artifact_refs=run.artifact_refs,
             started_at=run.started_at,
             finished_at=run.finished_at,
             error_message=run.error_message,
         )
 
 
+def _columnar_size(run: Run) -> Optional[int]:
+    columnar = run.artifacts.get("gpu_columnar")
+    if isinstance(columnar, bytes):
+        return len(columnar)
+    ref = run.artifact_refs.get("gpu_timeseries.ptel")
+    return int(ref["size"]) if ref else None  # type: ignore[call-overload]
+
+
+class PodStatusWebhook(BaseModel):
+    """Pod status notification pushed by RunPod or a sidecar."""
+
+    pod_id: str = Field(..., alias="podId")
+    status: str = Field(..., alias="desiredStatus")
+
+
+class SweepResponse(BaseModel):
+    sweep_id: str
+    status: str
+    counts: Dict[str, int]
+    cost_usd: Optional[float] = None
+    runs: List[RunResponse]
+
+
+class RunListResponse(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+
+
+def _owner_id(api_key: Optional[str]) -> str:
+    # Fair share is tracked per API key without keeping the key itself around.
+    if not api_key:
+        return "anonymous"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def _encode_cursor(run: Run) -> str:
+    raw = f"{run.started_at.isoformat()}|{run.id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        started_at, run_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(started_at), run_id
+    except (ValueError, UnicodeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Runs are stamped with naive UTC datetimes; normalize aware query values to match.
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Return the half-open byte range requested by ``header``, or ``None`` to send everything.
+
+    Multiple ranges and syntactically invalid ones (e.g. ``bytes=5-3``) are
+    ignored and fall back to the full content, as RFC 9110 requires; only a
+    range starting past the end is unsatisfiable.
+    """
+
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes=") :].strip().partition("-")
+    if not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if first:
+        start = int(first)
+        end = int(last) + 1 if last else size
+        if last and end <= start:
+            return None
+    else:
+        start, end = max(size - int(last), 0), size
+    end = min(end, size)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
 @router.post("/start", status_code=status.HTTP_202_ACCEPTED, response_model=Dict[str, str])
 def start_run(
     request: RunStartRequest,
-    background_tasks: BackgroundTasks,
+    api_key: Optional[str] = Security(api_key_header),
     run_service: RunService = Depends(get_run_service),
 ) -> Dict[str, str]:
-    """Start a new benchmark run."""
+    """Queue a new benchmark run.
+
+    Identical requests reuse a queued, running or recently succeeded run;
+    ``source`` tells which (``new``, ``in_flight`` or ``cached``).
+    """
+
+    try:
+        run, source = run_service.start_run(
+            gpu_type=request.gpu_type,
+            model_ref=request.model_ref,
+            samples=request.samples,
+            owner=_owner_id(api_key),
+            priority=request.priority,
+            dataset_profile=request.dataset_profile,
+            force=request.force,
+            max_age_s=request.max_age_s,
+            soak_s=request.soak_s,
+        )
+    except SchedulerError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    return {"run_id": run.id, "source": source}
+
+
+@router.post("/sweep", status_code=status.HTTP_202_ACCEPTED, response_model=Dict[str, Any])
+def start_sweep(
+    request: SweepRequest,
+    api_key: Optional[str] = Security(api_key_header),
+    run_service: RunService = Depends(get_run_service),
+    settings: Settings = Depends(get_settings),
+) -> Dict[str, Any]:
+    """Queue every combination of a parameter grid, packed per gpu_type onto few pods."""
+
+    size = len(set(request.gpu_types)) * len(set(request.model_refs)) * len(set(request.samples))
+    size *= len(set(request.dataset_profiles))
+    if size > settings.sweep_max_runs:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"sweep has {size} configurations; the limit is {settings.sweep_max_runs}",
+        )
+    try:
+        sweep_id, runs = run_service.start_sweep(
+            gpu_types=request.gpu_types,
+            model_refs=request.model_refs,
+            samples=request.samples,
+            dataset_profiles=request.dataset_profiles,
+            owner=_owner_id(api_key),
+            priority=request.priority,
+        )
+    except SchedulerError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    return {"sweep_id": sweep_id, "run_ids": [run.id for run in runs]}
+
+
+@router.get("/sweep/{sweep_id}", response_model=SweepResponse)
+def get_sweep(sweep_id: str, run_service: RunService = Depends(get_run_service)) -> SweepResponse:
+    """Return a sweep's aggregate status and cost with its runs (without artifacts)."""
+
+    sweep = run_service.get_sweep(sweep_id)
+    if not sweep:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sweep not found")
+    runs = [RunResponse.from_run(run, include_artifacts=False) for run in sweep.pop("runs")]  # type: ignore[union-attr]
+    return SweepResponse(runs=runs, **sweep)
+
+
+@router.post("/sweep/{sweep_id}/cancel", status_code=status.HTTP_202_ACCEPTED, response_model=Dict[str, int])
+def cancel_sweep(sweep_id: str, run_service: RunService = Depends(get_run_service)) -> Dict[str, int]:
+    """Cancel all queued and running batches of a sweep."""
+
+    if run_service.get_sweep(sweep_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sweep not found")
+    return {"cancelled_batches": run_service.cancel_sweep(sweep_id)}
+
+
+@router.get("/queue", response_model=Dict[str, Any])
+def queue_stats(
+    scheduler: RunScheduler = Depends(get_scheduler),
+    cache: RunResultCache = Depends(get_run_cache),
+) -> Dict[str, Any]:
+    """Return scheduler queue depth, in-flight runs and deduplication counters."""
+
+    return {**scheduler.stats(), "dedup": cache.stats()}
+
 
-    run = run_service.start_run(
-        gpu_type=request.gpu_type,
-        model_ref=request.model_ref,
-        samples=request.samples,
-        background_tasks=background_tasks,
+@router.get("/phases", response_model=Dict[str, Any])
+def phase_stats(
+    status_filter: Optional[str] = Query("succeeded", alias="status"),
+    gpu_type: Optional[str] = None,
+    model_ref: Optional[str] = None,
+    started_after: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=10000, description="Most recent runs to aggregate"),
+    run_service: RunService = Depends(get_run_service),
+) -> Dict[str, Any]:
+    """Return p50/p95 seconds per execution phase across recent runs."""
+
+    query = RunQuery(
+        status=status_filter,
+        gpu_type=gpu_type,
+        model_ref=model_ref,
+        started_after=_as_naive_utc(started_after),
+        limit=limit,
     )
-    return {"run_id": run.id}
+    return run_service.phase_stats(query)
+
+
+@router.post("/webhooks/runpod", response_model=Dict[str, bool])
+async def runpod_webhook(
+    payload: PodStatusWebhook,
+    orchestrator: RunpodOrchestrator = Depends(get_orchestrator),
+) -> Dict[str, bool]:
+    """Resolve a waiting run as soon as its pod reports a terminal status."""
+
+    return {"accepted": orchestrator.watcher.notify(payload.pod_id, payload.status)}
+
+
+@router.get("", response_model=RunListResponse)
+def list_runs(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    gpu_type: Optional[str] = None,
+    model_ref: Optional[str] = None,
+    started_after: Optional[datetime] = None,
+    started_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    fields: Optional[str] = Query(None, description="Comma-separated RunResponse fields to return"),
+    include_artifacts: bool = False,
+    run_service: RunService = Depends(get_run_service),
+) -> RunListResponse:
+    """List runs newest first with keyset pagination."""
+
+    projection: Optional[Set[str]] = None
+    if fields:
+        projection = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = projection - set(RunResponse.__fields__)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+        projection.add("id")
+        if not include_artifacts:
+            projection.discard("artifacts")
+
+    query = RunQuery(
+        status=status_filter,
+        gpu_type=gpu_type,
+        model_ref=model_ref,
+        started_after=_as_naive_utc(started_after),
+        started_before=_as_naive_utc(started_before),
+        before=_decode_cursor(cursor) if cursor else None,
+        limit=limit,
+    )
+    runs = run_service.list_runs(query, include_artifacts=include_artifacts)
+    exclude = None if include_artifacts else {"artifacts"}
+    items = [
+        RunResponse.from_run(run, include_artifacts=include_artifacts).dict(include=projection, exclude=exclude)
+        for run in runs
+    ]
+    next_cursor = _encode_cursor(runs[-1]) if len(runs) == limit else None
+    return RunListResponse(items=items, next_cursor=next_cursor)
 
 
 @router.get("/{run_id}", response_model=RunResponse)
-def get_run(run_id: str, run_service: RunService = Depends(get_run_service)) -> RunResponse:
+def get_run(
+    run_id: str,
+    include_artifacts: bool = Query(True, description="Set to false to omit raw result and telemetry artifacts"),
+    run_service: RunService = Depends(get_run_service),
+) -> RunResponse:
     """Retrieve run status and metrics."""
 
     run = run_service.get_run(run_id)
     if not run:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-    return RunResponse.from_run(run)
+    return RunResponse.from_run(run, include_artifacts=include_artifacts)
+
+
+@router.post("/{run_id}/cancel", status_code=status.HTTP_202_ACCEPTED, response_model=Dict[str, str])
+def cancel_run(run_id: str, run_service: RunService = Depends(get_run_service)) -> Dict[str, str]:
+    """Cancel a queued or running run."""
+
+    state = run_service.cancel_run(run_id)
+    if state is None:
+        if not run_service.get_run(run_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Run is not queued or running")
+    return {"run_id": run_id, "cancelled": state}
+
+
+@router.get("/{run_id}/events")
+async def stream_run_events(
+    run_id: str,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    run_service: RunService = Depends(get_run_service),
+    events: RunEventBroadcaster = Depends(get_event_broadcaster),
+) -> StreamingResponse:
+    """Stream run status transitions and metrics as Server-Sent Events."""
+
+    run = await run_in_threadpool(run_service.get_run, run_id)
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+
+    snapshot = RunResponse.from_run(run, include_artifacts=False).dict(exclude={"artifacts"})
+    return StreamingResponse(
+        events.stream(run_id, snapshot=snapshot, last_event_id=last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{run_id}/telemetry", response_class=Response)
+def get_run_telemetry(
+    run_id: str,
+    format: Literal["csv", "columnar"] = Query("csv", description="csv or raw columnar blocks"),
+    resolution: Optional[int] = Query(
+        None, ge=10, le=100_000, description="Return JSON downsampled to at most this many points per GPU"
+    ),
+    run_service: RunService = Depends(get_run_service),
+) -> Response:
+    """Export the run's GPU time series.
+
+    With ``resolution`` the series comes back as JSON chart data: per GPU,
+    bucket start times and the min, max and mean of each metric per bucket.
+    """
+
+    run = run_service.get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+
+    if resolution is not None:
+        series = run_service.telemetry_series(run, resolution)
+        if series is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No telemetry for run")
+        return Response(content=series, media_type="application/json")
+
+    if format == "columnar":
+        columnar = run_service.read_artifact(run, "gpu_timeseries.ptel")
+        if not columnar:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No columnar telemetry for run")
+        return Response(content=columnar, media_type="application/octet-stream")
+
+    csv_text = run_service.telemetry_csv(run)
+    if csv_text is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No telemetry for run")
+    return Response(content=csv_text, media_type="text/csv")
+
+
+@router.get("/{run_id}/outliers", response_model=Dict[str, Any])
+def get_run_latency_outliers(
+    run_id: str,
+    metric: OutlierMetric = Query("latency_p95_ms", description="Window latency statistic to screen"),
+    threshold: float = Query(3.0, gt=0, le=50, description="Robust z-score above which a window is an outlier"),
+    min_requests: int = Query(5, ge=1, description="Ignore windows with fewer requests"),
+    run_service: RunService = Depends(get_run_service),
+) -> Dict[str, Any]:
+    """Flag the run's latency outlier windows together with the GPU state during each of them."""
+
+    run = run_service.get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+    report = run_service.latency_outliers(run, metric, threshold, min_requests)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No latency windows for run")
+    return report
+
+
+@router.get("/{run_id}/progress", response_model=Dict[str, Any])
+def get_run_progress(run_id: str, run_service: RunService = Depends(get_run_service)) -> Dict[str, Any]:
+    """Report a soak run's totals as of its last checkpoint, also after it failed or while it runs."""
+
+    run = run_service.get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+    if run.soak_s is None or not run.progress:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No checkpoints for run")
+    return {"run_id": run.id, "status": run.status, "soak_s": run.soak_s, **run.progress}
+
+
+@router.get("/{run_id}/artifacts/{name}", response_class=StreamingResponse)
+def get_run_artifact(
+    run_id: str,
+    name: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None),
+    run_service: RunService = Depends(get_run_service),
+) -> Response:
+    """Download a file the run's pod produced, e.g. ``gpu_timeseries.ptel``.
+
+    Supports a single ``Range: bytes=...`` request so large artifacts can be
+    fetched in parts or resumed; only the stored chunks overlapping the range
+    are read.
+    """
+
+    run = run_service.get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+    artifact = run_service.open_artifact(run, name)
+    if artifact is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Artifact not found")
+
+    etag = f'"{artifact.etag}"'
+    headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+    if if_none_match is not None and etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    start, end = 0, artifact.size
+    status_code = status.HTTP_200_OK
+    byte_range = _parse_range(range_header, artifact.size)
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{artifact.size}"
+    headers["Content-Length"] = str(end - start)
+    media_type = next(
+        (media for suffix, media in ARTIFACT_MEDIA_TYPES.items() if name.endswith(suffix)), "application/octet-stream"
+    )
+    return StreamingResponse(
+        artifact.read(start, end), status_code=status_code, media_type=media_type, headers=headers
+    )
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Literal, Optional
+from typing import Dict, Literal, Optional
 
 from pydantic import BaseSettings, Field
 
@@ -14,11 +14,60 @@ class Settings(BaseSettings):
     catalog_mode: Literal["mock", "runpod"] = Field(
         "mock", alias="PERSEPHONE_CATALOG_MODE"
     )
+    catalog_ttl_s: float = Field(300.0, alias="PERSEPHONE_CATALOG_TTL_S")
     runpod_api_key: Optional[str] = Field(default=None, alias="RUNPOD_API_KEY")
+    runpod_base_url: str = Field("https://api.runpod.io/v2", alias="RUNPOD_BASE_URL")
+    runpod_graphql_url: str = Field("https://api.runpod.io/graphql", alias="RUNPOD_GRAPHQL_URL")
+    http_max_connections: int = Field(100, alias="PERSEPHONE_HTTP_MAX_CONNECTIONS")
+    http_max_keepalive: int = Field(20, alias="PERSEPHONE_HTTP_MAX_KEEPALIVE")
+    http_timeout_s: float = Field(10.0, alias="PERSEPHONE_HTTP_TIMEOUT_S")
+    http_retry_attempts: int = Field(4, alias="PERSEPHONE_HTTP_RETRY_ATTEMPTS")
+    poll_initial_s: float = Field(0.5, alias="PERSEPHONE_POLL_INITIAL_S")
+    poll_max_s: float = Field(15.0, alias="PERSEPHONE_POLL_MAX_S")
+    poll_backoff: float = Field(1.5, alias="PERSEPHONE_POLL_BACKOFF")
     agent_image: str = Field(
         "registry/persephone-agent:0.1", alias="PERSEPHONE_IMAGE_AGENT"
     )
     request_timeout_s: int = Field(900, alias="PERSEPHONE_REQUEST_TIMEOUT_S")
+    store_backend: Literal["memory", "sqlite"] = Field(
+        "memory", alias="PERSEPHONE_STORE_BACKEND"
+    )
+    store_path: str = Field("data/persephone.db", alias="PERSEPHONE_STORE_PATH")
+    # Directory of the content-addressed artifact store; empty keeps artifacts in the run store.
+    # Unset, it is ``artifacts`` next to the SQLite database, and off for the in-memory store.
+    artifact_dir: Optional[str] = Field(None, alias="PERSEPHONE_ARTIFACT_DIR")
+    # Text artifacts up to this size are also kept inline on the run, e.g. for RunResponse.artifacts.
+    artifact_inline_max_kb: int = Field(256, alias="PERSEPHONE_ARTIFACT_INLINE_MAX_KB")
+    scheduler_max_concurrency: int = Field(8, alias="PERSEPHONE_SCHEDULER_MAX_CONCURRENCY")
+    # JSON object mapping gpu_type to its concurrency limit, e.g. {"a100-80gb": 2}.
+    scheduler_gpu_limits: Dict[str, int] = Field(
+        default_factory=dict, alias="PERSEPHONE_SCHEDULER_GPU_LIMITS"
+    )
+    scheduler_max_queue: int = Field(1000, alias="PERSEPHONE_SCHEDULER_MAX_QUEUE")
+    scheduler_drain_timeout_s: int = Field(60, alias="PERSEPHONE_SCHEDULER_DRAIN_TIMEOUT_S")
+    # JSON object mapping gpu_type to the number of idle pods kept warm, e.g. {"l4-24gb": 2}.
+    warm_pool_sizes: Dict[str, int] = Field(
+        default_factory=dict, alias="PERSEPHONE_WARM_POOL_SIZES"
+    )
+    warm_pool_idle_ttl_s: float = Field(600.0, alias="PERSEPHONE_WARM_POOL_IDLE_TTL_S")
+    warm_pool_health_interval_s: float = Field(30.0, alias="PERSEPHONE_WARM_POOL_HEALTH_INTERVAL_S")
+    # Identical successful runs younger than this are served from cache; 0 disables it.
+    result_cache_max_age_s: float = Field(3600.0, alias="PERSEPHONE_RESULT_CACHE_MAX_AGE_S")
+    sweep_max_configs_per_pod: int = Field(16, alias="PERSEPHONE_SWEEP_MAX_CONFIGS_PER_POD")
+    sweep_max_runs: int = Field(500, alias="PERSEPHONE_SWEEP_MAX_RUNS")
+    sweep_poll_s: float = Field(5.0, alias="PERSEPHONE_SWEEP_POLL_S")
+    # Soak runs: agent checkpoint interval, how often the controller follows the
+    # checkpoints, and how many times a crashed agent is restarted from the last one.
+    soak_checkpoint_s: float = Field(30.0, alias="PERSEPHONE_SOAK_CHECKPOINT_S")
+    soak_poll_s: float = Field(30.0, alias="PERSEPHONE_SOAK_POLL_S")
+    soak_max_resumes: int = Field(1, alias="PERSEPHONE_SOAK_MAX_RESUMES")
+    telemetry_format: Literal["csv", "columnar"] = Field(
+        "csv", alias="PERSEPHONE_TELEMETRY_FORMAT"
+    )
+    # Agent inference backend; ``openai`` talks to a vLLM-style server inside the pod.
+    inference_backend: Literal["mock", "reference", "openai"] = Field(
+        "mock", alias="PERSEPHONE_INFERENCE_BACKEND"
+    )
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,283 @@
+"""Minimal Prometheus instrumentation for the controller.
+
+Metric children are bound to their label values once and then updated with
+plain attribute arithmetic, without locks. All updates must therefore happen
+on the event loop thread (middleware, async providers); values computed
+elsewhere are exposed through gauges evaluated at scrape time.
+"""
+from __future__ import annotations
+
+import math
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+T = TypeVar("T")
+
+
+class CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class HistogramChild:
+    __slots__ = ("_upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]) -> None:
+        self._upper_bounds = upper_bounds
+        # One slot per bucket plus +Inf; made cumulative only when rendered.
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self._upper_bounds, value)] += 1
+        self.sum += value
+
+
+class _Family:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def labels(self, *values: str, **kwargs: str) -> Any:
+        """Return the child for these label values, creating it on first use."""
+
+        key = values if values else tuple(kwargs[name] for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+    def _label_dict(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [(self.name, self._label_dict(key), child.value) for key, child in list(self._children.items())]
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.upper_bounds)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        samples: List[Tuple[str, Dict[str, str], float]] = []
+        for key, child in list(self._children.items()):
+            labels = self._label_dict(key)
+            cumulative = 0
+            for bound, count in zip((*self.upper_bounds, math.inf), list(child.counts)):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_count", labels, cumulative))
+            samples.append((f"{self.name}_sum", labels, child.sum))
+        return samples
+
+
+class GaugeFunc(_Family):
+    """A gauge whose labelled values are computed by ``func`` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        func: Callable[[], Dict[Tuple[str, ...], float]] | Callable[[], float],
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._func = func
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        values = self._func()
+        if not self.labelnames:
+            return [(self.name, {}, float(values))]  # type: ignore[arg-type]
+        return [(self.name, self._label_dict(key), value) for key, value in values.items()]  # type: ignore[union-attr]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._families: Dict[str, _Family] = {}
+
+    def register(self, family: _Family) -> _Family:
+        self._families[family.name] = family
+        return family
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+
+        lines: List[str] = []
+        for family in list(self._families.values()):
+            try:
+                samples = family.samples()
+            except Exception as exc:  # pylint: disable=broad-except
+                lines.append(f"# {family.name} unavailable: {exc}")
+                continue
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in samples:
+                if labels:
+                    rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+                    lines.append(f"{name}{{{rendered}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "persephone_http_request_duration_seconds",
+        "Controller HTTP request latency by route template.",
+        ("method", "route", "code"),
+    )
+)
+RUNPOD_CALL_SECONDS = REGISTRY.register(
+    Histogram(
+        "persephone_runpod_call_duration_seconds",
+        "Latency of RunPod orchestrator operations.",
+        ("operation",),
+        buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0),
+    )
+)
+RUNPOD_CALL_ERRORS = REGISTRY.register(
+    Counter(
+        "persephone_runpod_call_errors_total",
+        "Failed RunPod orchestrator operations.",
+        ("operation",),
+    )
+)
+
+
+def timed_operation(
+    histogram: HistogramChild, errors: CounterChild
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorate a coroutine function to record its latency and raised errors."""
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
+
+
+def status_class(code: int) -> str:
+    return f"{code // 100}xx"
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording request latency per route template.
+
+    Latency is measured until the response starts, so long-lived streams
+    such as Server-Sent Events count their time to first byte. An unhandled
+    exception is answered by the outer error middleware, never passing
+    through here, so it is recorded as a ``5xx`` before being re-raised.
+    """
+
+    def __init__(self, app: Any, histogram: Histogram = HTTP_REQUEST_SECONDS) -> None:
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        responded = False
+
+        def observe(code: str) -> None:
+            route = scope.get("route")
+            self.histogram.labels(scope["method"], getattr(route, "path", "unmatched"), code).observe(
+                time.perf_counter() - started
+            )
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal responded
+            if message["type"] == "http.response.start":
+                responded = True
+                observe(status_class(message["status"]))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not responded:
+                observe("5xx")
+            raise
+
+
+def register_gauge(
+    name: str,
+    documentation: str,
+    func: Callable[[], Any],
+    labelnames: Sequence[str] = (),
+    registry: Optional[Registry] = None,
+) -> GaugeFunc:
+    gauge = GaugeFunc(name, documentation, func, labelnames)
+    (registry or REGISTRY).register(gauge)
+    return gauge
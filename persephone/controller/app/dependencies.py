@@ -1,21 +1,200 @@
 """Application dependency wiring."""
 from __future__ import annotations
 
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
 from fastapi import Depends
 
 from .core.config import Settings, get_settings
+from .core.metrics import register_gauge
+from .providers.catalog_cache import CatalogCache
+from .providers.http import RetryPolicy, create_http_client
+from .providers.runpod_catalog import MOCK_GPUS, RunpodCatalog
 from .providers.runpod_orch import RunpodOrchestrator
+from .providers.warm_pool import WarmPodPool
+from .services.analytics import RunAnalytics
+from .services.events import RunEventBroadcaster
+from .services.run_cache import RunResultCache
 from .services.run_service import RunService
-from .storage.store import InMemoryRunStore
+from .services.scheduler import RunScheduler
+from .storage.artifact_store import ArtifactStore
+from .storage.sqlite_store import SqliteRunStore
+from .storage.store import InMemoryRunStore, RunStore
+
+
+def create_run_store(settings: Settings) -> RunStore:
+    if settings.store_backend == "sqlite":
+        return SqliteRunStore(settings.store_path)
+    return InMemoryRunStore()
+
+
+def create_artifact_store(settings: Settings) -> Optional[ArtifactStore]:
+    if settings.artifact_dir is not None:
+        return ArtifactStore(settings.artifact_dir) if settings.artifact_dir else None
+    if settings.store_backend == "sqlite":
+        return ArtifactStore(Path(settings.store_path).parent / "artifacts")
+    return None
+
+
+_store = create_run_store(get_settings())
+_events = RunEventBroadcaster()
+_run_cache = RunResultCache()
+_analytics = RunAnalytics()
+_artifact_store = create_artifact_store(get_settings())
+_scheduler = RunScheduler(
+    max_concurrency=get_settings().scheduler_max_concurrency,
+    gpu_limits=get_settings().scheduler_gpu_limits,
+    max_queue=get_settings().scheduler_max_queue,
+)
+
+
+def get_event_broadcaster() -> RunEventBroadcaster:
+    return _events
+
+
+def get_scheduler() -> RunScheduler:
+    return _scheduler
+
+
+def get_run_cache() -> RunResultCache:
+    return _run_cache
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+_orchestrator: Optional[RunpodOrchestrator] = None
+_warm_pool: Optional[WarmPodPool] = None
+_catalog_cache: Optional[CatalogCache] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the pooled HTTP client shared for the app's lifetime."""
+
+    global _http_client
+    if _http_client is None:
+        settings = get_settings()
+        _http_client = create_http_client(
+            max_connections=settings.http_max_connections,
+            max_keepalive=settings.http_max_keepalive,
+            timeout_s=settings.http_timeout_s,
+        )
+    return _http_client
 
 
-_store = InMemoryRunStore()
+async def close_http_client() -> None:
+    global _http_client, _orchestrator, _warm_pool
+    if _warm_pool is not None:
+        await _warm_pool.close()
+    if _orchestrator is not None:
+        await _orchestrator.watcher.close()
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _orchestrator = None
+    _warm_pool = None
+
+
+def get_orchestrator() -> RunpodOrchestrator:
+    global _orchestrator
+    if _orchestrator is None:
+        settings = get_settings()
+        _orchestrator = RunpodOrchestrator(
+            api_key=settings.runpod_api_key or "",
+            agent_image=settings.agent_image,
+            timeout_s=settings.request_timeout_s,
+            client=get_http_client(),
+            base_url=settings.runpod_base_url,
+            retry=RetryPolicy(attempts=settings.http_retry_attempts),
+            poll_initial_s=settings.poll_initial_s,
+            poll_max_s=settings.poll_max_s,
+            poll_backoff=settings.poll_backoff,
+        )
+    return _orchestrator
+
+
+def get_catalog_cache() -> CatalogCache:
+    """Return the shared GPU catalog cache for the configured catalog mode."""
+
+    global _catalog_cache
+    if _catalog_cache is None:
+        settings = get_settings()
+
+        async def fetch() -> List[dict]:
+            if settings.catalog_mode == "mock":
+                return list(MOCK_GPUS)
+            if not settings.runpod_api_key:
+                return []
+            catalog = RunpodCatalog(
+                api_key=settings.runpod_api_key,
+                client=get_http_client(),
+                base_url=settings.runpod_graphql_url,
+                retry=RetryPolicy(attempts=settings.http_retry_attempts),
+            )
+            return await catalog.fetch_gpus()
+
+        _catalog_cache = CatalogCache(fetch, ttl_s=settings.catalog_ttl_s)
+    return _catalog_cache
+
+
+def hourly_price(gpu_type: str) -> Optional[float]:
+    """Look up a gpu_type's hourly price in the cached catalog, if loaded."""
+
+    snapshot = get_catalog_cache().peek()
+    return snapshot.index.hourly_usd(gpu_type) if snapshot is not None else None
+
+
+def get_warm_pool() -> WarmPodPool:
+    global _warm_pool
+    if _warm_pool is None:
+        settings = get_settings()
+        _warm_pool = WarmPodPool(
+            get_orchestrator(),
+            target_sizes=settings.warm_pool_sizes,
+            idle_ttl_s=settings.warm_pool_idle_ttl_s,
+            health_interval_s=settings.warm_pool_health_interval_s,
+        )
+    return _warm_pool
 
 
 def get_run_service(settings: Settings = Depends(get_settings)) -> RunService:
-    orchestrator = RunpodOrchestrator(
-        api_key=settings.runpod_api_key or "",
-        agent_image=settings.agent_image,
-        timeout_s=settings.request_timeout_s,
+    return RunService(
+        _store,
+        get_orchestrator(),
+        settings.request_timeout_s,
+        scheduler=_scheduler,
+        telemetry_format=settings.telemetry_format,
+        inference_backend=settings.inference_backend,
+        events=_events,
+        pool=get_warm_pool(),
+        cache=_run_cache,
+        result_max_age_s=settings.result_cache_max_age_s,
+        price_lookup=hourly_price,
+        sweep_max_configs_per_pod=settings.sweep_max_configs_per_pod,
+        sweep_poll_s=settings.sweep_poll_s,
+        soak_checkpoint_s=settings.soak_checkpoint_s,
+        soak_poll_s=settings.soak_poll_s,
+        soak_max_resumes=settings.soak_max_resumes,
+        analytics=_analytics,
+        artifact_store=_artifact_store,
+        artifact_inline_max_bytes=settings.artifact_inline_max_kb * 1024,
     )
-    return RunService(_store, orchestrator, settings.request_timeout_s)
+
+
+def _catalog_age_s() -> float:
+    snapshot = _catalog_cache.peek() if _catalog_cache is not None else None
+    return snapshot.age_s if snapshot is not None else float("nan")
+
+
+def _pool_idle() -> dict:
+    if _warm_pool is None:
+        return {}
+    idle = _warm_pool.stats()["idle_by_gpu_type"]
+    return {(gpu_type,): count for gpu_type, count in idle.items()}  # type: ignore[union-attr]
+
+
+register_gauge("persephone_runs_queued", "Runs waiting in the scheduler queue.", lambda: _scheduler.stats()["queued"])
+register_gauge("persephone_runs_running", "Runs currently executing.", lambda: _scheduler.stats()["running"])
+register_gauge("persephone_store_runs", "Runs held in the run store.", lambda: _store.count())
+register_gauge("persephone_catalog_age_seconds", "Age of the cached GPU catalog snapshot.", _catalog_age_s)
+register_gauge("persephone_warm_pool_idle_pods", "Idle warm pods by GPU type.", _pool_idle, ("gpu_type",))
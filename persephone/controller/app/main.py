@@ -3,13 +3,17 @@ from __future__ import annotations
 
 import logging
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Response
 
-from .api import api_compute, api_runs
+from .api import api_analytics, api_compute, api_runs
 from .core.auth import require_api_key
 from .core.config import get_settings
+from .core.metrics import CONTENT_TYPE, REGISTRY, RequestMetricsMiddleware
+from .dependencies import close_http_client, get_catalog_cache, get_scheduler, get_warm_pool
+from .providers.catalog_cache import CatalogUnavailable
 
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 
 def create_app() -> FastAPI:
@@ -20,15 +24,37 @@ def create_app() -> FastAPI:
         description="MVP controller for orchestrating GPU benchmark runs.",
     )
 
+    app.add_middleware(RequestMetricsMiddleware)
+
     dependency = [Depends(require_api_key)]
 
     app.include_router(api_compute.router, dependencies=dependency)
     app.include_router(api_runs.router, dependencies=dependency)
+    app.include_router(api_analytics.router, dependencies=dependency)
+
+    @app.on_event("startup")
+    async def start_background_services() -> None:
+        await get_scheduler().start()
+        await get_warm_pool().start()
+        try:
+            # Prices from the catalog are used to cost runs.
+            await get_catalog_cache().get()
+        except CatalogUnavailable:
+            logger.warning("GPU catalog unavailable at startup; run costs will be empty")
+
+    @app.on_event("shutdown")
+    async def drain_scheduler_and_close_clients() -> None:
+        await get_scheduler().shutdown(timeout_s=settings.scheduler_drain_timeout_s)
+        await close_http_client()
 
     @app.get("/health", tags=["system"], summary="Health check")
     def health_check() -> dict:
         return {"status": "ok", "catalog_mode": settings.catalog_mode}
 
+    @app.get("/metrics", tags=["system"], summary="Prometheus metrics", include_in_schema=False)
+    def metrics() -> Response:
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
     return app
 
 
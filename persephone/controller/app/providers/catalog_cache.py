@@ -0,0 +1,98 @@
+"""In-memory GPU catalog cache with stale-while-revalidate refresh."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+
+from .offer_index import OfferIndex
+
+logger = logging.getLogger(__name__)
+
+CatalogFetcher = Callable[[], Awaitable[List[dict]]]
+
+
+class CatalogUnavailable(RuntimeError):
+    """Raised when the catalog has never been fetched successfully."""
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """An immutable catalog version with its pre-serialized body and indexes."""
+
+    gpus: List[dict]
+    body: bytes
+    etag: str
+    fetched_at: float
+    index: OfferIndex
+
+    @classmethod
+    def build(cls, gpus: List[dict]) -> "CatalogSnapshot":
+        body = json.dumps(gpus, separators=(",", ":"), sort_keys=True).encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:20] + '"'
+        return cls(gpus=gpus, body=body, etag=etag, fetched_at=time.monotonic(), index=OfferIndex(gpus))
+
+    @property
+    def age_s(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class CatalogCache:
+    """Serves the GPU catalog from memory and refreshes it in the background.
+
+    A snapshot younger than ``ttl_s`` is returned as-is. An older one is still
+    returned immediately while a single background refresh replaces it; if the
+    upstream fails the last known good snapshot keeps being served and the
+    next attempt waits ``retry_after_failure_s``. Only the
+    very first load waits for the upstream. Concurrent refreshes share one
+    in-flight request.
+    """
+
+    def __init__(self, fetch: CatalogFetcher, ttl_s: float = 300.0, retry_after_failure_s: float = 30.0) -> None:
+        self._fetch = fetch
+        self.ttl_s = ttl_s
+        self.retry_after_failure_s = retry_after_failure_s
+        self._next_attempt = 0.0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.failures = 0
+
+    async def get(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            await self._refresh()
+            if self._snapshot is None:
+                raise CatalogUnavailable("GPU catalog is not available yet")
+            return self._snapshot
+        if snapshot.age_s >= self.ttl_s and time.monotonic() >= self._next_attempt:
+            self._start_refresh()
+        return snapshot
+
+    def peek(self) -> Optional[CatalogSnapshot]:
+        """Return the current snapshot without waiting or refreshing."""
+
+        return self._snapshot
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._do_refresh())
+        return self._refresh_task
+
+    async def _refresh(self) -> None:
+        await asyncio.shield(self._start_refresh())
+
+    async def _do_refresh(self) -> None:
+        self.refreshes += 1
+        try:
+            gpus = await self._fetch()
+        except Exception as exc:  # pylint: disable=broad-except
+            self.failures += 1
+            self._next_attempt = time.monotonic() + self.retry_after_failure_s
+            logger.warning("GPU catalog refresh failed, serving last known good data: %s", exc)
+            return
+        self._snapshot = CatalogSnapshot.build(gpus)
@@ -0,0 +1,302 @@
+"""Local stand-in for the RunPod API used for offline development and benchmarks.
+
+Run it with ``uvicorn controller.app.providers.fake_runpod:app --port 9000`` and
+point the controller at it with ``RUNPOD_BASE_URL=http://localhost:9000/v2``,
+``RUNPOD_GRAPHQL_URL=http://localhost:9000/graphql`` and any ``RUNPOD_API_KEY``.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
+
+from .runpod_catalog import MOCK_GPUS
+
+
+@dataclass
+class FakeRunpodConfig:
+    """Behaviour knobs for the fake server."""
+
+    latency_s: float = 0.0
+    fail_rate: float = 0.0
+    run_duration_s: float = 1.0
+    seed: int | None = None
+
+    @classmethod
+    def from_env(cls) -> "FakeRunpodConfig":
+        return cls(
+            latency_s=float(os.getenv("FAKE_RUNPOD_LATENCY_S", "0")),
+            fail_rate=float(os.getenv("FAKE_RUNPOD_FAIL_RATE", "0")),
+            run_duration_s=float(os.getenv("FAKE_RUNPOD_RUN_DURATION_S", "1")),
+        )
+
+
+@dataclass
+class _FakePod:
+    id: str
+    gpu_type: str
+    env: Dict[str, str]
+    status: str = "RUNNING"
+    exec_started: float | None = None
+
+
+@dataclass
+class FakeRunpodState:
+    pods: Dict[str, _FakePod] = field(default_factory=dict)
+    requests: int = 0
+    injected_failures: int = 0
+
+
+def create_fake_runpod_app(config: FakeRunpodConfig | None = None) -> FastAPI:
+    config = config or FakeRunpodConfig()
+    state = FakeRunpodState()
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Fake RunPod")
+    app.state.fake = state
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):  # type: ignore[no-untyped-def]
+        state.requests += 1
+        if config.latency_s:
+            await asyncio.sleep(config.latency_s)
+        if config.fail_rate and rng.random() < config.fail_rate:
+            state.injected_failures += 1
+            status_code = rng.choice([429, 503])
+            return Response(status_code=status_code, headers={"Retry-After": "0"})
+        return await call_next(request)
+
+    @app.post("/v2/pods")
+    async def create_pod(payload: Dict[str, Any]) -> Dict[str, str]:
+        pod = _FakePod(id=f"fake-{uuid.uuid4().hex[:12]}", gpu_type=payload.get("gpuTypeId", ""), env=payload.get("env", {}))
+        state.pods[pod.id] = pod
+        return {"id": pod.id}
+
+    @app.post("/v2/pods/{pod_id}/exec")
+    async def exec_in_pod(pod_id: str, payload: Dict[str, Any]) -> Dict[str, str]:
+        pod = _get_pod(state, pod_id)
+        # Like RunPod, an exited or terminated pod is not brought back by an exec.
+        if _pod_status(pod, config)["desiredStatus"] != "RUNNING":
+            raise HTTPException(status_code=409, detail="pod is not running")
+        pod.env.update(payload.get("env") or {})
+        pod.exec_started = time.monotonic()
+        return {"id": pod.id}
+
+    @app.get("/v2/pods")
+    async def list_pods(ids: str = "") -> Dict[str, Any]:
+        wanted = [pod_id for pod_id in ids.split(",") if pod_id] if ids else list(state.pods)
+        return {"pods": [_pod_status(state.pods[pod_id], config) for pod_id in wanted if pod_id in state.pods]}
+
+    @app.get("/v2/pods/{pod_id}")
+    async def get_pod(pod_id: str) -> Dict[str, Any]:
+        return _pod_status(_get_pod(state, pod_id), config)
+
+    @app.get("/v2/pods/{pod_id}/files/{name}")
+    async def get_file(pod_id: str, name: str, request: Request) -> Response:
+        pod = _get_pod(state, pod_id)
+        if name == "checkpoints.jsonl" and "SOAK_S" in pod.env and pod.exec_started is not None:
+            return _ranged(_fake_checkpoints(pod, config.run_duration_s).encode("utf-8"), request.headers.get("range"))
+        if name == "results.jsonl" and "BATCH_CONFIG" in pod.env and pod.exec_started is not None:
+            return PlainTextResponse(_fake_batch_results(pod, rng, config.run_duration_s))
+        if _pod_status(pod, config)["desiredStatus"] != "EXITED":
+            raise HTTPException(status_code=404, detail="file not found")
+        if name == "result.json":
+            result = {**_fake_result(pod, rng), "phases": _fake_phases(config.run_duration_s)}
+            return PlainTextResponse(json.dumps(result), media_type="application/json")
+        if name == "gpu_timeseries.csv":
+            return PlainTextResponse(_fake_telemetry_csv(rng, config.run_duration_s), media_type="text/csv")
+        if name == "windows.jsonl":
+            return PlainTextResponse(_fake_windows(rng, config.run_duration_s))
+        raise HTTPException(status_code=404, detail="file not found")
+
+    @app.delete("/v2/pods/{pod_id}")
+    async def delete_pod(pod_id: str) -> Dict[str, str]:
+        pod = _get_pod(state, pod_id)
+        pod.status = "TERMINATED"
+        return {"id": pod.id}
+
+    @app.post("/graphql")
+    async def graphql() -> Dict[str, Any]:
+        gpu_types = [
+            {
+                "id": gpu["id"],
+                "displayName": gpu["name"],
+                "memoryInGb": gpu["vram_gb"],
+                "communityCloudHourlyCost": gpu["hourly_usd"],
+                "regions": gpu["regions"],
+            }
+            for gpu in MOCK_GPUS
+        ]
+        return {"data": {"gpuTypes": gpu_types}}
+
+    return app
+
+
+def _get_pod(state: FakeRunpodState, pod_id: str) -> _FakePod:
+    pod = state.pods.get(pod_id)
+    if pod is None:
+        raise HTTPException(status_code=404, detail="pod not found")
+    return pod
+
+
+def _pod_status(pod: _FakePod, config: FakeRunpodConfig) -> Dict[str, Any]:
+    status = pod.status
+    if status == "RUNNING" and pod.exec_started is not None:
+        if time.monotonic() - pod.exec_started >= config.run_duration_s:
+            status = "EXITED"
+    return {"id": pod.id, "gpuTypeId": pod.gpu_type, "desiredStatus": status}
+
+
+def _fake_result(pod: _FakePod, rng: random.Random) -> Dict[str, Any]:
+    p50 = rng.uniform(15.0, 40.0)
+    return {
+        "samples": int(pod.env.get("SAMPLES", "8")),
+        "latency_p50_ms": round(p50, 3),
+        "latency_p95_ms": round(p50 * 1.4, 3),
+        "latency_p99_ms": round(p50 * 1.8, 3),
+        "throughput_rps": round(1000.0 / p50, 3),
+        "note": "fake RunPod execution",
+        "run_token": pod.env.get("RUN_TOKEN"),
+    }
+
+
+def _fake_phases(duration_s: float) -> Dict[str, float]:
+    """Agent phase timings; the remainder of the run stands in for pod startup."""
+
+    return {
+        "setup": round(duration_s * 0.05, 3),
+        "probe": round(duration_s * 0.8, 3),
+        "telemetry_flush": round(duration_s * 0.05, 3),
+    }
+
+
+def _fake_batch_results(pod: _FakePod, rng: random.Random, duration_s: float) -> str:
+    """Return the lines a batch run would have written so far, spread over the run."""
+
+    batch = json.loads(pod.env["BATCH_CONFIG"])
+    elapsed = time.monotonic() - (pod.exec_started or 0.0)
+    step = duration_s / max(len(batch), 1)
+    lines = []
+    for position, entry in enumerate(batch):
+        end = (position + 1) * step
+        if end > elapsed:
+            break
+        result = _fake_result(pod, rng)
+        result["samples"] = entry["samples"]
+        lines.append(json.dumps({"id": entry["id"], "result": result, "window_s": [round(end - step, 3), round(end, 3)]}))
+    return "".join(line + "\n" for line in lines)
+
+
+def _fake_telemetry_csv(rng: random.Random, duration_s: float) -> str:
+    rows = ["t,gpu,gpu_util,mem_util,vram_mb,power_w,temp_c,sm_clock_mhz,pcie_tx_kbps,pcie_rx_kbps,throttle_reasons"]
+    for t in range(max(1, int(duration_s))):
+        rows.append(
+            f"{t},0,{rng.randint(40, 100)},{rng.randint(20, 80)},{rng.randint(1500, 2500)},"
+            f"{rng.randint(100, 300)},{rng.randint(50, 80)},1500,1024,2048,0"
+        )
+    return "\n".join(rows) + "\n"
+
+
+def _fake_windows(rng: random.Random, duration_s: float, window_s: float = 1.0) -> str:
+    """Joined latency/GPU windows; one in ten is a throttled latency spike."""
+
+    lines = []
+    for index in range(max(1, int(duration_s / window_s))):
+        spike = index % 10 == 7
+        p95 = rng.uniform(30.0, 40.0) * (3 if spike else 1)
+        window = {
+            "t_start_s": round(index * window_s, 3),
+            "t_end_s": round((index + 1) * window_s, 3),
+            "requests": rng.randint(20, 40),
+            "errors": 0,
+            "latency_p50_ms": round(p95 / 1.4, 3),
+            "latency_p95_ms": round(p95, 3),
+            "latency_p99_ms": round(p95 * 1.3, 3),
+            "latency_max_ms": round(p95 * 1.5, 3),
+            "gpu_samples": 2,
+            "gpu_util_mean": round(rng.uniform(70, 95), 2),
+            "mem_util_mean": round(rng.uniform(30, 50), 2),
+            "power_w_mean": round(rng.uniform(180, 220), 2),
+            "power_w_max": round(rng.uniform(220, 240), 2),
+            "temp_c_max": round(rng.uniform(60, 65) + (20 if spike else 0), 2),
+            "sm_clock_mhz_mean": 1200.0 if spike else 1500.0,
+            "sm_clock_mhz_min": 1100.0 if spike else 1500.0,
+            "vram_mb_max": 1800.0,
+            "throttled_fraction": 1.0 if spike else 0.0,
+        }
+        lines.append(json.dumps(window))
+    return "".join(line + "\n" for line in lines)
+
+
+def _fake_checkpoints(pod: _FakePod, duration_s: float) -> str:
+    """Soak checkpoints written so far; the soak budget is compressed into the run duration."""
+
+    soak_s = float(pod.env["SOAK_S"])
+    interval_s = float(pod.env.get("CHECKPOINT_S", "30"))
+    count = max(1, math.ceil(soak_s / interval_s))
+    elapsed = time.monotonic() - (pod.exec_started or 0.0)
+    lines = []
+    for seq in range(min(int(elapsed / duration_s * count), count)):
+        # Seeded per line so that every read returns the same bytes, as from an append-only file.
+        rng = random.Random(f"{pod.id}:{seq}")
+        requests = rng.randint(200, 400)
+        lines.append(
+            json.dumps(
+                {
+                    "seq": seq,
+                    "t_s": min((seq + 1) * interval_s, soak_s),
+                    "final": seq == count - 1,
+                    "requests": requests,
+                    "errors": 0,
+                    "latency_histogram": _fake_histogram(rng.uniform(15.0, 40.0), requests),
+                },
+                separators=(",", ":"),
+            )
+        )
+    return "".join(line + "\n" for line in lines)
+
+
+def _fake_histogram(p50: float, count: int, precision: float = 0.05, lowest_ms: float = 1e-3) -> Dict[str, Any]:
+    """A serialized agent latency histogram with most of ``count`` around ``p50``."""
+
+    values = [p50 * 0.9, p50, p50 * 1.4, p50 * 1.8]
+    counts = [int(count * 0.3), int(count * 0.4), int(count * 0.25)]
+    counts.append(count - sum(counts))
+    indexes = [int(math.log(value / lowest_ms) / math.log1p(precision)) + 1 for value in values]
+    return {
+        "layout": {"lowest_ms": lowest_ms, "highest_ms": 3.6e6, "precision": precision},
+        "count": count,
+        "sum_ms": round(sum(value * weight for value, weight in zip(values, counts)), 6),
+        "min_ms": round(values[0] * 0.98, 3),
+        "max_ms": round(values[-1] * 1.02, 3),
+        "index_deltas": [b - a for a, b in zip([0] + indexes, indexes)],
+        "counts": counts,
+    }
+
+
+def _ranged(content: bytes, header: str | None) -> Response:
+    """Serve an open-ended ``bytes=N-`` range, the only kind the controller asks for."""
+
+    spec = header[len("bytes=") :] if header and header.startswith("bytes=") else ""
+    if not (spec.endswith("-") and spec[:-1].isdigit()):
+        return Response(content, media_type="application/x-ndjson")
+    start = int(spec[:-1])
+    if start >= len(content):
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{len(content)}"})
+    return Response(
+        content[start:],
+        status_code=206,
+        media_type="application/x-ndjson",
+        headers={"Content-Range": f"bytes {start}-{len(content) - 1}/{len(content)}"},
+    )
+
+
+app = create_fake_runpod_app(FakeRunpodConfig.from_env())
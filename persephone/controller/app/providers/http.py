@@ -0,0 +1,87 @@
+"""Shared HTTP client and retry policy for provider integrations."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Failures that guarantee the server never saw the request, so any method may be retried.
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter for idempotent-enough provider calls."""
+
+    attempts: int = 4
+    base_delay_s: float = 0.25
+    max_delay_s: float = 8.0
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_delay_s)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * 2**attempt))
+
+
+def create_http_client(
+    max_connections: int = 100,
+    max_keepalive: int = 20,
+    timeout_s: float = 10.0,
+) -> httpx.AsyncClient:
+    """Create the pooled client shared by all providers for the app's lifetime."""
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+        timeout=httpx.Timeout(timeout_s),
+    )
+
+
+async def request_with_retry(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    policy: RetryPolicy = RetryPolicy(),
+    idempotent: Optional[bool] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a request, retrying transport errors and 429/5xx responses.
+
+    Requests that are not ``idempotent`` (by default those whose method is
+    not in ``IDEMPOTENT_METHODS``, e.g. a POST creating a pod) are retried
+    only when the server cannot have acted on them: connection failures and
+    429 responses. Retrying them after a timeout or a 5xx could repeat the
+    side effect. The final response is returned as-is (callers decide how to
+    treat error statuses); the last transport error is re-raised once
+    attempts run out.
+    """
+
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+    for attempt in range(policy.attempts):
+        last_attempt = attempt == policy.attempts - 1
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError as exc:
+            if last_attempt or not (idempotent or isinstance(exc, _NOT_SENT_ERRORS)):
+                raise
+            delay = policy.delay(attempt)
+            logger.warning("%s %s failed (%s); retrying in %.2fs", method, url, exc, delay)
+        else:
+            retryable = response.status_code in RETRY_STATUSES if idempotent else response.status_code == 429
+            if not retryable or last_attempt:
+                return response
+            delay = policy.delay(attempt, response.headers.get("Retry-After"))
+            logger.warning("%s %s returned %s; retrying in %.2fs", method, url, response.status_code, delay)
+        await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
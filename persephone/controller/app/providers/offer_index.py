@@ -0,0 +1,134 @@
+"""Prebuilt indexes for filtering and ranking GPU offers."""
+from __future__ import annotations
+
+from typing import Dict, List, Literal, Mapping, Optional
+
+import numpy as np
+
+AVAILABILITY_LEVELS = {"low": 0, "medium": 1, "high": 2}
+OfferSort = Literal["cheapest", "price_per_vram_gb", "vram", "throughput_per_usd"]
+
+
+def _as_float(value: object) -> float:
+    try:
+        return float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class OfferIndex:
+    """Column arrays, sort orders and region postings over one catalog snapshot.
+
+    Built once per snapshot; a query combines boolean masks from the indexes
+    and walks a precomputed sort order, so it never touches the offer dicts
+    except for the rows it returns. Offers with unknown price or VRAM never
+    match a price or VRAM filter and sort last.
+    """
+
+    def __init__(self, offers: List[dict]) -> None:
+        self._offers = offers
+        self._ids = [offer.get("id") for offer in offers]
+        self._positions = {offer_id: position for position, offer_id in enumerate(self._ids)}
+        self._vram = np.array([_as_float(offer.get("vram_gb")) for offer in offers], dtype=np.float64)
+        self._price = np.array([_as_float(offer.get("hourly_usd")) for offer in offers], dtype=np.float64)
+        self._availability = np.array(
+            [AVAILABILITY_LEVELS.get(str(offer.get("availability")).lower(), -1) for offer in offers],
+            dtype=np.int8,
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._price_per_vram = np.where(self._vram > 0, self._price / self._vram, np.nan)
+
+        self._by_region: Dict[str, np.ndarray] = {}
+        for position, offer in enumerate(offers):
+            for region in offer.get("regions") or []:
+                mask = self._by_region.setdefault(str(region).lower(), np.zeros(len(offers), dtype=bool))
+                mask[position] = True
+
+        # NaN sorts last in NumPy, which is where unknown values belong.
+        self._vram_order = np.argsort(self._vram, kind="stable")
+        self._vram_sorted = self._vram[self._vram_order]
+        self._price_order = np.argsort(self._price, kind="stable")
+        self._price_sorted = self._price[self._price_order]
+        self._orders = {
+            "cheapest": self._price_order,
+            "price_per_vram_gb": np.argsort(self._price_per_vram, kind="stable"),
+            "vram": np.argsort(-self._vram, kind="stable"),
+        }
+
+    def __len__(self) -> int:
+        return len(self._offers)
+
+    @property
+    def has_availability(self) -> bool:
+        """Whether any offer reports an availability level (the live RunPod catalog does not)."""
+
+        return bool((self._availability >= 0).any())
+
+    def hourly_usd(self, offer_id: str) -> Optional[float]:
+        """Return the hourly price of an offer, or ``None`` if unknown."""
+
+        position = self._positions.get(offer_id)
+        if position is None or np.isnan(self._price[position]):
+            return None
+        return float(self._price[position])
+
+    def query(
+        self,
+        min_vram_gb: Optional[float] = None,
+        max_hourly_usd: Optional[float] = None,
+        region: Optional[str] = None,
+        availability: Optional[str] = None,
+        sort: Optional[OfferSort] = None,
+        limit: Optional[int] = None,
+        throughput_rps: Optional[Mapping[str, float]] = None,
+    ) -> List[dict]:
+        """Return matching offers, best first when ``sort`` is given.
+
+        ``availability`` is a minimum level (``low`` < ``medium`` < ``high``);
+        offers of unknown availability never match it.
+        Ranking by ``throughput_per_usd`` uses ``throughput_rps`` measured per
+        gpu_type and reports it as requests per dollar.
+        """
+
+        mask = np.ones(len(self._offers), dtype=bool)
+        if min_vram_gb is not None:
+            start = np.searchsorted(self._vram_sorted, min_vram_gb, side="left")
+            mask &= self._range_mask(self._vram_order, start, int(np.isfinite(self._vram_sorted).sum()))
+        if max_hourly_usd is not None:
+            stop = np.searchsorted(self._price_sorted, max_hourly_usd, side="right")
+            mask &= self._range_mask(self._price_order, 0, stop)
+        if region is not None:
+            mask &= self._by_region.get(region.lower(), np.zeros(len(self._offers), dtype=bool))
+        if availability is not None:
+            mask &= self._availability >= AVAILABILITY_LEVELS[availability]
+
+        metric: Optional[np.ndarray] = None
+        if sort is None:
+            selected = np.flatnonzero(mask)
+        elif sort == "throughput_per_usd":
+            throughput = np.array(
+                [_as_float((throughput_rps or {}).get(offer_id)) for offer_id in self._ids], dtype=np.float64
+            )
+            with np.errstate(divide="ignore", invalid="ignore"):
+                metric = np.where(self._price > 0, throughput * 3600.0 / self._price, np.nan)
+            order = np.argsort(np.where(np.isnan(metric), np.inf, -metric), kind="stable")
+            selected = order[mask[order]]
+        else:
+            order = self._orders[sort]
+            selected = order[mask[order]]
+            if sort == "price_per_vram_gb":
+                metric = self._price_per_vram
+
+        if limit is not None:
+            selected = selected[:limit]
+        if metric is None:
+            return [self._offers[position] for position in selected]
+        return [
+            {**self._offers[position], sort: None if np.isnan(metric[position]) else round(float(metric[position]), 4)}
+            for position in selected
+        ]
+
+    def _range_mask(self, order: np.ndarray, start: int, stop: int) -> np.ndarray:
+        mask = np.zeros(len(self._offers), dtype=bool)
+        mask[order[start:stop]] = True
+        return mask
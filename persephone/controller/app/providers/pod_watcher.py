@@ -0,0 +1,150 @@
+"""Batched, adaptive polling of pod status."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_POD_STATUSES = {"EXITED", "TERMINATED", "FAILED"}
+# Reported for a pod the status query stopped returning, e.g. because it was deleted.
+MISSING_POD_STATUS = "MISSING"
+
+StatusFetcher = Callable[[List[str]], Awaitable[Dict[str, str]]]
+
+
+@dataclass
+class _Watch:
+    future: asyncio.Future
+    interval_s: float
+    due: float
+    missing: int = 0
+
+
+class PodStatusWatcher:
+    """Waits for many pods to finish using one polling loop.
+
+    Every watched pod has its own poll interval that starts at ``initial_s``
+    and grows by ``backoff`` up to ``max_s``, so short probes resolve quickly
+    while long runs cost few API calls. On each tick all pods that are due are
+    checked with a single batched status query. ``notify`` resolves a pod
+    immediately, e.g. from a webhook. A pod absent from ``missing_limit``
+    consecutive answers no longer exists and resolves as ``MISSING``
+    instead of being polled until the timeout.
+    """
+
+    def __init__(
+        self,
+        fetch_statuses: StatusFetcher,
+        initial_s: float = 0.5,
+        max_s: float = 15.0,
+        backoff: float = 1.5,
+        batch_size: int = 100,
+        missing_limit: int = 3,
+    ) -> None:
+        self._fetch_statuses = fetch_statuses
+        self.initial_s = initial_s
+        self.max_s = max_s
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.missing_limit = missing_limit
+        self._watches: Dict[str, _Watch] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+
+    async def wait(self, pod_id: str, timeout_s: float) -> str:
+        """Return the terminal status of ``pod_id`` or ``MISSING``; raises ``TimeoutError``."""
+
+        watch = self._watches.get(pod_id)
+        if watch is None:
+            loop = asyncio.get_running_loop()
+            watch = _Watch(future=loop.create_future(), interval_s=self.initial_s, due=time.monotonic() + self.initial_s)
+            self._watches[pod_id] = watch
+            self._ensure_running()
+        try:
+            return await asyncio.wait_for(asyncio.shield(watch.future), timeout=timeout_s)
+        except asyncio.TimeoutError as exc:
+            raise TimeoutError(f"pod {pod_id} did not finish within {timeout_s}s") from exc
+        finally:
+            self._watches.pop(pod_id, None)
+
+    def notify(self, pod_id: str, status: str) -> bool:
+        """Record a pushed status; returns ``True`` if a waiter was resolved."""
+
+        watch = self._watches.get(pod_id)
+        if watch is None or status.upper() not in TERMINAL_POD_STATUSES:
+            return False
+        if not watch.future.done():
+            watch.future.set_result(status.upper())
+        return True
+
+    @property
+    def watched(self) -> int:
+        return len(self._watches)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _ensure_running(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_forever())
+        else:
+            self._wakeup.set()
+
+    async def _poll_forever(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            pending = {pod_id: watch for pod_id, watch in self._watches.items() if not watch.future.done()}
+            if not pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            next_due = min(watch.due for watch in pending.values())
+            if next_due > now:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=next_due - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = [pod_id for pod_id, watch in pending.items() if watch.due <= now]
+            for start in range(0, len(due), self.batch_size):
+                await self._poll_batch(due[start : start + self.batch_size])
+
+    async def _poll_batch(self, pod_ids: List[str]) -> None:
+        self.polls += 1
+        statuses: Optional[Dict[str, str]]
+        try:
+            statuses = await self._fetch_statuses(pod_ids)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Pod status poll failed for %s pods: %s", len(pod_ids), exc)
+            statuses = None
+        now = time.monotonic()
+        for pod_id in pod_ids:
+            watch = self._watches.get(pod_id)
+            if watch is None or watch.future.done():
+                continue
+            # A failed poll says nothing about whether the pod exists.
+            if statuses is not None:
+                watch.missing = 0 if pod_id in statuses else watch.missing + 1
+                if watch.missing >= self.missing_limit:
+                    logger.warning("Pod %s missing from %s status polls in a row", pod_id, watch.missing)
+                    watch.future.set_result(MISSING_POD_STATUS)
+                    continue
+            status = (statuses or {}).get(pod_id, "").upper()
+            if status in TERMINAL_POD_STATUSES:
+                watch.future.set_result(status)
+                continue
+            watch.interval_s = min(watch.interval_s * self.backoff, self.max_s)
+            watch.due = now + watch.interval_s
@@ -1,10 +1,15 @@
 """GPU catalog providers."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+import logging
+from dataclasses import dataclass, field
 from typing import List
 
-import requests
+import httpx
+
+from .http import RetryPolicy, request_with_retry
+
+logger = logging.getLogger(__name__)
 
 
 MOCK_GPUS = [
@@ -48,10 +53,21 @@ class RunpodCatalog:
     """Catalog provider pulling offers from RunPod API."""
 
     api_key: str
+    client: httpx.AsyncClient
     base_url: str = "https://api.runpod.io/graphql"
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+
+    async def list_gpus(self) -> List[dict]:
+        """Return normalized GPU offers from RunPod, or an empty list on error."""
+
+        try:
+            return await self.fetch_gpus()
+        except (httpx.HTTPError, ValueError) as exc:
+            logger.warning("GPU catalog request failed: %s", exc)
+            return []
 
-    def list_gpus(self) -> List[dict]:
-        """Return normalized GPU offers from RunPod."""
+    async def fetch_gpus(self) -> List[dict]:
+        """Return normalized GPU offers from RunPod; raises on upstream errors."""
 
         headers = {"Authorization": f"Bearer {self.api_key}"}
         payload = {
@@ -67,13 +83,12 @@ class RunpodCatalog:
             }
             """,
         }
-        try:
-            response = requests.post(self.base_url, json=payload, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-        except requests.RequestException:
-            # TODO: log error details when logging subsystem is configured
-            return []
+        # A read-only GraphQL query, so safe to repeat despite being a POST.
+        response = await request_with_retry(
+            self.client, "POST", self.base_url, policy=self.retry, idempotent=True, json=payload, headers=headers
+        )
+        response.raise_for_status()
+        data = response.json()
 
         gpu_types = data.get("data", {}).get("gpuTypes", [])
         normalized: List[dict] = []
@@ -1,32 +1,91 @@
 """RunPod orchestrator abstraction."""
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
 import time
 import uuid
-from dataclasses import dataclass
-from typing import Dict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
-import requests
+import httpx
+
+from ..core.metrics import RUNPOD_CALL_ERRORS, RUNPOD_CALL_SECONDS, timed_operation
+from ..storage.artifact_store import ArtifactRef, ArtifactStore
+from ..storage.models import Artifact
+from .http import RETRY_STATUSES, RetryPolicy, request_with_retry
+from .pod_watcher import MISSING_POD_STATUS, PodStatusWatcher
+
+logger = logging.getLogger(__name__)
+
+_OPERATIONS = ("create_pod", "exec", "wait_and_fetch", "stop_pod")
+_LATENCY = {operation: RUNPOD_CALL_SECONDS.labels(operation) for operation in _OPERATIONS}
+_ERRORS = {operation: RUNPOD_CALL_ERRORS.labels(operation) for operation in _OPERATIONS}
+
+# Environment variable carrying the token the agent echoes in result.json, tying it to one exec.
+RUN_TOKEN_ENV = "RUN_TOKEN"
+
+# Files written by the agent into /workspace; binary ones are kept as bytes.
+ARTIFACT_FILES = {
+    "result.json": False,
+    "results.jsonl": False,
+    "gpu_timeseries.csv": False,
+    "gpu_timeseries.ptel": True,
+    "windows.jsonl": False,
+    "checkpoints.jsonl": False,
+}
 
 
 @dataclass
 class RunpodOrchestrator:
-    """Facade around the RunPod Dedicated API."""
+    """Facade around the RunPod Dedicated API.
+
+    All calls go through the shared, pooled ``client`` so that pod lifecycles
+    reuse keep-alive connections; transient failures are retried with
+    jittered exponential backoff. Completion is detected by a single
+    ``PodStatusWatcher`` shared by all runs, which may also be fed by webhooks.
+    """
 
     api_key: str
     agent_image: str
     timeout_s: int
+    client: httpx.AsyncClient
     base_url: str = "https://api.runpod.io/v2"
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    poll_initial_s: float = 0.5
+    poll_max_s: float = 15.0
+    poll_backoff: float = 1.5
+    watcher: PodStatusWatcher = field(init=False, repr=False)
+    # Environment of the last exec per mock pod, so mock results can reflect it.
+    _mock_env: Dict[str, Dict[str, str]] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.watcher = PodStatusWatcher(
+            self.get_pod_statuses,
+            initial_s=self.poll_initial_s,
+            max_s=self.poll_max_s,
+            backoff=self.poll_backoff,
+        )
 
     def _headers(self) -> Dict[str, str]:
         return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
 
-    def create_pod(self, gpu_type: str, env: Dict[str, str]) -> str:
-        """Create a pod and return its identifier.
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:  # type: ignore[no-untyped-def]
+        response = await request_with_retry(
+            self.client,
+            method,
+            f"{self.base_url}{path}",
+            policy=self.retry,
+            headers=self._headers(),
+            **kwargs,
+        )
+        response.raise_for_status()
+        return response
 
-        The implementation is stubbed for MVP while the RunPod contract is finalized.
-        """
+    @timed_operation(_LATENCY["create_pod"], _ERRORS["create_pod"])
+    async def create_pod(self, gpu_type: str, env: Dict[str, str]) -> str:
+        """Create a pod and return its identifier; raises ``RuntimeError`` if RunPod does not create one."""
 
         if not self.api_key:
             # Without an API key we cannot reach RunPod; return a generated identifier for mocks.
@@ -41,49 +100,68 @@ class RunpodOrchestrator:
             "containerDiskInGb": 20,
         }
         try:
-            response = requests.post(
-                f"{self.base_url}/pods",
-                headers=self._headers(),
-                data=json.dumps(payload),
-                timeout=10,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("id", f"mock-pod-{uuid.uuid4()}")
-        except requests.RequestException:
-            return f"mock-pod-{uuid.uuid4()}"
+            # Not idempotent: retried only if RunPod cannot have created a pod, so a retry never leaks one.
+            response = await self._request("POST", "/pods", content=json.dumps(payload))
+            pod_id = response.json().get("id")
+        except (httpx.HTTPError, ValueError) as exc:
+            raise RuntimeError(f"creating a {gpu_type} pod failed: {exc}") from exc
+        if not pod_id:
+            raise RuntimeError(f"creating a {gpu_type} pod returned no pod id")
+        return str(pod_id)
 
-    def exec(self, pod_id: str, command: list[str]) -> None:
+    @timed_operation(_LATENCY["exec"], _ERRORS["exec"])
+    async def exec(self, pod_id: str, command: list[str], env: Dict[str, str] | None = None) -> None:
         """Execute a command inside the pod.
 
-        For the MVP we assume success and rely on wait_and_fetch to surface failures.
+        ``env`` overrides the pod environment for this command, which lets a
+        warm pod run probes for different models. For the MVP we assume
+        success and rely on wait_and_fetch to surface failures.
         """
 
         if not self.api_key:
+            self._mock_env[pod_id] = dict(env or {})
             return
-        payload = {"podId": pod_id, "command": command}
+        payload = {"podId": pod_id, "command": command, "env": env or {}}
         try:
-            response = requests.post(
-                f"{self.base_url}/pods/{pod_id}/exec",
-                headers=self._headers(),
-                data=json.dumps(payload),
-                timeout=10,
-            )
-            response.raise_for_status()
-        except requests.RequestException:
-            # TODO: log error for observability
+            await self._request("POST", f"/pods/{pod_id}/exec", content=json.dumps(payload))
+        except httpx.HTTPError as exc:
+            logger.warning("exec failed on pod %s: %s", pod_id, exc)
+            _ERRORS["exec"].inc()
             return
 
-    def wait_and_fetch(self, pod_id: str, timeout_s: int | None = None) -> Dict[str, str]:
+    @timed_operation(_LATENCY["wait_and_fetch"], _ERRORS["wait_and_fetch"])
+    async def wait_and_fetch(
+        self,
+        pod_id: str,
+        timeout_s: int | None = None,
+        phases: Optional[Dict[str, float]] = None,
+        store: Optional[ArtifactStore] = None,
+        run_token: Optional[str] = None,
+    ) -> Dict[str, Artifact | ArtifactRef]:
         """Wait for completion and fetch artifacts from the pod.
 
-        Returns a mapping of artifact name to its textual contents.
+        Returns a mapping of artifact name to its contents: text for JSON and
+        CSV files, bytes for binary ones such as columnar telemetry. With a
+        ``store`` every file is instead streamed into it chunk by chunk and
+        the mapping holds references. If given, ``phases`` receives the
+        seconds spent in ``wait`` and ``download``.
+
+        The pod's status only says that its last command finished. With a
+        ``run_token`` (passed to the exec as ``RUN_TOKEN``) the fetched
+        ``result.json`` must carry the same token, so a result left behind
+        by an earlier run on the same pod fails the run instead of being
+        reported as its own.
         """
 
         timeout_s = timeout_s or self.timeout_s
+        phases = phases if phases is not None else {}
+        started = time.monotonic()
         if not self.api_key:
             # Return mock artifacts suitable for local testing.
-            time.sleep(1)
+            await asyncio.sleep(1)
+            phases["wait"] = round(time.monotonic() - started, 3)
+            phases["download"] = 0.0
+            env = self._mock_env.pop(pod_id, {})
             result = {
                 "result.json": json.dumps(
                     {
@@ -92,45 +170,184 @@ class RunpodOrchestrator:
                         "latency_p95_ms": 35.0,
                         "throughput_rps": 40.0,
                         "note": "mocked RunPod execution",
+                        "run_token": env.get(RUN_TOKEN_ENV),
                     }
                 ),
-                "gpu_timeseries.csv": "t,gpu_util,mem_util,vram_mb,power_w,temp_c\n"
-                "0,50,40,1800,120,60\n",
+                "gpu_timeseries.csv": "t,gpu,gpu_util,mem_util,vram_mb,power_w,temp_c,"
+                "sm_clock_mhz,pcie_tx_kbps,pcie_rx_kbps,throttle_reasons\n"
+                "0,0,50,40,1800,120,60,1500,1024,2048,0\n",
             }
+            batch = env.get("BATCH_CONFIG")
+            if batch:
+                result["results.jsonl"] = "".join(
+                    json.dumps(
+                        {
+                            "id": config["id"],
+                            "result": {"samples": config["samples"], "latency_p50_ms": 25.0, "throughput_rps": 40.0},
+                            "window_s": [0, 1],
+                        }
+                    )
+                    + "\n"
+                    for config in json.loads(batch)
+                )
+            if store is not None:
+                return {name: store.put(content.encode("utf-8")) for name, content in result.items()}
             return result
 
-        # TODO: poll RunPod status until completion and retrieve files via storage API.
-        # Placeholder polling loop simulating completion.
-        deadline = time.time() + timeout_s
-        while time.time() < deadline:
-            time.sleep(5)
-            break
-        # TODO: download artifacts from RunPod once available.
-        return {
-            "result.json": json.dumps(
-                {
-                    "samples": 0,
-                    "latency_p50_ms": 0,
-                    "latency_p95_ms": 0,
-                    "throughput_rps": 0,
-                    "note": "TODO: fetch from RunPod",
-                }
-            ),
-            "gpu_timeseries.csv": "",
-        }
+        try:
+            status = await self.watcher.wait(pod_id, timeout_s)
+        except TimeoutError as exc:
+            raise RuntimeError(str(exc)) from exc
+        if status == "FAILED":
+            raise RuntimeError(f"pod {pod_id} failed")
+        if status == MISSING_POD_STATUS:
+            raise RuntimeError(f"pod {pod_id} no longer exists")
+        waited = time.monotonic()
+        phases["wait"] = round(waited - started, 3)
 
-    def stop_pod(self, pod_id: str) -> None:
-        """Terminate the pod."""
+        artifacts: Dict[str, Artifact | ArtifactRef] = {}
+        for name, binary in ARTIFACT_FILES.items():
+            try:
+                if store is not None:
+                    ref = await self.store_file(pod_id, name, store)
+                    if ref is not None:
+                        artifacts[name] = ref
+                    continue
+                response = await self.fetch_file(pod_id, name)
+            except httpx.HTTPError as exc:
+                logger.warning("Fetching %s from pod %s failed: %s", name, pod_id, exc)
+                continue
+            if response is not None:
+                artifacts[name] = response.content if binary else response.text
+        phases["download"] = round(time.monotonic() - waited, 3)
+        if "result.json" not in artifacts:
+            raise RuntimeError(f"pod {pod_id} finished without result.json")
+        if run_token is not None:
+            await asyncio.to_thread(_check_run_token, pod_id, artifacts["result.json"], run_token, store)
+        return artifacts
+
+    async def fetch_file(self, pod_id: str, name: str) -> httpx.Response | None:
+        """Download a file from the pod workspace; ``None`` if it does not exist."""
+
+        response = await request_with_retry(
+            self.client,
+            "GET",
+            f"{self.base_url}/pods/{pod_id}/files/{name}",
+            policy=self.retry,
+            headers=self._headers(),
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response
+
+    async def store_file(self, pod_id: str, name: str, store: ArtifactStore) -> ArtifactRef | None:
+        """Stream a file from the pod workspace into ``store``; ``None`` if it does not exist.
+
+        File creation, compression and disk writes run in a worker thread, so
+        at most one network chunk plus one store chunk is held in memory.
+        """
+
+        url = f"{self.base_url}/pods/{pod_id}/files/{name}"
+        for attempt in range(self.retry.attempts):
+            last_attempt = attempt == self.retry.attempts - 1
+            writer = await asyncio.to_thread(store.writer)
+            try:
+                async with self.client.stream("GET", url, headers=self._headers()) as response:
+                    if response.status_code == 404:
+                        await asyncio.to_thread(writer.abort)
+                        return None
+                    if response.status_code in RETRY_STATUSES and not last_attempt:
+                        raise httpx.HTTPStatusError(
+                            f"{response.status_code} from {url}", request=response.request, response=response
+                        )
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes():
+                        await asyncio.to_thread(writer.write, chunk)
+                return await asyncio.to_thread(writer.commit)
+            except (httpx.TransportError, httpx.HTTPStatusError) as exc:
+                await asyncio.to_thread(writer.abort)
+                retryable = isinstance(exc, httpx.TransportError) or exc.response.status_code in RETRY_STATUSES
+                if last_attempt or not retryable:
+                    raise
+                delay = self.retry.delay(attempt)
+                logger.warning("Streaming %s from pod %s failed (%s); retrying in %.2fs", name, pod_id, exc, delay)
+                await asyncio.sleep(delay)
+            except BaseException:
+                writer.abort()
+                raise
+        raise AssertionError("unreachable")
+
+    async def fetch_text(self, pod_id: str, name: str) -> str | None:
+        """Read a text file from a running pod, e.g. to follow partial results."""
 
         if not self.api_key:
-            return
+            return None
         try:
-            response = requests.delete(
-                f"{self.base_url}/pods/{pod_id}",
-                headers=self._headers(),
-                timeout=10,
+            response = await self.fetch_file(pod_id, name)
+        except httpx.HTTPError as exc:
+            logger.warning("Fetching %s from pod %s failed: %s", name, pod_id, exc)
+            return None
+        return response.text if response is not None else None
+
+    async def fetch_from(self, pod_id: str, name: str, offset: int = 0) -> bytes | None:
+        """Read a pod file from byte ``offset`` on, e.g. to follow an append-only log.
+
+        Returns ``b""`` when nothing was appended past ``offset`` and ``None``
+        when the file cannot be read. Servers that ignore ``Range`` are
+        handled by slicing the full response.
+        """
+
+        if not self.api_key:
+            return None
+        try:
+            response = await request_with_retry(
+                self.client,
+                "GET",
+                f"{self.base_url}/pods/{pod_id}/files/{name}",
+                policy=self.retry,
+                headers={**self._headers(), "Range": f"bytes={offset}-"},
             )
+            if response.status_code == 416:
+                return b""
+            if response.status_code == 404:
+                return None
             response.raise_for_status()
-        except requests.RequestException:
-            # TODO: log error for observability
+        except httpx.HTTPError as exc:
+            logger.warning("Fetching %s from pod %s failed: %s", name, pod_id, exc)
+            return None
+        return response.content if response.status_code == 206 else response.content[offset:]
+
+    async def get_pod_statuses(self, pod_ids: List[str]) -> Dict[str, str]:
+        """Return ``desiredStatus`` for many pods with one request."""
+
+        if not self.api_key:
+            return {pod_id: "RUNNING" for pod_id in pod_ids}
+        response = await self._request("GET", "/pods", params={"ids": ",".join(pod_ids)})
+        return {pod["id"]: pod.get("desiredStatus", "") for pod in response.json().get("pods", [])}
+
+    @timed_operation(_LATENCY["stop_pod"], _ERRORS["stop_pod"])
+    async def stop_pod(self, pod_id: str) -> None:
+        """Terminate the pod."""
+
+        if not self.api_key:
+            return
+        try:
+            await self._request("DELETE", f"/pods/{pod_id}")
+        except httpx.HTTPError as exc:
+            logger.warning("stop_pod failed for %s: %s", pod_id, exc)
+            _ERRORS["stop_pod"].inc()
             return
+
+
+def _check_run_token(
+    pod_id: str, result: Artifact | ArtifactRef, run_token: str, store: Optional[ArtifactStore]
+) -> None:
+    if isinstance(result, ArtifactRef):
+        result = store.read(result.digest) if store is not None else b""
+    try:
+        found = json.loads(result).get("run_token")
+    except (ValueError, AttributeError):
+        found = None
+    if found != run_token:
+        raise RuntimeError(f"pod {pod_id} finished without a result for this run (result.json is from another run)")
@@ -0,0 +1,211 @@
+"""Warm pod pool that lets back-to-back runs skip pod cold starts."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .runpod_orch import RunpodOrchestrator
+
+logger = logging.getLogger(__name__)
+
+# An exited pod cannot run another probe, and its status would make the next run look finished at once.
+HEALTHY_POD_STATUSES = {"RUNNING"}
+
+
+@dataclass
+class PodLease:
+    """A pod handed out to one run."""
+
+    pod_id: str
+    gpu_type: str
+    model_ref: str
+    warm: bool
+
+
+@dataclass
+class _PooledPod:
+    pod_id: str
+    gpu_type: str
+    model_ref: Optional[str]
+    idle_since: float = field(default_factory=time.monotonic)
+
+
+class WarmPodPool:
+    """Keeps idle pods per gpu_type and hands them to compatible runs.
+
+    ``target_sizes`` sets how many pods, busy or idle, the pool keeps per
+    gpu_type; a gpu_type without a target gets a fresh pod per run that is
+    stopped afterwards. An idle pod is reused by a run with the same
+    ``model_ref`` or, failing that, by any run if the pod has not loaded a
+    model yet. Only pods that are still running are pooled or handed out;
+    their status is checked on release and again before reuse. Pods idle
+    longer than ``idle_ttl_s`` are stopped, and the pool is only topped up for
+    gpu_types that saw demand within that window. All methods run on the
+    event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        orchestrator: RunpodOrchestrator,
+        target_sizes: Optional[Dict[str, int]] = None,
+        idle_ttl_s: float = 600.0,
+        health_interval_s: float = 30.0,
+    ) -> None:
+        self._orchestrator = orchestrator
+        self.target_sizes = dict(target_sizes or {})
+        self.idle_ttl_s = idle_ttl_s
+        self.health_interval_s = health_interval_s
+        self._idle: Dict[str, List[_PooledPod]] = {}
+        self._busy: Dict[str, PodLease] = {}
+        self._last_demand: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._hits = 0
+        self._misses = 0
+        self._evicted = 0
+        self._unhealthy = 0
+        self._cold_starts = 0
+        self._cold_start_total_s = 0.0
+
+    async def start(self) -> None:
+        """Pre-warm configured gpu_types and start the maintenance loop."""
+
+        now = time.monotonic()
+        for gpu_type in self.target_sizes:
+            self._last_demand[gpu_type] = now
+        if self.target_sizes:
+            self._task = asyncio.create_task(self._maintain_forever())
+
+    async def acquire(self, gpu_type: str, model_ref: str, env: Dict[str, str]) -> PodLease:
+        """Return a warm compatible pod, or create a new one."""
+
+        self._last_demand[gpu_type] = time.monotonic()
+        while True:
+            pod = self._take_idle(gpu_type, model_ref)
+            if pod is None or await self._is_running(pod.pod_id):
+                break
+            self._unhealthy += 1
+            await self._orchestrator.stop_pod(pod.pod_id)
+        if pod is not None:
+            self._hits += 1
+            lease = PodLease(pod.pod_id, gpu_type, model_ref, warm=True)
+        else:
+            self._misses += 1
+            started = time.monotonic()
+            pod_id = await self._orchestrator.create_pod(gpu_type, env)
+            self._record_cold_start(time.monotonic() - started)
+            lease = PodLease(pod_id, gpu_type, model_ref, warm=False)
+        self._busy[lease.pod_id] = lease
+        return lease
+
+    async def release(self, lease: PodLease, healthy: bool = True) -> None:
+        """Return a pod after its run; unhealthy or surplus pods are stopped."""
+
+        self._busy.pop(lease.pod_id, None)
+        if healthy and self._pool_size(lease.gpu_type) < self.target_sizes.get(lease.gpu_type, 0):
+            if await self._is_running(lease.pod_id):
+                self._idle.setdefault(lease.gpu_type, []).append(
+                    _PooledPod(lease.pod_id, lease.gpu_type, lease.model_ref)
+                )
+                return
+        await self._orchestrator.stop_pod(lease.pod_id)
+
+    def stats(self) -> Dict[str, object]:
+        """Return pool occupancy, hit rate and cold-start time saved."""
+
+        lookups = self._hits + self._misses
+        mean_cold_start = self._cold_start_total_s / self._cold_starts if self._cold_starts else 0.0
+        return {
+            "target_sizes": dict(self.target_sizes),
+            "idle_by_gpu_type": {gpu_type: len(pods) for gpu_type, pods in self._idle.items() if pods},
+            "busy": len(self._busy),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "mean_cold_start_s": round(mean_cold_start, 3),
+            "cold_start_saved_s": round(self._hits * mean_cold_start, 3),
+            "evicted": self._evicted,
+            "unhealthy": self._unhealthy,
+        }
+
+    async def close(self) -> None:
+        """Stop the maintenance loop and all idle pods."""
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        idle = [pod for pods in self._idle.values() for pod in pods]
+        self._idle.clear()
+        await asyncio.gather(*(self._orchestrator.stop_pod(pod.pod_id) for pod in idle))
+
+    def _take_idle(self, gpu_type: str, model_ref: str) -> Optional[_PooledPod]:
+        idle = self._idle.get(gpu_type, [])
+        for wanted in (model_ref, None):
+            for position, pod in enumerate(idle):
+                if pod.model_ref == wanted:
+                    return idle.pop(position)
+        return None
+
+    async def _is_running(self, pod_id: str) -> bool:
+        try:
+            statuses = await self._orchestrator.get_pod_statuses([pod_id])
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Checking pod %s failed: %s", pod_id, exc)
+            return False
+        return statuses.get(pod_id, "").upper() in HEALTHY_POD_STATUSES
+
+    def _pool_size(self, gpu_type: str) -> int:
+        busy = sum(1 for lease in self._busy.values() if lease.gpu_type == gpu_type)
+        return busy + len(self._idle.get(gpu_type, []))
+
+    def _record_cold_start(self, seconds: float) -> None:
+        self._cold_starts += 1
+        self._cold_start_total_s += seconds
+
+    async def _maintain_forever(self) -> None:
+        while True:
+            try:
+                await self.maintain()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Warm pool maintenance failed")
+            await asyncio.sleep(self.health_interval_s)
+
+    async def maintain(self) -> None:
+        """Evict expired and unhealthy idle pods, then top up to target."""
+
+        now = time.monotonic()
+        expired = [pod for pods in self._idle.values() for pod in pods if now - pod.idle_since > self.idle_ttl_s]
+        for pod in expired:
+            self._idle[pod.gpu_type].remove(pod)
+            self._evicted += 1
+        await asyncio.gather(*(self._orchestrator.stop_pod(pod.pod_id) for pod in expired))
+
+        checked = [pod for pods in self._idle.values() for pod in pods]
+        if checked:
+            statuses = await self._orchestrator.get_pod_statuses([pod.pod_id for pod in checked])
+            # Pods may have been acquired or released while the query was in flight.
+            unhealthy = [
+                pod
+                for pod in checked
+                if statuses.get(pod.pod_id, "").upper() not in HEALTHY_POD_STATUSES
+                and pod in self._idle.get(pod.gpu_type, [])
+            ]
+            for pod in unhealthy:
+                self._idle[pod.gpu_type].remove(pod)
+                self._unhealthy += 1
+            await asyncio.gather(*(self._orchestrator.stop_pod(pod.pod_id) for pod in unhealthy))
+
+        for gpu_type, target in self.target_sizes.items():
+            if now - self._last_demand.get(gpu_type, float("-inf")) > self.idle_ttl_s:
+                continue
+            missing = target - self._pool_size(gpu_type)
+            if missing > 0:
+                await asyncio.gather(*(self._add_unbound(gpu_type) for _ in range(missing)))
+
+    async def _add_unbound(self, gpu_type: str) -> None:
+        started = time.monotonic()
+        pod_id = await self._orchestrator.create_pod(gpu_type, {})
+        self._record_cold_start(time.monotonic() - started)
+        self._idle.setdefault(gpu_type, []).append(_PooledPod(pod_id, gpu_type, None))
@@ -0,0 +1,286 @@
+"""Incrementally maintained cross-run analytics."""
+from __future__ import annotations
+
+import math
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Literal, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..storage.models import Run
+
+CompareSort = Literal["throughput", "cost"]
+
+RESULT_COLUMNS = ("throughput_rps", "latency_p50_ms", "latency_p95_ms", "latency_p99_ms")
+TELEMETRY_COLUMNS = (
+    "gpu_util_mean",
+    "gpu_util_max",
+    "power_w_max",
+    "vram_mb_peak",
+    "temp_c_max",
+    "energy_j",
+    "throttle_s",
+)
+COLUMNS = RESULT_COLUMNS + TELEMETRY_COLUMNS
+
+# Two-sided 95% Student's t critical values for 1..30 degrees of freedom.
+_T95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)  # fmt: skip
+
+# (model_ref, dataset_profile, gpu_type, inference_backend, soak)
+GroupKey = Tuple[str, Optional[str], str, Optional[str], bool]
+
+
+class _GroupColumns:
+    """Float columns holding one row per run of a group, at most ``max_rows``.
+
+    Once full, a new row replaces the row of the oldest run, so the group
+    keeps its most recent runs whatever order they are added in.
+    """
+
+    def __init__(self, max_rows: int, capacity: int = 16) -> None:
+        self.size = 0
+        self.max_rows = max_rows
+        self.ids: List[str] = []
+        self._started = np.empty(min(capacity, max_rows))
+        self._data = np.full((len(COLUMNS), min(capacity, max_rows)), np.nan)
+
+    @property
+    def newest(self) -> float:
+        return float(self._started[: self.size].max()) if self.size else -math.inf
+
+    def accepts(self, started: float) -> bool:
+        return self.size < self.max_rows or started > self._started[: self.size].min()
+
+    def append(self, run_id: str, started: float, row: Sequence[float]) -> Optional[str]:
+        """Store a row; return the id of the run it replaced, if any."""
+
+        evicted = None
+        if self.size == self.max_rows:
+            index = int(self._started[: self.size].argmin())
+            evicted, self.ids[index] = self.ids[index], run_id
+        else:
+            if self.size == self._data.shape[1]:
+                capacity = min(self.size * 2, self.max_rows)
+                grown = np.full((len(COLUMNS), capacity), np.nan)
+                grown[:, : self.size] = self._data
+                self._data = grown
+                self._started = np.resize(self._started, capacity)
+            index = self.size
+            self.ids.append(run_id)
+            self.size += 1
+        self._started[index] = started
+        self._data[:, index] = row
+        return evicted
+
+    def column(self, name: str) -> np.ndarray:
+        return self._data[COLUMNS.index(name), : self.size]
+
+
+class RunAnalytics:
+    """Per ``(model_ref, dataset_profile, gpu_type, inference_backend, soak)`` columns of successful run results.
+
+    Runs served by different inference backends, and soak runs versus
+    sample-count runs, measure different things, so they never share a group.
+
+    Runs are added once, when they finish, together with the summary of their
+    GPU telemetry, so a comparison only reduces the stored columns instead of
+    re-reading run history and re-parsing telemetry. ``load`` backfills from
+    the store the first time it is called.
+
+    Memory is bounded: a group keeps its ``max_runs_per_group`` most recent
+    runs, and past ``max_groups`` the group whose newest run is oldest is
+    dropped.
+    """
+
+    def __init__(self, max_runs_per_group: int = 500, max_groups: int = 1000) -> None:
+        if max_runs_per_group < 1 or max_groups < 1:
+            raise ValueError("max_runs_per_group and max_groups must be positive")
+        self._max_runs_per_group = max_runs_per_group
+        self._max_groups = max_groups
+        self._groups: Dict[GroupKey, _GroupColumns] = {}
+        self._seen: Dict[str, GroupKey] = {}
+        self._loaded = False
+        self._lock = Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def wants(self, run: Run) -> bool:
+        """Whether ``add`` would keep ``run``; lets a backfill skip loading its telemetry."""
+
+        if run.status != "succeeded" or run.throughput_rps is None:
+            return False
+        with self._lock:
+            if run.id in self._seen:
+                return False
+            columns = self._groups.get(_group_key(run))
+            if columns is not None:
+                return columns.accepts(run.started_at.timestamp())
+            return len(self._groups) < self._max_groups or run.started_at.timestamp() > self._oldest_group()[1]
+
+    def wanted(self, runs: Sequence[Run]) -> List[Run]:
+        """Return the runs of a newest-first batch that ``add`` would keep."""
+
+        taken: Dict[GroupKey, int] = {}
+        kept: List[Run] = []
+        for run in runs:
+            key = _group_key(run)
+            if taken.get(key, 0) < self._max_runs_per_group and self.wants(run):
+                taken[key] = taken.get(key, 0) + 1
+                kept.append(run)
+        return kept
+
+    def add(self, run: Run, telemetry: Mapping[str, float]) -> None:
+        if run.status != "succeeded" or run.throughput_rps is None:
+            return
+        row = [_as_float(getattr(run, name)) for name in RESULT_COLUMNS]
+        row.extend(_as_float(telemetry.get(name)) for name in TELEMETRY_COLUMNS)
+        started = run.started_at.timestamp()
+        key = _group_key(run)
+        with self._lock:
+            if run.id in self._seen:
+                return
+            columns = self._groups.get(key)
+            if columns is None:
+                if len(self._groups) >= self._max_groups:
+                    oldest, newest = self._oldest_group()
+                    if started <= newest:
+                        return
+                    for run_id in self._groups.pop(oldest).ids:
+                        del self._seen[run_id]
+                columns = self._groups[key] = _GroupColumns(self._max_runs_per_group)
+            elif not columns.accepts(started):
+                return
+            evicted = columns.append(run.id, started, row)
+            if evicted is not None:
+                del self._seen[evicted]
+            self._seen[run.id] = key
+
+    def load(self, runs: Iterable[Run], telemetry: Callable[[Run], Mapping[str, float]]) -> None:
+        """Add every run not seen yet; later calls are no-ops."""
+
+        if self._loaded:
+            return
+        for run in runs:
+            if self.wants(run):
+                self.add(run, telemetry(run))
+        self._loaded = True
+
+    def _oldest_group(self) -> Tuple[GroupKey, float]:
+        key = min(self._groups, key=lambda group: self._groups[group].newest)
+        return key, self._groups[key].newest
+
+    def compare(
+        self,
+        model_ref: str,
+        dataset_profile: Optional[str] = None,
+        gpu_types: Optional[Sequence[str]] = None,
+        price_lookup: Optional[Callable[[str], Optional[float]]] = None,
+        sort: CompareSort = "throughput",
+        inference_backend: Optional[str] = None,
+        soak: bool = False,
+    ) -> List[Dict[str, object]]:
+        """Return one entry per gpu_type that ran ``model_ref`` on ``inference_backend``, best first.
+
+        Means come with 95% confidence intervals across repeated runs. Cost per
+        1k requests uses the gpu_type's current hourly price.
+        """
+
+        wanted = (model_ref, dataset_profile, inference_backend, soak)
+        with self._lock:
+            groups = {
+                gpu_type: columns
+                for (model, profile, gpu_type, backend, soak_run), columns in self._groups.items()
+                if (model, profile, backend, soak_run) == wanted and (not gpu_types or gpu_type in gpu_types)
+            }
+            entries = [self._summarize(gpu_type, columns, price_lookup) for gpu_type, columns in groups.items()]
+
+        def sort_key(entry: Dict[str, object]) -> float:
+            if sort == "cost":
+                cost = entry["cost_per_1k_requests_usd"]
+                return cost["mean"] if cost else math.inf  # type: ignore[index]
+            return -entry["throughput_rps"]["mean"]  # type: ignore[index]
+
+        return sorted(entries, key=sort_key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"groups": len(self._groups), "runs": len(self._seen)}
+
+    @staticmethod
+    def _summarize(
+        gpu_type: str, columns: _GroupColumns, price_lookup: Optional[Callable[[str], Optional[float]]]
+    ) -> Dict[str, object]:
+        throughput = columns.column("throughput_rps")
+        entry: Dict[str, object] = {
+            "gpu_type": gpu_type,
+            "runs": columns.size,
+            "throughput_rps": _distribution(throughput),
+        }
+        for name in RESULT_COLUMNS[1:]:
+            entry[name] = _distribution(columns.column(name))
+
+        hourly_usd = price_lookup(gpu_type) if price_lookup else None
+        entry["hourly_usd"] = hourly_usd
+        entry["cost_per_1k_requests_usd"] = None
+        if hourly_usd is not None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cost = np.where(throughput > 0, hourly_usd / (throughput * 3.6), np.nan)
+            entry["cost_per_1k_requests_usd"] = _distribution(cost, digits=6)
+
+        telemetry_runs = int(np.count_nonzero(~np.isnan(columns.column("gpu_util_mean"))))
+        telemetry: Dict[str, object] = {"runs": telemetry_runs}
+        if telemetry_runs:
+            for name in TELEMETRY_COLUMNS:
+                values = columns.column(name)
+                telemetry[name] = _round(np.nanmean(values)) if np.any(~np.isnan(values)) else None
+        entry["telemetry"] = telemetry
+        return entry
+
+
+def _distribution(values: np.ndarray, digits: int = 3) -> Optional[Dict[str, object]]:
+    """Mean with a 95% confidence interval and percentiles of the non-NaN values."""
+
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return None
+    mean = float(values.mean())
+    summary: Dict[str, object] = {"n": int(values.size), "mean": _round(mean, digits)}
+    if values.size > 1:
+        std = float(values.std(ddof=1))
+        half_width = _t95(values.size - 1) * std / math.sqrt(values.size)
+        summary["std"] = _round(std, digits)
+        summary["ci95"] = [_round(mean - half_width, digits), _round(mean + half_width, digits)]
+    else:
+        summary["std"] = None
+        summary["ci95"] = None
+    p5, p50, p95 = np.percentile(values, [5, 50, 95])
+    summary.update(
+        min=_round(values.min(), digits),
+        p5=_round(p5, digits),
+        p50=_round(p50, digits),
+        p95=_round(p95, digits),
+        max=_round(values.max(), digits),
+    )
+    return summary
+
+
+def _group_key(run: Run) -> GroupKey:
+    return (run.model_ref, run.dataset_profile, run.gpu_type, run.inference_backend, run.soak_s is not None)
+
+
+def _t95(degrees_of_freedom: int) -> float:
+    return _T95[degrees_of_freedom - 1] if degrees_of_freedom <= len(_T95) else 1.96
+
+
+def _as_float(value: object) -> float:
+    return float(value) if isinstance(value, (int, float)) else math.nan
+
+
+def _round(value: float, digits: int = 3) -> float:
+    return round(float(value), digits)
@@ -0,0 +1,133 @@
+"""Latency outlier windows and the GPU state they coincided with."""
+from __future__ import annotations
+
+import json
+from typing import Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+
+OutlierMetric = Literal["latency_p50_ms", "latency_p95_ms", "latency_p99_ms", "latency_max_ms"]
+
+GPU_FIELDS = (
+    "gpu_util_mean",
+    "mem_util_mean",
+    "power_w_mean",
+    "power_w_max",
+    "temp_c_max",
+    "sm_clock_mhz_mean",
+    "sm_clock_mhz_min",
+    "vram_mb_max",
+    "throttled_fraction",
+)
+# Scales a median absolute deviation to a standard deviation for normal data.
+_MAD_TO_STD = 1.4826
+
+
+def parse_windows(text: str) -> List[Dict[str, object]]:
+    """Parse the agent's ``windows.jsonl``, skipping malformed lines."""
+
+    windows = []
+    for line in text.splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict):
+            windows.append(record)
+    return windows
+
+
+def latency_outliers(
+    windows: List[Dict[str, object]],
+    metric: OutlierMetric = "latency_p95_ms",
+    threshold: float = 3.0,
+    min_requests: int = 5,
+) -> Dict[str, object]:
+    """Flag windows whose ``metric`` is far above the run's typical window.
+
+    A window is an outlier when its robust z-score, the distance from the
+    median in units of the scaled median absolute deviation, exceeds
+    ``threshold``. Windows with fewer than ``min_requests`` requests are
+    ignored. Each outlier lists its GPU state next to the median of the
+    other windows, plus ``signals`` naming what differed: throttling, lower
+    SM clocks, heat, memory pressure or an underused GPU (which points at
+    the host or queueing rather than the device).
+    """
+
+    eligible = [
+        window
+        for window in windows
+        if isinstance(window.get(metric), (int, float)) and int(window.get("requests") or 0) >= min_requests
+    ]
+    report: Dict[str, object] = {
+        "metric": metric,
+        "threshold": threshold,
+        "windows": len(windows),
+        "eligible_windows": len(eligible),
+        "outliers": [],
+    }
+    if len(eligible) < 3:
+        return report
+
+    values = np.asarray([float(window[metric]) for window in eligible])  # type: ignore[arg-type]
+    median = float(np.median(values))
+    scale = _MAD_TO_STD * float(np.median(np.abs(values - median)))
+    # Perfectly steady runs have no spread; fall back to 5% of the median.
+    scale = scale or max(abs(median) * 0.05, 1e-9)
+    scores = (values - median) / scale
+    flagged = scores > threshold
+
+    baseline = _median_state([window for window, outlier in zip(eligible, flagged) if not outlier])
+    report.update(median=round(median, 3), scale=round(scale, 3), baseline=baseline)
+    report["outliers"] = [
+        {
+            "t_start_s": window.get("t_start_s"),
+            "t_end_s": window.get("t_end_s"),
+            "requests": window.get("requests"),
+            metric: window[metric],
+            "score": round(float(score), 2),
+            "gpu": {name: window.get(name) for name in GPU_FIELDS if name in window},
+            "signals": _signals(window, baseline),
+        }
+        for window, score, outlier in zip(eligible, scores, flagged)
+        if outlier
+    ]
+    return report
+
+
+def _median_state(windows: List[Dict[str, object]]) -> Dict[str, Optional[float]]:
+    state: Dict[str, Optional[float]] = {}
+    for name in GPU_FIELDS:
+        values = [float(window[name]) for window in windows if isinstance(window.get(name), (int, float))]  # type: ignore[arg-type]
+        state[name] = round(float(np.median(values)), 3) if values else None
+    return state
+
+
+def _signals(window: Dict[str, object], baseline: Dict[str, Optional[float]]) -> List[str]:
+    def value(name: str) -> Optional[float]:
+        raw = window.get(name)
+        return float(raw) if isinstance(raw, (int, float)) else None
+
+    def compare(name: str) -> Tuple[Optional[float], Optional[float]]:
+        return value(name), baseline.get(name)
+
+    signals = []
+    throttled = value("throttled_fraction")
+    if throttled:
+        signals.append("throttling")
+    clock, base_clock = compare("sm_clock_mhz_min")
+    if clock is not None and base_clock and clock < 0.95 * base_clock:
+        signals.append("sm_clock_drop")
+    temp, base_temp = compare("temp_c_max")
+    if temp is not None and base_temp is not None and temp >= base_temp + 5:
+        signals.append("thermal")
+    vram, base_vram = compare("vram_mb_max")
+    mem_util, base_mem_util = compare("mem_util_mean")
+    if (vram is not None and base_vram and vram > 1.1 * base_vram) or (
+        mem_util is not None and base_mem_util and mem_util > 1.25 * base_mem_util
+    ):
+        signals.append("memory_pressure")
+    util, base_util = compare("gpu_util_mean")
+    if util is not None and base_util and util < 0.5 * base_util:
+        signals.append("gpu_underutilized")
+    return signals
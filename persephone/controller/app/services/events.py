@@ -0,0 +1,143 @@
+"""Fan-out of run progress events to streaming subscribers."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import AsyncIterator, Deque, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled"}
+
+
+@dataclass(eq=False)
+class _Subscriber:
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=256))
+    overflowed: bool = False
+
+    def offer(self, item: tuple[bytes, bool]) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # A subscriber that cannot keep up is disconnected rather than slowing everyone down.
+            self.overflowed = True
+
+
+@dataclass
+class _RunChannel:
+    sequence: int = 0
+    history: Deque[tuple[int, bytes]] = field(default_factory=lambda: deque(maxlen=64))
+    subscribers: Set[_Subscriber] = field(default_factory=set)
+    closed: bool = False
+
+
+class RunEventBroadcaster:
+    """Publishes run events once and fans them out to every watcher.
+
+    Each event is encoded as a Server-Sent Events frame a single time and the
+    same bytes are queued for all subscribers of the run, so serving many
+    watchers costs one queue append each instead of a store read per client.
+    A short per-run history lets late subscribers and reconnecting clients
+    (``Last-Event-ID``) catch up.
+    """
+
+    def __init__(self, max_runs: int = 1024, heartbeat_s: float = 15.0) -> None:
+        self._channels: "OrderedDict[str, _RunChannel]" = OrderedDict()
+        self._max_runs = max_runs
+        self._heartbeat_s = heartbeat_s
+        self._lock = Lock()
+
+    def publish(self, run_id: str, event: str, data: Dict[str, object], final: bool = False) -> None:
+        """Publish an event; safe to call from any thread.
+
+        ``final`` marks the last event of a run and ends all open streams.
+        """
+
+        with self._lock:
+            channel = self._channel(run_id)
+            channel.sequence += 1
+            frame = _encode_frame(channel.sequence, event, data)
+            channel.history.append((channel.sequence, frame))
+            channel.closed = channel.closed or final
+            subscribers = list(channel.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, (frame, final))
+            except RuntimeError:
+                logger.debug("Dropping subscriber with closed event loop")
+
+    def subscriber_count(self, run_id: Optional[str] = None) -> int:
+        with self._lock:
+            if run_id is not None:
+                channel = self._channels.get(run_id)
+                return len(channel.subscribers) if channel else 0
+            return sum(len(channel.subscribers) for channel in self._channels.values())
+
+    async def stream(
+        self,
+        run_id: str,
+        snapshot: Optional[Dict[str, object]] = None,
+        last_event_id: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield SSE frames for ``run_id`` until the run reaches a terminal state."""
+
+        subscriber = _Subscriber(loop=asyncio.get_running_loop())
+        with self._lock:
+            channel = self._channel(run_id)
+            backlog = [frame for seq, frame in channel.history if last_event_id is None or seq > last_event_id]
+            closed = channel.closed
+            if not closed:
+                channel.subscribers.add(subscriber)
+
+        try:
+            if snapshot is not None and last_event_id is None:
+                yield _encode_frame(None, "snapshot", snapshot)
+            for frame in backlog:
+                yield frame
+            if closed or (snapshot is not None and snapshot.get("status") in TERMINAL_STATUSES):
+                return
+            while not subscriber.overflowed:
+                try:
+                    frame, final = await asyncio.wait_for(subscriber.queue.get(), timeout=self._heartbeat_s)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield frame
+                if final:
+                    return
+        finally:
+            with self._lock:
+                current = self._channels.get(run_id)
+                if current is not None:
+                    current.subscribers.discard(subscriber)
+
+    def _channel(self, run_id: str) -> _RunChannel:
+        channel = self._channels.get(run_id)
+        if channel is None:
+            channel = self._channels[run_id] = _RunChannel()
+            self._evict()
+        else:
+            self._channels.move_to_end(run_id)
+        return channel
+
+    def _evict(self) -> None:
+        newest = next(reversed(self._channels))
+        while len(self._channels) > self._max_runs:
+            for run_id, channel in self._channels.items():
+                if not channel.subscribers and run_id != newest:
+                    del self._channels[run_id]
+                    break
+            else:
+                return
+
+
+def _encode_frame(sequence: Optional[int], event: str, data: Dict[str, object]) -> bytes:
+    payload = json.dumps(data, default=str, separators=(",", ":"))
+    prefix = f"id: {sequence}\n" if sequence is not None else ""
+    return f"{prefix}event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
@@ -0,0 +1,80 @@
+"""Aggregation of serialized agent latency histograms."""
+from __future__ import annotations
+
+import math
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Mirrors the sparse payload produced by ``agent.histogram.LatencyHistogram.to_dict``.
+HistogramPayload = Dict[str, object]
+
+
+def merge_histograms(payloads: Iterable[HistogramPayload]) -> Optional[HistogramPayload]:
+    """Merge histograms sharing one bucket layout by summing their counts."""
+
+    layout: Optional[dict] = None
+    counts: Dict[int, int] = {}
+    total = 0
+    sum_ms = 0.0
+    min_ms = math.inf
+    max_ms = 0.0
+    for payload in payloads:
+        if layout is None:
+            layout = dict(payload["layout"])  # type: ignore[arg-type]
+        elif payload["layout"] != layout:
+            raise ValueError("cannot merge histograms with different layouts")
+        for index, count in zip(accumulate(payload["index_deltas"]), payload["counts"]):  # type: ignore[arg-type]
+            counts[index] = counts.get(index, 0) + count
+        total += int(payload["count"])  # type: ignore[arg-type]
+        sum_ms += float(payload["sum_ms"])  # type: ignore[arg-type]
+        if payload["count"]:
+            min_ms = min(min_ms, float(payload["min_ms"]))  # type: ignore[arg-type]
+            max_ms = max(max_ms, float(payload["max_ms"]))  # type: ignore[arg-type]
+
+    if layout is None:
+        return None
+    indexes = sorted(counts)
+    return {
+        "layout": layout,
+        "count": total,
+        "sum_ms": round(sum_ms, 6),
+        "min_ms": min_ms if total else None,
+        "max_ms": max_ms if total else None,
+        "index_deltas": [b - a for a, b in zip([0] + indexes, indexes)],
+        "counts": [counts[index] for index in indexes],
+    }
+
+
+def histogram_percentiles(payload: HistogramPayload, quantiles: Sequence[float]) -> Dict[float, float]:
+    """Return nearest-rank percentiles from a serialized histogram in one pass."""
+
+    total = int(payload["count"])  # type: ignore[arg-type]
+    if total == 0:
+        raise ValueError("histogram is empty")
+    layout = payload["layout"]
+    lowest_ms = float(layout["lowest_ms"])  # type: ignore[index]
+    log_base = math.log1p(float(layout["precision"]))  # type: ignore[index]
+    min_ms = float(payload["min_ms"])  # type: ignore[arg-type]
+    max_ms = float(payload["max_ms"])  # type: ignore[arg-type]
+
+    pending: List[tuple[int, float]] = sorted(
+        (max(math.ceil(quantile * total), 1), quantile) for quantile in quantiles
+    )
+    values: Dict[float, float] = {}
+    seen = 0
+    cursor = 0
+    for index, count in zip(accumulate(payload["index_deltas"]), payload["counts"]):  # type: ignore[arg-type]
+        seen += count
+        while cursor < len(pending) and pending[cursor][0] <= seen:
+            quantile = pending[cursor][1]
+            if quantile >= 1:
+                value = max_ms
+            elif index == 0:
+                value = lowest_ms
+            else:
+                value = math.exp(math.log(lowest_ms) + (index - 0.5) * log_base)
+            values[quantile] = min(max(value, min_ms), max_ms)
+            cursor += 1
+    for _, quantile in pending[cursor:]:
+        values[quantile] = max_ms
+    return values
@@ -0,0 +1,88 @@
+"""Per-phase timing of benchmark runs."""
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Iterable, Mapping
+
+import numpy as np
+
+# Controller-side phases in execution order; together they cover a run's
+# wall time. ``wait`` is further broken down into ``startup`` (image pull,
+# container and interpreter start) and the agent's own phases, which are
+# stored with an ``agent_`` prefix.
+RUN_PHASES = ("queued", "pod_acquire", "exec", "wait", "download", "parse", "teardown")
+AGENT_PREFIX = "agent_"
+
+
+class PhaseTimer:
+    """Accumulates seconds per phase from successive monotonic marks.
+
+    Each ``mark`` attributes the time since the previous mark (or since the
+    timer was created) to the named phase.
+    """
+
+    def __init__(self, durations: Dict[str, float], clock: Callable[[], float] = time.monotonic) -> None:
+        self.durations = durations
+        self._clock = clock
+        self._last = clock()
+
+    def mark(self, phase: str) -> None:
+        now = self._clock()
+        self.durations[phase] = round(self.durations.get(phase, 0.0) + now - self._last, 3)
+        self._last = now
+
+    def skip(self) -> None:
+        """Restart the clock without attributing the elapsed time."""
+
+        self._last = self._clock()
+
+
+def add_agent_phases(durations: Dict[str, float], agent_phases: Mapping[str, object]) -> None:
+    """Store the agent's phases; the rest of ``wait`` is the pod's startup."""
+
+    agent_total = 0.0
+    for name, seconds in agent_phases.items():
+        try:
+            value = float(seconds)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            continue
+        durations[f"{AGENT_PREFIX}{name}"] = round(value, 3)
+        agent_total += value
+    if "wait" in durations and agent_total:
+        durations["startup"] = round(max(0.0, durations["wait"] - agent_total), 3)
+
+
+def phase_percentiles(runs_phases: Iterable[Mapping[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Return count, p50, p95 and mean seconds for every phase seen in the runs.
+
+    ``share`` is the phase's fraction of the summed means of the top-level
+    phases, i.e. where the typical run's wall time goes.
+    """
+
+    samples: Dict[str, list] = {}
+    for phases in runs_phases:
+        for name, seconds in phases.items():
+            samples.setdefault(name, []).append(seconds)
+
+    stats: Dict[str, Dict[str, float]] = {}
+    for name, values in samples.items():
+        array = np.asarray(values, dtype=np.float64)
+        p50, p95 = np.percentile(array, [50, 95])
+        stats[name] = {
+            "count": int(array.size),
+            "p50_s": round(float(p50), 3),
+            "p95_s": round(float(p95), 3),
+            "mean_s": round(float(array.mean()), 3),
+        }
+    # Phases nested inside ``wait`` must not be counted twice.
+    total = sum(entry["mean_s"] for name, entry in stats.items() if name in RUN_PHASES)
+    for name, entry in stats.items():
+        entry["share"] = round(entry["mean_s"] / total, 4) if total else 0.0
+    return dict(sorted(stats.items(), key=lambda item: _phase_order(item[0])))
+
+
+def _phase_order(name: str) -> tuple:
+    if name in RUN_PHASES:
+        return (RUN_PHASES.index(name), 0, name)
+    # Nested phases follow the ``wait`` they belong to.
+    return (RUN_PHASES.index("wait"), 1 if name == "startup" else 2, name)
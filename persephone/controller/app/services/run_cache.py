@@ -0,0 +1,102 @@
+"""Content-addressed deduplication of identical benchmark runs."""
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+
+def run_fingerprint(
+    gpu_type: str,
+    model_ref: str,
+    samples: int,
+    dataset_profile: Optional[str],
+    owner: str,
+    soak_s: Optional[float] = None,
+    inference_backend: str = "mock",
+) -> str:
+    """Return a stable hash of everything that determines a run's result.
+
+    The owner (API key) is part of it, so identical requests are only
+    coalesced or served from cache within one key and never hand one key's
+    run to another. So is the inference backend: a mock result must not be
+    served for a request measured on a real model server.
+    """
+
+    inputs: Dict[str, object] = {
+        "owner": owner,
+        "inference_backend": inference_backend,
+        "gpu_type": gpu_type,
+        "model_ref": model_ref,
+        "samples": samples,
+        "dataset_profile": dataset_profile,
+    }
+    if soak_s is not None:
+        # Only soak runs carry the budget, so fingerprints of other runs are unchanged.
+        inputs["soak_s"] = soak_s
+    key = json.dumps(inputs, sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class RunResultCache:
+    """Maps run fingerprints to in-flight runs and recent successful results.
+
+    ``claim`` atomically either returns an existing run to reuse or records
+    the caller's run as the in-flight one for its fingerprint. Successful
+    results are kept in an LRU of ``max_entries`` and served while younger
+    than the requested max age.
+    """
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._in_flight: Dict[str, str] = {}
+        self._succeeded: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = Lock()
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    def claim(self, fingerprint: str, run_id: str, max_age_s: float, force: bool = False) -> Tuple[str, str]:
+        """Return ``(run_id, source)`` where source is ``new``, ``in_flight`` or ``cached``.
+
+        With ``force`` the caller's run always becomes the in-flight one.
+        """
+
+        with self._lock:
+            if force:
+                self._in_flight[fingerprint] = run_id
+                return run_id, "new"
+            existing = self._in_flight.get(fingerprint)
+            if existing is not None:
+                self.coalesced += 1
+                return existing, "in_flight"
+            cached = self._succeeded.get(fingerprint)
+            if cached is not None and max_age_s > 0 and time.monotonic() - cached[1] <= max_age_s:
+                self._succeeded.move_to_end(fingerprint)
+                self.cache_hits += 1
+                return cached[0], "cached"
+            self._in_flight[fingerprint] = run_id
+            return run_id, "new"
+
+    def finish(self, fingerprint: str, run_id: str, succeeded: bool) -> None:
+        """Release the in-flight slot and remember the run if it succeeded."""
+
+        with self._lock:
+            if self._in_flight.get(fingerprint) == run_id:
+                del self._in_flight[fingerprint]
+            if succeeded:
+                self._succeeded[fingerprint] = (run_id, time.monotonic())
+                self._succeeded.move_to_end(fingerprint)
+                while len(self._succeeded) > self.max_entries:
+                    self._succeeded.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "cached_results": len(self._succeeded),
+                "coalesced": self.coalesced,
+                "cache_hits": self.cache_hits,
+            }
@@ -1,100 +1,957 @@
 """Run orchestration service."""
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import itertools
 import json
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict
+from threading import Event, Lock
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 from uuid import uuid4
 
-from fastapi import BackgroundTasks
-
-from ..providers.runpod_orch import RunpodOrchestrator
-from ..storage.models import Run
-from ..storage.store import InMemoryRunStore
+from ..providers.pod_watcher import MISSING_POD_STATUS
+from ..providers.runpod_orch import ARTIFACT_FILES, RUN_TOKEN_ENV, RunpodOrchestrator
+from ..providers.warm_pool import PodLease, WarmPodPool
+from ..storage.artifact_store import ArtifactRef, ArtifactStore
+from ..storage.models import Artifact, Run
+from ..storage.store import RunQuery, RunStore
+from .analytics import CompareSort, RunAnalytics
+from .correlation import OutlierMetric, latency_outliers, parse_windows
+from .histograms import histogram_percentiles
+from .events import RunEventBroadcaster
+from .phases import PhaseTimer, add_agent_phases, phase_percentiles
+from .run_cache import RunResultCache, run_fingerprint
+from .scheduler import RunScheduler
+from .soak import CHECKPOINTS_FILE, SoakProgress
+from .telemetry import (
+    Columns,
+    build_series,
+    columns_to_csv,
+    iter_lines,
+    load_columnar,
+    load_columnar_chunks,
+    load_csv,
+    load_csv_lines,
+    series_at,
+    summarize_telemetry,
+)
 
 logger = logging.getLogger(__name__)
 
+PriceLookup = Callable[[str], Optional[float]]
+BATCH_RESULTS_FILE = "results.jsonl"
+# Downsampled GPU series are stored per resolution as ``gpu_series_<buckets>`` artifacts.
+SERIES_ARTIFACT_PREFIX = "gpu_series_"
+ACTIVE_STATUSES = {"pending", "running"}
+# Inline artifact keys of the pod files they were collected from.
+INLINE_ARTIFACT_KEYS = {
+    "result.json": "result_json",
+    "gpu_timeseries.csv": "gpu_csv",
+    "gpu_timeseries.ptel": "gpu_columnar",
+    "windows.jsonl": "windows_jsonl",
+}
+
+
+class RunCancelled(Exception):
+    """Raised inside a run when cancellation was requested."""
+
+
+@dataclass
+class OpenedArtifact:
+    """A run artifact ready to be served, in full or by byte range."""
+
+    size: int
+    etag: str
+    read: Callable[[int, int], Iterator[bytes]]
+
 
 class RunService:
     """Business logic for managing benchmark runs."""
 
     def __init__(
         self,
-        store: InMemoryRunStore,
+        store: RunStore,
         orchestrator: RunpodOrchestrator,
         request_timeout_s: int,
+        scheduler: RunScheduler,
+        telemetry_format: str = "csv",
+        inference_backend: str = "mock",
+        events: Optional[RunEventBroadcaster] = None,
+        pool: Optional[WarmPodPool] = None,
+        cache: Optional[RunResultCache] = None,
+        result_max_age_s: float = 0.0,
+        price_lookup: Optional[PriceLookup] = None,
+        sweep_max_configs_per_pod: int = 16,
+        sweep_poll_s: float = 5.0,
+        soak_checkpoint_s: float = 30.0,
+        soak_poll_s: float = 30.0,
+        soak_max_resumes: int = 1,
+        analytics: Optional[RunAnalytics] = None,
+        artifact_store: Optional[ArtifactStore] = None,
+        artifact_inline_max_bytes: int = 256 * 1024,
     ) -> None:
         self._store = store
         self._orchestrator = orchestrator
+        self._pool = pool or WarmPodPool(orchestrator)
+        self._scheduler = scheduler
         self._request_timeout_s = request_timeout_s
+        self._telemetry_format = telemetry_format
+        self._inference_backend = inference_backend
+        self._events = events
+        self._cache = cache
+        self._result_max_age_s = result_max_age_s
+        self._price_lookup = price_lookup
+        self._sweep_max_configs_per_pod = sweep_max_configs_per_pod
+        self._sweep_poll_s = sweep_poll_s
+        self._soak_checkpoint_s = soak_checkpoint_s
+        self._soak_poll_s = soak_poll_s
+        self._soak_max_resumes = soak_max_resumes
+        self._analytics = analytics or RunAnalytics()
+        self._artifact_store = artifact_store
+        self._artifact_inline_max_bytes = artifact_inline_max_bytes
+        # Run id -> scheduler job of its sweep batch, while the batch is queued or running.
+        self._sweep_jobs: Dict[str, str] = {}
+        self._sweep_jobs_lock = Lock()
+
+    @property
+    def inference_backend(self) -> str:
+        return self._inference_backend
 
     def start_run(
         self,
         gpu_type: str,
         model_ref: str,
         samples: int,
-        background_tasks: BackgroundTasks,
-    ) -> Run:
+        owner: str = "default",
+        priority: int = 0,
+        dataset_profile: Optional[str] = None,
+        force: bool = False,
+        max_age_s: Optional[float] = None,
+        soak_s: Optional[float] = None,
+    ) -> Tuple[Run, str]:
+        """Create a pending run and queue it on the scheduler.
+
+        With ``soak_s`` the run is a soak: the agent runs for that many
+        seconds instead of ``samples`` requests and checkpoints its progress,
+        which is followed into ``Run.progress`` while it runs.
+
+        Returns the run and where it came from: ``new``, ``in_flight`` when an
+        identical run is already queued or running, or ``cached`` when an
+        identical run succeeded within ``max_age_s`` (defaults to the
+        configured max age). ``force`` always starts a new run.
+
+        Raises ``SchedulerError`` when the run cannot be queued; the run is
+        then recorded as failed.
+        """
+
         run = Run(
             id=str(uuid4()),
             gpu_type=gpu_type,
             model_ref=model_ref,
             samples=samples,
             status="pending",
+            dataset_profile=dataset_profile,
+            fingerprint=run_fingerprint(
+                gpu_type, model_ref, samples, dataset_profile, owner, soak_s, inference_backend=self._inference_backend
+            ),
+            soak_s=soak_s,
+            inference_backend=self._inference_backend,
         )
+        if self._cache is not None:
+            max_age = self._result_max_age_s if max_age_s is None else max_age_s
+            run_id, source = self._cache.claim(run.fingerprint, run.id, max_age, force=force)
+            if source != "new":
+                existing = self._store.get(run_id)
+                if existing is not None:
+                    return existing, source
+                self._cache.claim(run.fingerprint, run.id, max_age, force=True)
+
         self._store.save(run)
-        background_tasks.add_task(self._execute_run, run.id)
-        return run
+        self._publish(run.id, "status", {"status": run.status})
+        try:
+            self._scheduler.submit(
+                run.id,
+                gpu_type,
+                self._execute_run,
+                owner=owner,
+                priority=priority,
+                on_cancel=self._cancel_queued,
+            )
+        except Exception as exc:
+            run.mark_failed(str(exc), datetime.utcnow())
+            self._finish(run)
+            raise
+        return run, "new"
+
+    def start_sweep(
+        self,
+        gpu_types: Sequence[str],
+        model_refs: Sequence[str],
+        samples: Sequence[int],
+        dataset_profiles: Sequence[Optional[str]] = (None,),
+        owner: str = "default",
+        priority: int = 0,
+    ) -> Tuple[str, List[Run]]:
+        """Queue every combination of the grid, packing configurations onto few pods.
+
+        Configurations are grouped per gpu_type into batches of at most
+        ``sweep_max_configs_per_pod``; each batch is one scheduler job that
+        runs its configurations one after another in a single pod. Cancelling
+        any run of a batch, or the sweep, cancels the whole batch. If a batch
+        cannot be queued, the batches queued before it are cancelled and the
+        ``SchedulerError`` is raised.
+        """
+
+        sweep_id = str(uuid4())
+        runs: List[Run] = []
+        job_ids: List[str] = []
+        for gpu_type in dict.fromkeys(gpu_types):
+            group = [
+                Run(
+                    id=str(uuid4()),
+                    gpu_type=gpu_type,
+                    model_ref=model_ref,
+                    samples=count,
+                    status="pending",
+                    dataset_profile=profile,
+                    fingerprint=run_fingerprint(
+                        gpu_type, model_ref, count, profile, owner, inference_backend=self._inference_backend
+                    ),
+                    sweep_id=sweep_id,
+                    inference_backend=self._inference_backend,
+                )
+                for model_ref, count, profile in itertools.product(
+                    dict.fromkeys(model_refs), dict.fromkeys(samples), dict.fromkeys(dataset_profiles)
+                )
+            ]
+            # Same-model configurations stay adjacent so a batch loads each model once.
+            group.sort(key=lambda run: (run.model_ref, run.dataset_profile or "", run.samples))
+            for start in range(0, len(group), self._sweep_max_configs_per_pod):
+                batch = group[start : start + self._sweep_max_configs_per_pod]
+                for run in batch:
+                    self._store.save(run)
+                    self._publish(run.id, "status", {"status": run.status, "sweep_id": sweep_id})
+                run_ids = [run.id for run in batch]
+                job_id = f"{sweep_id}:{len(job_ids)}"
+                with self._sweep_jobs_lock:
+                    self._sweep_jobs.update(dict.fromkeys(run_ids, job_id))
+                try:
+                    self._scheduler.submit(
+                        job_id,
+                        gpu_type,
+                        functools.partial(self._execute_sweep_batch, run_ids),
+                        owner=owner,
+                        priority=priority,
+                        on_cancel=functools.partial(self._cancel_queued_batch, run_ids),
+                    )
+                except Exception as exc:
+                    self._release_sweep_jobs(run_ids)
+                    for run in batch:
+                        run.mark_failed(str(exc), datetime.utcnow())
+                        self._finish(run)
+                    for queued in job_ids:
+                        self._scheduler.cancel(queued, reason=f"sweep could not be queued: {exc}")
+                    raise
+                job_ids.append(job_id)
+                runs.extend(batch)
+        return sweep_id, runs
+
+    def get_sweep(self, sweep_id: str) -> Optional[Dict[str, object]]:
+        """Return a sweep's runs with its aggregate status and cost."""
+
+        runs = self._store.query_runs(RunQuery(sweep_id=sweep_id, limit=100000))
+        if not runs:
+            return None
+        counts: Dict[str, int] = {}
+        for run in runs:
+            counts[run.status] = counts.get(run.status, 0) + 1
+        if counts.get("pending", 0) == len(runs):
+            status = "pending"
+        elif any(run.status in ACTIVE_STATUSES for run in runs):
+            status = "running"
+        elif counts.get("succeeded", 0) == len(runs):
+            status = "succeeded"
+        elif counts.get("succeeded", 0):
+            status = "partial"
+        else:
+            status = "failed"
+        costs = [run.cost_usd for run in runs if run.cost_usd is not None]
+        return {
+            "sweep_id": sweep_id,
+            "status": status,
+            "counts": counts,
+            "cost_usd": round(sum(costs), 6) if costs else None,
+            "runs": sorted(runs, key=lambda run: (run.gpu_type, run.model_ref, run.samples)),
+        }
+
+    def cancel_sweep(self, sweep_id: str) -> int:
+        """Cancel every queued or running batch of a sweep; returns batches cancelled."""
+
+        runs = self._store.query_runs(RunQuery(sweep_id=sweep_id, limit=100000))
+        with self._sweep_jobs_lock:
+            job_ids = {self._sweep_jobs[run.id] for run in runs if run.id in self._sweep_jobs}
+        return sum(1 for job_id in job_ids if self._scheduler.cancel(job_id))
+
+    def cancel_run(self, run_id: str) -> Optional[str]:
+        """Cancel a queued or running run; returns its state when cancelled.
+
+        A run of a sweep batch cancels the whole batch.
+        """
+
+        with self._sweep_jobs_lock:
+            job_id = self._sweep_jobs.get(run_id, run_id)
+        return self._scheduler.cancel(job_id)
+
+    def _cancel_queued(self, run_id: str, reason: str) -> None:
+        run = self._store.get(run_id)
+        if not run:
+            return
+        run.mark_cancelled(reason, datetime.utcnow())
+        self._finish(run)
+
+    def _cancel_queued_batch(self, run_ids: List[str], _job_id: str, reason: str) -> None:
+        self._release_sweep_jobs(run_ids)
+        for run_id in run_ids:
+            self._cancel_queued(run_id, reason)
+
+    def _release_sweep_jobs(self, run_ids: List[str]) -> None:
+        with self._sweep_jobs_lock:
+            for run_id in run_ids:
+                self._sweep_jobs.pop(run_id, None)
 
     def get_run(self, run_id: str) -> Run | None:
         return self._store.get(run_id)
 
-    def _execute_run(self, run_id: str) -> None:
-        run = self._store.get(run_id)
+    def list_runs(self, query: RunQuery, include_artifacts: bool = False) -> List[Run]:
+        runs = self._store.query_runs(query)
+        if include_artifacts:
+            # Stores may omit artifacts from queries; load them for this page only.
+            runs = [self._store.get(run.id) or run for run in runs]
+        return runs
+
+    def throughput_by_gpu_type(self, model_ref: str, recent: int = 1000, soak: bool = False) -> Dict[str, float]:
+        """Return mean measured throughput per gpu_type over recent successful runs of ``model_ref``.
+
+        Throughput is only comparable across GPUs for the same model served
+        by the same inference backend and measured the same way, so only
+        runs on the configured backend and, unless ``soak``, sample-count
+        (not soak) runs are counted.
+        """
+
+        totals: Dict[str, List[float]] = {}
+        for run in self._store.query_runs(RunQuery(status="succeeded", model_ref=model_ref, limit=recent)):
+            if not run.throughput_rps or run.inference_backend != self._inference_backend:
+                continue
+            if (run.soak_s is not None) == soak:
+                totals.setdefault(run.gpu_type, []).append(run.throughput_rps)
+        return {gpu_type: sum(values) / len(values) for gpu_type, values in totals.items()}
+
+    def compare_gpus(
+        self,
+        model_ref: str,
+        dataset_profile: Optional[str] = None,
+        gpu_types: Optional[Sequence[str]] = None,
+        sort: CompareSort = "throughput",
+        inference_backend: Optional[str] = None,
+        soak: bool = False,
+    ) -> List[Dict[str, object]]:
+        """Compare gpu_types on the successful runs of one model.
+
+        Only runs served by ``inference_backend`` (the configured one by
+        default) and of the same mode, soak or sample-count, are compared.
+        The first call backfills the analytics from the store; after that
+        runs are added as they finish.
+        """
+
+        if not self._analytics.loaded:
+            self._analytics.load(self._succeeded_runs_for_analytics(), self._telemetry_summary)
+        return self._analytics.compare(
+            model_ref,
+            dataset_profile,
+            gpu_types,
+            self._price_lookup,
+            sort,
+            inference_backend=inference_backend or self._inference_backend,
+            soak=soak,
+        )
+
+    def _succeeded_runs_for_analytics(self, page_size: int = 500) -> Iterator[Run]:
+        """Yield succeeded runs newest first, a page at a time.
+
+        Runs without a stored telemetry summary need their artifacts; those
+        the analytics would keep are loaded with one ``get_many`` per page.
+        """
+
+        query = RunQuery(status="succeeded", limit=page_size)
+        while True:
+            page = self._store.query_runs(query)
+            missing = [run.id for run in self._analytics.wanted(page) if not run.telemetry_summary]
+            loaded = self._store.get_many(missing) if missing else {}
+            for run in page:
+                yield loaded.get(run.id, run)
+            if len(page) < page_size:
+                return
+            query.before = (page[-1].started_at, page[-1].id)
+
+    def phase_stats(self, query: RunQuery) -> Dict[str, object]:
+        """Return p50/p95 seconds per phase across the runs matching ``query``."""
+
+        runs = [run for run in self._store.query_runs(query) if run.phases]
+        return {"runs": len(runs), "phases": phase_percentiles(run.phases for run in runs)}
+
+    def telemetry_csv(self, run: Run) -> Optional[str]:
+        """Return the run's GPU time series as CSV, decoding columnar data if needed."""
+
+        csv_text = run.artifacts.get("gpu_csv")
+        if isinstance(csv_text, str) and csv_text:
+            return csv_text
+        columnar = self.read_artifact(run, "gpu_timeseries.ptel")
+        if columnar:
+            return columns_to_csv(load_columnar(columnar))
+        stored_csv = self.read_artifact(run, "gpu_timeseries.csv")
+        return stored_csv.decode("utf-8") if stored_csv else None
+
+    def latency_outliers(
+        self, run: Run, metric: OutlierMetric = "latency_p95_ms", threshold: float = 3.0, min_requests: int = 5
+    ) -> Optional[Dict[str, object]]:
+        """Report the run's latency outlier windows with their GPU state, if the agent recorded windows."""
+
+        windows = self.read_artifact(run, "windows.jsonl")
+        if windows is None:
+            return None
+        return latency_outliers(parse_windows(windows.decode("utf-8")), metric, threshold, min_requests)
+
+    def read_artifact(self, run: Run, name: str) -> Optional[bytes]:
+        """Return the contents of the pod file ``name`` collected for ``run``."""
+
+        opened = self.open_artifact(run, name)
+        return b"".join(opened.read(0, opened.size)) if opened else None
+
+    def open_artifact(self, run: Run, name: str) -> Optional[OpenedArtifact]:
+        """Locate the pod file ``name`` of ``run`` in the artifact store or inline on the run."""
+
+        ref_data = run.artifact_refs.get(name)
+        if ref_data and self._artifact_store is not None:
+            ref = ArtifactRef.from_dict(ref_data)
+            if self._artifact_store.exists(ref.digest):
+                store = self._artifact_store
+                return OpenedArtifact(
+                    size=ref.size,
+                    etag=ref.digest,
+                    read=lambda start, end: store.iter_range(ref.digest, start, end),
+                )
+        inline = run.artifacts.get(INLINE_ARTIFACT_KEYS.get(name, name))
+        if isinstance(inline, str):
+            inline = inline.encode("utf-8")
+        if not inline:
+            return None
+        data: bytes = inline
+        return OpenedArtifact(
+            size=len(data),
+            etag=hashlib.sha256(data).hexdigest(),
+            read=lambda start, end: iter((data[start:end],)),
+        )
+
+    def telemetry_series(self, run: Run, resolution: int) -> Optional[str]:
+        """Return the run's GPU series as JSON with at most ``resolution`` points per device.
+
+        Served from the largest precomputed level that fits; other
+        resolutions are downsampled from the raw series on demand.
+        """
+
+        samples = int(run.telemetry_summary.get("samples", 0))
+        levels = sorted(
+            int(name[len(SERIES_ARTIFACT_PREFIX) :]) for name in run.artifacts if name.startswith(SERIES_ARTIFACT_PREFIX)
+        )
+        fitting = [level for level in levels if level <= resolution]
+        if samples > resolution and fitting:
+            level = fitting[-1]
+            body = run.artifacts[f"{SERIES_ARTIFACT_PREFIX}{level}"]
+        else:
+            columns = self._telemetry_columns(run)
+            if columns is None:
+                return None
+            level = min(resolution, samples) if samples else resolution
+            body = json.dumps(series_at(columns, resolution), separators=(",", ":"))
+        # Stored levels are already JSON; splice them in without decoding.
+        return f'{{"resolution":{level},"samples":{samples},"gpus":{body!s}}}'
+
+    def _finish(self, run: Run) -> None:
+        """Persist a run in its terminal state and release its fingerprint."""
+
+        self._store.update(run)
+        if run.status == "succeeded":
+            self._analytics.add(run, self._telemetry_summary(run))
+        if self._cache is not None and run.fingerprint:
+            self._cache.finish(run.fingerprint, run.id, succeeded=run.status == "succeeded")
+        self._publish(run.id, "status", {"status": run.status, "error_message": run.error_message}, final=True)
+
+    def _publish(self, run_id: str, event: str, data: Dict[str, object], final: bool = False) -> None:
+        if self._events is not None:
+            self._events.publish(run_id, event, data, final=final)
+
+    async def _execute_run(self, run_id: str, cancel_event: Optional[Event] = None) -> None:
+        def checkpoint() -> None:
+            if cancel_event is not None and cancel_event.is_set():
+                raise RunCancelled("cancelled by user")
+
+        # Store calls and artifact parsing block, so they run in worker threads, off the event loop.
+        run = await asyncio.to_thread(self._store.get, run_id)
         if not run:
             logger.error("Run %s not found in store", run_id)
             return
 
+        run.phases = {"queued": round(max(0.0, (datetime.utcnow() - run.started_at).total_seconds()), 3)}
+        timer = PhaseTimer(run.phases)
         run.mark_running()
-        self._store.update(run)
+        await asyncio.to_thread(self._store.update, run)
+        self._publish(run_id, "status", {"status": run.status})
 
-        pod_id = None
+        lease: Optional[PodLease] = None
         try:
-            env = {"MODEL_REF": run.model_ref, "SAMPLES": str(run.samples)}
-            pod_id = self._orchestrator.create_pod(run.gpu_type, env)
-            logger.info("Created pod %s for run %s", pod_id, run_id)
+            env = {
+                "MODEL_REF": run.model_ref,
+                "SAMPLES": str(run.samples),
+                "TELEMETRY_FORMAT": self._telemetry_format,
+                "INFERENCE_BACKEND": self._inference_backend,
+                RUN_TOKEN_ENV: uuid4().hex,
+            }
+            if run.dataset_profile:
+                env["DATASET_PROFILE"] = run.dataset_profile
+            if run.soak_s is not None:
+                env["SOAK_S"] = str(run.soak_s)
+                env["CHECKPOINT_S"] = str(self._soak_checkpoint_s)
+            checkpoint()
+            lease = await self._pool.acquire(run.gpu_type, run.model_ref, env)
+            timer.mark("pod_acquire")
+            logger.info("Acquired %s pod %s for run %s", "warm" if lease.warm else "new", lease.pod_id, run_id)
+            self._publish(run_id, "phase", {"phase": "pod_created", "pod_id": lease.pod_id, "warm": lease.warm})
 
-            self._orchestrator.exec(pod_id, ["python", "agent.py", "run"])
-            artifacts = self._orchestrator.wait_and_fetch(pod_id, self._request_timeout_s)
-            parsed = self._parse_artifacts(artifacts)
-            run.mark_succeeded(
-                latency_p50_ms=parsed["result"].get("latency_p50_ms", 0.0),
-                latency_p95_ms=parsed["result"].get("latency_p95_ms", 0.0),
-                throughput_rps=parsed["result"].get("throughput_rps", 0.0),
-                artifacts={
-                    "result_json": parsed["artifacts"].get("result.json", ""),
-                    "gpu_csv": parsed["artifacts"].get("gpu_timeseries.csv", ""),
+            checkpoint()
+            exec_started = time.monotonic()
+            await self._orchestrator.exec(lease.pod_id, ["python", "agent.py", "run"], env=env)
+            timer.mark("exec")
+            self._publish(run_id, "phase", {"phase": "executing"})
+            if run.soak_s is not None:
+                fetched = await self._follow_soak(run, lease.pod_id, env, checkpoint)
+            else:
+                fetched = await self._orchestrator.wait_and_fetch(
+                    lease.pod_id,
+                    self._request_timeout_s,
+                    phases=run.phases,
+                    store=self._artifact_store,
+                    run_token=env[RUN_TOKEN_ENV],
+                )
+            timer.skip()
+            run.cost_usd = self._pod_cost(run.gpu_type, time.monotonic() - exec_started)
+            checkpoint()
+            self._publish(run_id, "phase", {"phase": "fetched"})
+            await asyncio.to_thread(self._record_result, run, fetched)
+            timer.mark("parse")
+            self._publish(
+                run_id,
+                "metrics",
+                {
+                    "latency_p50_ms": run.latency_p50_ms,
+                    "latency_p95_ms": run.latency_p95_ms,
+                    "latency_p99_ms": run.latency_p99_ms,
+                    "throughput_rps": run.throughput_rps,
                 },
-                finished_at=datetime.utcnow(),
             )
+            self._publish(run_id, "telemetry", run.telemetry_summary)
+        except RunCancelled as exc:
+            logger.info("Run %s cancelled", run_id)
+            run.mark_cancelled(str(exc), datetime.utcnow())
         except Exception as exc:  # pylint: disable=broad-except
             logger.exception("Run %s failed: %s", run_id, exc)
             run.mark_failed(str(exc), datetime.utcnow())
         finally:
-            if pod_id:
+            if lease is not None:
+                timer.skip()
+                try:
+                    await self._pool.release(lease, healthy=run.status == "succeeded")
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception("Failed to release pod %s", lease.pod_id)
+                timer.mark("teardown")
+            await asyncio.to_thread(self._finish, run)
+
+    def _record_result(self, run: Run, fetched: Dict[str, Artifact | ArtifactRef]) -> None:
+        """Parse the fetched artifacts into the run's metrics and telemetry and mark it succeeded."""
+
+        parsed = self._parse_artifacts(self._resolve_artifacts(run, fetched))
+        add_agent_phases(run.phases, parsed["result"].get("phases") or {})
+        run.mark_succeeded(
+            latency_p50_ms=parsed["result"].get("latency_p50_ms", 0.0),
+            latency_p95_ms=parsed["result"].get("latency_p95_ms", 0.0),
+            throughput_rps=parsed["result"].get("throughput_rps", 0.0),
+            latency_p99_ms=parsed["result"].get("latency_p99_ms"),
+            artifacts=self._collect_artifacts(parsed["artifacts"]),
+            finished_at=datetime.utcnow(),
+        )
+        self._ingest_telemetry(run)
+
+    async def _follow_soak(
+        self, run: Run, pod_id: str, env: Dict[str, str], checkpoint: Callable[[], None]
+    ) -> Dict[str, Artifact | ArtifactRef]:
+        """Wait for a soak run while following its checkpoints.
+
+        Every ``soak_poll_s`` only the checkpoint lines appended since the
+        last poll are fetched. If the agent stops without a result after at
+        least one checkpoint, it is started again with ``RESUME=1`` up to
+        ``soak_max_resumes`` times and continues from its last checkpoint;
+        otherwise the run fails with the progress of its last checkpoint kept.
+        The checkpoints live in the pod's workspace, so a pod that is no longer
+        running (e.g. preempted) cannot be resumed and the run fails right away.
+        """
+
+        progress = SoakProgress()
+        timeout_s = self._request_timeout_s + int(run.soak_s or 0)
+        for attempt in itertools.count():
+            waiter = asyncio.ensure_future(
+                self._orchestrator.wait_and_fetch(
+                    pod_id, timeout_s, phases=run.phases, store=self._artifact_store, run_token=env[RUN_TOKEN_ENV]
+                )
+            )
+            try:
+                while not waiter.done():
+                    await asyncio.wait({waiter}, timeout=self._soak_poll_s)
+                    checkpoint()
+                    if not waiter.done():
+                        await self._poll_soak(run, pod_id, progress)
+            finally:
+                waiter.cancel()
+            try:
+                fetched = waiter.result()
+            except RuntimeError as exc:
+                await self._poll_soak(run, pod_id, progress)
+                if not progress.checkpoints or attempt >= self._soak_max_resumes:
+                    raise
+                status = (await self._orchestrator.get_pod_statuses([pod_id])).get(pod_id, MISSING_POD_STATUS)
+                if status != "RUNNING":
+                    raise RuntimeError(
+                        f"{exc}; pod {pod_id} is {status}, so the soak cannot resume from t={progress.elapsed_s}s"
+                    ) from exc
+                logger.warning(
+                    "Soak run %s stopped at t=%ss (%s); resuming from its last checkpoint", run.id, progress.elapsed_s, exc
+                )
+                self._publish(run.id, "phase", {"phase": "resuming", "elapsed_s": progress.elapsed_s})
+                progress.discard_partial()
+                await self._orchestrator.exec(pod_id, ["python", "agent.py", "run"], env={**env, "RESUME": "1"})
+                continue
+            await self._poll_soak(run, pod_id, progress)
+            return fetched
+        raise AssertionError("unreachable")
+
+    async def _poll_soak(self, run: Run, pod_id: str, progress: SoakProgress) -> None:
+        data = await self._orchestrator.fetch_from(pod_id, CHECKPOINTS_FILE, progress.offset)
+        if data and await asyncio.to_thread(progress.feed, data):
+            run.progress = progress.summary()
+            await asyncio.to_thread(self._store.update, run)
+            self._publish(run.id, "progress", run.progress)
+
+    async def _execute_sweep_batch(
+        self, run_ids: List[str], _job_id: str, cancel_event: Optional[Event] = None
+    ) -> None:
+        def checkpoint() -> None:
+            if cancel_event is not None and cancel_event.is_set():
+                raise RunCancelled("cancelled by user")
+
+        runs = await asyncio.to_thread(self._start_batch, run_ids)
+        if not runs:
+            self._release_sweep_jobs(run_ids)
+            return
+        first = next(iter(runs.values()))
+        # The pod's phases are shared by every run of the batch; each keeps its own ``queued``.
+        phases: Dict[str, float] = {}
+        timer = PhaseTimer(phases)
+
+        batch = [
+            {"id": run.id, "model_ref": run.model_ref, "samples": run.samples, "dataset_profile": run.dataset_profile}
+            for run in runs.values()
+        ]
+        env = {
+            "MODEL_REF": first.model_ref,
+            "SAMPLES": str(first.samples),
+            "TELEMETRY_FORMAT": self._telemetry_format,
+            "INFERENCE_BACKEND": self._inference_backend,
+            "BATCH_CONFIG": json.dumps(batch),
+            RUN_TOKEN_ENV: uuid4().hex,
+        }
+        windows: Dict[str, Tuple[float, float]] = {}
+        lease: Optional[PodLease] = None
+        exec_started: Optional[float] = None
+        try:
+            checkpoint()
+            lease = await self._pool.acquire(first.gpu_type, first.model_ref, env)
+            timer.mark("pod_acquire")
+            for run in runs.values():
+                self._publish(run.id, "phase", {"phase": "pod_created", "pod_id": lease.pod_id, "warm": lease.warm})
+
+            checkpoint()
+            exec_started = time.monotonic()
+            await self._orchestrator.exec(lease.pod_id, ["python", "agent.py", "run"], env=env)
+            timer.mark("exec")
+            for run in runs.values():
+                self._publish(run.id, "phase", {"phase": "executing"})
+            waiter = asyncio.ensure_future(
+                self._orchestrator.wait_and_fetch(
+                    lease.pod_id,
+                    self._request_timeout_s,
+                    phases=phases,
+                    store=self._artifact_store,
+                    run_token=env[RUN_TOKEN_ENV],
+                )
+            )
+            try:
+                while not waiter.done():
+                    await asyncio.wait({waiter}, timeout=self._sweep_poll_s)
+                    checkpoint()
+                    if not waiter.done():
+                        partial = await self._orchestrator.fetch_text(lease.pod_id, BATCH_RESULTS_FILE)
+                        await asyncio.to_thread(self._apply_batch_results, runs, partial, windows)
+            finally:
+                waiter.cancel()
+            fetched = waiter.result()
+            timer.skip()
+            results = await asyncio.to_thread(self._fetched_text, fetched, BATCH_RESULTS_FILE)
+            await asyncio.to_thread(self._apply_batch_results, runs, results, windows)
+            await asyncio.to_thread(self._attach_batch_telemetry, runs, fetched, windows)
+            timer.mark("parse")
+            for run in runs.values():
+                if run.status == "running":
+                    run.mark_failed("no result in batch output", datetime.utcnow())
+        except RunCancelled as exc:
+            logger.info("Sweep batch %s cancelled", list(runs))
+            for run in runs.values():
+                if run.status == "running":
+                    run.mark_cancelled(str(exc), datetime.utcnow())
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Sweep batch %s failed: %s", list(runs), exc)
+            for run in runs.values():
+                if run.status == "running":
+                    run.mark_failed(str(exc), datetime.utcnow())
+        finally:
+            if lease is not None:
+                timer.skip()
                 try:
-                    self._orchestrator.stop_pod(pod_id)
+                    await self._pool.release(lease, healthy=all(run.status == "succeeded" for run in runs.values()))
                 except Exception:  # pylint: disable=broad-except
-                    logger.exception("Failed to stop pod %s", pod_id)
+                    logger.exception("Failed to release pod %s", lease.pod_id)
+                timer.mark("teardown")
+            if exec_started is not None:
+                self._split_batch_cost(runs, windows, time.monotonic() - exec_started)
+            self._release_sweep_jobs(run_ids)
+            for run in runs.values():
+                run.phases.update(phases)
+                await asyncio.to_thread(self._finish, run)
+
+    def _start_batch(self, run_ids: List[str]) -> Dict[str, Run]:
+        runs = {run.id: run for run in (self._store.get(run_id) for run_id in run_ids) if run is not None}
+        for run in runs.values():
+            run.phases = {"queued": round(max(0.0, (datetime.utcnow() - run.started_at).total_seconds()), 3)}
+            run.mark_running()
             self._store.update(run)
+            self._publish(run.id, "status", {"status": run.status})
+        return runs
+
+    def _apply_batch_results(
+        self, runs: Dict[str, Run], text: Optional[Artifact], windows: Dict[str, Tuple[float, float]]
+    ) -> None:
+        """Record sub-results from ``results.jsonl`` for runs still in progress."""
+
+        if not isinstance(text, str):
+            return
+        for line in text.splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # The agent may be mid-write on the last line.
+            run = runs.get(entry.get("id"))
+            if run is None or run.status != "running":
+                continue
+            if entry.get("window_s"):
+                windows[run.id] = (float(entry["window_s"][0]), float(entry["window_s"][1]))
+            if "error" in entry:
+                run.mark_failed(str(entry["error"]), datetime.utcnow())
+                self._store.update(run)
+                continue
+            parsed = self._parse_artifacts({"result.json": json.dumps(entry.get("result", {}))})
+            result = parsed["result"]
+            run.mark_succeeded(
+                latency_p50_ms=result.get("latency_p50_ms", 0.0),
+                latency_p95_ms=result.get("latency_p95_ms", 0.0),
+                throughput_rps=result.get("throughput_rps", 0.0),
+                latency_p99_ms=result.get("latency_p99_ms"),
+                artifacts={"result_json": json.dumps(result)},
+                finished_at=datetime.utcnow(),
+            )
+            self._store.update(run)
+            self._publish(
+                run.id,
+                "metrics",
+                {
+                    "latency_p50_ms": run.latency_p50_ms,
+                    "latency_p95_ms": run.latency_p95_ms,
+                    "latency_p99_ms": run.latency_p99_ms,
+                    "throughput_rps": run.throughput_rps,
+                },
+            )
+
+    def _attach_batch_telemetry(
+        self,
+        runs: Dict[str, Run],
+        fetched: Dict[str, Artifact | ArtifactRef],
+        windows: Dict[str, Tuple[float, float]],
+    ) -> None:
+        """Give each finished sub-run the slice of the pod's GPU time series it ran in."""
+
+        store = self._artifact_store
+        try:
+            columnar = fetched.get("gpu_timeseries.ptel")
+            csv_text = fetched.get("gpu_timeseries.csv")
+            if isinstance(columnar, ArtifactRef) and columnar.size and store is not None:
+                # Stored files are decoded chunk by chunk instead of being read whole.
+                columns = load_columnar_chunks(store.iter_range(columnar.digest))
+            elif isinstance(columnar, bytes) and columnar:
+                columns = load_columnar(columnar)
+            elif isinstance(csv_text, ArtifactRef) and csv_text.size and store is not None:
+                columns = load_csv_lines(iter_lines(store.iter_range(csv_text.digest)))
+            elif isinstance(csv_text, str) and csv_text:
+                columns = load_csv(csv_text)
+            else:
+                return
+        except ValueError:
+            logger.warning("Could not parse batch telemetry for %s", list(runs))
+            return
+        if "t" not in columns:
+            return
+        for run_id, (start, end) in windows.items():
+            run = runs[run_id]
+            if run.status != "succeeded":
+                continue
+            mask = (columns["t"] >= start) & (columns["t"] <= end)
+            window = {name: values[mask] for name, values in columns.items()}
+            run.artifacts["gpu_csv"] = columns_to_csv(window)
+            self._ingest_telemetry(run, window)
+            self._publish(run.id, "telemetry", run.telemetry_summary)
+
+    def _fetched_text(self, fetched: Dict[str, Artifact | ArtifactRef], name: str) -> Optional[Artifact]:
+        value = fetched.get(name)
+        if isinstance(value, ArtifactRef):
+            return self._artifact_store.read(value.digest).decode("utf-8")  # type: ignore[union-attr]
+        return value
+
+    def _split_batch_cost(
+        self, runs: Dict[str, Run], windows: Dict[str, Tuple[float, float]], pod_seconds: float
+    ) -> None:
+        """Apportion the batch's pod time to its runs by how long each one ran."""
+
+        total = self._pod_cost(next(iter(runs.values())).gpu_type, pod_seconds)
+        if total is None:
+            return
+        durations = {run_id: max(end - start, 0.0) for run_id, (start, end) in windows.items()}
+        measured = sum(durations.values())
+        for run in runs.values():
+            share = durations.get(run.id, 0.0) / measured if measured else 1.0 / len(runs)
+            run.cost_usd = round(total * share, 6)
+
+    def _pod_cost(self, gpu_type: str, seconds: float) -> Optional[float]:
+        hourly_usd = self._price_lookup(gpu_type) if self._price_lookup else None
+        return round(hourly_usd * seconds / 3600.0, 6) if hourly_usd is not None else None
+
+    def _telemetry_summary(self, run: Run) -> Dict[str, float]:
+        if run.telemetry_summary:
+            return run.telemetry_summary
+        columns = self._telemetry_columns(run)
+        return summarize_telemetry(columns) if columns is not None else {}
+
+    def _ingest_telemetry(self, run: Run, columns: Optional[Columns] = None) -> None:
+        """Parse the run's telemetry once into its summary and downsampled series."""
+
+        columns = columns if columns is not None else self._telemetry_columns(run)
+        if columns is None:
+            return
+        run.telemetry_summary = summarize_telemetry(columns)
+        for level, series in build_series(columns).items():
+            run.artifacts[f"{SERIES_ARTIFACT_PREFIX}{level}"] = json.dumps(series, separators=(",", ":"))
+
+    def _telemetry_columns(self, run: Run) -> Optional[Columns]:
+        try:
+            columnar = run.artifacts.get("gpu_columnar")
+            if isinstance(columnar, bytes) and columnar:
+                return load_columnar(columnar)
+            # Stored files are decoded chunk by chunk instead of being read whole.
+            opened = self.open_artifact(run, "gpu_timeseries.ptel")
+            if opened is not None and opened.size:
+                return load_columnar_chunks(opened.read(0, opened.size))
+            csv_text = run.artifacts.get("gpu_csv")
+            if isinstance(csv_text, str) and csv_text:
+                return load_csv(csv_text)
+            opened = self.open_artifact(run, "gpu_timeseries.csv")
+            if opened is not None and opened.size:
+                return load_csv_lines(iter_lines(opened.read(0, opened.size)))
+            return None
+        except ValueError:
+            logger.warning("Could not parse telemetry for run %s", run.id)
+            return None
+
+    def _resolve_artifacts(self, run: Run, fetched: Dict[str, Artifact | ArtifactRef]) -> Dict[str, Artifact]:
+        """Record stored artifacts on the run and load the ones that are parsed or kept inline.
+
+        ``result.json`` is always loaded. Other text files are loaded only up
+        to the inline size limit; larger and binary files stay in the store
+        and are read from it on demand.
+        """
+
+        artifacts: Dict[str, Artifact] = {}
+        for name, value in fetched.items():
+            if not isinstance(value, ArtifactRef):
+                artifacts[name] = value
+                continue
+            run.artifact_refs[name] = value.to_dict()
+            if ARTIFACT_FILES.get(name, True):
+                continue
+            if name == "result.json" or value.size <= self._artifact_inline_max_bytes:
+                artifacts[name] = self._artifact_store.read(value.digest).decode("utf-8")  # type: ignore[union-attr]
+        return artifacts
 
     @staticmethod
-    def _parse_artifacts(artifacts: Dict[str, str]) -> Dict[str, Dict[str, str | float]]:
+    def _collect_artifacts(artifacts: Dict[str, Artifact]) -> Dict[str, Artifact]:
+        collected: Dict[str, Artifact] = {
+            "result_json": artifacts.get("result.json", ""),
+            "gpu_csv": artifacts.get("gpu_timeseries.csv", ""),
+        }
+        columnar = artifacts.get("gpu_timeseries.ptel")
+        if isinstance(columnar, bytes) and columnar:
+            # Keep the compact form only; CSV is rendered on demand by the telemetry endpoint.
+            collected["gpu_columnar"] = columnar
+            del collected["gpu_csv"]
+        windows = artifacts.get("windows.jsonl")
+        if isinstance(windows, str) and windows:
+            collected["windows_jsonl"] = windows
+        return collected
+
+    @staticmethod
+    def _parse_artifacts(artifacts: Dict[str, Artifact]) -> Dict[str, Dict[str, Artifact | float]]:
         result_blob = artifacts.get("result.json", "{}")
         try:
             result_data = json.loads(result_blob)
         except json.JSONDecodeError:
             result_data = {}
 
+        # Only the top-level histogram counts: with several workers the agent
+        # already combined them, and a worker's own histogram is for its best
+        # batch size, which need not be the one reported.
+        histogram = result_data.get("latency_histogram")
+        if isinstance(histogram, dict) and histogram.get("count"):
+            latency = histogram_percentiles(histogram, (0.50, 0.95, 0.99))
+            result_data["latency_p50_ms"] = round(latency[0.50], 3)
+            result_data["latency_p95_ms"] = round(latency[0.95], 3)
+            result_data["latency_p99_ms"] = round(latency[0.99], 3)
+
         return {"result": result_data, "artifacts": artifacts}
@@ -0,0 +1,259 @@
+"""Bounded run scheduler with priorities and fair share across API keys."""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from bisect import insort
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Event, Lock
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Either a coroutine function run on the event loop or a blocking function run on the pool.
+JobFunc = Callable[[str, Event], Union[None, Awaitable[None]]]
+CancelFunc = Callable[[str, str], None]
+
+
+class SchedulerError(RuntimeError):
+    """Raised when a run cannot be accepted by the scheduler."""
+
+
+@dataclass(order=True)
+class _Job:
+    sort_key: tuple = field(init=False, repr=False)
+    priority: int = field(compare=False)
+    sequence: int = field(compare=False)
+    run_id: str = field(compare=False)
+    gpu_type: str = field(compare=False)
+    owner: str = field(compare=False)
+    func: JobFunc = field(compare=False, repr=False)
+    on_cancel: Optional[CancelFunc] = field(compare=False, repr=False, default=None)
+    submitted_at: float = field(compare=False, default_factory=time.monotonic)
+    cancel_event: Event = field(compare=False, default_factory=Event)
+
+    def __post_init__(self) -> None:
+        # Higher priority first, then FIFO within a priority.
+        self.sort_key = (-self.priority, self.sequence)
+
+
+class RunScheduler:
+    """Queues runs and executes them under global and per-GPU-type limits.
+
+    Each API key (``owner``) has its own priority-ordered queue. When a slot
+    frees up, the dispatcher picks the highest-priority runnable job across
+    owners; ties go to the owner with the fewest runs in flight, then to the
+    one served least recently. Coroutine jobs run on the event loop; blocking
+    jobs run on a dedicated thread pool so that they never occupy the web
+    server's threads.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        gpu_limits: Optional[Dict[str, int]] = None,
+        max_queue: int = 1000,
+    ) -> None:
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        self.max_concurrency = max_concurrency
+        self.gpu_limits = dict(gpu_limits or {})
+        self.max_queue = max_queue
+        self._queues: Dict[str, List[_Job]] = {}
+        self._running: Dict[str, _Job] = {}
+        self._running_by_gpu: Dict[str, int] = {}
+        self._running_by_owner: Dict[str, int] = {}
+        self._last_served: Dict[str, int] = {}
+        self._sequence = itertools.count()
+        # Counts dispatches, so _last_served orders owners by when they were last served.
+        self._dispatches = itertools.count()
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="run-worker")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._closed = False
+        self._completed = 0
+
+    async def start(self) -> None:
+        """Start dispatching on the running event loop."""
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch_forever())
+
+    def submit(
+        self,
+        run_id: str,
+        gpu_type: str,
+        func: JobFunc,
+        owner: str = "default",
+        priority: int = 0,
+        on_cancel: Optional[CancelFunc] = None,
+    ) -> None:
+        """Queue ``func(run_id, cancel_event)``; safe to call from any thread."""
+
+        if self._loop is None:
+            raise SchedulerError("scheduler is not running")
+        with self._lock:
+            if self._closed:
+                raise SchedulerError("scheduler is shutting down")
+            if self._queued_count() >= self.max_queue:
+                raise SchedulerError("run queue is full")
+            job = _Job(
+                priority=priority,
+                sequence=next(self._sequence),
+                run_id=run_id,
+                gpu_type=gpu_type,
+                owner=owner,
+                func=func,
+                on_cancel=on_cancel,
+            )
+            insort(self._queues.setdefault(owner, []), job)
+        self._notify()
+
+    def cancel(self, run_id: str, reason: str = "cancelled by user") -> Optional[str]:
+        """Cancel a run; returns ``"queued"``, ``"running"`` or ``None`` if unknown."""
+
+        job: Optional[_Job] = None
+        with self._lock:
+            running = self._running.get(run_id)
+            if running is not None:
+                running.cancel_event.set()
+                return "running"
+            for queue in self._queues.values():
+                job = next((queued for queued in queue if queued.run_id == run_id), None)
+                if job is not None:
+                    queue.remove(job)
+                    break
+        if job is None:
+            return None
+        if job.on_cancel:
+            job.on_cancel(run_id, reason)
+        return "queued"
+
+    def stats(self) -> Dict[str, object]:
+        """Return queue depth and in-flight counts for monitoring."""
+
+        with self._lock:
+            queued_by_gpu: Dict[str, int] = {}
+            queued_by_owner: Dict[str, int] = {}
+            oldest_wait = 0.0
+            now = time.monotonic()
+            for owner, queue in self._queues.items():
+                if queue:
+                    queued_by_owner[owner] = len(queue)
+                for job in queue:
+                    queued_by_gpu[job.gpu_type] = queued_by_gpu.get(job.gpu_type, 0) + 1
+                    oldest_wait = max(oldest_wait, now - job.submitted_at)
+            return {
+                "queued": self._queued_count(),
+                "running": len(self._running),
+                "completed": self._completed,
+                "max_concurrency": self.max_concurrency,
+                "queued_by_gpu_type": queued_by_gpu,
+                "running_by_gpu_type": {k: v for k, v in self._running_by_gpu.items() if v},
+                "queued_by_owner": queued_by_owner,
+                "running_by_owner": {k: v for k, v in self._running_by_owner.items() if v},
+                "oldest_queued_s": round(oldest_wait, 3),
+                "accepting": not self._closed,
+            }
+
+    async def shutdown(self, timeout_s: float = 60.0) -> None:
+        """Stop accepting runs, cancel queued ones and wait for running ones.
+
+        Runs still in flight after ``timeout_s`` are asked to cancel, which
+        tears down their pods.
+        """
+
+        with self._lock:
+            self._closed = True
+            queued = [job for queue in self._queues.values() for job in queue]
+            self._queues.clear()
+        for job in queued:
+            if job.on_cancel:
+                job.on_cancel(job.run_id, "controller shutting down")
+
+        if self._tasks:
+            _, pending = await asyncio.wait(set(self._tasks), timeout=timeout_s)
+            if pending:
+                logger.warning("Cancelling %s runs still in flight after drain timeout", len(pending))
+                with self._lock:
+                    for job in self._running.values():
+                        job.cancel_event.set()
+                await asyncio.wait(pending, timeout=30)
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _queued_count(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _notify(self) -> None:
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _dispatch_forever(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while True:
+                job = self._next_job()
+                if job is None:
+                    break
+                task = asyncio.create_task(self._run(job))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    def _next_job(self) -> Optional[_Job]:
+        with self._lock:
+            if len(self._running) >= self.max_concurrency:
+                return None
+            best: Optional[_Job] = None
+            best_rank: Optional[tuple] = None
+            for owner, queue in self._queues.items():
+                job = next((job for job in queue if self._gpu_slot_free(job.gpu_type)), None)
+                if job is None:
+                    continue
+                rank = (
+                    -job.priority,
+                    self._running_by_owner.get(owner, 0),
+                    self._last_served.get(owner, -1),
+                    job.sequence,
+                )
+                if best_rank is None or rank < best_rank:
+                    best, best_rank = job, rank
+            if best is None:
+                return None
+            self._queues[best.owner].remove(best)
+            self._running[best.run_id] = best
+            self._running_by_gpu[best.gpu_type] = self._running_by_gpu.get(best.gpu_type, 0) + 1
+            self._running_by_owner[best.owner] = self._running_by_owner.get(best.owner, 0) + 1
+            self._last_served[best.owner] = next(self._dispatches)
+            return best
+
+    def _gpu_slot_free(self, gpu_type: str) -> bool:
+        limit = self.gpu_limits.get(gpu_type)
+        return limit is None or self._running_by_gpu.get(gpu_type, 0) < limit
+
+    async def _run(self, job: _Job) -> None:
+        assert self._loop is not None
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                await job.func(job.run_id, job.cancel_event)
+            else:
+                await self._loop.run_in_executor(self._executor, job.func, job.run_id, job.cancel_event)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Run %s crashed in scheduler", job.run_id)
+        finally:
+            with self._lock:
+                self._running.pop(job.run_id, None)
+                self._running_by_gpu[job.gpu_type] -= 1
+                self._running_by_owner[job.owner] -= 1
+                self._completed += 1
+            self._notify()
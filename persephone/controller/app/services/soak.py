@@ -0,0 +1,82 @@
+"""Progress of soak runs from the agent's append-only ``checkpoints.jsonl``."""
+from __future__ import annotations
+
+import json
+from typing import Dict, Optional
+
+from .histograms import HistogramPayload, histogram_percentiles, merge_histograms
+
+CHECKPOINTS_FILE = "checkpoints.jsonl"
+
+
+class SoakProgress:
+    """Folds checkpoint lines into running totals as they arrive.
+
+    ``feed`` takes the file's bytes from ``offset`` on, so a running soak is
+    followed by fetching only what was appended since the last poll; an
+    unterminated last line is kept until the rest of it arrives. Each
+    checkpoint is merged once, so following a long soak costs the same per
+    poll regardless of how long it has been running.
+    """
+
+    def __init__(self) -> None:
+        self.offset = 0
+        self.checkpoints = 0
+        self.elapsed_s = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.final = False
+        self._histogram: Optional[HistogramPayload] = None
+        self._pending = b""
+
+    def feed(self, data: bytes) -> int:
+        """Consume appended bytes and return the number of new checkpoints."""
+
+        self.offset += len(data)
+        lines = (self._pending + data).split(b"\n")
+        self._pending = lines.pop()
+        added = 0
+        for line in lines:
+            try:
+                checkpoint = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(checkpoint, dict):
+                continue
+            self.checkpoints += 1
+            self.elapsed_s = float(checkpoint.get("t_s") or self.elapsed_s)
+            self.requests += int(checkpoint.get("requests") or 0)
+            self.errors += int(checkpoint.get("errors") or 0)
+            self.final = bool(checkpoint.get("final"))
+            histogram = checkpoint.get("latency_histogram")
+            if histogram:
+                self._histogram = merge_histograms([self._histogram, histogram] if self._histogram else [histogram])
+            added += 1
+        return added
+
+    def discard_partial(self) -> None:
+        """Forget an unterminated last line; a resumed agent truncates it before appending."""
+
+        self.offset -= len(self._pending)
+        self._pending = b""
+
+    def summary(self) -> Dict[str, object]:
+        """Totals and latency percentiles as of the last checkpoint."""
+
+        summary: Dict[str, object] = {
+            "checkpoints": self.checkpoints,
+            "elapsed_s": self.elapsed_s,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": round(self.requests / self.elapsed_s, 3) if self.elapsed_s else 0.0,
+            "final": self.final,
+        }
+        if self._histogram and self._histogram["count"]:
+            latency = histogram_percentiles(self._histogram, (0.50, 0.95, 0.99))
+            summary.update(
+                latency_p50_ms=round(latency[0.50], 3),
+                latency_p95_ms=round(latency[0.95], 3),
+                latency_p99_ms=round(latency[0.99], 3),
+                latency_max_ms=self._histogram["max_ms"],
+            )
+        return summary
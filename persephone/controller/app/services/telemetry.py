@@ -0,0 +1,276 @@
+"""Readers for GPU telemetry artifacts produced by the agent."""
+from __future__ import annotations
+
+import io
+import itertools
+import json
+import mmap
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+# Must match ``agent.telemetry_format.MAGIC``.
+COLUMNAR_MAGIC = b"PTEL1\n"
+
+Columns = Dict[str, np.ndarray]
+
+# Metrics kept in downsampled series and the bucket counts precomputed per run.
+SERIES_METRICS = ("gpu_util", "mem_util", "vram_mb", "power_w", "temp_c", "sm_clock_mhz")
+SERIES_RESOLUTIONS = (100, 500, 2000)
+
+# NVML clock throttle reasons that slow a busy GPU down: SW power cap, HW slowdown,
+# SW thermal, HW thermal and HW power brake. GpuIdle and ApplicationsClocksSetting
+# are set on healthy GPUs and are not counted. Must match ``agent.gpu_metrics.SLOWDOWN_THROTTLE_REASONS``.
+SLOWDOWN_THROTTLE_REASONS = 0x04 | 0x08 | 0x20 | 0x40 | 0x80
+
+
+def is_columnar(blob: bytes | memoryview) -> bool:
+    return bytes(blob[: len(COLUMNAR_MAGIC)]) == COLUMNAR_MAGIC
+
+
+def load_columnar(buffer: bytes | memoryview | mmap.mmap) -> Columns:
+    """Decode a columnar telemetry buffer into one NumPy array per column.
+
+    Uncompressed integer columns spanning a single block are returned as views
+    over ``buffer`` without copying.
+    """
+
+    view = memoryview(buffer)
+    if not is_columnar(view):
+        raise ValueError("not a columnar telemetry buffer")
+    parts: _Parts = {}
+    if _decode_blocks(view, len(COLUMNAR_MAGIC), parts, copy=False) != len(view):
+        raise ValueError("truncated columnar telemetry buffer")
+    return _join_parts(parts)
+
+
+def load_columnar_chunks(chunks: Iterable[bytes]) -> Columns:
+    """Decode columnar telemetry arriving in pieces, e.g. from ``ArtifactStore.iter_range``.
+
+    Each block is decoded as soon as it is complete, so only the block being
+    received is buffered rather than the whole file.
+    """
+
+    pending = bytearray()
+    parts: _Parts = {}
+    checked = False
+    for chunk in chunks:
+        pending += chunk
+        if not checked:
+            if len(pending) < len(COLUMNAR_MAGIC):
+                continue
+            if not is_columnar(pending):
+                raise ValueError("not a columnar telemetry buffer")
+            del pending[: len(COLUMNAR_MAGIC)]
+            checked = True
+        with memoryview(pending) as view:
+            consumed = _decode_blocks(view, 0, parts, copy=True)
+        del pending[:consumed]
+    if not checked:
+        raise ValueError("not a columnar telemetry buffer")
+    if pending:
+        raise ValueError("truncated columnar telemetry buffer")
+    return _join_parts(parts)
+
+
+_Parts = Dict[str, List[Tuple[np.ndarray, int]]]
+
+
+def _decode_blocks(view: memoryview, position: int, parts: _Parts, copy: bool) -> int:
+    """Decode the complete blocks of ``view`` from ``position``; return where the first incomplete one starts."""
+
+    while position + 4 <= len(view):
+        (header_length,) = struct.unpack_from("<I", view, position)
+        body = position + 4 + header_length
+        if body > len(view):
+            break
+        header = json.loads(bytes(view[position + 4 : body]))
+        if body + sum(column["length"] for column in header["columns"]) > len(view):
+            break
+        position = body
+        for column in header["columns"]:
+            chunk = view[position : position + column["length"]]
+            position += column["length"]
+            raw = (bytes(chunk) if copy else chunk) if column["codec"] == "none" else zlib.decompress(chunk)
+            values = np.frombuffer(raw, dtype=column["dtype"])
+            if column["encoding"] == "delta":
+                values = np.cumsum(values, dtype=np.int64)
+            parts.setdefault(column["name"], []).append((values, column["scale"]))
+    return position
+
+
+def _join_parts(parts: _Parts) -> Columns:
+    columns: Columns = {}
+    for name, chunks in parts.items():
+        values = chunks[0][0] if len(chunks) == 1 else np.concatenate([chunk for chunk, _ in chunks])
+        scale = chunks[0][1]
+        columns[name] = values / scale if scale != 1 else values
+    return columns
+
+
+def load_columnar_file(path: str | Path) -> Columns:
+    """Memory-map a columnar telemetry file and decode it."""
+
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return load_columnar(mapped)
+
+
+def columns_to_csv(columns: Columns) -> str:
+    """Render decoded columns as CSV text compatible with ``gpu_timeseries.csv``."""
+
+    names = list(columns)
+    buffer = io.StringIO()
+    buffer.write(",".join(names) + "\n")
+    if names and len(columns[names[0]]):
+        table = np.column_stack([columns[name] for name in names])
+        formats = ["%d" if np.issubdtype(columns[name].dtype, np.integer) else "%.3f" for name in names]
+        np.savetxt(buffer, table, fmt=formats, delimiter=",")
+    return buffer.getvalue()
+
+
+def load_csv(text: str) -> Columns:
+    """Parse ``gpu_timeseries.csv`` text into one NumPy array per column."""
+
+    return load_csv_lines(text.splitlines())
+
+
+def load_csv_lines(lines: Iterable[str]) -> Columns:
+    """Parse ``gpu_timeseries.csv`` given line by line, without holding the text."""
+
+    lines = iter(lines)
+    header = next(lines, None)
+    if header is None:
+        return {}
+    names = header.strip().split(",")
+    first = next((line for line in lines if line.strip()), None)
+    if first is None:
+        return {name: np.empty(0) for name in names}
+    table = np.loadtxt(itertools.chain((first,), lines), delimiter=",", ndmin=2)
+    return {name: table[:, position] for position, name in enumerate(names)}
+
+
+def iter_lines(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[str]:
+    """Split a stream of byte chunks into decoded lines."""
+
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            yield line.decode(encoding)
+    if pending:
+        yield pending.decode(encoding)
+
+
+def summarize_telemetry(columns: Columns) -> Dict[str, float]:
+    """Return headline statistics across all devices of a time series.
+
+    Energy integrates each device's power over ``t``; throttle time counts
+    the sampling intervals that start with a slowdown throttle reason set
+    (``SLOWDOWN_THROTTLE_REASONS``).
+    """
+
+    summary: Dict[str, float] = {}
+    if not columns or not len(next(iter(columns.values()))):
+        return summary
+    for name, key, reducer in (
+        ("gpu_util", "gpu_util_mean", np.mean),
+        ("gpu_util", "gpu_util_max", np.max),
+        ("mem_util", "mem_util_mean", np.mean),
+        ("power_w", "power_w_mean", np.mean),
+        ("power_w", "power_w_max", np.max),
+        ("vram_mb", "vram_mb_peak", np.max),
+        ("temp_c", "temp_c_max", np.max),
+    ):
+        if name in columns:
+            summary[key] = round(float(reducer(columns[name])), 3)
+
+    if "t" in columns:
+        devices = _split_devices(columns)
+        energy_j = 0.0
+        throttle_s = 0.0
+        for device in devices.values():
+            dt = np.diff(device["t"])
+            if "power_w" in device and len(dt):
+                # Trapezoidal rule, written out to work on every NumPy version.
+                energy_j += float(np.sum(dt * (device["power_w"][1:] + device["power_w"][:-1]) / 2))
+            if "throttle_reasons" in device and len(dt):
+                throttle_s += float(np.sum(dt[_slowed_down(device["throttle_reasons"][:-1])]))
+        summary["samples"] = max(len(device["t"]) for device in devices.values())
+        summary["duration_s"] = round(float(columns["t"].max() - columns["t"].min()), 3)
+        summary["energy_j"] = round(energy_j, 3)
+        summary["throttle_s"] = round(throttle_s, 3)
+    return summary
+
+
+def build_series(
+    columns: Columns, resolutions: Sequence[int] = SERIES_RESOLUTIONS
+) -> Dict[int, Dict[str, Dict[str, object]]]:
+    """Downsample every device's series to each resolution with min/max buckets.
+
+    A level holds at most ``resolution`` buckets per device; each bucket
+    keeps the min, max and mean of the samples it covers, so short spikes
+    survive any level. Levels at or above the raw sample count are omitted.
+    """
+
+    devices = _split_devices(columns) if "t" in columns else {}
+    samples = max((len(device["t"]) for device in devices.values()), default=0)
+    return {
+        resolution: {gpu: _downsample(device, resolution) for gpu, device in devices.items()}
+        for resolution in sorted(resolutions)
+        if resolution < samples
+    }
+
+
+def series_at(columns: Columns, resolution: int) -> Dict[str, Dict[str, object]]:
+    """Downsample every device to ``resolution`` buckets on demand."""
+
+    devices = _split_devices(columns) if "t" in columns else {}
+    return {gpu: _downsample(device, resolution) for gpu, device in devices.items()}
+
+
+def _slowed_down(reasons: np.ndarray) -> np.ndarray:
+    return (np.nan_to_num(reasons).astype(np.int64) & SLOWDOWN_THROTTLE_REASONS) != 0
+
+
+def _split_devices(columns: Columns) -> Dict[str, Columns]:
+    if "gpu" not in columns:
+        return {"0": columns}
+    gpu_ids = columns["gpu"]
+    return {
+        str(int(gpu)): {name: values[gpu_ids == gpu] for name, values in columns.items() if name != "gpu"}
+        for gpu in np.unique(gpu_ids)
+    }
+
+
+def _downsample(device: Columns, resolution: int) -> Dict[str, object]:
+    count = len(device["t"])
+    if count <= resolution:
+        series: Dict[str, object] = {"t": _rounded(device["t"])}
+        for name in SERIES_METRICS:
+            if name in device:
+                values = _rounded(device[name])
+                series[name] = {"min": values, "max": values, "mean": values}
+        return series
+
+    # Equal-count buckets; reduceat reduces each [start, next start) slice.
+    starts = np.linspace(0, count, resolution, endpoint=False).astype(np.int64)
+    sizes = np.diff(np.append(starts, count))
+    series = {"t": _rounded(device["t"][starts])}
+    for name in SERIES_METRICS:
+        if name in device:
+            values = device[name].astype(np.float64, copy=False)
+            series[name] = {
+                "min": _rounded(np.minimum.reduceat(values, starts)),
+                "max": _rounded(np.maximum.reduceat(values, starts)),
+                "mean": _rounded(np.add.reduceat(values, starts) / sizes),
+            }
+    return series
+
+
+def _rounded(values: np.ndarray) -> List[float]:
+    return np.round(values.astype(np.float64, copy=False), 2).tolist()
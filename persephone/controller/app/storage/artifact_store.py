@@ -0,0 +1,155 @@
+"""Content-addressed, compressed on-disk storage for run artifacts."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import zlib
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# File layout: MAGIC, independently compressed chunks of ``chunk_size`` raw
+# bytes, a JSON index with the chunk offsets, and the index length as u32.
+MAGIC = b"PART1\n"
+_TRAILER = struct.Struct("<I")
+
+
+@dataclass(frozen=True)
+class ArtifactRef:
+    """Where an artifact lives in the store; ``digest`` is the SHA-256 of its content."""
+
+    digest: str
+    size: int
+    stored_size: int
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "ArtifactRef":
+        return cls(digest=str(data["digest"]), size=int(data["size"]), stored_size=int(data["stored_size"]))  # type: ignore[arg-type]
+
+
+class ArtifactWriter:
+    """Accepts an artifact in arbitrary pieces and compresses it chunk by chunk.
+
+    Only one chunk of raw data is buffered at a time. ``commit`` moves the
+    file to its content address; identical content is stored once.
+    """
+
+    def __init__(self, store: "ArtifactStore") -> None:
+        self._store = store
+        store.root.mkdir(parents=True, exist_ok=True)
+        handle, self._temp_path = tempfile.mkstemp(dir=store.root, prefix=".incoming-")
+        self._file = os.fdopen(handle, "wb")
+        self._file.write(MAGIC)
+        self._offsets: List[int] = [len(MAGIC)]
+        self._buffer = bytearray()
+        self._hash = hashlib.sha256()
+        self._size = 0
+
+    def write(self, data: bytes) -> None:
+        self._hash.update(data)
+        self._size += len(data)
+        self._buffer += data
+        chunk_size = self._store.chunk_size
+        while len(self._buffer) >= chunk_size:
+            self._flush(bytes(self._buffer[:chunk_size]))
+            del self._buffer[:chunk_size]
+
+    def commit(self) -> ArtifactRef:
+        if self._buffer:
+            self._flush(bytes(self._buffer))
+            self._buffer.clear()
+        index = json.dumps(
+            {"size": self._size, "chunk_size": self._store.chunk_size, "offsets": self._offsets}
+        ).encode()
+        self._file.write(index)
+        self._file.write(_TRAILER.pack(len(index)))
+        stored_size = self._file.tell()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+        digest = self._hash.hexdigest()
+        path = self._store.path(digest)
+        if path.exists():
+            os.unlink(self._temp_path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self._temp_path, path)
+        return ArtifactRef(digest=digest, size=self._size, stored_size=stored_size)
+
+    def abort(self) -> None:
+        self._file.close()
+        try:
+            os.unlink(self._temp_path)
+        except FileNotFoundError:
+            pass
+
+    def _flush(self, chunk: bytes) -> None:
+        self._file.write(zlib.compress(chunk, self._store.level))
+        self._offsets.append(self._file.tell())
+
+
+class ArtifactStore:
+    """Directory of artifacts addressed by the SHA-256 of their content.
+
+    Artifacts are split into chunks compressed independently, so a byte range
+    is served by decompressing only the chunks it overlaps.
+    """
+
+    def __init__(self, root: str | Path, chunk_size: int = 1 << 20, level: int = 3) -> None:
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+        self.level = level
+        self._index = lru_cache(maxsize=256)(self._read_index)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def writer(self) -> ArtifactWriter:
+        return ArtifactWriter(self)
+
+    def put(self, data: bytes) -> ArtifactRef:
+        writer = self.writer()
+        try:
+            writer.write(data)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.commit()
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def read(self, digest: str) -> bytes:
+        return b"".join(self.iter_range(digest))
+
+    def iter_range(self, digest: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the artifact's bytes ``[start, end)`` one chunk at a time."""
+
+        index = self._index(digest)
+        size, chunk_size, offsets = index["size"], index["chunk_size"], index["offsets"]
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return
+        with open(self.path(digest), "rb") as handle:
+            for chunk_number in range(start // chunk_size, (end - 1) // chunk_size + 1):
+                handle.seek(offsets[chunk_number])
+                chunk = zlib.decompress(handle.read(offsets[chunk_number + 1] - offsets[chunk_number]))
+                chunk_start = chunk_number * chunk_size
+                yield chunk[max(start - chunk_start, 0) : end - chunk_start]
+
+    def _read_index(self, digest: str) -> Dict[str, object]:
+        with open(self.path(digest), "rb") as handle:
+            if handle.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"artifact {digest} is not in the store format")
+            handle.seek(-_TRAILER.size, os.SEEK_END)
+            (length,) = _TRAILER.unpack(handle.read(_TRAILER.size))
+            handle.seek(-_TRAILER.size - length, os.SEEK_END)
+            return json.loads(handle.read(length))
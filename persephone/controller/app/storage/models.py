@@ -3,10 +3,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
 
 RunStatus = str
+# Text artifacts (result JSON, CSV) are stored as ``str``; binary ones as ``bytes``.
+Artifact = Union[str, bytes]
 
 
 @dataclass(slots=True)
@@ -20,11 +22,29 @@ class Run:
     status: RunStatus
     latency_p50_ms: Optional[float] = None
     latency_p95_ms: Optional[float] = None
+    latency_p99_ms: Optional[float] = None
     throughput_rps: Optional[float] = None
-    artifacts: Dict[str, str] = field(default_factory=dict)
+    artifacts: Dict[str, Artifact] = field(default_factory=dict)
     started_at: datetime = field(default_factory=datetime.utcnow)
     finished_at: Optional[datetime] = None
     error_message: Optional[str] = None
+    dataset_profile: Optional[str] = None
+    # Hash of the inputs that determine the result; identical runs share it.
+    fingerprint: Optional[str] = None
+    sweep_id: Optional[str] = None
+    cost_usd: Optional[float] = None
+    # Seconds spent in each phase of execution, see ``services.phases``.
+    phases: Dict[str, float] = field(default_factory=dict)
+    # Headline GPU telemetry statistics, computed once when the run completes.
+    telemetry_summary: Dict[str, float] = field(default_factory=dict)
+    # Pod file name to ``ArtifactRef.to_dict()`` for artifacts in the artifact store.
+    artifact_refs: Dict[str, Dict[str, object]] = field(default_factory=dict)
+    # Time budget of a soak run; soak runs ignore ``samples``.
+    soak_s: Optional[float] = None
+    # Soak totals as of the agent's last checkpoint, see ``services.soak``.
+    progress: Dict[str, object] = field(default_factory=dict)
+    # Backend the agent served the model with; ``None`` for runs stored before it was recorded.
+    inference_backend: Optional[str] = None
 
     def mark_running(self) -> None:
         self.status = "running"
@@ -34,12 +54,14 @@ class Run:
         latency_p50_ms: float,
         latency_p95_ms: float,
         throughput_rps: float,
-        artifacts: Dict[str, str],
+        artifacts: Dict[str, Artifact],
         finished_at: datetime,
+        latency_p99_ms: Optional[float] = None,
     ) -> None:
         self.status = "succeeded"
         self.latency_p50_ms = latency_p50_ms
         self.latency_p95_ms = latency_p95_ms
+        self.latency_p99_ms = latency_p99_ms
         self.throughput_rps = throughput_rps
         self.artifacts = artifacts
         self.finished_at = finished_at
@@ -48,3 +70,8 @@ class Run:
         self.status = "failed"
         self.error_message = error_message
         self.finished_at = finished_at
+
+    def mark_cancelled(self, reason: str, finished_at: datetime) -> None:
+        self.status = "cancelled"
+        self.error_message = reason
+        self.finished_at = finished_at
@@ -0,0 +1,219 @@
+"""SQLite-backed persistent storage for runs."""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .models import Artifact, Run
+from .store import RunQuery
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    gpu_type TEXT NOT NULL,
+    model_ref TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_status ON runs (status);
+CREATE INDEX IF NOT EXISTS runs_gpu_type ON runs (gpu_type);
+CREATE INDEX IF NOT EXISTS runs_model_ref ON runs (model_ref);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs (started_at, id);
+CREATE INDEX IF NOT EXISTS runs_sweep_id ON runs (json_extract(doc, '$.sweep_id'));
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    is_text INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+# Stays under SQLite's default limit on bound parameters per statement.
+_MAX_IDS_PER_QUERY = 500
+
+_DATETIME_FIELDS = {f.name for f in dataclasses.fields(Run) if "datetime" in str(f.type)}
+
+
+class SqliteRunStore:
+    """Durable run storage using SQLite in WAL mode.
+
+    Run metadata lives in ``runs`` (indexed on the columns used for
+    filtering, the remaining fields as a JSON document). Artifacts are kept in
+    a separate table so that listing runs never reads them, and a save only
+    writes the artifact rows that changed since the last save of that run.
+
+    Each thread has its own connection, so the database must be a file:
+    ``:memory:`` would give every thread a separate, empty database.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = str(path)
+        if self._path == ":memory:" or self._path.startswith("file::memory:"):
+            raise ValueError("SqliteRunStore needs a database file; use InMemoryRunStore for a non-persistent store")
+        Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        # Digests of the artifact rows last written per active run.
+        self._written: Dict[str, Dict[str, str]] = {}
+        self._written_lock = threading.Lock()
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def list_runs(self) -> Iterable[Run]:
+        rows = self._connection().execute("SELECT doc FROM runs ORDER BY started_at, id").fetchall()
+        return [_run_from_doc(doc) for (doc,) in rows]
+
+    def query_runs(self, query: RunQuery) -> List[Run]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column in ("status", "gpu_type", "model_ref"):
+            value = getattr(query, column)
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if query.sweep_id is not None:
+            clauses.append("json_extract(doc, '$.sweep_id') = ?")
+            params.append(query.sweep_id)
+        if query.started_after is not None:
+            clauses.append("started_at >= ?")
+            params.append(query.started_after.isoformat())
+        if query.started_before is not None:
+            clauses.append("started_at < ?")
+            params.append(query.started_before.isoformat())
+        if query.before is not None:
+            clauses.append("(started_at, id) < (?, ?)")
+            params.extend((query.before[0].isoformat(), query.before[1]))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT doc FROM runs {where} ORDER BY started_at DESC, id DESC LIMIT ?",
+            (*params, query.limit),
+        ).fetchall()
+        return [_run_from_doc(doc) for (doc,) in rows]
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def get(self, run_id: str) -> Optional[Run]:
+        conn = self._connection()
+        row = conn.execute("SELECT doc FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        run = _run_from_doc(row[0])
+        for name, is_text, data in conn.execute(
+            "SELECT name, is_text, data FROM artifacts WHERE run_id = ?", (run_id,)
+        ):
+            run.artifacts[name] = data.decode("utf-8") if is_text else bytes(data)
+        return run
+
+    def get_many(self, run_ids: Sequence[str]) -> Dict[str, Run]:
+        conn = self._connection()
+        runs: Dict[str, Run] = {}
+        for start in range(0, len(run_ids), _MAX_IDS_PER_QUERY):
+            chunk = list(run_ids[start : start + _MAX_IDS_PER_QUERY])
+            placeholders = ",".join("?" * len(chunk))
+            for run_id, doc in conn.execute(f"SELECT id, doc FROM runs WHERE id IN ({placeholders})", chunk):
+                runs[run_id] = _run_from_doc(doc)
+            for run_id, name, is_text, data in conn.execute(
+                f"SELECT run_id, name, is_text, data FROM artifacts WHERE run_id IN ({placeholders})", chunk
+            ):
+                runs[run_id].artifacts[name] = data.decode("utf-8") if is_text else bytes(data)
+        return runs
+
+    def save(self, run: Run) -> None:
+        encoded = {name: _encode_artifact(value) for name, value in run.artifacts.items()}
+        digests = {name: _digest(is_text, data) for name, (is_text, data) in encoded.items()}
+        with self._written_lock:
+            written = self._written.get(run.id)
+        conn = self._connection()
+        with _transaction(conn):
+            conn.execute(
+                "INSERT INTO runs (id, status, gpu_type, model_ref, started_at, doc) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET status = excluded.status, gpu_type = excluded.gpu_type, "
+                "model_ref = excluded.model_ref, started_at = excluded.started_at, doc = excluded.doc",
+                (run.id, run.status, run.gpu_type, run.model_ref, run.started_at.isoformat(), _run_to_doc(run)),
+            )
+            if written is None:
+                # Nothing known about this run's rows, e.g. after a restart: drop the ones no longer present.
+                stale = [name for (name,) in conn.execute("SELECT name FROM artifacts WHERE run_id = ?", (run.id,))]
+            else:
+                stale = list(written)
+            conn.executemany(
+                "DELETE FROM artifacts WHERE run_id = ? AND name = ?",
+                [(run.id, name) for name in stale if name not in encoded],
+            )
+            conn.executemany(
+                "INSERT INTO artifacts (run_id, name, is_text, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (run_id, name) DO UPDATE SET is_text = excluded.is_text, data = excluded.data",
+                [
+                    (run.id, name, is_text, data)
+                    for name, (is_text, data) in encoded.items()
+                    if written is None or written.get(name) != digests[name]
+                ],
+            )
+        with self._written_lock:
+            if run.status in ("pending", "running"):
+                self._written[run.id] = digests
+            else:
+                # Finished runs are rarely saved again; a later save just rewrites their rows.
+                self._written.pop(run.id, None)
+
+    def update(self, run: Run) -> None:
+        self.save(run)
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _encode_artifact(value: Artifact) -> tuple[int, bytes]:
+    if isinstance(value, bytes):
+        return 0, value
+    return 1, value.encode("utf-8")
+
+
+def _digest(is_text: int, data: bytes) -> str:
+    return f"{is_text}:{hashlib.blake2b(data, digest_size=16).hexdigest()}"
+
+
+def _run_to_doc(run: Run) -> str:
+    doc: Dict[str, Any] = {}
+    for f in dataclasses.fields(run):
+        if f.name == "artifacts":
+            continue
+        value = getattr(run, f.name)
+        doc[f.name] = value.isoformat() if isinstance(value, datetime) else value
+    return json.dumps(doc, separators=(",", ":"))
+
+
+def _run_from_doc(doc: str) -> Run:
+    data = json.loads(doc)
+    known: List[str] = [f.name for f in dataclasses.fields(Run)]
+    values = {name: data[name] for name in known if name in data}
+    for name in _DATETIME_FIELDS:
+        if values.get(name):
+            values[name] = datetime.fromisoformat(values[name])
+    return Run(**values)
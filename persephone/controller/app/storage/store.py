@@ -1,29 +1,115 @@
 """In-memory storage implementation for runs."""
 from __future__ import annotations
 
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime
 from threading import Lock
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
 
 from .models import Run
 
+RunKey = Tuple[datetime, str]
+
+
+@dataclass
+class RunQuery:
+    """Filters and keyset position for listing runs, newest first.
+
+    ``before`` is the ``(started_at, id)`` key of the last run of the previous
+    page; only runs strictly older than it are returned.
+    """
+
+    status: Optional[str] = None
+    gpu_type: Optional[str] = None
+    model_ref: Optional[str] = None
+    started_after: Optional[datetime] = None
+    started_before: Optional[datetime] = None
+    sweep_id: Optional[str] = None
+    before: Optional[RunKey] = None
+    limit: int = 50
+
+    def matches(self, run: Run) -> bool:
+        return (
+            (self.status is None or run.status == self.status)
+            and (self.gpu_type is None or run.gpu_type == self.gpu_type)
+            and (self.model_ref is None or run.model_ref == self.model_ref)
+            and (self.started_after is None or run.started_at >= self.started_after)
+            and (self.started_before is None or run.started_at < self.started_before)
+            and (self.sweep_id is None or run.sweep_id == self.sweep_id)
+        )
+
+
+class RunStore(Protocol):
+    """Storage interface the run service depends on."""
+
+    def list_runs(self) -> Iterable[Run]:
+        ...
+
+    def query_runs(self, query: RunQuery) -> List[Run]:
+        """Return up to ``query.limit`` matching runs without loading artifacts."""
+
+    def get(self, run_id: str) -> Optional[Run]:
+        ...
+
+    def get_many(self, run_ids: Sequence[str]) -> Dict[str, Run]:
+        """Load several runs with their artifacts; missing ids are left out."""
+
+    def count(self) -> int:
+        """Return the number of stored runs."""
+
+    def save(self, run: Run) -> None:
+        ...
+
+    def update(self, run: Run) -> None:
+        ...
+
 
 class InMemoryRunStore:
     """Thread-safe in-memory run storage."""
 
     def __init__(self) -> None:
         self._runs: Dict[str, Run] = {}
+        self._order: List[RunKey] = []
         self._lock = Lock()
 
     def list_runs(self) -> Iterable[Run]:
         with self._lock:
             return list(self._runs.values())
 
+    def query_runs(self, query: RunQuery) -> List[Run]:
+        with self._lock:
+            position = len(self._order)
+            if query.before is not None:
+                position = bisect_left(self._order, query.before)
+            if query.started_before is not None:
+                position = min(position, bisect_left(self._order, (query.started_before, "")))
+            page: List[Run] = []
+            while position > 0 and len(page) < query.limit:
+                position -= 1
+                started_at, run_id = self._order[position]
+                if query.started_after is not None and started_at < query.started_after:
+                    break
+                run = self._runs[run_id]
+                if query.matches(run):
+                    page.append(run)
+            return page
+
+    def count(self) -> int:
+        return len(self._runs)
+
     def get(self, run_id: str) -> Optional[Run]:
         with self._lock:
             return self._runs.get(run_id)
 
+    def get_many(self, run_ids: Sequence[str]) -> Dict[str, Run]:
+        with self._lock:
+            return {run_id: self._runs[run_id] for run_id in run_ids if run_id in self._runs}
+
     def save(self, run: Run) -> None:
         with self._lock:
+            if run.id not in self._runs:
+                insort(self._order, (run.started_at, run.id))
             self._runs[run.id] = run
 
     def update(self, run: Run) -> None:
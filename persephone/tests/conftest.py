@@ -0,0 +1,70 @@
+"""Shared fixtures; tests import ``agent`` and ``controller`` from the ``persephone`` directory."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+from controller.app.providers.fake_runpod import FakeRunpodConfig, create_fake_runpod_app  # noqa: E402
+from controller.app.providers.runpod_orch import RunpodOrchestrator  # noqa: E402
+from controller.app.services.run_service import RunService  # noqa: E402
+from controller.app.services.scheduler import RunScheduler  # noqa: E402
+from controller.app.storage.store import InMemoryRunStore  # noqa: E402
+
+
+@pytest.fixture
+def fake_runpod_config() -> FakeRunpodConfig:
+    return FakeRunpodConfig(run_duration_s=0.2, seed=7)
+
+
+@pytest.fixture
+def orchestrator(fake_runpod_config: FakeRunpodConfig) -> RunpodOrchestrator:
+    """An orchestrator talking to the in-process fake RunPod API."""
+
+    transport = httpx.ASGITransport(app=create_fake_runpod_app(fake_runpod_config))
+    return RunpodOrchestrator(
+        "test-key",
+        "persephone-agent:test",
+        30,
+        httpx.AsyncClient(transport=transport),
+        base_url="http://fake/v2",
+        poll_initial_s=0.05,
+        poll_max_s=0.1,
+    )
+
+
+@pytest.fixture
+def make_service(orchestrator: RunpodOrchestrator):
+    """Build a ``RunService`` over an in-memory store and the fake RunPod API."""
+
+    def build(store=None, scheduler=None, **options) -> RunService:  # type: ignore[no-untyped-def]
+        return RunService(
+            store if store is not None else InMemoryRunStore(),
+            orchestrator,
+            60,
+            scheduler=scheduler or RunScheduler(max_concurrency=4),
+            **options,
+        )
+
+    return build
+
+
+async def _wait_for(predicate: Callable[[], bool], timeout_s: float = 10.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout_s
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def wait_for() -> Callable[..., Awaitable[None]]:
+    """Poll ``predicate`` on the running loop until it holds, failing after ``timeout_s``."""
+
+    return _wait_for
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from controller.app.services.analytics import RunAnalytics
+from controller.app.storage.models import Run
+from controller.app.storage.store import InMemoryRunStore
+
+
+def _run(index: int, gpu_type: str = "l4", throughput: float = 100.0, **fields) -> Run:
+    values = dict(
+        id=f"run-{index}",
+        gpu_type=gpu_type,
+        model_ref="m",
+        samples=8,
+        status="succeeded",
+        started_at=datetime(2026, 1, 1) + timedelta(minutes=index),
+        throughput_rps=throughput,
+        latency_p50_ms=10.0,
+        latency_p95_ms=20.0,
+        latency_p99_ms=30.0,
+    )
+    values.update(fields)
+    return Run(**values)
+
+
+def test_compare_ranks_gpu_types_with_confidence_intervals():
+    analytics = RunAnalytics()
+    for index, throughput in enumerate([100.0, 110.0, 90.0]):
+        analytics.add(_run(index, "l4", throughput), {"gpu_util_mean": 50.0})
+    analytics.add(_run(10, "a100", 300.0), {})
+
+    entries = analytics.compare("m", price_lookup={"l4": 0.36, "a100": 3.6}.get)
+    assert [entry["gpu_type"] for entry in entries] == ["a100", "l4"]
+    l4 = entries[1]
+    assert l4["runs"] == 3
+    assert l4["throughput_rps"]["mean"] == 100.0
+    low, high = l4["throughput_rps"]["ci95"]
+    assert low < 100.0 < high
+    assert l4["telemetry"]["runs"] == 3
+    assert l4["telemetry"]["gpu_util_mean"] == 50.0
+    assert entries[0]["throughput_rps"]["ci95"] is None
+
+    by_cost = analytics.compare("m", price_lookup={"l4": 0.36, "a100": 3.6}.get, sort="cost")
+    assert [entry["gpu_type"] for entry in by_cost] == ["l4", "a100"]
+
+
+def test_groups_keep_only_their_most_recent_runs():
+    analytics = RunAnalytics(max_runs_per_group=3)
+    for index in [5, 1, 4, 2, 3, 0]:
+        analytics.add(_run(index, throughput=float(index)), {})
+
+    entry = analytics.compare("m")[0]
+    assert entry["runs"] == 3
+    assert entry["throughput_rps"]["min"] == 3.0
+    assert analytics.stats() == {"groups": 1, "runs": 3}
+
+
+def test_group_with_the_oldest_runs_is_dropped_past_max_groups():
+    analytics = RunAnalytics(max_groups=2)
+    analytics.add(_run(1, "l4"), {})
+    analytics.add(_run(2, "a100"), {})
+    analytics.add(_run(0, "h100"), {})
+    assert {entry["gpu_type"] for entry in analytics.compare("m")} == {"l4", "a100"}
+
+    analytics.add(_run(3, "h100"), {})
+    assert {entry["gpu_type"] for entry in analytics.compare("m")} == {"a100", "h100"}
+    assert analytics.stats() == {"groups": 2, "runs": 2}
+
+
+def test_inference_backends_and_soak_runs_are_compared_separately():
+    analytics = RunAnalytics()
+    analytics.add(_run(0, "l4", 100.0, inference_backend="mock"), {})
+    analytics.add(_run(1, "l4", 900.0, inference_backend="vllm"), {})
+    analytics.add(_run(2, "l4", 50.0, inference_backend="mock", soak_s=3600.0), {})
+
+    def means(**filters):
+        return [entry["throughput_rps"]["mean"] for entry in analytics.compare("m", **filters)]
+
+    assert means(inference_backend="mock") == [100.0]
+    assert means(inference_backend="vllm") == [900.0]
+    assert means(inference_backend="mock", soak=True) == [50.0]
+    assert analytics.stats() == {"groups": 3, "runs": 3}
+
+
+class _CountingStore(InMemoryRunStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.gets = 0
+        self.get_many_ids = []
+
+    def get(self, run_id):
+        self.gets += 1
+        return super().get(run_id)
+
+    def get_many(self, run_ids):
+        self.get_many_ids.append(list(run_ids))
+        return super().get_many(run_ids)
+
+
+@pytest.mark.parametrize("stored_summary", [True, False])
+def test_backfill_batch_loads_only_runs_it_keeps(make_service, stored_summary):
+    store = _CountingStore()
+    for index in range(7):
+        run = _run(index, throughput=float(index), inference_backend="mock")
+        if stored_summary:
+            run.telemetry_summary = {"gpu_util_mean": 40.0}
+        store.save(run)
+    store.save(_run(99, status="failed"))
+    service = make_service(store=store, analytics=RunAnalytics(max_runs_per_group=4))
+
+    entry = service.compare_gpus("m")[0]
+    assert entry["runs"] == 4
+    assert entry["throughput_rps"]["min"] == 3.0
+    assert store.gets == 0
+    if stored_summary:
+        assert store.get_many_ids == []
+    else:
+        assert store.get_many_ids == [["run-6", "run-5", "run-4", "run-3"]]
+
+    # The backfill runs once; later comparisons read the kept columns.
+    service.compare_gpus("m")
+    assert store.get_many_ids == ([] if stored_summary else [["run-6", "run-5", "run-4", "run-3"]])
+
+
+def test_limits_must_be_positive():
+    with pytest.raises(ValueError):
+        RunAnalytics(max_runs_per_group=0)
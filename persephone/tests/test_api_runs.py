@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from controller.app.dependencies import get_run_service
+from controller.app.main import app
+from controller.app.storage.models import Run
+
+HEADERS = {"X-API-Key": "dev-secret"}
+
+
+@pytest.fixture
+def service(make_service):
+    return make_service()
+
+
+@pytest.fixture
+def client(service):
+    app.dependency_overrides[get_run_service] = lambda: service
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def _save_runs(service, count: int) -> None:
+    for index in range(count):
+        service._store.save(  # pylint: disable=protected-access
+            Run(
+                id=f"run-{index}",
+                gpu_type="l4" if index % 2 else "a100",
+                model_ref="m",
+                samples=8,
+                status="succeeded",
+                started_at=datetime(2026, 1, 1) + timedelta(minutes=index),
+                artifacts={"result_json": "{}"},
+            )
+        )
+
+
+def test_requests_need_an_api_key(client):
+    assert client.get("/runs").status_code == 401
+
+
+def test_list_pages_through_every_run_with_cursors(client, service):
+    _save_runs(service, 5)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/runs", params=params, headers=HEADERS).json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"run-{index}" for index in range(4, -1, -1)]
+
+
+def test_list_filters_and_projects_fields(client, service):
+    _save_runs(service, 4)
+    page = client.get("/runs", params={"gpu_type": "l4", "fields": "status"}, headers=HEADERS).json()
+    assert page["items"] == [{"id": "run-3", "status": "succeeded"}, {"id": "run-1", "status": "succeeded"}]
+
+
+def test_list_omits_artifacts_unless_asked(client, service):
+    _save_runs(service, 1)
+    (item,) = client.get("/runs", headers=HEADERS).json()["items"]
+    assert "artifacts" not in item
+    (item,) = client.get("/runs", params={"include_artifacts": True}, headers=HEADERS).json()["items"]
+    assert item["artifacts"]["result_json"] == "{}"
+
+
+def test_get_includes_artifacts_unless_opted_out(client, service):
+    _save_runs(service, 1)
+    run = client.get("/runs/run-0", headers=HEADERS).json()
+    assert run["artifacts"]["result_json"] == "{}"
+    run = client.get("/runs/run-0", params={"include_artifacts": False}, headers=HEADERS).json()
+    assert run["artifacts"]["result_json"] is None
+
+
+@pytest.mark.parametrize("params", [{"fields": "nope"}, {"cursor": "%%%"}])
+def test_list_rejects_bad_parameters(client, params):
+    assert client.get("/runs", params=params, headers=HEADERS).status_code == 400
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import io
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from agent.gpu_metrics import CSV_HEADER
+from agent.telemetry_format import ColumnarWriter
+from controller.app.api.api_runs import _parse_range
+from controller.app.core.config import Settings
+from controller.app.dependencies import create_artifact_store, get_run_service
+from controller.app.main import app
+from controller.app.services.telemetry import (
+    iter_lines,
+    load_columnar,
+    load_columnar_chunks,
+    load_csv,
+    load_csv_lines,
+)
+from controller.app.storage.artifact_store import ArtifactStore
+from controller.app.storage.models import Run
+
+HEADERS = {"X-API-Key": "dev-secret"}
+DATA = bytes(range(256)) * 10
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(tmp_path / "artifacts", chunk_size=100)
+
+
+def test_ranges_decompress_only_overlapping_chunks(store):
+    ref = store.put(DATA)
+    assert ref.size == len(DATA)
+    assert store.read(ref.digest) == DATA
+    assert b"".join(store.iter_range(ref.digest, 150, 420)) == DATA[150:420]
+    assert len(list(store.iter_range(ref.digest, 150, 420))) == 4
+    assert list(store.iter_range(ref.digest, 300, 300)) == []
+    assert b"".join(store.iter_range(ref.digest, 2500)) == DATA[2500:]
+
+
+def test_identical_content_is_stored_once(store):
+    first, second = store.put(DATA), store.put(DATA)
+    assert first == second
+    assert len([path for path in store.root.rglob("*") if path.is_file()]) == 1
+
+
+def test_aborted_writer_leaves_nothing_behind(store):
+    writer = store.writer()
+    writer.write(DATA)
+    writer.abort()
+    assert not [path for path in store.root.rglob("*") if path.is_file()]
+
+
+def _columnar(blocks: int) -> bytes:
+    stream = io.BytesIO()
+    writer = ColumnarWriter(stream, CSV_HEADER)
+    for block in range(blocks):
+        table = np.zeros((20, len(CSV_HEADER)))
+        table[:, 0] = np.arange(20) * 0.5 + block * 10
+        table[:, 2] = block
+        writer.write(table)
+    return stream.getvalue()
+
+
+def test_columnar_decodes_from_store_chunks(store):
+    data = _columnar(5)
+    ref = store.put(data)
+    streamed = load_columnar_chunks(store.iter_range(ref.digest))
+    whole = load_columnar(data)
+    assert list(streamed) == list(whole)
+    for name in whole:
+        assert streamed[name] == pytest.approx(whole[name])
+
+
+@pytest.mark.parametrize("data", [_columnar(2)[:-3], b"PTEL", b"not telemetry at all"])
+def test_columnar_chunks_reject_bad_input(data):
+    with pytest.raises(ValueError):
+        load_columnar_chunks(data[i : i + 7] for i in range(0, len(data), 7))
+
+
+def test_csv_lines_match_whole_text_parsing():
+    text = "t,gpu,gpu_util\n0.0,0,10\n0.5,0,20\n1.0,0,30\n"
+    chunks = [text.encode()[i : i + 5] for i in range(0, len(text), 5)]
+    streamed = load_csv_lines(iter_lines(chunks))
+    assert streamed["gpu_util"].tolist() == load_csv(text)["gpu_util"].tolist() == [10, 20, 30]
+    assert load_csv_lines(iter_lines([b"t,gpu\n"]))["t"].size == 0
+    assert load_csv_lines([]) == {}
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("bytes=0-9", (0, 10)),
+        ("bytes=90-", (90, 100)),
+        ("bytes=-10", (90, 100)),
+        ("bytes=95-200", (95, 100)),
+        ("bytes=-500", (0, 100)),
+        ("bytes=5-3", None),
+        ("bytes=0-1,5-6", None),
+        ("bytes=a-b", None),
+        ("bytes=--5", None),
+        ("bytes=-", None),
+        ("items=0-1", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert _parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=150-200", "bytes=-0"])
+def test_parse_range_past_the_end_is_unsatisfiable(header):
+    with pytest.raises(HTTPException) as info:
+        _parse_range(header, 100)
+    assert info.value.status_code == 416
+
+
+@pytest.fixture
+def client(make_service, store):
+    service = make_service(artifact_store=store)
+    ref = store.put(DATA)
+    service._store.save(  # pylint: disable=protected-access
+        Run(id="r", gpu_type="l4", model_ref="m", samples=1, status="succeeded", artifact_refs={"trace.bin": ref.to_dict()})
+    )
+    app.dependency_overrides[get_run_service] = lambda: service
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_artifact_download_honours_ranges(client):
+    url = "/runs/r/artifacts/trace.bin"
+    full = client.get(url, headers=HEADERS)
+    assert full.status_code == 200
+    assert full.content == DATA
+
+    part = client.get(url, headers={**HEADERS, "Range": "bytes=150-419"})
+    assert part.status_code == 206
+    assert part.content == DATA[150:420]
+    assert part.headers["Content-Range"] == f"bytes 150-419/{len(DATA)}"
+
+    ignored = client.get(url, headers={**HEADERS, "Range": "bytes=5-3"})
+    assert (ignored.status_code, ignored.content) == (200, DATA)
+
+    beyond = client.get(url, headers={**HEADERS, "Range": f"bytes={len(DATA)}-"})
+    assert beyond.status_code == 416
+    assert beyond.headers["Content-Range"] == f"bytes */{len(DATA)}"
+
+    cached = client.get(url, headers={**HEADERS, "If-None-Match": full.headers["ETag"]})
+    assert cached.status_code == 304
+    assert client.get("/runs/r/artifacts/missing.bin", headers=HEADERS).status_code == 404
+
+
+def test_artifact_store_defaults_next_to_the_sqlite_database(tmp_path):
+    sqlite = {"PERSEPHONE_STORE_BACKEND": "sqlite", "PERSEPHONE_STORE_PATH": str(tmp_path / "db" / "runs.db")}
+    assert create_artifact_store(Settings(**sqlite)).root == tmp_path / "db" / "artifacts"
+    assert create_artifact_store(Settings()) is None
+    assert create_artifact_store(Settings(PERSEPHONE_ARTIFACT_DIR="", **sqlite)) is None
+    assert create_artifact_store(Settings(PERSEPHONE_ARTIFACT_DIR=str(tmp_path / "a"))).root == tmp_path / "a"
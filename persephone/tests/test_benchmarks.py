@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from benchmarks import bench_api, bench_serialization, bench_store
+from benchmarks.common import emit, latency_summary, run_concurrently
+
+
+def test_latency_summary_reports_milliseconds_and_throughput():
+    summary = latency_summary([0.001, 0.002, 0.003, 0.004], wall_s=2.0)
+    assert summary["count"] == 4
+    assert summary["p50_ms"] == pytest.approx(2.5)
+    assert summary["max_ms"] == pytest.approx(4.0)
+    assert summary["throughput_per_s"] == 2.0
+    assert latency_summary([]) == {"count": 0}
+
+
+def test_run_concurrently_bounds_in_flight_calls_and_counts_errors():
+    in_flight = {"now": 0, "max": 0}
+
+    async def operation(index: int) -> None:
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.001)
+        in_flight["now"] -= 1
+        if index % 5 == 0:
+            raise RuntimeError("boom")
+
+    summary = asyncio.run(run_concurrently(operation, 20, 4))
+    assert in_flight["max"] == 4
+    assert summary["errors"] == 4
+    assert summary["count"] == 16
+
+
+def test_store_and_serialization_benchmarks_produce_json(tmp_path):
+    output = tmp_path / "results.json"
+    results = {
+        "store": bench_store.run([1, 2], 5, sqlite=True),
+        "serialization": bench_serialization.run([10], 1),
+    }
+    emit(results, str(output))
+    document = json.loads(output.read_text())
+    # Two writers of five runs, each saved once and updated twice.
+    assert document["store"]["sqlite"][1]["writes"]["count"] == 30
+    assert document["serialization"]["results"][0]["gpu_csv_rows"] == 10
+    assert "python" in document["environment"]
+
+
+def test_api_benchmark_runs_against_the_fake_backend():
+    results = asyncio.run(bench_api.run([2], requests_per_level=4, catalog_size=20, run_duration_s=0.05))
+    assert [level["errors"] for level in results["runs_start"] + results["runs_get"]] == [0, 0]
+    assert set(results["catalog"]) == {"full", "not_modified", "filtered"}
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from controller.app.providers.catalog_cache import CatalogCache, CatalogUnavailable
+
+
+class _Upstream:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.fail = False
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0.001)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return [{"id": "l4", "hourly_usd": 0.4 + self.calls}]
+
+
+def test_concurrent_first_loads_share_one_fetch():
+    upstream = _Upstream()
+    cache = CatalogCache(upstream.fetch)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get() for _ in range(10)))
+
+    snapshots = asyncio.run(scenario())
+    assert upstream.calls == 1
+    assert len({snapshot.etag for snapshot in snapshots}) == 1
+    assert snapshots[0].index.hourly_usd("l4") == pytest.approx(1.4)
+
+
+def test_stale_snapshot_is_served_while_refreshing():
+    upstream = _Upstream()
+    cache = CatalogCache(upstream.fetch, ttl_s=0.0)
+
+    async def scenario():
+        first = await cache.get()
+        stale = await cache.get()
+        await asyncio.sleep(0.01)
+        return first, stale, await cache.get()
+
+    first, stale, fresh = asyncio.run(scenario())
+    assert stale is first
+    assert fresh.etag != first.etag
+
+
+def test_failed_refresh_keeps_last_good_snapshot_and_backs_off():
+    upstream = _Upstream()
+    cache = CatalogCache(upstream.fetch, ttl_s=0.0, retry_after_failure_s=60)
+
+    async def scenario():
+        good = await cache.get()
+        upstream.fail = True
+        await cache.get()
+        await asyncio.sleep(0.01)
+        for _ in range(5):
+            assert await cache.get() is good
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert upstream.calls == 2
+    assert cache.failures == 1
+
+
+def test_first_load_failure_is_reported():
+    upstream = _Upstream()
+    upstream.fail = True
+    with pytest.raises(CatalogUnavailable):
+        asyncio.run(CatalogCache(upstream.fetch).get())
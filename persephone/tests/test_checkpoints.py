@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from agent import agent as agent_module
+from agent.checkpoints import CheckpointWriter, load_checkpoints, summarize_checkpoints
+from agent.gpu_metrics import FIELDS
+from agent.windows import RunWindows
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_evicted_windows_stay_in_the_merged_histogram():
+    windows = RunWindows(window_s=1.0, origin=0.0)
+    for second in range(5):
+        windows.record_latency(second + 0.5, 10.0 * (second + 1))
+    windows.record_error(1.5)
+    windows.evict(3)
+
+    assert [record["t_start_s"] for record in windows.records()] == [3.0, 4.0]
+    assert windows.merged_latency().count == 5
+    assert windows.merged_latency(3).count == 2
+    assert windows.merged_latency(1, 2).count == 3  # evicted windows only exist merged
+
+    # Late arrivals for evicted windows still count, GPU samples of them are dropped.
+    windows.record_latency(0.2, 5.0)
+    windows.record_gpu(0.2, np.zeros((1, len(FIELDS))))
+    assert windows.merged_latency().count == 6
+    assert windows.records(0, 3) == []
+
+
+def test_late_arrivals_for_checkpointed_windows_go_into_the_next_checkpoint(tmp_path):
+    clock = _Clock()
+    windows = RunWindows(window_s=1.0, origin=0.0, clock=clock)
+    path = tmp_path / "checkpoints.jsonl"
+    writer = CheckpointWriter(path, windows, interval_s=3600.0)
+    writer.start()
+
+    windows.record_latency(0.5, 10.0)
+    clock.now = 1.0
+    writer._checkpoint(final=False)  # pylint: disable=protected-access
+    # A request that started in window 0 completes, or fails, after it was checkpointed.
+    windows.record_latency(0.9, 30.0)
+    worker = RunWindows(window_s=1.0, origin=0.0)
+    worker.record_latency(0.8, 20.0)
+    worker.record_error(0.9)
+    windows.merge_latency(worker.latency_state())
+    windows.record_error(0.9)
+    clock.now = 2.0
+    writer._file.close()  # pylint: disable=protected-access
+    with pytest.raises(ValueError):
+        writer._checkpoint(final=False)  # pylint: disable=protected-access
+    writer._file = open(path, "a", encoding="utf-8")  # pylint: disable=protected-access,consider-using-with
+    clock.now = 2.5
+    writer.stop()
+
+    checkpoints = load_checkpoints(path)
+    assert [(entry["requests"], entry["errors"]) for entry in checkpoints] == [(1, 0), (2, 2)]
+    assert summarize_checkpoints(checkpoints)["requests"] == windows.merged_latency().count == 3
+
+
+def test_checkpoints_hold_only_new_windows_and_evict_them(tmp_path):
+    clock = _Clock()
+    windows = RunWindows(window_s=1.0, origin=0.0, clock=clock)
+    path = tmp_path / "checkpoints.jsonl"
+    writer = CheckpointWriter(path, windows, interval_s=3600.0)
+    writer.start()
+
+    for second in range(6):
+        clock.now = second + 0.5
+        windows.record_latency(clock.now, 20.0)
+        windows.record_latency(clock.now, 40.0)
+        if second in (1, 3):
+            clock.now = second + 1.0
+            writer._checkpoint(final=False)  # pylint: disable=protected-access
+            assert windows.records(0, second + 1) == []
+    clock.now = 6.2
+    writer.stop()
+
+    checkpoints = load_checkpoints(path)
+    assert [(entry["seq"], entry["requests"], entry["final"]) for entry in checkpoints] == [
+        (0, 4, False),
+        (1, 4, False),
+        (2, 4, True),
+    ]
+    assert [len(entry["windows"]) for entry in checkpoints] == [2, 2, 2]
+    summary = summarize_checkpoints(checkpoints)
+    assert (summary["requests"], summary["elapsed_s"], summary["throughput_rps"]) == (12, 6.2, 1.935)
+    assert summary["latency_p95_ms"] == pytest.approx(40.0, rel=0.05)
+
+
+def test_resumed_writer_drops_a_torn_line_and_continues_the_sequence(tmp_path):
+    path = tmp_path / "checkpoints.jsonl"
+    path.write_text(json.dumps({"seq": 0, "t_s": 2.0, "requests": 3}) + "\n" + '{"seq": 1, "t_s"')
+    previous = load_checkpoints(path)
+    assert len(previous) == 1
+
+    clock = _Clock()
+    clock.now = 2.0
+    windows = RunWindows(window_s=1.0, origin=0.0, clock=clock)
+    windows.record_latency(2.5, 10.0)
+    writer = CheckpointWriter(path, windows, interval_s=3600.0, previous=previous)
+    writer.start()
+    clock.now = 3.1
+    writer.stop()
+
+    checkpoints = load_checkpoints(path)
+    assert [entry["seq"] for entry in checkpoints] == [0, 1]
+    assert summarize_checkpoints(checkpoints)["requests"] == 4
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    for name in ("RESULT_JSON", "GPU_CSV", "GPU_COLUMNAR", "RESULTS_JSONL", "WINDOWS_JSONL", "CHECKPOINTS_JSONL"):
+        monkeypatch.setattr(agent_module, name, tmp_path / getattr(agent_module, name).name)
+    monkeypatch.setattr(agent_module, "WORKSPACE", tmp_path)
+    monkeypatch.setenv("GPU_METRICS_BACKEND", "fake")
+    return tmp_path
+
+
+def test_soak_resume_covers_the_whole_budget(workspace):
+    options = dict(soak_s=0.6, checkpoint_s=0.2, window_s=0.1)
+    agent_module.execute_run("m", 1, **options)
+    first = load_checkpoints(workspace / "checkpoints.jsonl")
+    assert len(first) > 1 and first[-1]["final"]
+
+    # Pretend the agent died after its first checkpoint and resume it.
+    lines = (workspace / "checkpoints.jsonl").read_text().splitlines()
+    (workspace / "checkpoints.jsonl").write_text(lines[0] + "\n")
+    kept = load_checkpoints(workspace / "checkpoints.jsonl")
+    agent_module.execute_run("m", 1, resume=True, **options)
+
+    result = json.loads((workspace / "result.json").read_text())
+    assert result["soak"]["resumed"] is True
+    checkpoints = load_checkpoints(workspace / "checkpoints.jsonl")
+    assert [entry["seq"] for entry in checkpoints] == list(range(len(checkpoints)))
+    assert result["samples"] == summarize_checkpoints(checkpoints)["requests"]
+    assert result["samples"] > sum(entry["requests"] for entry in kept)
+
+    windows = [json.loads(line) for line in (workspace / "windows.jsonl").read_text().splitlines()]
+    expected = [record for entry in checkpoints for record in entry.get("windows", [])]
+    assert windows == expected
+    assert sum(record["requests"] for record in windows) == result["samples"]
+
+
+def test_soak_rejects_several_batch_sizes(workspace):
+    with pytest.raises(ValueError, match="one batch size"):
+        agent_module.execute_run("m", 1, soak_s=1.0, batch_sizes=(1, 4))
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agent.datasets import DEFAULT_PROFILE, PROFILES, load_prompts
+from controller.app.api.api_runs import DATASET_PROFILES
+from controller.app.dependencies import get_run_service
+from controller.app.main import app
+
+HEADERS = {"X-API-Key": "dev-secret"}
+
+
+def test_builtin_profiles_are_deterministic():
+    first = load_prompts("summarize", count=5, seed=3)
+    assert first == load_prompts("summarize", count=5, seed=3)
+    assert first != load_prompts("summarize", count=5, seed=4)
+    assert all(prompt.max_tokens == PROFILES["summarize"].max_tokens for prompt in first)
+    assert load_prompts(None, count=2) == load_prompts(DEFAULT_PROFILE, count=2)
+
+
+def test_max_tokens_overrides_the_profile():
+    assert {prompt.max_tokens for prompt in load_prompts("chat", count=4, max_tokens=7)} == {7}
+
+
+def test_prompts_file(tmp_path):
+    path = tmp_path / "prompts.jsonl"
+    path.write_text(json.dumps({"prompt": "hi", "max_tokens": 3}) + "\n\n" + json.dumps({"prompt": "yo"}) + "\n")
+    prompts = load_prompts(str(path))
+    assert [(prompt.text, prompt.max_tokens) for prompt in prompts] == [("hi", 3), ("yo", 128)]
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        load_prompts("no-such-profile")
+
+
+def test_controller_knows_every_agent_profile():
+    assert set(DATASET_PROFILES) == set(PROFILES)
+
+
+@pytest.fixture
+def client(make_service):
+    service = make_service()
+    app.dependency_overrides[get_run_service] = lambda: service
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/runs/start", {"gpu_type": "l4", "model_ref": "m", "samples": 8, "dataset_profile": "no-such-profile"}),
+        ("/runs/sweep", {"gpu_types": ["l4"], "model_refs": ["m"], "samples": [8], "dataset_profiles": [None, "nope"]}),
+    ],
+)
+def test_api_rejects_unknown_profiles_before_starting_anything(client, path, body):
+    response = client.post(path, json=body, headers=HEADERS)
+    assert response.status_code == 422
+    assert "unknown dataset profile" in response.text
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from controller.app.services.events import RunEventBroadcaster
+
+
+async def _collect(stream) -> list:
+    return [frame async for frame in stream]
+
+
+def test_stream_replays_history_then_follows_until_final():
+    events = RunEventBroadcaster()
+
+    async def scenario() -> list:
+        events.publish("r", "status", {"status": "pending"})
+        task = asyncio.create_task(_collect(events.stream("r", snapshot={"status": "pending"})))
+        await asyncio.sleep(0)
+        # Events may be published from worker threads.
+        thread = threading.Thread(target=events.publish, args=("r", "status", {"status": "running"}))
+        thread.start()
+        thread.join()
+        events.publish("r", "status", {"status": "succeeded"}, final=True)
+        return await asyncio.wait_for(task, 1.0)
+
+    frames = asyncio.run(scenario())
+    assert frames[0].startswith(b"event: snapshot\n")
+    assert [frame.split(b"\n", 1)[0] for frame in frames[1:]] == [b"id: 1", b"id: 2", b"id: 3"]
+    assert b'"succeeded"' in frames[-1]
+    assert events.subscriber_count("r") == 0
+
+
+def test_reconnect_resumes_after_last_event_id():
+    events = RunEventBroadcaster()
+    for status in ("pending", "running", "failed"):
+        events.publish("r", "status", {"status": status}, final=status == "failed")
+
+    frames = asyncio.run(_collect(events.stream("r", snapshot={"status": "failed"}, last_event_id=1)))
+    assert [frame.split(b"\n", 1)[0] for frame in frames] == [b"id: 2", b"id: 3"]
+
+
+def test_terminal_snapshot_ends_stream_immediately():
+    events = RunEventBroadcaster()
+    frames = asyncio.run(_collect(events.stream("r", snapshot={"status": "cancelled"})))
+    assert len(frames) == 1
+
+
+def test_heartbeat_is_sent_while_idle():
+    events = RunEventBroadcaster(heartbeat_s=0.01)
+
+    async def first_two() -> list:
+        stream = events.stream("r")
+        frames = [await stream.__anext__(), None]
+        events.publish("r", "status", {"status": "succeeded"}, final=True)
+        frames[1] = await stream.__anext__()
+        await stream.aclose()
+        return frames
+
+    frames = asyncio.run(first_two())
+    assert frames[0] == b": keepalive\n\n"
+    assert frames[1].startswith(b"id: 1\n")
+
+
+def test_idle_channels_are_evicted_beyond_the_limit():
+    events = RunEventBroadcaster(max_runs=2)
+    for run_id in ("a", "b", "c"):
+        events.publish(run_id, "status", {"status": "pending"})
+    frames = asyncio.run(_collect(events.stream("a", snapshot={"status": "failed"})))
+    # Only the snapshot: the history of "a" was evicted.
+    assert len(frames) == 1
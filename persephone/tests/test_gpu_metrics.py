@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from agent.gpu_metrics import CSV_HEADER, FIELDS, FakeBackend, GpuSampler, collect_gpu_metrics
+
+
+class _Collect:
+    def __init__(self) -> None:
+        self.tables = []
+
+    def write(self, table: np.ndarray) -> None:
+        self.tables.append(table)
+
+
+def test_sampler_drains_samples_in_order():
+    sampler = GpuSampler(FakeBackend(device_count=2), capacity=8, flush_every=4)
+    sampler.open()
+    for tick in range(5):
+        sampler.sample(float(tick))
+    times, values = sampler.drain()
+    assert times.tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert values.shape == (5, 2, len(FIELDS))
+    assert sampler.pending == 0
+    assert sampler.latest()[0] == 4.0
+
+
+def test_sampler_overrun_keeps_newest_samples():
+    sampler = GpuSampler(FakeBackend(), capacity=4, flush_every=4)
+    sampler.open()
+    for tick in range(10):
+        sampler.sample(float(tick))
+    assert sampler.pending == 4
+    times, _ = sampler.drain()
+    assert times.tolist() == [6.0, 7.0, 8.0, 9.0]
+
+
+def test_flush_writes_one_row_per_device():
+    sampler = GpuSampler(FakeBackend(device_count=3), capacity=8, flush_every=8)
+    sampler.open()
+    sampler.sample(0.5)
+    sampler.sample(1.5)
+    writer = _Collect()
+    assert sampler.flush(writer) == 2
+    (table,) = writer.tables
+    assert table.shape == (6, len(CSV_HEADER))
+    assert table[:, 0].tolist() == [0.5, 0.5, 0.5, 1.5, 1.5, 1.5]
+    assert table[:, 1].tolist() == [0, 1, 2, 0, 1, 2]
+    assert sampler.flush(writer) == 0
+
+
+def test_sampler_rejects_flush_larger_than_capacity():
+    with pytest.raises(ValueError):
+        GpuSampler(FakeBackend(), capacity=4, flush_every=5)
+
+
+def test_collect_writes_csv_on_the_given_clock(tmp_path):
+    ticks = iter(np.arange(0.0, 100.0, 0.25))
+    path = tmp_path / "gpu.csv"
+    collect_gpu_metrics(path, interval_s=0.0, duration_s=1.0, backend=FakeBackend(2), clock=lambda: next(ticks), origin=0.0)
+
+    lines = path.read_text().splitlines()
+    assert lines[0] == ",".join(CSV_HEADER)
+    times = sorted({float(line.split(",")[0]) for line in lines[1:]})
+    assert times == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert len(lines) - 1 == 2 * len(times)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from agent.histogram import LatencyHistogram
+from controller.app.services.histograms import histogram_percentiles, merge_histograms
+
+
+def test_percentiles_are_within_precision_of_exact_values():
+    values = np.random.default_rng(0).lognormal(3.0, 1.0, 20_000)
+    histogram = LatencyHistogram()
+    histogram.record_many(values)
+    estimated = histogram.percentiles((0.5, 0.99))
+    for quantile, value in estimated.items():
+        exact = float(np.quantile(values, quantile, method="inverted_cdf"))
+        assert value == pytest.approx(exact, rel=histogram.precision)
+    assert histogram.percentiles((1.0,))[1.0] == values.max()
+
+
+def test_merge_equals_recording_everything_in_one_histogram():
+    left, right, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    left.record_many([1.0, 2.0, 3.0])
+    right.record_many([10.0, 20.0])
+    both.record_many([1.0, 2.0, 3.0, 10.0, 20.0])
+    left.merge(right)
+    assert left.count == both.count
+    assert np.array_equal(left.counts, both.counts)
+    assert (left.min_ms, left.max_ms) == (both.min_ms, both.max_ms)
+
+
+def test_merge_rejects_other_layouts():
+    with pytest.raises(ValueError):
+        LatencyHistogram().merge(LatencyHistogram(precision=0.05))
+
+
+def test_serialized_round_trip():
+    histogram = LatencyHistogram()
+    histogram.record_many([0.5, 5.0, 50.0, 500.0])
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert np.array_equal(restored.counts, histogram.counts)
+    assert restored.percentiles() == histogram.percentiles()
+
+
+def test_controller_merge_matches_agent_merge():
+    rng = np.random.default_rng(1)
+    parts = []
+    combined = LatencyHistogram()
+    for _ in range(3):
+        part = LatencyHistogram()
+        values = rng.exponential(30.0, 500)
+        part.record_many(values)
+        combined.record_many(values)
+        parts.append(part.to_dict())
+
+    merged = merge_histograms(parts)
+    assert merged["count"] == combined.count
+    quantiles = (0.5, 0.95, 0.99)
+    assert histogram_percentiles(merged, quantiles) == pytest.approx(combined.percentiles(quantiles))
+
+
+def test_controller_merge_rejects_mixed_layouts():
+    fine, coarse = LatencyHistogram(), LatencyHistogram(precision=0.05)
+    fine.record(1.0)
+    coarse.record(1.0)
+    with pytest.raises(ValueError):
+        merge_histograms([fine.to_dict(), coarse.to_dict()])
+    assert merge_histograms([]) is None
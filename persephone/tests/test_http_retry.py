@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from controller.app.providers.http import RetryPolicy, request_with_retry
+
+POLICY = RetryPolicy(attempts=3, base_delay_s=0.0)
+
+
+def _send(method: str, outcomes, **options):
+    """Send one request through a transport replaying ``outcomes``; returns (result, calls)."""
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        outcome = outcomes[min(len(calls), len(outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome)
+
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await request_with_retry(client, method, "http://fake/pods", policy=POLICY, **options)
+
+    try:
+        return asyncio.run(send()).status_code, len(calls)
+    except httpx.HTTPError as exc:
+        return type(exc), len(calls)
+
+
+def test_idempotent_requests_retry_server_errors():
+    assert _send("GET", [503, 502, 200]) == (200, 3)
+    assert _send("DELETE", [httpx.ReadTimeout("slow"), 200]) == (200, 2)
+
+
+def test_post_is_not_retried_once_the_server_may_have_acted():
+    assert _send("POST", [503, 200]) == (503, 1)
+    assert _send("POST", [httpx.ReadTimeout("slow"), 200]) == (httpx.ReadTimeout, 1)
+
+
+def test_post_is_retried_when_it_was_never_processed():
+    assert _send("POST", [429, 200]) == (200, 2)
+    assert _send("POST", [httpx.ConnectError("refused"), 200]) == (200, 2)
+
+
+def test_callers_can_mark_a_post_idempotent():
+    assert _send("POST", [503, 200], idempotent=True) == (200, 2)
+
+
+def test_last_error_is_raised_when_attempts_run_out():
+    assert _send("GET", [httpx.ConnectError("refused")]) == (httpx.ConnectError, 3)
+
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pytest
+
+from agent.datasets import Prompt
+from agent.inference import MockBackend, ReferenceBackend, make_inference_backend
+
+
+def test_reference_backend_decodes_every_prompt_to_its_length():
+    backend = ReferenceBackend("m", d_model=32, layers=1, heads=2, max_context=64)
+    generations = backend.generate([Prompt("hello", 4), Prompt("a longer prompt", 2)])
+    assert [(gen.prompt_tokens, gen.output_tokens) for gen in generations] == [(5, 4), (15, 2)]
+    assert len(generations[0].inter_token_s) == 3
+    assert all(gen.ttft_s > 0 for gen in generations)
+
+
+@pytest.mark.parametrize("max_tokens", [63, 64, 500])
+def test_reference_backend_caps_generation_to_the_context(max_tokens):
+    backend = ReferenceBackend("m", d_model=32, layers=1, heads=2, max_context=64)
+    (generation,) = backend.generate([Prompt("x" * 100, max_tokens)])
+    assert generation.prompt_tokens == 1
+    assert generation.output_tokens == 63
+
+
+def test_long_prompts_keep_their_last_tokens():
+    backend = ReferenceBackend("m", d_model=32, layers=1, heads=2, max_context=64)
+    (generation,) = backend.generate([Prompt("x" * 100, 10)])
+    assert generation.prompt_tokens == 54
+
+
+def test_backend_factory():
+    assert isinstance(make_inference_backend("mock", "m"), MockBackend)
+    assert make_inference_backend("reference", "m").name == "reference"
+    with pytest.raises(ValueError):
+        make_inference_backend("nope", "m")
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from agent.loadgen import LoadConfig, run_load
+from agent.runner import run_probe
+
+
+def test_closed_loop_runs_exact_sample_count_with_bounded_concurrency():
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+
+    def request() -> None:
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        time.sleep(0.002)
+        with lock:
+            in_flight["now"] -= 1
+
+    result = run_load(request, LoadConfig(concurrency=3, samples=30))
+    assert result.completed == 30
+    assert result.errors == 0
+    assert in_flight["max"] <= 3
+    assert result.measured_s > 0
+
+
+def test_errors_are_counted_but_not_timed():
+    calls = iter(range(1000))
+
+    def request() -> None:
+        if next(calls) % 2:
+            raise RuntimeError("boom")
+
+    result = run_load(request, LoadConfig(samples=10))
+    assert result.completed + result.errors == 10
+    assert result.errors == 5
+
+
+def test_open_loop_includes_queueing_in_latency():
+    # One server at 10 ms per request offered 200 rps: requests queue, so
+    # latency from the intended start grows well beyond the service time.
+    result = run_load(lambda: time.sleep(0.01), LoadConfig(concurrency=1, rate_rps=200, samples=20))
+    assert result.completed == 20
+    assert result.latency.percentiles((0.99,))[0.99] > 3 * result.service.percentiles((0.50,))[0.50]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"concurrency": 0, "samples": 1}, {"rate_rps": -1.0, "samples": 1}, {"samples": None}, {"warmup_s": -1, "samples": 1}],
+)
+def test_invalid_config_is_rejected(options):
+    with pytest.raises(ValueError):
+        LoadConfig(**options)
+
+
+def test_run_probe_reports_latency_and_throughput():
+    result = run_probe("mock-v0", samples=5, concurrency=2)
+    assert result["samples"] == 5
+    assert result["mode"] == "closed"
+    assert result["latency_p50_ms"] >= 20.0
+    assert result["throughput_rps"] > 0
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from controller.app.core.metrics import (
+    Counter,
+    Histogram,
+    Registry,
+    RequestMetricsMiddleware,
+    register_gauge,
+    timed_operation,
+)
+from controller.app.main import app
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+    child = histogram.labels("/runs")
+    for value in (0.05, 0.1, 0.5, 5.0):
+        child.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/runs",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/runs",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/runs",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/runs"} 4' in lines
+    assert 'latency_seconds_sum{route="/runs"} 5.65' in lines
+
+
+def test_labels_are_validated_and_escaped():
+    registry = Registry()
+    counter = registry.register(Counter("errors_total", "Errors.", ("kind",)))
+    counter.labels(kind='say "hi"\n').inc(2)
+    assert 'errors_total{kind="say \\"hi\\"\\n"} 2' in registry.render()
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+
+def test_failing_gauge_does_not_break_the_scrape():
+    registry = Registry()
+    register_gauge("broken", "Broken.", lambda: 1 / 0, registry=registry)
+    register_gauge("idle", "Idle pods.", lambda: {("l4",): 3}, ("gpu_type",), registry=registry)
+    rendered = registry.render()
+    assert "# broken unavailable" in rendered
+    assert 'idle{gpu_type="l4"} 3' in rendered
+
+
+def test_timed_operation_counts_errors():
+    histogram = Histogram("op_seconds", "Op.").labels()
+    errors = Counter("op_errors_total", "Op errors.").labels()
+
+    @timed_operation(histogram, errors)
+    async def operation(fail: bool) -> str:
+        if fail:
+            raise RuntimeError("boom")
+        return "ok"
+
+    assert asyncio.run(operation(False)) == "ok"
+    with pytest.raises(RuntimeError):
+        asyncio.run(operation(True))
+    assert sum(histogram.counts) == 2
+    assert errors.value == 1
+
+
+def test_requests_are_recorded_by_route_template():
+    client = TestClient(app)
+    client.get("/runs/some-id/progress", headers={"X-API-Key": "wrong"})
+    body = client.get("/metrics").text
+    assert 'route="/runs/{run_id}/progress",code="4xx"' in body
+    assert "persephone_runs_queued" in body
+
+
+def test_unhandled_errors_are_recorded_as_5xx():
+    registry = Registry()
+    histogram = registry.register(Histogram("request_seconds", "Requests.", ("method", "route", "code")))
+    broken = FastAPI()
+    broken.add_middleware(RequestMetricsMiddleware, histogram=histogram)
+
+    @broken.get("/boom/{item}")
+    def boom(item: str) -> None:
+        raise RuntimeError(item)
+
+    response = TestClient(broken, raise_server_exceptions=False).get("/boom/x")
+    assert response.status_code == 500
+    assert 'request_seconds_count{method="GET",route="/boom/{item}",code="5xx"} 1' in registry.render()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from controller.app.dependencies import get_catalog_cache, get_run_service
+from controller.app.main import app
+from controller.app.providers.catalog_cache import CatalogCache
+from controller.app.providers.offer_index import OfferIndex
+from controller.app.storage.models import Run
+
+OFFERS = [
+    {"id": "a100", "vram_gb": 80, "hourly_usd": 2.0, "regions": ["US"], "availability": "high"},
+    {"id": "l4", "vram_gb": 24, "hourly_usd": 0.5, "regions": ["EU", "US"], "availability": "medium"},
+    {"id": "h100", "vram_gb": 80, "hourly_usd": 4.0, "regions": ["EU"], "availability": "low"},
+    {"id": "mystery", "vram_gb": None, "hourly_usd": None},
+]
+
+
+def _ids(offers):
+    return [offer["id"] for offer in offers]
+
+
+def test_filters_combine():
+    index = OfferIndex(OFFERS)
+    assert _ids(index.query(min_vram_gb=40)) == ["a100", "h100"]
+    assert _ids(index.query(max_hourly_usd=2.0, region="us")) == ["a100", "l4"]
+    assert _ids(index.query(availability="medium")) == ["a100", "l4"]
+
+
+def test_unknown_values_sort_last_and_never_match_filters():
+    index = OfferIndex(OFFERS)
+    assert _ids(index.query(sort="cheapest")) == ["l4", "a100", "h100", "mystery"]
+    assert "mystery" not in _ids(index.query(max_hourly_usd=100))
+    ranked = index.query(sort="price_per_vram_gb", limit=2)
+    assert [(offer["id"], offer["price_per_vram_gb"]) for offer in ranked] == [("l4", 0.0208), ("a100", 0.025)]
+
+
+def test_throughput_per_usd_ranking():
+    index = OfferIndex(OFFERS)
+    ranked = index.query(sort="throughput_per_usd", throughput_rps={"a100": 100.0, "h100": 400.0})
+    assert [(offer["id"], offer["throughput_per_usd"]) for offer in ranked[:2]] == [
+        ("h100", 360000.0),
+        ("a100", 180000.0),
+    ]
+    assert ranked[-1]["throughput_per_usd"] is None
+
+
+@pytest.fixture
+def offers():
+    return OFFERS
+
+
+@pytest.fixture
+def client(make_service, offers):
+    service = make_service()
+    for index, (gpu_type, model_ref, throughput, backend, soak_s) in enumerate(
+        [
+            ("a100", "small", 100.0, "mock", None),
+            ("h100", "small", 150.0, "mock", None),
+            ("a100", "large", 5.0, "mock", None),
+            ("h100", "large", 20.0, "mock", None),
+            # Another backend and a soak run of the same model are not comparable.
+            ("a100", "large", 500.0, "vllm", None),
+            ("a100", "large", 500.0, "mock", 60.0),
+        ]
+    ):
+        run = Run(
+            id=f"r{index}",
+            gpu_type=gpu_type,
+            model_ref=model_ref,
+            samples=8,
+            status="pending",
+            inference_backend=backend,
+            soak_s=soak_s,
+        )
+        run.mark_succeeded(1.0, 2.0, throughput, {}, datetime.utcnow())
+        service._store.save(run)  # pylint: disable=protected-access
+
+    async def catalog():
+        return offers
+
+    app.dependency_overrides[get_run_service] = lambda: service
+    app.dependency_overrides[get_catalog_cache] = lambda: CatalogCache(catalog)
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_throughput_ranking_uses_only_comparable_runs_of_the_requested_model(client):
+    headers = {"X-API-Key": "dev-secret"}
+    ranked = client.get("/compute/gpus", params={"sort": "throughput_per_usd", "model_ref": "large"}, headers=headers)
+    # h100 is 4x faster at 2x the price for "large"; averaging in "small" would put a100 first.
+    assert _ids(ranked.json())[:2] == ["h100", "a100"]
+    missing = client.get("/compute/gpus", params={"sort": "throughput_per_usd"}, headers=headers)
+    assert missing.status_code == 422
+
+
+@pytest.mark.parametrize("offers", [[{**offer, "availability": "unknown"} for offer in OFFERS]])
+def test_availability_filter_is_rejected_without_availability_data(client):
+    headers = {"X-API-Key": "dev-secret"}
+    response = client.get("/compute/gpus", params={"availability": "low"}, headers=headers)
+    assert response.status_code == 422
+    assert "availability" in response.json()["detail"]
+    assert len(client.get("/compute/gpus", params={"min_vram_gb": 1}, headers=headers).json()) == 3
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import itertools
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from controller.app.dependencies import get_run_service
+from controller.app.main import app
+from controller.app.services.phases import PhaseTimer, add_agent_phases, phase_percentiles
+from controller.app.storage.models import Run
+
+
+def test_timer_attributes_time_between_marks():
+    ticks = iter([0.0, 1.0, 1.5, 4.0, 4.25])
+    durations = {}
+    timer = PhaseTimer(durations, clock=lambda: next(ticks))
+    timer.mark("pod_acquire")
+    timer.mark("exec")
+    timer.skip()
+    timer.mark("exec")
+    assert durations == {"pod_acquire": 1.0, "exec": 0.75}
+
+
+def test_agent_phases_leave_the_rest_of_wait_as_startup():
+    durations = {"wait": 10.0}
+    add_agent_phases(durations, {"model_load": 3.0, "measure": 5.0, "bogus": "x"})
+    assert durations == {"wait": 10.0, "agent_model_load": 3.0, "agent_measure": 5.0, "startup": 2.0}
+
+
+def test_percentiles_share_counts_only_top_level_phases():
+    runs = [{"queued": 1.0, "wait": 3.0, "agent_measure": 2.0, "startup": 1.0} for _ in range(4)]
+    stats = phase_percentiles(runs)
+    assert list(stats) == ["queued", "wait", "startup", "agent_measure"]
+    assert stats["wait"]["share"] == 0.75
+    assert stats["agent_measure"] == {"count": 4, "p50_s": 2.0, "p95_s": 2.0, "mean_s": 2.0, "share": 0.5}
+
+
+def test_phase_stats_endpoint_aggregates_recent_runs(make_service):
+    service = make_service()
+    for index, seconds in zip(itertools.count(), (1.0, 2.0, 3.0)):
+        run = Run(id=f"r{index}", gpu_type="l4", model_ref="m", samples=1, status="pending")
+        run.phases = {"queued": seconds}
+        run.mark_succeeded(1.0, 1.0, 1.0, {}, datetime.utcnow())
+        service._store.save(run)  # pylint: disable=protected-access
+    app.dependency_overrides[get_run_service] = lambda: service
+    try:
+        body = TestClient(app).get("/runs/phases", headers={"X-API-Key": "dev-secret"}).json()
+    finally:
+        app.dependency_overrides.clear()
+    assert body["runs"] == 3
+    assert body["phases"]["queued"]["p50_s"] == 2.0
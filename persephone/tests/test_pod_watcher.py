@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List
+
+import httpx
+import pytest
+
+from controller.app.providers.http import RetryPolicy
+from controller.app.providers.pod_watcher import MISSING_POD_STATUS, PodStatusWatcher
+from controller.app.providers.runpod_orch import RunpodOrchestrator
+
+
+class _Pods:
+    """Pod statuses that turn terminal after a number of polls."""
+
+    def __init__(self, finish_after: Dict[str, int]) -> None:
+        self.finish_after = finish_after
+        self.calls: List[List[str]] = []
+
+    async def fetch(self, pod_ids: List[str]) -> Dict[str, str]:
+        self.calls.append(sorted(pod_ids))
+        statuses = {}
+        for pod_id in pod_ids:
+            self.finish_after[pod_id] -= 1
+            statuses[pod_id] = "EXITED" if self.finish_after[pod_id] <= 0 else "RUNNING"
+        return statuses
+
+
+def test_many_pods_are_polled_in_one_batched_call():
+    pods = _Pods({f"p{index}": 2 for index in range(5)})
+    watcher = PodStatusWatcher(pods.fetch, initial_s=0.01, max_s=0.02)
+
+    async def scenario():
+        statuses = await asyncio.gather(*(watcher.wait(pod_id, 2) for pod_id in pods.finish_after))
+        await watcher.close()
+        return statuses
+
+    assert asyncio.run(scenario()) == ["EXITED"] * 5
+    assert pods.calls[0] == sorted(pods.finish_after)
+    assert watcher.polls == 2
+    assert watcher.watched == 0
+
+
+def test_poll_interval_backs_off_to_the_maximum():
+    pods = _Pods({"slow": 6})
+    watcher = PodStatusWatcher(pods.fetch, initial_s=0.01, max_s=0.04, backoff=2.0)
+
+    async def scenario():
+        await watcher.wait("slow", 2)
+        await watcher.close()
+
+    asyncio.run(scenario())
+    assert watcher.polls == 6
+
+
+def test_notify_resolves_a_waiter_without_polling():
+    pods = _Pods({"p": 100})
+    watcher = PodStatusWatcher(pods.fetch, initial_s=10.0)
+
+    async def scenario():
+        waiter = asyncio.create_task(watcher.wait("p", 2))
+        await asyncio.sleep(0)
+        assert not watcher.notify("p", "RUNNING")
+        assert watcher.notify("p", "failed")
+        status = await waiter
+        await watcher.close()
+        return status
+
+    assert asyncio.run(scenario()) == "FAILED"
+    assert pods.calls == []
+    assert not watcher.notify("unknown", "EXITED")
+
+
+def test_wait_times_out_and_survives_fetch_errors():
+    async def failing(_pod_ids):
+        raise RuntimeError("api down")
+
+    watcher = PodStatusWatcher(failing, initial_s=0.01, max_s=0.01)
+
+    async def scenario():
+        try:
+            await watcher.wait("p", 0.05)
+        finally:
+            await watcher.close()
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(scenario())
+    assert watcher.polls >= 2
+    assert watcher.watched == 0
+
+
+def test_pod_missing_from_consecutive_polls_resolves_as_missing():
+    answers = iter([{}, {"p": "RUNNING"}, {}, RuntimeError("api down"), {}, {}])
+
+    async def fetch(_pod_ids):
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    watcher = PodStatusWatcher(fetch, initial_s=0.01, max_s=0.01, missing_limit=3)
+
+    async def scenario():
+        try:
+            return await watcher.wait("p", 2)
+        finally:
+            await watcher.close()
+
+    # The pod reappears once and a failed poll does not count, so only the last three answers add up.
+    assert asyncio.run(scenario()) == MISSING_POD_STATUS
+    assert watcher.polls == 6
+
+
+def _orchestrator(handler) -> RunpodOrchestrator:
+    return RunpodOrchestrator(
+        "key",
+        "image",
+        30,
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        base_url="http://runpod/v2",
+        retry=RetryPolicy(attempts=1),
+        poll_initial_s=0.01,
+        poll_max_s=0.01,
+    )
+
+
+def test_failed_pod_creation_raises_instead_of_returning_a_made_up_pod():
+    orchestrator = _orchestrator(lambda request: httpx.Response(500))
+
+    with pytest.raises(RuntimeError, match="creating a l4 pod failed"):
+        asyncio.run(orchestrator.create_pod("l4", {}))
+
+
+def test_waiting_on_a_deleted_pod_fails_fast():
+    orchestrator = _orchestrator(lambda request: httpx.Response(200, json={"pods": []}))
+
+    async def scenario():
+        try:
+            await orchestrator.wait_and_fetch("gone", timeout_s=5)
+        finally:
+            await orchestrator.watcher.close()
+
+    with pytest.raises(RuntimeError, match="no longer exists"):
+        asyncio.run(scenario())
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+
+from controller.app.services.run_cache import RunResultCache, run_fingerprint
+from controller.app.services.scheduler import RunScheduler
+
+
+def test_fingerprint_covers_every_input():
+    base = run_fingerprint("l4", "m", 8, None, "alice")
+    assert base == run_fingerprint("l4", "m", 8, None, "alice")
+    variants = [
+        run_fingerprint("a100", "m", 8, None, "alice"),
+        run_fingerprint("l4", "n", 8, None, "alice"),
+        run_fingerprint("l4", "m", 9, None, "alice"),
+        run_fingerprint("l4", "m", 8, "chat", "alice"),
+        run_fingerprint("l4", "m", 8, None, "bob"),
+        run_fingerprint("l4", "m", 8, None, "alice", soak_s=60.0),
+        run_fingerprint("l4", "m", 8, None, "alice", inference_backend="reference"),
+    ]
+    assert len({base, *variants}) == len(variants) + 1
+
+
+def test_claim_coalesces_in_flight_then_serves_cached_results():
+    cache = RunResultCache()
+    assert cache.claim("f", "r1", max_age_s=60) == ("r1", "new")
+    assert cache.claim("f", "r2", max_age_s=60) == ("r1", "in_flight")
+    cache.finish("f", "r1", succeeded=True)
+    assert cache.claim("f", "r3", max_age_s=60) == ("r1", "cached")
+    assert cache.claim("f", "r4", max_age_s=0) == ("r4", "new")
+    assert cache.claim("f", "r5", max_age_s=60, force=True) == ("r5", "new")
+    assert cache.stats()["coalesced"] == 1 and cache.stats()["cache_hits"] == 1
+
+
+def test_failed_runs_are_not_cached_and_lru_is_bounded():
+    cache = RunResultCache(max_entries=2)
+    cache.claim("f", "r1", 60)
+    cache.finish("f", "r1", succeeded=False)
+    assert cache.claim("f", "r2", 60) == ("r2", "new")
+    for index in range(3):
+        cache.finish(f"g{index}", f"s{index}", succeeded=True)
+    assert cache.stats()["cached_results"] == 2
+    assert cache.claim("g0", "x", 60) == ("x", "new")
+
+
+def test_identical_requests_share_a_run_only_within_one_owner(make_service):
+    scheduler = RunScheduler(max_concurrency=1)
+    service = make_service(scheduler=scheduler, cache=RunResultCache(), result_max_age_s=600)
+
+    async def scenario():
+        await scheduler.start()
+        try:
+            first, _ = service.start_run("l4", "m", 8, owner="alice")
+            same = service.start_run("l4", "m", 8, owner="alice")
+            other = service.start_run("l4", "m", 8, owner="bob")
+            return first, same, other
+        finally:
+            await scheduler.shutdown(0.01)
+
+    first, (same, same_source), (other, other_source) = asyncio.run(scenario())
+    assert (same.id, same_source) == (first.id, "in_flight")
+    assert other_source == "new" and other.id != first.id
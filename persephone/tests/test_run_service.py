@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from typing import Callable, List
+
+from controller.app.services.run_service import RunService
+from controller.app.services.scheduler import RunScheduler
+from controller.app.storage.artifact_store import ArtifactStore
+from controller.app.storage.store import InMemoryRunStore
+
+
+def _run(scheduler: RunScheduler, scenario: Callable[[], "asyncio.Future"]):
+    async def main():
+        await scheduler.start()
+        try:
+            return await scenario()
+        finally:
+            await scheduler.shutdown(1)
+
+    return asyncio.run(main())
+
+
+class _ThreadCheckingStore:
+    """Wraps a store and records which threads call it."""
+
+    def __init__(self, store) -> None:
+        self._store = store
+        self.threads: List[int] = []
+
+    def __getattr__(self, name):
+        attribute = getattr(self._store, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            self.threads.append(threading.get_ident())
+            return attribute(*args, **kwargs)
+
+        return call
+
+
+def test_run_succeeds_without_store_calls_on_the_event_loop(make_service, wait_for):
+    inner = InMemoryRunStore()
+    store = _ThreadCheckingStore(inner)
+    scheduler = RunScheduler(max_concurrency=2)
+    service: RunService = make_service(store=store, scheduler=scheduler)
+
+    async def scenario():
+        run, source = service.start_run("l4", "m", 8)
+        store.threads.clear()
+        # Poll the wrapped store so that only the service's own calls are recorded.
+        await wait_for(lambda: inner.get(run.id).status not in {"pending", "running"})
+        return inner.get(run.id), source, threading.get_ident()
+
+    run, source, loop_thread = _run(scheduler, scenario)
+    assert source == "new"
+    assert run.status == "succeeded", run.error_message
+    assert run.latency_p50_ms and run.throughput_rps
+    assert json.loads(run.artifacts["result_json"])
+    assert store.threads and loop_thread not in store.threads
+
+
+def test_artifact_store_is_only_used_off_the_event_loop(make_service, wait_for, tmp_path):
+    artifact_store = _ThreadCheckingStore(ArtifactStore(tmp_path / "artifacts", chunk_size=256))
+    scheduler = RunScheduler(max_concurrency=2)
+    service: RunService = make_service(
+        scheduler=scheduler, artifact_store=artifact_store, artifact_inline_max_bytes=0
+    )
+
+    async def scenario():
+        run, _ = service.start_run("l4", "m", 8)
+        await wait_for(lambda: service.get_run(run.id).status not in {"pending", "running"})
+        return service.get_run(run.id), threading.get_ident()
+
+    run, loop_thread = _run(scheduler, scenario)
+    assert run.status == "succeeded", run.error_message
+    assert "result.json" in run.artifact_refs
+    assert run.telemetry_summary
+    assert artifact_store.threads and loop_thread not in artifact_store.threads
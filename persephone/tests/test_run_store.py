@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from controller.app.storage.models import Run
+from controller.app.storage.sqlite_store import SqliteRunStore
+from controller.app.storage.store import InMemoryRunStore, RunQuery
+
+
+def _run(index: int, **fields) -> Run:
+    values = dict(
+        id=f"run-{index}",
+        gpu_type="l4" if index % 2 else "a100",
+        model_ref="m",
+        samples=8,
+        status="pending",
+        started_at=datetime(2026, 1, 1) + timedelta(minutes=index),
+    )
+    values.update(fields)
+    return Run(**values)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryRunStore()
+    return SqliteRunStore(tmp_path / "runs.db")
+
+
+def test_save_get_and_update_round_trip(store):
+    run = _run(1, artifacts={"result_json": "{}", "gpu_columnar": b"\x00\x01"})
+    store.save(run)
+    run.mark_succeeded(10.0, 20.0, 5.0, {"result_json": '{"a": 1}', "gpu_columnar": b"\x00\x01"}, datetime(2026, 1, 2))
+    store.update(run)
+
+    loaded = store.get("run-1")
+    assert loaded.status == "succeeded"
+    assert loaded.latency_p95_ms == 20.0
+    assert loaded.artifacts == {"result_json": '{"a": 1}', "gpu_columnar": b"\x00\x01"}
+    assert store.get("missing") is None
+    assert store.count() == 1
+
+
+def test_query_filters_and_pages_newest_first(store):
+    for index in range(6):
+        store.save(_run(index))
+
+    page = store.query_runs(RunQuery(gpu_type="l4", limit=2))
+    assert [run.id for run in page] == ["run-5", "run-3"]
+    last = page[-1]
+    rest = store.query_runs(RunQuery(gpu_type="l4", before=(last.started_at, last.id), limit=2))
+    assert [run.id for run in rest] == ["run-1"]
+
+
+def test_sqlite_rejects_in_memory_database():
+    with pytest.raises(ValueError):
+        SqliteRunStore(":memory:")
+
+
+def test_sqlite_is_usable_from_other_threads(tmp_path):
+    store = SqliteRunStore(tmp_path / "runs.db")
+    store.save(_run(1))
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(store.get("run-1")))
+    thread.start()
+    thread.join()
+    assert seen[0].id == "run-1"
+
+
+def test_sqlite_update_writes_only_changed_artifacts(tmp_path):
+    path = tmp_path / "runs.db"
+    store = SqliteRunStore(path)
+    run = _run(1, status="running", artifacts={"big": "x" * 1000, "small": "a"})
+    store.save(run)
+
+    # Record which rows a second save touches.
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE touched (name TEXT)")
+    conn.execute("CREATE TRIGGER t_ins AFTER INSERT ON artifacts BEGIN INSERT INTO touched VALUES (new.name); END")
+    conn.execute("CREATE TRIGGER t_upd AFTER UPDATE ON artifacts BEGIN INSERT INTO touched VALUES (new.name); END")
+    conn.execute("CREATE TRIGGER t_del AFTER DELETE ON artifacts BEGIN INSERT INTO touched VALUES (old.name); END")
+    conn.commit()
+
+    run.artifacts = {"big": "x" * 1000, "small": "b", "new": "c"}
+    store.update(run)
+    assert sorted(name for (name,) in conn.execute("SELECT name FROM touched")) == ["new", "small"]
+
+    run.artifacts = {"big": "x" * 1000}
+    store.update(run)
+    assert store.get("run-1").artifacts == {"big": "x" * 1000}
+
+
+def test_sqlite_drops_artifacts_removed_before_a_restart(tmp_path):
+    path = tmp_path / "runs.db"
+    store = SqliteRunStore(path)
+    store.save(_run(1, status="succeeded", artifacts={"a": "1", "b": "2"}))
+
+    reopened = SqliteRunStore(path)
+    run = reopened.get("run-1")
+    del run.artifacts["b"]
+    reopened.update(run)
+    assert SqliteRunStore(path).get("run-1").artifacts == {"a": "1"}
+
+
+def test_get_many_loads_runs_with_artifacts(store):
+    store.save(_run(1, artifacts={"a": "1", "b": b"\x02"}))
+    store.save(_run(2))
+
+    runs = store.get_many(["run-1", "run-2", "missing"])
+    assert sorted(runs) == ["run-1", "run-2"]
+    assert runs["run-1"].artifacts == {"a": "1", "b": b"\x02"}
+    assert runs["run-2"].artifacts == {}
+    assert store.get_many([]) == {}
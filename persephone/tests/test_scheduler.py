@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List, Tuple
+
+import pytest
+
+from controller.app.services.scheduler import RunScheduler, SchedulerError
+
+
+def _run_jobs(scheduler: RunScheduler, jobs: List[Tuple[str, str, int]], gpu_type: str = "l4") -> List[str]:
+    """Submit ``(run_id, owner, priority)`` jobs at once and return the dispatch order."""
+
+    order: List[str] = []
+
+    async def job(run_id, _cancel_event) -> None:
+        order.append(run_id)
+        await asyncio.sleep(0.001)
+
+    async def scenario() -> None:
+        await scheduler.start()
+        for run_id, owner, priority in jobs:
+            scheduler.submit(run_id, gpu_type, job, owner=owner, priority=priority)
+        while scheduler.stats()["completed"] < len(jobs):
+            await asyncio.sleep(0.001)
+        await scheduler.shutdown(1)
+
+    asyncio.run(scenario())
+    return order
+
+
+def test_owners_alternate_even_when_one_queued_first():
+    jobs = [(f"a{index}", "a", 0) for index in range(4)] + [(f"b{index}", "b", 0) for index in range(2)]
+    order = _run_jobs(RunScheduler(max_concurrency=1), jobs)
+    assert order == ["a0", "b0", "a1", "b1", "a2", "a3"]
+
+
+def test_priority_beats_fair_share():
+    jobs = [("a0", "a", 0), ("a1", "a", 0), ("b0", "b", 0), ("b1", "b", 5)]
+    order = _run_jobs(RunScheduler(max_concurrency=1), jobs)
+    assert order[0] == "b1"
+
+
+def test_gpu_limits_bound_concurrency():
+    running = {"now": 0, "max": 0}
+
+    async def job(_run_id, _cancel_event) -> None:
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.005)
+        running["now"] -= 1
+
+    async def scenario() -> None:
+        scheduler = RunScheduler(max_concurrency=4, gpu_limits={"h100": 2})
+        await scheduler.start()
+        for index in range(6):
+            scheduler.submit(f"r{index}", "h100", job)
+        while scheduler.stats()["completed"] < 6:
+            await asyncio.sleep(0.001)
+        await scheduler.shutdown(1)
+
+    asyncio.run(scenario())
+    assert running["max"] == 2
+
+
+def test_cancel_queued_and_running_jobs():
+    cancelled = []
+
+    async def scenario() -> Tuple[str, str, bool]:
+        scheduler = RunScheduler(max_concurrency=1)
+        await scheduler.start()
+        started = asyncio.Event()
+        seen = {}
+
+        async def job(run_id, cancel_event) -> None:
+            started.set()
+            while not cancel_event.is_set():
+                await asyncio.sleep(0.001)
+            seen[run_id] = True
+
+        scheduler.submit("first", "l4", job)
+        scheduler.submit("second", "l4", job, on_cancel=lambda run_id, reason: cancelled.append((run_id, reason)))
+        await started.wait()
+        queued = scheduler.cancel("second")
+        running = scheduler.cancel("first")
+        await scheduler.shutdown(1)
+        return queued, running, seen.get("first", False)
+
+    assert asyncio.run(scenario()) == ("queued", "running", True)
+    assert cancelled == [("second", "cancelled by user")]
+
+
+def test_submit_rejects_when_not_running_or_full():
+    scheduler = RunScheduler(max_queue=1)
+    with pytest.raises(SchedulerError):
+        scheduler.submit("r", "l4", lambda *_: None)
+
+    async def scenario() -> None:
+        await scheduler.start()
+        scheduler.submit("r1", "l4", lambda *_: None)
+        with pytest.raises(SchedulerError):
+            scheduler.submit("r2", "l4", lambda *_: None)
+        await scheduler.shutdown(1)
+
+    asyncio.run(scenario())
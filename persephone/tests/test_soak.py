@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Dict, List, Optional
+
+import pytest
+
+from agent.histogram import LatencyHistogram
+from controller.app.providers.runpod_orch import RUN_TOKEN_ENV
+from controller.app.services.run_service import RunService
+from controller.app.services.scheduler import RunScheduler
+from controller.app.services.soak import SoakProgress
+from controller.app.storage.models import Run
+from controller.app.storage.store import InMemoryRunStore
+
+
+def _checkpoint(t_s: float, latencies: List[float], errors: int = 0, final: bool = False) -> bytes:
+    histogram = LatencyHistogram()
+    histogram.record_many(latencies)
+    line = {
+        "t_s": t_s,
+        "requests": len(latencies),
+        "errors": errors,
+        "final": final,
+        "latency_histogram": histogram.to_dict(),
+    }
+    return (json.dumps(line) + "\n").encode("utf-8")
+
+
+def test_progress_folds_checkpoints_across_partial_reads():
+    data = _checkpoint(30.0, [10.0, 20.0]) + _checkpoint(60.0, [30.0, 40.0], errors=1)
+    progress = SoakProgress()
+
+    assert progress.feed(data[:50]) == 0
+    assert progress.feed(data[50:]) == 2
+    summary = progress.summary()
+    assert progress.offset == len(data)
+    assert (summary["checkpoints"], summary["requests"], summary["errors"]) == (2, 4, 1)
+    assert summary["elapsed_s"] == 60.0
+    assert summary["throughput_rps"] == pytest.approx(4 / 60, abs=1e-3)
+    assert summary["latency_max_ms"] == 40.0
+    assert not summary["final"]
+
+
+def test_discarding_a_torn_line_rewinds_the_offset():
+    first = _checkpoint(30.0, [10.0])
+    progress = SoakProgress()
+    progress.feed(first + b'{"t_s": 60')
+
+    progress.discard_partial()
+    assert progress.offset == len(first)
+    # The resumed agent rewrites the line from scratch.
+    assert progress.feed(_checkpoint(60.0, [20.0], final=True)) == 1
+    assert progress.summary()["final"]
+
+
+class _Orchestrator:
+    """A pod whose agent fails ``failures`` times after writing ``checkpoints``."""
+
+    def __init__(self, checkpoints: bytes, failures: int = 1, status: Optional[str] = "RUNNING") -> None:
+        self.checkpoints = checkpoints
+        self.failures = failures
+        self.status = status
+        self.execs: List[Dict[str, str]] = []
+
+    async def wait_and_fetch(self, pod_id: str, timeout_s: int, **options: object) -> Dict[str, str]:
+        await asyncio.sleep(0.02)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError(f"pod {pod_id} exited without result.json")
+        return {"result.json": "{}"}
+
+    async def fetch_from(self, pod_id: str, name: str, offset: int = 0) -> Optional[bytes]:
+        return self.checkpoints[offset:]
+
+    async def get_pod_statuses(self, pod_ids: List[str]) -> Dict[str, str]:
+        return {pod_id: self.status for pod_id in pod_ids if self.status is not None}
+
+    async def exec(self, pod_id: str, command: List[str], env: Optional[Dict[str, str]] = None) -> None:
+        self.execs.append(dict(env or {}))
+
+
+def _soak_run(orchestrator: _Orchestrator, soak_max_resumes: int = 1):  # type: ignore[no-untyped-def]
+    store = InMemoryRunStore()
+    service = RunService(
+        store,
+        orchestrator,  # type: ignore[arg-type]
+        60,
+        scheduler=RunScheduler(max_concurrency=1),
+        soak_poll_s=0.01,
+        soak_max_resumes=soak_max_resumes,
+    )
+    run = Run(id="soak", gpu_type="l4", model_ref="m", samples=1, status="running", soak_s=60.0)
+    store.save(run)
+    env = {"SOAK_S": "60", RUN_TOKEN_ENV: "token"}
+    return store, run, service._follow_soak(run, "pod-1", env, lambda: None)
+
+
+def test_follow_soak_resumes_on_the_same_running_pod():
+    orchestrator = _Orchestrator(_checkpoint(30.0, [10.0, 20.0]))
+    _, run, follow = _soak_run(orchestrator)
+
+    assert asyncio.run(follow) == {"result.json": "{}"}
+    assert [env.get("RESUME") for env in orchestrator.execs] == ["1"]
+    assert orchestrator.execs[0][RUN_TOKEN_ENV] == "token"
+    assert run.progress["checkpoints"] == 1
+
+
+@pytest.mark.parametrize("status", ["TERMINATED", "EXITED", None])
+def test_follow_soak_fails_fast_when_its_pod_is_gone(status):
+    orchestrator = _Orchestrator(_checkpoint(30.0, [10.0, 20.0]), status=status)
+    store, run, follow = _soak_run(orchestrator)
+
+    expected = f"pod pod-1 is {status or 'MISSING'}, so the soak cannot resume from t=30.0s"
+    with pytest.raises(RuntimeError, match=expected):
+        asyncio.run(follow)
+    assert orchestrator.execs == []
+    assert store.get(run.id).progress["requests"] == 2
+
+
+def test_follow_soak_gives_up_after_its_resumes():
+    orchestrator = _Orchestrator(_checkpoint(30.0, [10.0]) + _checkpoint(60.0, [20.0]), failures=2)
+    store, run, follow = _soak_run(orchestrator)
+
+    with pytest.raises(RuntimeError, match="exited without result.json"):
+        asyncio.run(follow)
+    assert len(orchestrator.execs) == 1
+    assert store.get(run.id).progress["checkpoints"] == 2
+
+
+def test_follow_soak_without_checkpoints_does_not_resume():
+    orchestrator = _Orchestrator(b"")
+    _, _, follow = _soak_run(orchestrator)
+
+    with pytest.raises(RuntimeError, match="exited without result.json"):
+        asyncio.run(follow)
+    assert orchestrator.execs == []
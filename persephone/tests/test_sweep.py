@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from controller.app.services.scheduler import RunScheduler, SchedulerError
+from controller.app.storage.artifact_store import ArtifactStore
+from controller.app.storage.store import RunQuery
+
+TERMINAL = {"succeeded", "failed", "cancelled"}
+
+
+def _scenario(scheduler: RunScheduler, body):
+    async def main():
+        await scheduler.start()
+        try:
+            return await body()
+        finally:
+            await scheduler.shutdown(1)
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def fake_runpod_config(fake_runpod_config):
+    fake_runpod_config.run_duration_s = 0.5
+    return fake_runpod_config
+
+
+def test_sweep_packs_configurations_into_batches(make_service, wait_for):
+    scheduler = RunScheduler(max_concurrency=2)
+    service = make_service(scheduler=scheduler, sweep_max_configs_per_pod=2, sweep_poll_s=0.05)
+
+    async def body():
+        sweep_id, runs = service.start_sweep(["l4"], ["m"], [4, 8, 16])
+        assert scheduler.stats()["queued"] == 2
+        await wait_for(lambda: service.get_sweep(sweep_id)["status"] not in {"pending", "running"})
+        return service.get_sweep(sweep_id)
+
+    sweep = _scenario(scheduler, body)
+    assert sweep["counts"] == {"succeeded": 3}
+
+
+def test_sweep_streams_pod_files_into_the_artifact_store_and_times_phases(make_service, wait_for, tmp_path):
+    scheduler = RunScheduler(max_concurrency=1)
+    service = make_service(
+        scheduler=scheduler,
+        sweep_max_configs_per_pod=2,
+        sweep_poll_s=0.05,
+        artifact_store=ArtifactStore(tmp_path / "artifacts"),
+    )
+
+    async def body():
+        sweep_id, runs = service.start_sweep(["l4"], ["m"], [4, 8])
+        await wait_for(lambda: service.get_sweep(sweep_id)["status"] not in {"pending", "running"})
+        return [service.get_run(run.id) for run in runs]
+
+    runs = _scenario(scheduler, body)
+    assert [run.status for run in runs] == ["succeeded", "succeeded"]
+    for run in runs:
+        assert {"queued", "pod_acquire", "exec", "wait", "download", "parse", "teardown"} <= set(run.phases)
+        assert set(run.artifacts) == {"result_json", "gpu_csv"}
+    # The fake pod samples its GPUs once a second, so only the first run's slice holds a sample.
+    assert runs[0].telemetry_summary["samples"] == 1
+
+
+def test_cancelling_any_run_of_a_batch_cancels_the_batch(make_service, wait_for):
+    scheduler = RunScheduler(max_concurrency=1)
+    service = make_service(scheduler=scheduler, sweep_max_configs_per_pod=2, sweep_poll_s=0.05)
+
+    async def body():
+        sweep_id, runs = service.start_sweep(["l4"], ["m"], [4, 8, 16, 32])
+        running, queued = runs[:2], runs[2:]
+        await wait_for(lambda: service.get_run(running[0].id).status == "running")
+        # Neither run is the one the batch used to be keyed by.
+        assert service.cancel_run(queued[1].id) == "queued"
+        assert service.cancel_run(running[1].id) == "running"
+        await wait_for(lambda: all(service.get_run(run.id).status in TERMINAL for run in runs))
+        # The in-memory store shares run objects, so wait for the batch job itself to end too.
+        await wait_for(lambda: scheduler.stats()["running"] == 0)
+        return [service.get_run(run.id).status for run in runs], service.cancel_run(running[1].id)
+
+    statuses, again = _scenario(scheduler, body)
+    assert statuses == ["cancelled"] * 4
+    assert again is None
+
+
+def test_cancel_sweep_reaches_running_batches_with_finished_runs(make_service, wait_for):
+    scheduler = RunScheduler(max_concurrency=1)
+    service = make_service(scheduler=scheduler, sweep_max_configs_per_pod=4, sweep_poll_s=0.05)
+
+    async def body():
+        sweep_id, runs = service.start_sweep(["l4"], ["m"], [4, 8])
+        await wait_for(lambda: service.get_run(runs[0].id).status == "running")
+        # The first configuration of a running batch already finished.
+        first = service.get_run(runs[0].id)
+        first.mark_succeeded(1.0, 2.0, 3.0, {}, first.started_at)
+        service._store.update(first)  # pylint: disable=protected-access
+        cancelled = service.cancel_sweep(sweep_id)
+        await wait_for(lambda: service.get_run(runs[1].id).status in TERMINAL)
+        return cancelled, service.get_run(runs[1].id).status
+
+    assert _scenario(scheduler, body) == (1, "cancelled")
+
+
+def test_rejected_batch_rolls_back_the_whole_sweep(make_service):
+    scheduler = RunScheduler(max_concurrency=1, max_queue=1)
+    service = make_service(scheduler=scheduler, sweep_max_configs_per_pod=1)
+
+    async def body():
+        with pytest.raises(SchedulerError):
+            service.start_sweep(["l4"], ["m"], [4, 8, 16])
+        runs = service.list_runs(RunQuery())
+        return sorted(run.status for run in runs), scheduler.stats()["queued"]
+
+    statuses, queued = _scenario(scheduler, body)
+    assert statuses == ["cancelled", "failed"]
+    assert queued == 0
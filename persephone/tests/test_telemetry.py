@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import io
+import json
+
+import numpy as np
+import pytest
+
+from agent.gpu_metrics import CSV_HEADER
+from agent.telemetry_format import ColumnarWriter
+from controller.app.services.telemetry import (
+    build_series,
+    columns_to_csv,
+    is_columnar,
+    load_columnar,
+    load_columnar_file,
+    load_csv,
+    series_at,
+    summarize_telemetry,
+)
+from controller.app.storage.models import Run
+
+
+def _table(rows: int, devices: int = 2) -> np.ndarray:
+    samples = rows // devices
+    table = np.zeros((samples * devices, len(CSV_HEADER)))
+    table[:, 0] = np.repeat(np.arange(samples) * 0.5, devices)
+    table[:, 1] = np.tile(np.arange(devices), samples)
+    table[:, 2] = np.tile([10, 90], samples * devices // 2)
+    table[:, 4] = 1800.25
+    table[:, 5] = 200.0
+    return table
+
+
+def _encode(*tables: np.ndarray) -> bytes:
+    stream = io.BytesIO()
+    writer = ColumnarWriter(stream, CSV_HEADER)
+    for table in tables:
+        writer.write(table)
+    return stream.getvalue()
+
+
+def test_columnar_round_trip_across_blocks():
+    first, second = _table(8), _table(6)
+    second[:, 0] += 10
+    columns = load_columnar(_encode(first, second))
+    expected = np.vstack([first, second])
+    assert list(columns) == CSV_HEADER
+    for position, name in enumerate(CSV_HEADER):
+        assert columns[name] == pytest.approx(expected[:, position])
+
+
+def test_columnar_file_is_memory_mapped(tmp_path):
+    path = tmp_path / "gpu.ptel"
+    path.write_bytes(_encode(_table(4)))
+    assert load_columnar_file(path)["vram_mb"] == pytest.approx([1800.25] * 4)
+
+
+def test_non_columnar_buffer_is_rejected():
+    assert not is_columnar(b"t,gpu\n")
+    with pytest.raises(ValueError):
+        load_columnar(b"t,gpu\n")
+
+
+def test_columns_render_as_csv_that_parses_back():
+    columns = load_columnar(_encode(_table(4)))
+    parsed = load_csv(columns_to_csv(columns))
+    assert parsed["t"] == pytest.approx(columns["t"])
+    assert parsed["power_w"] == pytest.approx(columns["power_w"])
+    assert load_csv(",".join(CSV_HEADER))["t"].size == 0
+
+
+def test_summary_integrates_energy_per_device():
+    summary = summarize_telemetry(load_columnar(_encode(_table(6))))
+    # Two devices at 200 W for one second each.
+    assert summary["energy_j"] == pytest.approx(400.0)
+    assert summary["samples"] == 3
+    assert summary["duration_s"] == pytest.approx(1.0)
+    assert summary["gpu_util_max"] == 90
+    assert summarize_telemetry({}) == {}
+
+
+def test_throttle_time_counts_only_slowdown_reasons():
+    table = _table(8)
+    table[:, 10] = 0x1 | 0x2  # GpuIdle and ApplicationsClocksSetting on a healthy GPU
+    assert summarize_telemetry(load_columnar(_encode(table)))["throttle_s"] == 0.0
+    table[2:4, 10] = 0x1 | 0x20  # both devices hit the SW thermal slowdown for one interval
+    assert summarize_telemetry(load_columnar(_encode(table)))["throttle_s"] == pytest.approx(1.0)
+
+
+def test_build_series_keeps_spikes_in_every_level():
+    table = _table(2000)
+    table[1000, 2] = 100.0  # one spike on gpu 0, which otherwise sits at 10
+    columns = load_columnar(_encode(table))
+
+    levels = build_series(columns, resolutions=(10, 100, 5000))
+    assert sorted(levels) == [10, 100]  # 1000 samples per device: no level at or above that
+    for level in levels.values():
+        assert sorted(level) == ["0", "1"]
+        gpu = level["0"]
+        assert len(gpu["t"]) <= 100
+        assert max(gpu["gpu_util"]["max"]) == 100.0
+        assert min(gpu["gpu_util"]["min"]) == 10.0
+        assert max(gpu["gpu_util"]["mean"]) < 100.0
+    assert len(levels[10]["0"]["t"]) == 10
+    assert levels[10]["0"]["t"][0] == 0.0
+
+
+def test_series_at_returns_raw_points_when_they_fit():
+    columns = load_columnar(_encode(_table(8)))
+    series = series_at(columns, 100)["0"]
+    assert series["t"] == [0.0, 0.5, 1.0, 1.5]
+    assert series["gpu_util"]["min"] == series["gpu_util"]["max"] == [10.0, 10.0, 10.0, 10.0]
+
+
+def test_run_series_uses_the_largest_precomputed_level_that_fits(make_service):
+    service = make_service()
+    run = Run(id="r", gpu_type="l4", model_ref="m", samples=1, status="succeeded", artifacts={"gpu_columnar": _encode(_table(2400))})
+    service._ingest_telemetry(run)  # pylint: disable=protected-access
+    assert run.telemetry_summary["samples"] == 1200
+    assert sorted(name for name in run.artifacts if name.startswith("gpu_series_")) == ["gpu_series_100", "gpu_series_500"]
+
+    stored = json.loads(service.telemetry_series(run, 700))
+    assert (stored["resolution"], stored["samples"]) == (500, 1200)
+    assert len(stored["gpus"]["0"]["t"]) == 500
+
+    on_demand = json.loads(service.telemetry_series(run, 50))
+    assert on_demand["resolution"] == 50
+    assert len(on_demand["gpus"]["1"]["t"]) == 50
+
+    raw = json.loads(service.telemetry_series(run, 5000))
+    assert (raw["resolution"], len(raw["gpus"]["0"]["t"])) == (1200, 1200)
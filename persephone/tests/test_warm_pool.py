@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+from typing import Dict, List
+
+import pytest
+
+from controller.app.providers.warm_pool import WarmPodPool
+from controller.app.services.scheduler import RunScheduler
+
+
+class _Orchestrator:
+    def __init__(self) -> None:
+        self._ids = itertools.count()
+        self.created: List[str] = []
+        self.stopped: List[str] = []
+        self.statuses: Dict[str, str] = {}
+
+    async def create_pod(self, gpu_type: str, env: Dict[str, str]) -> str:
+        pod_id = f"{gpu_type}-{next(self._ids)}"
+        self.created.append(pod_id)
+        return pod_id
+
+    async def stop_pod(self, pod_id: str) -> None:
+        self.stopped.append(pod_id)
+
+    async def get_pod_statuses(self, pod_ids: List[str]) -> Dict[str, str]:
+        return {pod_id: self.statuses.get(pod_id, "RUNNING") for pod_id in pod_ids}
+
+
+def test_released_pod_is_reused_by_the_same_model():
+    orchestrator = _Orchestrator()
+    pool = WarmPodPool(orchestrator, target_sizes={"l4": 1})
+
+    async def scenario():
+        first = await pool.acquire("l4", "m", {})
+        await pool.release(first)
+        second = await pool.acquire("l4", "m", {})
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert not first.warm and second.warm
+    assert second.pod_id == first.pod_id
+    assert pool.stats()["hits"] == 1
+
+
+def test_pods_without_a_target_are_stopped_after_use():
+    orchestrator = _Orchestrator()
+    pool = WarmPodPool(orchestrator)
+
+    async def scenario():
+        lease = await pool.acquire("a100", "m", {})
+        await pool.release(lease)
+        return lease
+
+    lease = asyncio.run(scenario())
+    assert orchestrator.stopped == [lease.pod_id]
+
+
+def test_unhealthy_release_is_not_pooled():
+    orchestrator = _Orchestrator()
+    pool = WarmPodPool(orchestrator, target_sizes={"l4": 1})
+
+    async def scenario():
+        lease = await pool.acquire("l4", "m", {})
+        await pool.release(lease, healthy=False)
+        return lease
+
+    lease = asyncio.run(scenario())
+    assert orchestrator.stopped == [lease.pod_id]
+    assert pool.stats()["idle_by_gpu_type"] == {}
+
+
+def test_maintain_prewarms_evicts_and_replaces_unhealthy_pods():
+    orchestrator = _Orchestrator()
+    pool = WarmPodPool(orchestrator, target_sizes={"l4": 2}, idle_ttl_s=60, health_interval_s=60)
+
+    async def scenario():
+        # The maintenance loop pre-warms right away, then sleeps for the health interval.
+        await pool.start()
+        await asyncio.sleep(0.01)
+        assert pool.stats()["idle_by_gpu_type"] == {"l4": 2}
+        orchestrator.statuses[orchestrator.created[0]] = "TERMINATED"
+        await pool.maintain()
+        # An unbound pod serves any model.
+        lease = await pool.acquire("l4", "other", {})
+        await pool.close()
+        return lease
+
+    lease = asyncio.run(scenario())
+    assert lease.warm
+    assert orchestrator.created[0] in orchestrator.stopped
+    assert len(orchestrator.created) == 3
+    assert pool.stats()["unhealthy"] == 1
+
+
+def test_pods_that_stopped_running_are_neither_pooled_nor_reused():
+    orchestrator = _Orchestrator()
+    pool = WarmPodPool(orchestrator, target_sizes={"l4": 2})
+
+    async def scenario():
+        first, second = await pool.acquire("l4", "m", {}), await pool.acquire("l4", "m", {})
+        orchestrator.statuses[first.pod_id] = "EXITED"
+        await pool.release(first)
+        await pool.release(second)
+        orchestrator.statuses[second.pod_id] = "EXITED"  # exited while idle
+        return first, second, await pool.acquire("l4", "m", {})
+
+    first, second, third = asyncio.run(scenario())
+    assert orchestrator.stopped == [first.pod_id, second.pod_id]
+    assert not third.warm and third.pod_id not in (first.pod_id, second.pod_id)
+    assert pool.stats()["unhealthy"] == 1
+
+
+class _TrustingPool(WarmPodPool):
+    """The pool without its status checks, handing out pods whatever state they are in."""
+
+    async def _is_running(self, pod_id: str) -> bool:
+        return True
+
+
+@pytest.mark.parametrize("pool_type", [WarmPodPool, _TrustingPool])
+def test_a_reused_pod_that_already_exited_never_reports_the_previous_result(
+    make_service, orchestrator, wait_for, pool_type
+):
+    scheduler = RunScheduler(max_concurrency=1)
+    service = make_service(scheduler=scheduler, pool=pool_type(orchestrator, target_sizes={"l4": 1}))
+
+    async def scenario():
+        await scheduler.start()
+        try:
+            runs = []
+            for samples in (4, 8):
+                run, _ = service.start_run("l4", "m", samples)
+                await wait_for(lambda: service.get_run(run.id).status not in {"pending", "running"})
+                runs.append(service.get_run(run.id))
+            return runs
+        finally:
+            await scheduler.shutdown(1)
+
+    first, second = asyncio.run(scenario())
+    assert first.status == "succeeded"
+    if pool_type is WarmPodPool:
+        # The first pod exited with its run, so the second one gets a new pod.
+        assert second.status == "succeeded", second.error_message
+        assert json.loads(second.artifacts["result_json"])["samples"] == 8
+    else:
+        # Handed the exited pod, the run sees the first run's result.json and fails instead of reporting it.
+        assert second.status == "failed"
+        assert "another run" in second.error_message
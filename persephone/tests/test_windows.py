@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from agent.gpu_metrics import FIELDS
+from agent.windows import RunWindows
+from controller.app.services.correlation import latency_outliers, parse_windows
+
+
+def _gpu(**values: float) -> np.ndarray:
+    sample = np.zeros((1, len(FIELDS)))
+    for name, value in values.items():
+        sample[0, FIELDS.index(name)] = value
+    return sample
+
+
+def test_latency_and_gpu_samples_join_on_window_index():
+    windows = RunWindows(window_s=1.0, origin=100.0)
+    windows.record_latency(100.2, 10.0)
+    windows.record_latency(100.9, 30.0)
+    windows.record_error(101.5)
+    windows.record_gpu(100.5, _gpu(gpu_util=50, sm_clock_mhz=1800, temp_c=60))
+    windows.record_gpu(100.7, _gpu(gpu_util=70, sm_clock_mhz=1500, temp_c=65, throttle_reasons=4))
+    windows.record_latency(99.0, 5.0)  # before the origin counts towards the first window
+
+    first, second = windows.records()
+    assert (first["t_start_s"], first["t_end_s"], first["requests"], first["errors"]) == (0.0, 1.0, 3, 0)
+    assert first["latency_max_ms"] == pytest.approx(30.0, rel=0.05)
+    assert first["gpu_util_mean"] == 60.0
+    assert (first["sm_clock_mhz_min"], first["temp_c_max"]) == (1500.0, 65.0)
+    assert first["throttled_fraction"] == 0.5
+    assert (second["requests"], second["errors"]) == (0, 1)
+    assert [record["t_start_s"] for record in windows.records(first=1)] == [1.0]
+
+
+def test_idle_and_application_clock_bits_are_not_throttling():
+    windows = RunWindows(window_s=1.0, origin=0.0)
+    windows.record_gpu(0.2, _gpu(throttle_reasons=0x1))
+    windows.record_gpu(0.4, _gpu(throttle_reasons=0x2 | 0x1))
+    windows.record_gpu(0.6, _gpu(throttle_reasons=0x1 | 0x40))
+    windows.record_gpu(0.8, np.vstack([_gpu(throttle_reasons=0x1), _gpu(throttle_reasons=0x80)]))
+
+    assert windows.records()[0]["throttled_fraction"] == 0.5
+
+
+def test_latency_state_merges_across_processes():
+    main, worker = RunWindows(window_s=1.0, origin=0.0), RunWindows(window_s=1.0, origin=0.0)
+    main.record_latency(0.5, 10.0)
+    worker.record_latency(0.5, 20.0)
+    worker.record_latency(2.5, 40.0)
+    worker.record_error(2.6)
+    main.merge_latency(worker.latency_state())
+
+    assert [(record["requests"], record["errors"]) for record in main.records()] == [(2, 0), (1, 1)]
+    assert main.merged_latency().count == 3
+    assert main.merged_latency(first=1).count == 1
+    assert main.merged_latency(first=5) is None
+
+
+def test_window_length_must_be_positive():
+    with pytest.raises(ValueError):
+        RunWindows(window_s=0)
+
+
+def _window(index: int, p95: float, **gpu: float) -> dict:
+    record = {"t_start_s": index * 2.0, "t_end_s": index * 2.0 + 2, "requests": 20, "latency_p95_ms": p95}
+    record.update(gpu_util_mean=80.0, sm_clock_mhz_min=1800.0, temp_c_max=60.0, throttled_fraction=0.0)
+    record.update(gpu)
+    return record
+
+
+def test_outliers_carry_gpu_state_and_signals():
+    windows = [_window(index, 100.0 + index % 3) for index in range(10)]
+    windows.append(_window(10, 400.0, sm_clock_mhz_min=1200.0, temp_c_max=80.0, throttled_fraction=0.5))
+    windows.append(_window(11, 350.0, gpu_util_mean=20.0))
+    windows.append({**_window(12, 900.0), "requests": 2})  # too few requests to judge
+
+    report = latency_outliers(windows)
+    assert (report["windows"], report["eligible_windows"]) == (13, 12)
+    assert report["baseline"]["gpu_util_mean"] == 80.0
+    first, second = report["outliers"]
+    assert first["t_start_s"] == 20.0
+    assert first["signals"] == ["throttling", "sm_clock_drop", "thermal"]
+    assert first["gpu"]["sm_clock_mhz_min"] == 1200.0
+    assert second["signals"] == ["gpu_underutilized"]
+
+
+def test_steady_or_short_runs_have_no_outliers():
+    assert latency_outliers([_window(index, 100.0) for index in range(10)])["outliers"] == []
+    assert latency_outliers([_window(0, 1.0), _window(1, 1000.0)])["outliers"] == []
+
+
+def test_parse_windows_skips_malformed_lines():
+    text = '{"requests": 1}\nnot json\n[1, 2]\n\n{"requests": 2}\n'
+    assert parse_windows(text) == [{"requests": 1}, {"requests": 2}]
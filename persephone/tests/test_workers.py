@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import pytest
+
+from agent import workers
+from agent.histogram import LatencyHistogram
+from agent.workers import _combine_sweeps, run_workers
+from controller.app.services.run_service import RunService
+
+
+def _entry(batch_size: int, latencies, tokens_per_s: float) -> dict:
+    histogram = LatencyHistogram()
+    for latency in latencies:
+        histogram.record(latency)
+    return {
+        "batch_size": batch_size,
+        "samples": len(latencies),
+        "mode": "closed",
+        "concurrency": 1,
+        "throughput_rps": 10.0,
+        "errors": 0,
+        "duration_s": 1.0,
+        "tokens_per_s": tokens_per_s,
+        "latency_histogram": histogram.to_dict(),
+    }
+
+
+def test_combined_histogram_is_for_the_chosen_batch_size_only():
+    # Each worker's own best size differs; the combined pick is batch size 4.
+    first = {"batch_sweep": [_entry(1, [1.0] * 10, 50.0), _entry(4, [100.0] * 3, 40.0)]}
+    second = {"batch_sweep": [_entry(1, [1.0] * 10, 10.0), _entry(4, [100.0] * 5, 80.0)]}
+    first.update(first["batch_sweep"][0])
+    second.update(second["batch_sweep"][1])
+
+    combined = _combine_sweeps([first, second])
+    assert combined["batch_size"] == 4
+    assert combined["latency_histogram"]["count"] == 8
+    assert combined["latency_p50_ms"] == pytest.approx(100.0, rel=0.01)
+    assert [entry["latency_histogram"]["count"] for entry in combined["batch_sweep"]] == [20, 8]
+
+
+def test_controller_uses_only_the_top_level_histogram():
+    top = _entry(4, [100.0] * 8, 0.0)
+    worker = _entry(1, [1.0] * 50, 0.0)
+    result = {**top, "latency_p50_ms": 0.0, "workers": [{"worker": 0, **worker}]}
+    parsed = RunService._parse_artifacts({"result.json": json.dumps(result)})  # pylint: disable=protected-access
+    assert parsed["result"]["latency_p50_ms"] == pytest.approx(100.0, rel=0.01)
+    assert parsed["result"]["latency_histogram"]["count"] == 8
+
+
+def test_workers_report_a_combined_top_level_histogram():
+    result = run_workers("m", 12, 2, batch_sizes=(1, 2))
+    assert result["worker_count"] == 2 and result["failed_workers"] == 0
+    chosen = next(entry for entry in result["batch_sweep"] if entry["batch_size"] == result["batch_size"])
+    assert result["latency_histogram"] == chosen["latency_histogram"]
+    assert result["latency_histogram"]["count"] > 0
+
+
+def _die_before_the_barrier(index, *args):
+    if index == 0:
+        os._exit(3)  # pylint: disable=protected-access
+    workers._worker_main(index, *args)  # pylint: disable=protected-access
+
+
+def test_a_worker_dying_before_the_barrier_releases_the_others(monkeypatch):
+    monkeypatch.setattr(workers, "_worker_main", _die_before_the_barrier)
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="probe workers failed"):
+        run_workers("m", 4, 2)
+    assert time.monotonic() - started < 30